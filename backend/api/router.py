@@ -12,6 +12,7 @@ from apps.feedback.routers import feedback_router
 from apps.payments.routers import payments_router
 from apps.re_objects.dev_routers import dev_router
 from apps.re_objects.routers import buildings_router, floors_router, premises_router
+from apps.re_objects.upload_routers import uploads_router
 from apps.referrals.routers import referrals_router
 from apps.site_settings.routers import site_settings_router
 
@@ -41,5 +42,6 @@ api.add_router("/site-settings", site_settings_router, tags=["Site Settings"])
 api.add_router("/premises", premises_router)
 api.add_router("/buildings", buildings_router)
 api.add_router("/floors", floors_router)
+api.add_router("/uploads", uploads_router)
 api.add_router("", dev_router, tags=["Dev / Test"])
 
@@ -33,6 +33,7 @@ class ErrorCode(str, Enum):
     ACCOUNTS_PASSWORD_RESET_ERROR = "ACCOUNTS_PASSWORD_RESET_ERROR"
     ACCOUNTS_PASSWORD_RESET_TOKEN_INVALID = "ACCOUNTS_PASSWORD_RESET_TOKEN_INVALID"
     ACCOUNTS_PASSWORD_RESET_TOKEN_EXPIRED = "ACCOUNTS_PASSWORD_RESET_TOKEN_EXPIRED"
+    ACCOUNTS_PASSWORD_HASHING_BUSY = "ACCOUNTS_PASSWORD_HASHING_BUSY"
     
     # Feedback errors
     FEEDBACK_NOT_FOUND = "FEEDBACK_NOT_FOUND"
@@ -47,6 +48,8 @@ class ErrorCode(str, Enum):
 
     # Re objects (premises)
     RE_OBJECTS_NOT_FOUND = "RE_OBJECTS_NOT_FOUND"
+    RE_OBJECTS_FORBIDDEN = "RE_OBJECTS_FORBIDDEN"
+    RE_OBJECTS_UPLOAD_CONFLICT = "RE_OBJECTS_UPLOAD_CONFLICT"
 
     # Bookings
     BOOKINGS_PREMISE_UNAVAILABLE = "BOOKINGS_PREMISE_UNAVAILABLE"
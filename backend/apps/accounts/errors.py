@@ -33,6 +33,7 @@ class AccountsErrorCodes:
     PASSWORD_RESET_ERROR = ErrorCode.ACCOUNTS_PASSWORD_RESET_ERROR
     PASSWORD_RESET_TOKEN_INVALID = ErrorCode.ACCOUNTS_PASSWORD_RESET_TOKEN_INVALID
     PASSWORD_RESET_TOKEN_EXPIRED = ErrorCode.ACCOUNTS_PASSWORD_RESET_TOKEN_EXPIRED
+    PASSWORD_HASHING_BUSY = ErrorCode.ACCOUNTS_PASSWORD_HASHING_BUSY
 
 
 def create_accounts_error(
@@ -65,3 +66,14 @@ def create_accounts_error(
         detail=detail,
         instance=instance
     )
+
+
+def create_password_hashing_busy_error(instance: str) -> dict:
+    """503: очередь хеширования паролей заполнена (см. services.password_hashing)."""
+    return create_accounts_error(
+        status=503,
+        code=AccountsErrorCodes.PASSWORD_HASHING_BUSY,
+        title="Service busy",
+        detail="Too many concurrent password operations, please retry shortly",
+        instance=instance
+    )
@@ -12,7 +12,7 @@ from ninja import Router
 
 from api.schemas import ProblemDetail
 
-from ..errors import AccountsErrorCodes, create_accounts_error
+from ..errors import AccountsErrorCodes, create_accounts_error, create_password_hashing_busy_error
 from ..models import CustomUser
 from ..schemas.auth import AuthOut, PasswordResetConfirmIn, PasswordResetIn, UserLoginIn, UserRegistrationIn
 from ..services.auth_service import (
@@ -23,6 +23,12 @@ from ..services.auth_service import (
     verify_password_reset_token,
 )
 from ..services.email_service import send_password_reset_email
+from ..services.password_hashing import (
+    PasswordHashingBusyError,
+    acheck_user_password,
+    aset_user_password,
+    hash_password,
+)
 from ..services.utils import get_user_data
 
 logger = logging.getLogger(__name__)
@@ -37,7 +43,7 @@ auth_router = Router()
 
 @auth_router.post(
     "/register",
-    response={200: AuthOut, 400: ProblemDetail},
+    response={200: AuthOut, 400: ProblemDetail, 503: ProblemDetail},
     summary="Регистрация пользователя",
     description="Создаёт пользователя (individual или agent). Для агентов обязательно organization_name; inn опционален. Возвращает JWT токены; опционально use_cookies.",
 )
@@ -181,13 +187,16 @@ async def register(request, data: UserRegistrationIn):  # pylint: disable=unused
         
         # Создаем пользователя
         try:
+            # Хеш считается в пуле хеширования, create_user получает готовый пароль позже
+            password_hash = await hash_password(data.password1)
             user = await sync_to_async(CustomUser.objects.create_user)(
                 username=username,
                 email=data.email,
-                password=data.password1
+                password=None
             )
             
-            # Устанавливаем дополнительные поля
+            # Устанавливаем пароль и дополнительные поля
+            user.password = password_hash
             user.user_type = data.user_type
             user.full_name = data.full_name
             user.phone = data.phone
@@ -256,6 +265,8 @@ async def register(request, data: UserRegistrationIn):  # pylint: disable=unused
         )
         return response
         
+    except PasswordHashingBusyError:
+        return 503, create_password_hashing_busy_error("/api/v1/auth/register")
     except Exception as e:
         return 400, create_accounts_error(
             status=400,
@@ -268,7 +279,7 @@ async def register(request, data: UserRegistrationIn):  # pylint: disable=unused
 
 @auth_router.post(
     "/login",
-    response={200: AuthOut, 400: ProblemDetail, 401: ProblemDetail},
+    response={200: AuthOut, 400: ProblemDetail, 401: ProblemDetail, 503: ProblemDetail},
     summary="Вход в систему",
     description="Аутентификация по email и паролю. Возвращает access и refresh токены; опционально use_cookies.",
 )
@@ -326,7 +337,7 @@ async def login_user(request, data: UserLoginIn):
             )
         
         # Проверяем пароль
-        is_valid = await sync_to_async(user.check_password)(data.password)
+        is_valid = await acheck_user_password(user, data.password)
         
         if not is_valid:
             return 401, create_accounts_error(
@@ -372,6 +383,8 @@ async def login_user(request, data: UserLoginIn):
         
         return 200, response_data
         
+    except PasswordHashingBusyError:
+        return 503, create_password_hashing_busy_error("/api/v1/auth/login")
     except Exception as e:
         return 400, create_accounts_error(
             status=400,
@@ -651,7 +664,7 @@ async def password_reset(request, data: PasswordResetIn):  # pylint: disable=unu
 
 @auth_router.post(
     "/password-reset/confirm",
-    response={200: dict, 400: ProblemDetail, 401: ProblemDetail},
+    response={200: dict, 400: ProblemDetail, 401: ProblemDetail, 503: ProblemDetail},
     summary="Подтверждение сброса пароля",
     description="Устанавливает новый пароль по токену из письма. Параметры: token, new_password1, new_password2.",
 )
@@ -734,11 +747,13 @@ async def password_reset_confirm(request, data: PasswordResetConfirmIn):  # pyli
             )
         
         # Устанавливаем новый пароль и сохраняем асинхронно
-        user.set_password(data.new_password1)
+        await aset_user_password(user, data.new_password1)
         await user.asave()
         
         return 200, {"message": "Password has been reset successfully"}
 
+    except PasswordHashingBusyError:
+        return 503, create_password_hashing_busy_error("/api/v1/auth/password-reset/confirm")
     except Exception as e:
         logger.exception('password_reset_confirm: unexpected error')
         return 400, create_accounts_error(
@@ -1,19 +1,21 @@
-from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError
+from django.http import HttpResponse
 from ninja import Query, Router
 
 from api.schemas import ProblemDetail
 from apps.bookings.schemas import BookingOut
-from apps.bookings.services import list_bookings_for_user
+from apps.bookings.services import alist_bookings_for_user, list_bookings_page_for_user
 from apps.deals.errors import DealsErrorCodes, create_deals_error
 from apps.deals.schemas import ProfilePremisesListResponse
 from apps.deals.services import list_deals_for_profile_page
 
-from ..errors import AccountsErrorCodes, create_accounts_error
-from ..schemas.profile import UpdatePasswordIn, UpdateProfileIn, UserOut
+from ..errors import AccountsErrorCodes, create_accounts_error, create_password_hashing_busy_error
+from ..schemas.profile import ProfileDashboardOut, UpdatePasswordIn, UpdateProfileIn, UserOut
 from ..services.auth_service import jwt_auth
+from ..services.dashboard import build_profile_dashboard
+from ..services.password_hashing import PasswordHashingBusyError, acheck_user_password, aset_user_password
 from ..services.utils import get_user_data
 
 profile_router = Router()
@@ -66,12 +68,47 @@ async def get_user(request):
     description=(
         "Список броней текущего пользователя (новые первые). "
         "При BOOKINGS_LIST_ONLY_ACTIVE=True (по умолчанию) — только неистёкшие; "
-        "при False — все записи (см. настройки Django)."
+        "при False — все записи (см. настройки Django). "
+        "Без page_size — весь список. С page_size (не больше 100) — страница page; "
+        "общее число записей — в заголовке X-Total-Count, соседние страницы — в Link (rel=prev/next)."
     ),
 )
-async def list_my_bookings(request):
-    items = await sync_to_async(list_bookings_for_user, thread_sensitive=True)(request.auth)
-    return 200, items
+async def list_my_bookings(
+    request,
+    response: HttpResponse,
+    page: int = Query(1, ge=1, description='Номер страницы (только вместе с page_size)'),
+    page_size: int | None = Query(None, ge=1, le=100, description='Размер страницы; без него — весь список'),
+):
+    if page_size is None:
+        return 200, await alist_bookings_for_user(request.auth)
+    result = await list_bookings_page_for_user(request.auth, page=page, page_size=page_size)
+    response['X-Total-Count'] = str(result['total'])
+    links = [
+        f'<{request.path}?page={number}&page_size={page_size}>; rel="{rel}"'
+        for rel, number in (('prev', page - 1), ('next', page + 1))
+        if 1 <= number <= result['total_pages']
+    ]
+    if links:
+        response['Link'] = ', '.join(links)
+    return 200, result['items']
+
+
+@profile_router.get(
+    '/dashboard',
+    response={200: ProfileDashboardOut, 401: ProblemDetail},
+    auth=jwt_auth,
+    summary='Сводка личного кабинета',
+    description=(
+        'Одним запросом: данные пользователя (user), первая страница активных броней (bookings), '
+        'первые страницы сделок аренды и продажи (rent, sale — как у /profile/premises) '
+        'и статистика реферальных ссылок (referrals). page_size — размер каждой страницы.'
+    ),
+)
+async def get_dashboard(
+    request,
+    page_size: int = Query(10, ge=1, le=50, description='Размер первой страницы каждого списка'),
+):
+    return 200, await build_profile_dashboard(request.auth, page_size=page_size)
 
 
 @profile_router.get(
@@ -201,7 +238,7 @@ async def update_profile(request, data: UpdateProfileIn):
 
 @profile_router.post(
     "/change-password",
-    response={200: dict, 400: ProblemDetail, 401: ProblemDetail},
+    response={200: dict, 400: ProblemDetail, 401: ProblemDetail, 503: ProblemDetail},
     auth=jwt_auth,
     summary="Смена пароля",
     description="Меняет пароль авторизованного пользователя. Требует текущий пароль и дважды новый. Требует JWT.",
@@ -248,7 +285,7 @@ async def change_password(request, data: UpdatePasswordIn):
         user = request.auth
         
         # Проверяем текущий пароль асинхронно
-        is_valid = await sync_to_async(user.check_password)(data.current_password)
+        is_valid = await acheck_user_password(user, data.current_password)
         
         if not is_valid:
             return 400, create_accounts_error(
@@ -282,11 +319,13 @@ async def change_password(request, data: UpdatePasswordIn):
             )
         
         # Устанавливаем новый пароль и сохраняем асинхронно
-        user.set_password(data.new_password1)
+        await aset_user_password(user, data.new_password1)
         await user.asave()
         
         return 200, {"message": "Password changed successfully"}
         
+    except PasswordHashingBusyError:
+        return 503, create_password_hashing_busy_error("/api/v1/profile/change-password")
     except Exception as e:
         return 400, create_accounts_error(
             status=400,
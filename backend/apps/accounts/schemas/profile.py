@@ -1,6 +1,10 @@
 from ninja import Schema
 from typing import Optional
 
+from apps.bookings.schemas import BookingListResponse
+from apps.deals.schemas import ProfilePremisesListResponse
+from apps.referrals.schemas import ReferralStatsOut
+
 
 class UserOut(Schema):
     id: int
@@ -13,6 +17,15 @@ class UserOut(Schema):
     inn: Optional[str] = None
 
 
+class ProfileDashboardOut(Schema):
+    """Всё для первого экрана личного кабинета одним ответом."""
+    user: UserOut
+    bookings: BookingListResponse
+    rent: ProfilePremisesListResponse
+    sale: ProfilePremisesListResponse
+    referrals: ReferralStatsOut
+
+
 class UpdateProfileIn(Schema):
     full_name: Optional[str] = None
     email: Optional[str] = None
@@ -0,0 +1,33 @@
+"""
+Сводка для первого экрана личного кабинета (/profile/dashboard).
+
+Раньше фронтенд делал четыре запроса (/profile/user, /profile/bookings, /profile/premises?query=rent и sale),
+каждый со своей проверкой JWT; брони читались целиком через sync_to_async. Здесь подзапросы идут через
+async ORM и собираются asyncio.gather в один ответ; у каждого списка — только первая страница.
+"""
+
+import asyncio
+
+from django.conf import settings
+
+from apps.bookings.services import list_bookings_page_for_user
+from apps.deals.services import list_deals_for_profile_page
+from apps.referrals.services import get_referral_stats
+
+from .utils import get_user_data
+
+
+async def build_profile_dashboard(user, *, page_size: int) -> dict:
+    bookings, rent, sale, referrals = await asyncio.gather(
+        list_bookings_page_for_user(user, page=1, page_size=page_size),
+        list_deals_for_profile_page(user, settings.RE_OBJECTS_SALE_TYPE_RENT, page=1, page_size=page_size),
+        list_deals_for_profile_page(user, settings.RE_OBJECTS_SALE_TYPE_SALE, page=1, page_size=page_size),
+        get_referral_stats(user),
+    )
+    return {
+        'user': get_user_data(user),
+        'bookings': bookings,
+        'rent': rent,
+        'sale': sale,
+        'referrals': referrals,
+    }
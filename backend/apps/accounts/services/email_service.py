@@ -1,26 +1,29 @@
 """
 Сервис для отправки email (только текст, без HTML-шаблонов).
+
+Письма не отправляются в запросе: они кладутся в очередь apps.notifications (outbox),
+SMTP-доставку выполняет воркер send_emails.
 """
 import logging
 
-from asgiref.sync import sync_to_async
 from django.conf import settings
-from django.core.mail import send_mail
+
+from apps.notifications.models import OutgoingEmail
+from apps.notifications.outbox import aenqueue_email
 
 logger = logging.getLogger(__name__)
 
 
-@sync_to_async
-def send_password_reset_email(user, token):
+async def send_password_reset_email(user, token):
     """
-    Отправляет email с токеном для сброса пароля
+    Ставит в очередь email с токеном для сброса пароля
 
     Args:
         user: Объект пользователя CustomUser
         token: JWT токен для сброса пароля
 
     Returns:
-        bool: True если email отправлен успешно, False в случае ошибки
+        bool: True если письмо поставлено в очередь, False в случае ошибки
     """
     try:
         reset_url = f"{settings.FRONTEND_AUTH_BASE_URL}/auth/restore-password?token={token}"
@@ -40,19 +43,18 @@ def send_password_reset_email(user, token):
 Команда Aregrp.ru
 """
 
-        send_mail(
+        await aenqueue_email(
+            to=user.email,
             subject=subject,
-            message=message.strip(),
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[user.email],
-            fail_silently=False,
+            body=message.strip(),
+            kind=OutgoingEmail.Kind.PASSWORD_RESET,
         )
 
         return True
 
     except Exception:
         logger.exception(
-            'password_reset_email: send_mail failed',
+            'password_reset_email: enqueue failed',
             extra={'user_id': getattr(user, 'pk', None)},
         )
         return False
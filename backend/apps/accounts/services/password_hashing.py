@@ -0,0 +1,158 @@
+"""
+Хеширование и проверка паролей в отдельном ограниченном пуле потоков.
+
+PBKDF2 намеренно тратит сотни миллисекунд CPU. Через общий sync_to_async-поток всплеск логинов
+останавливал остальной sync-код процесса, а set_password в async-ручках выполнялся прямо в event loop.
+Здесь хеширование идёт в ThreadPoolExecutor на PASSWORD_HASHING_WORKERS потоков: hashlib.pbkdf2_hmac
+(как и argon2/bcrypt) отпускает GIL, поэтому потоки не мешают event loop.
+
+Backpressure: одновременно принимается не больше workers + PASSWORD_HASHING_MAX_QUEUE задач,
+сверх этого — PasswordHashingBusyError (ручки отвечают 503), чтобы очередь не росла без предела.
+Метрики очереди — hashing_stats(); раз в PASSWORD_HASHING_STATS_LOG_SECONDS они пишутся в лог.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+
+logger = logging.getLogger(__name__)
+
+
+class PasswordHashingBusyError(Exception):
+    """Очередь хеширования заполнена — запрос нужно повторить позже."""
+
+
+class PasswordHasherPool:
+    def __init__(self, *, workers: int, max_queue: int, slow_wait_seconds: float = 1.0, stats_log_seconds: float = 60):
+        self.workers = workers
+        self.capacity = workers + max_queue
+        self.slow_wait_seconds = slow_wait_seconds
+        self.stats_log_seconds = stats_log_seconds
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hashing')
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._running = 0
+        self._submitted = 0
+        self._rejected = 0
+        self._completed = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._run_total = 0.0
+        self._logged_at = time.monotonic()
+
+    async def run(self, func, *args):
+        """Выполняет func(*args) в пуле; PasswordHashingBusyError — если пул и очередь заняты."""
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                self._rejected += 1
+                raise PasswordHashingBusyError(f'Password hashing queue is full ({self.capacity})')
+            self._in_flight += 1
+            self._submitted += 1
+        enqueued_at = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, self._measured, func, args, enqueued_at
+            )
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+            self._maybe_log_stats()
+
+    def _measured(self, func, args, enqueued_at: float):
+        started = time.perf_counter()
+        wait = started - enqueued_at
+        with self._lock:
+            self._running += 1
+            self._wait_total += wait
+            self._wait_max = max(self._wait_max, wait)
+        if wait > self.slow_wait_seconds:
+            logger.warning('Password hashing task waited %.2fs in queue', wait)
+        try:
+            return func(*args)
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+                self._run_total += time.perf_counter() - started
+
+    def stats(self) -> dict:
+        with self._lock:
+            completed = self._completed or 1
+            return {
+                'workers': self.workers,
+                'capacity': self.capacity,
+                'running': self._running,
+                'queued': self._in_flight - self._running,
+                'submitted': self._submitted,
+                'completed': self._completed,
+                'rejected': self._rejected,
+                'avg_wait_ms': round(self._wait_total / completed * 1000, 2),
+                'max_wait_ms': round(self._wait_max * 1000, 2),
+                'avg_run_ms': round(self._run_total / completed * 1000, 2),
+            }
+
+    def _maybe_log_stats(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if now - self._logged_at < self.stats_log_seconds:
+                return
+            self._logged_at = now
+        logger.info('Password hashing stats: %s', self.stats())
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_pool: PasswordHasherPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_hasher_pool() -> PasswordHasherPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = PasswordHasherPool(
+                workers=settings.PASSWORD_HASHING_WORKERS,
+                max_queue=settings.PASSWORD_HASHING_MAX_QUEUE,
+                stats_log_seconds=settings.PASSWORD_HASHING_STATS_LOG_SECONDS,
+            )
+        return _pool
+
+
+def hashing_stats() -> dict:
+    return get_hasher_pool().stats()
+
+
+def _verify(raw_password: str, encoded: str) -> tuple[bool, bool]:
+    needs_upgrade = []
+    is_valid = check_password(raw_password, encoded, setter=lambda _raw: needs_upgrade.append(True))
+    return is_valid, bool(needs_upgrade)
+
+
+async def hash_password(raw_password: str | None) -> str:
+    """make_password в пуле хеширования."""
+    return await get_hasher_pool().run(make_password, raw_password)
+
+
+async def acheck_user_password(user, raw_password: str) -> bool:
+    """
+    Проверяет пароль пользователя в пуле хеширования.
+
+    Как и User.check_password, при устаревшем алгоритме/числе итераций перехеширует пароль и сохраняет его.
+    """
+    is_valid, needs_upgrade = await get_hasher_pool().run(_verify, raw_password, user.password)
+    if is_valid and needs_upgrade:
+        user.password = await hash_password(raw_password)
+        await user.asave(update_fields=['password'])
+    return is_valid
+
+
+async def aset_user_password(user, raw_password: str) -> None:
+    """Аналог User.set_password (без сохранения), хеш считается в пуле."""
+    user.password = await hash_password(raw_password)
+    user._password = raw_password
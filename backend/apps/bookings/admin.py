@@ -1,10 +1,29 @@
 from django.contrib import admin
 
+from core.admin import LargeTableAdminMixin
+
 from .models import Booking
 
 
 @admin.register(Booking)
-class BookingAdmin(admin.ModelAdmin):
-    list_display = ("user", "premise", "deal_type", "referrer", "source_payment", "expires_at", "created_at")
-    list_filter = ("deal_type",)
+class BookingAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    list_display = (
+        "user",
+        "premise",
+        "deal_type",
+        "referrer",
+        "source_payment",
+        "expires_at",
+        "is_active",
+        "created_at",
+    )
+    list_select_related = (
+        "user",
+        "referrer",
+        "source_payment",
+        "premise__city",
+        "premise__building",
+        "premise__floor",
+    )
+    list_filter = ("deal_type", "is_active")
     raw_id_fields = ("user", "premise", "source_payment", "referrer")
@@ -0,0 +1,57 @@
+"""
+Снимает истёкшие брони и рассылает booking_expired.
+
+Разовый проход (cron):
+
+  uv run manage.py expire_bookings
+
+Постоянный процесс: засыпает до ближайшего истечения, но не дольше --interval секунд
+(новые брони, созданные во время сна, подхватываются не позже чем через --interval):
+
+  uv run manage.py expire_bookings --loop --interval 30
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+
+from apps.bookings.services import expire_due_bookings, next_booking_expiry
+
+
+class Command(BaseCommand):
+    help = 'Переводит истёкшие брони в неактивные и отправляет события booking_expired.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Работать постоянно')
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=60,
+            help='Максимальная пауза между проходами в режиме --loop, с',
+        )
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        if not options['loop']:
+            self._sweep(options['batch_size'])
+            return
+        try:
+            while True:
+                close_old_connections()
+                self._sweep(options['batch_size'])
+                time.sleep(self._sleep_seconds(options['interval']))
+        except KeyboardInterrupt:
+            self.stdout.write('Остановлено.')
+
+    def _sweep(self, batch_size: int) -> None:
+        expired = expire_due_bookings(batch_size=batch_size)
+        if expired:
+            premises = len({premise_id for _, premise_id in expired})
+            self.stdout.write(self.style.SUCCESS(f'Снято броней: {len(expired)}, помещений освобождено: {premises}'))
+
+    def _sleep_seconds(self, interval: float) -> float:
+        next_expiry = next_booking_expiry()
+        if next_expiry is None:
+            return interval
+        return min(interval, max(0.0, (next_expiry - timezone.now()).total_seconds()) + 0.05)
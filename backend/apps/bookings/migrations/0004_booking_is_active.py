@@ -0,0 +1,43 @@
+from django.db import migrations, models
+from django.db.models import Q
+from django.utils import timezone
+
+
+def deactivate_expired_and_duplicates(apps, schema_editor):
+    """Истёкшие брони — неактивны; из нескольких активных на помещение остаётся самая поздняя."""
+    Booking = apps.get_model('bookings', 'Booking')
+    Booking.objects.filter(expires_at__lte=timezone.now()).update(is_active=False)
+    seen_premises = set()
+    stale_ids = []
+    for booking_id, premise_id in (
+        Booking.objects.filter(is_active=True)
+        .order_by('premise_id', '-expires_at', '-id')
+        .values_list('id', 'premise_id')
+        .iterator()
+    ):
+        if premise_id in seen_premises:
+            stale_ids.append(booking_id)
+        else:
+            seen_premises.add(premise_id)
+    if stale_ids:
+        Booking.objects.filter(pk__in=stale_ids).update(is_active=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0003_booking_referrer'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='is_active',
+            field=models.BooleanField(default=True, help_text='Удерживает помещение: у помещения может быть только одна активная бронь', verbose_name='Активна'),
+        ),
+        migrations.RunPython(deactivate_expired_and_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='booking',
+            constraint=models.UniqueConstraint(condition=Q(is_active=True), fields=('premise',), name='bookings_one_active_per_premise', violation_error_message='У помещения уже есть активная бронь'),
+        ),
+    ]
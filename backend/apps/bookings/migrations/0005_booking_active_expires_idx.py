@@ -0,0 +1,17 @@
+# Generated by Django 5.2.1 on 2026-10-19 12:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0004_booking_is_active'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['expires_at'], name='bookings_active_expires_idx'),
+        ),
+    ]
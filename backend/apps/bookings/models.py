@@ -1,9 +1,23 @@
 from django.conf import settings
 from django.db import models
+from django.utils import timezone
 
 from apps.payments.models import Payment
 from apps.re_objects.models import Premise
 
+from .signals import send_booking_expired_on_commit
+
+
+class BookingQuerySet(models.QuerySet):
+    def active(self):
+        """
+        Брони, удерживающие помещение: is_active (частичные индексы по premise и expires_at).
+
+        Истечение — это снятие флага (expire_bookings, повторная бронь помещения), а не сравнение
+        expires_at с текущим временем: запрос не зависит от момента вызова и не читает историю броней.
+        """
+        return self.filter(is_active=True)
+
 
 class Booking(models.Model):
     """Бронь помещения пользователем (MVP: срок по умолчанию 3 суток задаётся при создании в сервисе)."""
@@ -30,6 +44,11 @@ class Booking(models.Model):
         verbose_name="Тип сделки",
     )
     expires_at = models.DateTimeField(verbose_name="Истекает")
+    is_active = models.BooleanField(
+        default=True,
+        verbose_name="Активна",
+        help_text="Удерживает помещение: у помещения может быть только одна активная бронь",
+    )
     source_payment = models.ForeignKey(
         Payment,
         on_delete=models.SET_NULL,
@@ -49,11 +68,39 @@ class Booking(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Создано")
 
+    objects = BookingQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Бронь"
         verbose_name_plural = "Брони"
         ordering = ["-created_at"]
         db_table = "bookings_booking"
+        indexes = [
+            # Маленький индекс только по активным броням: проход expire_bookings и ближайшее истечение
+            models.Index(
+                fields=["expires_at"],
+                condition=models.Q(is_active=True),
+                name="bookings_active_expires_idx",
+            ),
+        ]
+        constraints = [
+            # Эксклюзивность помещения на уровне БД: параллельные брони не проходят мимо проверки
+            models.UniqueConstraint(
+                fields=["premise"],
+                condition=models.Q(is_active=True),
+                name="bookings_one_active_per_premise",
+                violation_error_message="У помещения уже есть активная бронь",
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        # Уже истёкшая на момент создания бронь помещение не удерживает
+        expired_on_create = self._state.adding and self.expires_at and self.expires_at <= timezone.now()
+        if expired_on_create:
+            self.is_active = False
+        super().save(*args, **kwargs)
+        if expired_on_create:
+            send_booking_expired_on_commit(Booking, [(self.pk, self.premise_id)])
 
     def __str__(self):
         return f"Booking {self.pk} user={self.user_id} premise={self.premise_id}"
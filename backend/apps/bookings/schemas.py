@@ -23,3 +23,13 @@ class BookingOut(Schema):
     created_at: datetime
     source_payment_provider_id: str | None = None
     referrer_id: int | None = None
+
+
+class BookingListResponse(Schema):
+    """Страница броней: items, total, page, page_size, total_pages (как у списков re_objects)."""
+
+    items: list[BookingOut]
+    total: int
+    page: int
+    page_size: int
+    total_pages: int
@@ -3,16 +3,17 @@ from typing import Optional
 from uuid import UUID
 
 from django.conf import settings
-from django.db import transaction
+from django.db import IntegrityError, transaction
 from django.utils import timezone
 
 from apps.payments.models import Payment
-from apps.re_objects.availability import premise_is_available_for_deal
 from apps.re_objects.models import Premise
+from core.pagination import get_paginated_list
 
 from .errors import BookingsErrorCodes, create_bookings_error
 from .models import Booking
 from .schemas import BookingOut
+from .signals import send_booking_expired_on_commit
 
 
 def _booking_to_out(b: Booking) -> BookingOut:
@@ -35,6 +36,53 @@ def _booking_to_out(b: Booking) -> BookingOut:
     )
 
 
+def _try_insert_active_booking(fields: dict) -> Optional[Booking]:
+    try:
+        with transaction.atomic():
+            return Booking.objects.create(is_active=True, **fields)
+    except IntegrityError:
+        return None
+
+
+def lock_premise(premise_id: int) -> Optional[Premise]:
+    """
+    Блокирует строку помещения до конца текущей транзакции (SELECT ... FOR UPDATE).
+
+    Под этой блокировкой идут проверка незавершённых платежей и INSERT брони (create_booking,
+    бронь продажи из webhook), а также проверка броней и платежей перед занятием помещения новым
+    платежом (create_payment), поэтому бронь и незавершённый платёж по одному помещению
+    и два незавершённых платежа не создаются параллельно.
+    """
+    return Premise.objects.select_for_update().filter(pk=premise_id).first()
+
+
+def insert_active_booking(*, premise: Premise, **fields) -> Optional[Booking]:
+    """
+    Создаёт активную бронь одним INSERT; None — у помещения уже есть активная бронь.
+
+    Вызывать под lock_premise: блокировка строки помещения сериализует проверку незавершённых
+    платежей с этим INSERT (create_booking, бронь продажи по payment.succeeded). Частичный уникальный
+    индекс bookings_one_active_per_premise — страховка: вторая активная бронь не пройдёт и без блокировки.
+    Если мешает истёкшая, но ещё не снятая бронь, она деактивируется (с booking_expired, как
+    у expire_due_bookings) и INSERT повторяется один раз.
+    """
+    fields["premise"] = premise
+    booking = _try_insert_active_booking(fields)
+    if booking is not None:
+        return booking
+    # Активная бронь у помещения одна (частичный уникальный индекс) — снимаем её по pk,
+    # чтобы событие получил только тот запрос, который действительно её деактивировал
+    expired_id = (
+        Booking.objects.filter(premise=premise, is_active=True, expires_at__lte=timezone.now())
+        .values_list("id", flat=True)
+        .first()
+    )
+    if expired_id is None or not Booking.objects.filter(pk=expired_id, is_active=True).update(is_active=False):
+        return None
+    send_booking_expired_on_commit(Booking, [(expired_id, premise.pk)])
+    return _try_insert_active_booking(fields)
+
+
 def create_booking(
     user,
     premise_uuid: UUID,
@@ -87,31 +135,12 @@ def create_booking(
             ),
         )
 
-    now = timezone.now()
-    has_active_booking = Booking.objects.filter(premise=premise, expires_at__gt=now).exists()
-    has_active_pending_payment = Payment.objects.filter(
-        premise=premise,
-        status__in=(Payment.Status.PENDING, Payment.Status.WAITING_FOR_CAPTURE),
-    ).exists()
-
-    if not premise_is_available_for_deal(
-        premise=premise,
-        deal_type=deal_type,
-        has_active_booking=has_active_booking,
-        has_active_pending_payment=has_active_pending_payment,
-    ):
-        if has_active_booking:
-            return None, (
-                409,
-                create_bookings_error(
-                    status=409,
-                    code=BookingsErrorCodes.ACTIVE_BOOKING_EXISTS,
-                    title="Active booking exists",
-                    detail="This premise already has an active booking",
-                    instance="/api/v1/bookings",
-                ),
-            )
-
+    with transaction.atomic():
+        lock_premise(premise.pk)
+        has_active_pending_payment = Payment.objects.filter(
+            premise=premise,
+            status__in=(Payment.Status.PENDING, Payment.Status.WAITING_FOR_CAPTURE),
+        ).exists()
         if has_active_pending_payment:
             return None, (
                 409,
@@ -124,87 +153,87 @@ def create_booking(
                 ),
             )
 
+        booking = insert_active_booking(
+            user=user,
+            premise=premise,
+            deal_type=deal_type,
+            expires_at=timezone.now() + timedelta(days=3),
+        )
+    if booking is None:
         return None, (
             409,
             create_bookings_error(
                 status=409,
-                code=BookingsErrorCodes.PREMISE_UNAVAILABLE,
-                title="Premise unavailable",
-                detail="This premise is currently unavailable",
+                code=BookingsErrorCodes.ACTIVE_BOOKING_EXISTS,
+                title="Active booking exists",
+                detail="This premise already has an active booking",
                 instance="/api/v1/bookings",
             ),
         )
-
-    expires_at = now + timedelta(days=3)
-    with transaction.atomic():
-        has_active_booking_locked = Booking.objects.filter(
-            premise=premise,
-            expires_at__gt=now,
-        ).select_for_update().exists()
-        has_active_pending_payment_locked = Payment.objects.filter(
-            premise=premise,
-            status__in=(Payment.Status.PENDING, Payment.Status.WAITING_FOR_CAPTURE),
-        ).select_for_update().exists()
-
-        if not premise_is_available_for_deal(
-            premise=premise,
-            deal_type=deal_type,
-            has_active_booking=has_active_booking_locked,
-            has_active_pending_payment=has_active_pending_payment_locked,
-        ):
-            if has_active_booking_locked:
-                return None, (
-                    409,
-                    create_bookings_error(
-                        status=409,
-                        code=BookingsErrorCodes.ACTIVE_BOOKING_EXISTS,
-                        title="Active booking exists",
-                        detail="This premise already has an active booking",
-                        instance="/api/v1/bookings",
-                    ),
-                )
-
-            if has_active_pending_payment_locked:
-                return None, (
-                    409,
-                    create_bookings_error(
-                        status=409,
-                        code=BookingsErrorCodes.PREMISE_UNAVAILABLE,
-                        title="Premise has payment in progress",
-                        detail="This premise has an active unfinished payment",
-                        instance="/api/v1/bookings",
-                    ),
-                )
-
-            return None, (
-                409,
-                create_bookings_error(
-                    status=409,
-                    code=BookingsErrorCodes.PREMISE_UNAVAILABLE,
-                    title="Premise unavailable",
-                    detail="This premise is currently unavailable",
-                    instance="/api/v1/bookings",
-                ),
-            )
-        booking = Booking.objects.create(
-            user=user,
-            premise=premise,
-            deal_type=deal_type,
-            expires_at=expires_at,
-        )
-
-    booking = Booking.objects.select_related(
-        "premise", "premise__building", "source_payment", "referrer"
-    ).get(pk=booking.pk)
     return _booking_to_out(booking), None
 
 
-def list_bookings_for_user(user) -> list[BookingOut]:
+def _bookings_for_user_qs(user):
     qs = (
         Booking.objects.filter(user=user)
-        .select_related("premise", "premise__building", "source_payment", "referrer")
+        .select_related("premise", "premise__building", "source_payment")
         .order_by("-created_at")
     )
     if settings.BOOKINGS_LIST_ONLY_ACTIVE:
-        qs = qs.filter(expires_at__gt=timezone.now())
-    return [_booking_to_out(b) for b in qs]
+        qs = qs.active()
+    return qs
+
+
+def list_bookings_for_user(user) -> list[BookingOut]:
+    return [_booking_to_out(b) for b in _bookings_for_user_qs(user)]
+
+
+async def alist_bookings_for_user(user) -> list[BookingOut]:
+    """Все брони пользователя (async ORM) — /profile/bookings без page_size."""
+    return [_booking_to_out(b) async for b in _bookings_for_user_qs(user)]
+
+
+async def list_bookings_page_for_user(user, *, page: int, page_size: int) -> dict:
+    """Страница броней пользователя (async ORM): items, total, page, page_size, total_pages."""
+    return await get_paginated_list(
+        _bookings_for_user_qs(user),
+        page=page,
+        page_size=page_size,
+        to_out=_booking_to_out,
+    )
+
+
+def expire_due_bookings(*, now=None, batch_size: int = 500) -> list[tuple[int, int]]:
+    """
+    Снимает истёкшие брони (is_active=False) пачками по batch_size.
+
+    После коммита каждой пачки отправляет booking_expired — подписчики (кеши, денормализованная
+    доступность) узнают о освобождении помещения сразу. Возвращает [(booking_id, premise_id), ...].
+    """
+    now = now or timezone.now()
+    expired: list[tuple[int, int]] = []
+    while True:
+        with transaction.atomic():
+            due = list(
+                Booking.objects.filter(is_active=True, expires_at__lte=now)
+                .order_by("expires_at")
+                .values_list("id", "premise_id")[:batch_size]
+            )
+            if not due:
+                break
+            Booking.objects.filter(pk__in=[booking_id for booking_id, _ in due]).update(is_active=False)
+            send_booking_expired_on_commit(Booking, due)
+        expired.extend(due)
+        if len(due) < batch_size:
+            break
+    return expired
+
+
+def next_booking_expiry():
+    """Ближайший expires_at среди активных броней (None — активных нет)."""
+    return (
+        Booking.objects.filter(is_active=True)
+        .order_by("expires_at")
+        .values_list("expires_at", flat=True)
+        .first()
+    )
@@ -0,0 +1,28 @@
+from collections.abc import Iterable
+
+from django.db import transaction
+from django.dispatch import Signal
+
+# Брони истекли и сняты с помещений, отправляется после коммита (send_booking_expired_on_commit).
+# Аргументы: booking_ids: list[int], premise_ids: list[int] — помещения, которые стали свободны от броней.
+booking_expired = Signal()
+
+
+def send_booking_expired_on_commit(sender, expired: Iterable[tuple[int, int]]) -> None:
+    """
+    Отправляет booking_expired после коммита текущей транзакции.
+
+    expired — пары (booking_id, premise_id). Единая точка для всех путей снятия истёкших броней:
+    expire_due_bookings, повторная бронь помещения с неснятой истёкшей бронью и Booking.save.
+    """
+    expired = list(expired)
+    if not expired:
+        return
+    transaction.on_commit(
+        lambda: booking_expired.send(
+            sender=sender,
+            booking_ids=[booking_id for booking_id, _ in expired],
+            premise_ids=sorted({premise_id for _, premise_id in expired}),
+        )
+    )
+
@@ -1,5 +1,5 @@
-from decimal import Decimal
 import uuid
+from decimal import Decimal
 
 from django.contrib.auth import get_user_model
 from django.test import TestCase
@@ -76,3 +76,4 @@ class BookingAvailabilityTests(TestCase):
         self.assertEqual(status, 409)
         self.assertEqual(body['code'], 'BOOKINGS_PREMISE_UNAVAILABLE')
         self.assertEqual(Booking.objects.count(), 0)
+
@@ -1,10 +1,12 @@
 from django.contrib import admin
 
+from core.admin import LargeTableAdminMixin
+
 from .models import Deal
 
 
 @admin.register(Deal)
-class DealAdmin(admin.ModelAdmin):
+class DealAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = (
         'id',
         'user',
@@ -16,6 +18,7 @@ class DealAdmin(admin.ModelAdmin):
         'commission_amount',
         'created_at',
     )
+    list_select_related = ('user', 'premise__city', 'premise__building', 'premise__floor')
     list_filter = ('deal_type',)
     search_fields = ('user__email', 'premise__title', 'premise__room_number', 'premise__building__name')
     autocomplete_fields = ('user', 'premise')
@@ -0,0 +1,37 @@
+from django.contrib import admin, messages
+from django.utils import timezone
+
+from .models import OutgoingEmail
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = ('id', 'kind', 'to_email', 'subject', 'status', 'attempts', 'created_at', 'sent_at')
+    list_filter = ('status', 'kind')
+    search_fields = ('to_email', 'subject')
+    readonly_fields = (
+        'kind',
+        'to_email',
+        'from_email',
+        'subject',
+        'body',
+        'status',
+        'attempts',
+        'last_error',
+        'next_attempt_at',
+        'created_at',
+        'sent_at',
+    )
+    actions = ('retry_now',)
+
+    def has_add_permission(self, request):
+        return False
+
+    @admin.action(description='Отправить повторно')
+    def retry_now(self, request, queryset):
+        updated = queryset.exclude(status__in=(OutgoingEmail.Status.SENT, OutgoingEmail.Status.SENDING)).update(
+            status=OutgoingEmail.Status.PENDING,
+            attempts=0,
+            next_attempt_at=timezone.now(),
+        )
+        self.message_user(request, f'Поставлено в очередь: {updated}', messages.SUCCESS)
@@ -0,0 +1,55 @@
+"""
+Воркер очереди писем (apps.notifications.outbox).
+
+  uv run manage.py send_emails          # один проход
+  uv run manage.py send_emails --loop   # постоянный процесс
+"""
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from apps.notifications.outbox import RateLimiter, purge_sent_emails, send_email_batch
+
+PURGE_EVERY_SECONDS = 3600
+
+
+class Command(BaseCommand):
+    help = 'Отправляет письма из очереди пачками через одно SMTP-соединение.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Работать постоянно')
+        parser.add_argument('--interval', type=float, default=1, help='Пауза, когда очередь пуста, с')
+        parser.add_argument('--batch-size', type=int, default=50, help='Писем на одно SMTP-соединение')
+        parser.add_argument(
+            '--rate-per-minute',
+            type=int,
+            default=None,
+            help='Ограничение скорости (по умолчанию EMAIL_OUTBOX_RATE_PER_MINUTE, 0 — без ограничения)',
+        )
+
+    def handle(self, *args, **options):
+        rate = options['rate_per_minute']
+        limiter = RateLimiter(settings.EMAIL_OUTBOX_RATE_PER_MINUTE if rate is None else rate)
+        if not options['loop']:
+            self._run_once(options['batch_size'], limiter)
+            return
+        purged_at = 0.0
+        try:
+            while True:
+                close_old_connections()
+                if time.monotonic() - purged_at > PURGE_EVERY_SECONDS:
+                    purge_sent_emails()
+                    purged_at = time.monotonic()
+                if not self._run_once(options['batch_size'], limiter):
+                    time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write('Остановлено.')
+
+    def _run_once(self, batch_size: int, limiter: RateLimiter) -> int:
+        sent, failed = send_email_batch(batch_size=batch_size, rate_limiter=limiter)
+        if sent or failed:
+            self.stdout.write(f'Отправлено: {sent}, ошибок: {failed}')
+        return sent + failed
@@ -0,0 +1,71 @@
+# Generated by Django 5.2.1 on 2026-10-19 12:19
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name='OutgoingEmail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                (
+                    'kind',
+                    models.CharField(
+                        choices=[
+                            ('password_reset', 'Восстановление пароля'),
+                            ('booking', 'Бронирование'),
+                            ('payment', 'Оплата'),
+                            ('other', 'Прочее'),
+                        ],
+                        default='other',
+                        max_length=32,
+                        verbose_name='Тип',
+                    ),
+                ),
+                ('to_email', models.EmailField(max_length=254, verbose_name='Получатель')),
+                ('from_email', models.CharField(max_length=254, verbose_name='Отправитель')),
+                ('subject', models.CharField(max_length=255, verbose_name='Тема')),
+                ('body', models.TextField(verbose_name='Текст')),
+                (
+                    'status',
+                    models.CharField(
+                        choices=[
+                            ('pending', 'Ожидает отправки'),
+                            ('sent', 'Отправлено'),
+                            ('failed', 'Ошибка (попытки исчерпаны)'),
+                        ],
+                        default='pending',
+                        max_length=16,
+                        verbose_name='Статус',
+                    ),
+                ),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Попыток')),
+                ('last_error', models.TextField(blank=True, verbose_name='Последняя ошибка')),
+                (
+                    'next_attempt_at',
+                    models.DateTimeField(default=django.utils.timezone.now, verbose_name='Следующая попытка'),
+                ),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Создано')),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='Отправлено')),
+            ],
+            options={
+                'verbose_name': 'Письмо',
+                'verbose_name_plural': 'Очередь писем',
+                'db_table': 'notifications_outgoing_email',
+                'ordering': ['-id'],
+                'indexes': [
+                    models.Index(
+                        condition=models.Q(('status', 'pending')),
+                        fields=['next_attempt_at', 'id'],
+                        name='notifications_email_queue',
+                    )
+                ],
+            },
+        ),
+    ]
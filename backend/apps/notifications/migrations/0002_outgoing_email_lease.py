@@ -0,0 +1,39 @@
+# Generated by Django 5.2.1 on 2026-10-19 15:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('notifications', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='outgoingemail',
+            name='notifications_email_queue',
+        ),
+        migrations.AlterField(
+            model_name='outgoingemail',
+            name='status',
+            field=models.CharField(
+                choices=[
+                    ('pending', 'Ожидает отправки'),
+                    ('sending', 'Отправляется'),
+                    ('sent', 'Отправлено'),
+                    ('failed', 'Ошибка (попытки исчерпаны)'),
+                ],
+                default='pending',
+                max_length=16,
+                verbose_name='Статус',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='outgoingemail',
+            index=models.Index(
+                condition=models.Q(('status__in', ['pending', 'sending'])),
+                fields=['next_attempt_at', 'id'],
+                name='notifications_email_queue',
+            ),
+        ),
+    ]
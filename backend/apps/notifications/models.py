@@ -0,0 +1,57 @@
+from django.db import models
+from django.utils import timezone
+
+
+class OutgoingEmail(models.Model):
+    """
+    Письмо в очереди отправки (outbox).
+
+    Запись создаётся в транзакции запроса, отправку выполняет воркер send_emails — одно SMTP-соединение
+    на пачку писем, повторы с экспоненциальной задержкой. У письма в статусе sending next_attempt_at —
+    конец аренды воркера: если воркер не записал результат к этому времени, письмо забирают снова.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Ожидает отправки'
+        SENDING = 'sending', 'Отправляется'
+        SENT = 'sent', 'Отправлено'
+        FAILED = 'failed', 'Ошибка (попытки исчерпаны)'
+
+    class Kind(models.TextChoices):
+        PASSWORD_RESET = 'password_reset', 'Восстановление пароля'
+        BOOKING = 'booking', 'Бронирование'
+        PAYMENT = 'payment', 'Оплата'
+        OTHER = 'other', 'Прочее'
+
+    kind = models.CharField(max_length=32, choices=Kind.choices, default=Kind.OTHER, verbose_name='Тип')
+    to_email = models.EmailField(verbose_name='Получатель')
+    from_email = models.CharField(max_length=254, verbose_name='Отправитель')
+    subject = models.CharField(max_length=255, verbose_name='Тема')
+    body = models.TextField(verbose_name='Текст')
+    status = models.CharField(
+        max_length=16,
+        choices=Status.choices,
+        default=Status.PENDING,
+        verbose_name='Статус',
+    )
+    attempts = models.PositiveIntegerField(default=0, verbose_name='Попыток')
+    last_error = models.TextField(blank=True, verbose_name='Последняя ошибка')
+    next_attempt_at = models.DateTimeField(default=timezone.now, verbose_name='Следующая попытка')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Создано')
+    sent_at = models.DateTimeField(null=True, blank=True, verbose_name='Отправлено')
+
+    class Meta:
+        db_table = 'notifications_outgoing_email'
+        verbose_name = 'Письмо'
+        verbose_name_plural = 'Очередь писем'
+        ordering = ['-id']
+        indexes = [
+            models.Index(
+                fields=['next_attempt_at', 'id'],
+                name='notifications_email_queue',
+                condition=models.Q(status__in=['pending', 'sending']),
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.to_email}: {self.subject} ({self.status})'
@@ -0,0 +1,188 @@
+"""
+Очередь исходящих писем (outbox).
+
+Запрос только сохраняет письмо (enqueue_email / aenqueue_email) — в той же транзакции, что и остальные
+изменения, поэтому письмо не теряется и не уходит при откате. Отправку выполняет воркер send_emails:
+
+- пачка писем отправляется через одно SMTP-соединение (EMAIL_BACKEND из настроек);
+- письмо забирается коротким UPDATE (статус sending, аренда на EMAIL_OUTBOX_LEASE_SECONDS), отправляется
+  вне транзакции, результат записывается отдельным UPDATE — SMTP и ожидание лимита не держат блокировок БД;
+  письмо воркера, упавшего посреди отправки, по истечении аренды заберёт следующий проход;
+- ошибка откладывает письмо с экспоненциальной задержкой, после EMAIL_OUTBOX_MAX_ATTEMPTS попыток —
+  статус failed (видно в админке, можно повторить);
+- скорость отправки ограничена EMAIL_OUTBOX_RATE_PER_MINUTE (лимиты SMTP-провайдера).
+"""
+
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+
+from .models import OutgoingEmail
+
+logger = logging.getLogger(__name__)
+
+
+def _build(to: str, subject: str, body: str, kind: str, from_email: str | None) -> OutgoingEmail:
+    return OutgoingEmail(
+        kind=kind,
+        to_email=to,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        subject=subject,
+        body=body,
+    )
+
+
+def enqueue_email(
+    *,
+    to: str,
+    subject: str,
+    body: str,
+    kind: str = OutgoingEmail.Kind.OTHER,
+    from_email: str | None = None,
+) -> OutgoingEmail:
+    """Кладёт письмо в очередь (в текущей транзакции)."""
+    email = _build(to, subject, body, kind, from_email)
+    email.save()
+    return email
+
+
+async def aenqueue_email(
+    *,
+    to: str,
+    subject: str,
+    body: str,
+    kind: str = OutgoingEmail.Kind.OTHER,
+    from_email: str | None = None,
+) -> OutgoingEmail:
+    """Async-вариант enqueue_email для async-ручек."""
+    email = _build(to, subject, body, kind, from_email)
+    await email.asave()
+    return email
+
+
+class RateLimiter:
+    """Не больше per_minute отправок в минуту (равномерно); 0 — без ограничения."""
+
+    def __init__(self, per_minute: int):
+        self.interval = 60 / per_minute if per_minute > 0 else 0.0
+        self._next_at = 0.0
+
+    def wait(self) -> None:
+        if not self.interval:
+            return
+        now = time.monotonic()
+        if now < self._next_at:
+            time.sleep(self._next_at - now)
+        self._next_at = max(now, self._next_at) + self.interval
+
+
+def _retry_delay(attempts: int) -> timedelta:
+    base = settings.EMAIL_OUTBOX_RETRY_BASE_SECONDS
+    return timedelta(seconds=min(base * 2 ** (attempts - 1), settings.EMAIL_OUTBOX_RETRY_MAX_SECONDS))
+
+
+def _close_quietly(connection) -> None:
+    try:
+        connection.close()
+    except Exception:
+        logger.debug('SMTP connection close failed', exc_info=True)
+
+
+def deliver_email(email: OutgoingEmail, connection) -> bool:
+    """
+    Отправляет одно забранное (_claim_email) письмо через открытое соединение и сохраняет результат.
+    True — отправлено. Вызывается вне транзакции.
+    """
+    message = EmailMessage(
+        subject=email.subject,
+        body=email.body,
+        from_email=email.from_email,
+        to=[email.to_email],
+        connection=connection,
+    )
+    email.attempts += 1
+    try:
+        connection.open()
+        connection.send_messages([message])
+    except Exception as exc:
+        # Соединение могло оборваться — следующее письмо откроет новое
+        _close_quietly(connection)
+        email.last_error = f'{type(exc).__name__}: {exc}'
+        if email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+            email.status = OutgoingEmail.Status.FAILED
+            logger.error('Email %s to %s failed permanently: %s', email.pk, email.to_email, exc)
+        else:
+            email.status = OutgoingEmail.Status.PENDING
+            email.next_attempt_at = timezone.now() + _retry_delay(email.attempts)
+            logger.warning('Email %s failed (attempt %s): %s', email.pk, email.attempts, exc)
+        email.save(update_fields=['status', 'attempts', 'last_error', 'next_attempt_at'])
+        return False
+
+    email.status = OutgoingEmail.Status.SENT
+    email.last_error = ''
+    email.sent_at = timezone.now()
+    email.save(update_fields=['status', 'attempts', 'last_error', 'sent_at'])
+    return True
+
+
+def _due_emails(now):
+    """Письма к отправке: ожидающие попытки и забранные воркером, аренда которого истекла."""
+    return OutgoingEmail.objects.filter(
+        status__in=(OutgoingEmail.Status.PENDING, OutgoingEmail.Status.SENDING),
+        next_attempt_at__lte=now,
+    )
+
+
+def _due_email_ids(now, limit: int) -> list[int]:
+    return list(_due_emails(now).order_by('next_attempt_at', 'id').values_list('id', flat=True)[:limit])
+
+
+def _claim_email(email_id: int) -> OutgoingEmail | None:
+    """Забирает письмо одним условным UPDATE; None — письмо уже забрал другой воркер."""
+    now = timezone.now()
+    lease_until = now + timedelta(seconds=settings.EMAIL_OUTBOX_LEASE_SECONDS)
+    due = _due_emails(now).filter(pk=email_id)
+    if not due.update(status=OutgoingEmail.Status.SENDING, next_attempt_at=lease_until):
+        return None
+    return OutgoingEmail.objects.get(pk=email_id)
+
+
+def send_email_batch(*, batch_size: int = 50, rate_limiter: RateLimiter | None = None) -> tuple[int, int]:
+    """
+    Один проход воркера. Возвращает (отправлено, ошибок).
+
+    Соединение открывается один раз на пачку. Письмо забирается условным UPDATE до отправки, поэтому
+    несколько воркеров не отправят одно письмо дважды, а блокировка строки не держится на время SMTP.
+    """
+    email_ids = _due_email_ids(timezone.now(), batch_size)
+    if not email_ids:
+        return 0, 0
+
+    sent = failed = 0
+    connection = get_connection(fail_silently=False)
+    try:
+        for email_id in email_ids:
+            email = _claim_email(email_id)
+            if email is None:
+                continue
+            if rate_limiter is not None:
+                rate_limiter.wait()
+            if deliver_email(email, connection):
+                sent += 1
+            else:
+                failed += 1
+    finally:
+        _close_quietly(connection)
+    return sent, failed
+
+
+def purge_sent_emails(now=None) -> int:
+    """Удаляет отправленные письма старше EMAIL_OUTBOX_KEEP_SENT_DAYS (в них ссылки с токенами)."""
+    now = now or timezone.now()
+    threshold = now - timedelta(days=settings.EMAIL_OUTBOX_KEEP_SENT_DAYS)
+    deleted, _ = OutgoingEmail.objects.filter(status=OutgoingEmail.Status.SENT, sent_at__lt=threshold).delete()
+    return deleted
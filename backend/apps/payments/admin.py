@@ -1,10 +1,13 @@
-from django.contrib import admin
+from django.contrib import admin, messages
 
-from .models import Payment
+from core.admin import LargeTableAdminMixin
+
+from .inbox import inbox_backlog, process_inbox_entry
+from .models import Payment, WebhookInboxEntry
 
 
 @admin.register(Payment)
-class PaymentAdmin(admin.ModelAdmin):
+class PaymentAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = (
         'provider_payment_id',
         'premise',
@@ -14,7 +17,66 @@ class PaymentAdmin(admin.ModelAdmin):
         'amount_currency',
         'created_at',
     )
+    list_select_related = ('premise__city', 'premise__building', 'premise__floor')
     list_filter = ('paid', 'status', 'amount_currency')
-    search_fields = ('provider_payment_id', 'description')
+    search_fields = ('provider_payment_id',)
     raw_id_fields = ('premise',)
     readonly_fields = ('created_at', 'updated_at')
+
+
+@admin.register(WebhookInboxEntry)
+class WebhookInboxEntryAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    list_display = (
+        'id',
+        'provider_payment_id',
+        'event',
+        'status',
+        'attempts',
+        'received_at',
+        'processing_lag',
+    )
+    list_filter = ('status', 'event')
+    search_fields = ('provider_payment_id',)
+    readonly_fields = (
+        'provider_payment_id',
+        'event',
+        'payload',
+        'status',
+        'attempts',
+        'last_error',
+        'next_attempt_at',
+        'received_at',
+        'processed_at',
+    )
+    actions = ('replay_entries',)
+
+    @admin.display(description='Задержка обработки')
+    def processing_lag(self, obj):
+        if obj.processed_at is None:
+            return '—'
+        return f'{(obj.processed_at - obj.received_at).total_seconds():.1f} с'
+
+    @admin.action(description='Обработать повторно')
+    def replay_entries(self, request, queryset):
+        ok = failed = 0
+        for entry in queryset.order_by('id'):
+            entry.attempts = 0
+            if process_inbox_entry(entry):
+                ok += 1
+            else:
+                failed += 1
+        level = messages.WARNING if failed else messages.SUCCESS
+        self.message_user(request, f'Обработано: {ok}, с ошибкой: {failed}', level)
+
+    def changelist_view(self, request, extra_context=None):
+        backlog = inbox_backlog()
+        self.message_user(
+            request,
+            f'В очереди: {backlog["pending"]}, задержка самой старой записи: {backlog["lag_seconds"]:.0f} с, '
+            f'с ошибкой: {backlog["failed"]}',
+            messages.WARNING if backlog['failed'] or backlog['lag_seconds'] > 60 else messages.INFO,
+        )
+        return super().changelist_view(request, extra_context=extra_context)
+
+    def has_add_permission(self, request):
+        return False
@@ -14,6 +14,7 @@ class PaymentsConfig(AppConfig):
         Configuration.configure(
             settings.PAYMENTS_ACCOUNT_ID,
             settings.PAYMENTS_SECRET_KEY,
+            api_url=settings.PAYMENTS_API_URL,
         )
 
         Configuration.configure_user_agent(
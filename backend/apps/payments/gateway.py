@@ -0,0 +1,251 @@
+"""
+Асинхронный шлюз платёжного провайдера.
+
+YooKassaGateway ходит в REST API ЮKassa через общий httpx.AsyncClient: keep-alive пул соединений,
+таймауты и повторы при сетевых ошибках, 429 и 5xx. Повтор отправляется с тем же Idempotence-Key,
+поэтому провайдер не создаст второй платёж. Запрос не занимает поток: пока ждём ответ ЮKassa,
+event loop обслуживает остальные запросы.
+
+StubPaymentGateway — локальная реализация без сети для тестов и бенчмарков (PAYMENTS_GATEWAY=stub).
+"""
+
+import asyncio
+import logging
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field, replace
+from datetime import UTC, datetime
+
+import httpx
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+class PaymentGatewayError(Exception):
+    """Провайдер не создал/не вернул платёж (ошибка API, таймаут, исчерпаны повторы)."""
+
+
+class PaymentNotFoundError(PaymentGatewayError):
+    """Провайдер не знает платёж с таким id (404)."""
+
+
+@dataclass(frozen=True)
+class ProviderPayment:
+    """Платёж в ответе провайдера — только поля, которые использует backend."""
+
+    id: str
+    status: str
+    paid: bool
+    amount_value: str
+    amount_currency: str
+    description: str = ''
+    confirmation_type: str = 'redirect'
+    confirmation_url: str | None = None
+    created_at: str | None = None
+    metadata: dict = field(default_factory=dict)
+
+    @classmethod
+    def from_api(cls, data: dict) -> 'ProviderPayment':
+        amount = data.get('amount') or {}
+        confirmation = data.get('confirmation') or {}
+        return cls(
+            id=str(data['id']),
+            status=str(data.get('status') or ''),
+            paid=bool(data.get('paid')),
+            amount_value=str(amount.get('value') or '0.00'),
+            amount_currency=str(amount.get('currency') or 'RUB'),
+            description=str(data.get('description') or ''),
+            confirmation_type=str(confirmation.get('type') or 'redirect'),
+            confirmation_url=confirmation.get('confirmation_url'),
+            created_at=data.get('created_at'),
+            metadata=data.get('metadata') or {},
+        )
+
+
+class PaymentGateway(ABC):
+    """Интерфейс шлюза: создание и чтение платежа. Неполная реализация не создаётся (TypeError)."""
+
+    @abstractmethod
+    async def create_payment(self, payload: dict, idempotence_key: str) -> ProviderPayment: ...
+
+    @abstractmethod
+    async def get_payment(self, payment_id: str) -> ProviderPayment: ...
+
+    async def aclose(self) -> None:
+        return None
+
+
+class YooKassaGateway(PaymentGateway):
+    """
+    REST API ЮKassa через httpx.AsyncClient.
+
+    Клиент (и его пул соединений) привязан к event loop, в котором создан; при вызове из другого
+    loop (management-команды, тесты через async_to_sync) создаётся новый клиент, а прежний закрывается.
+    """
+
+    def __init__(
+        self,
+        *,
+        api_url: str,
+        account_id: str,
+        secret_key: str,
+        timeout: float = 10.0,
+        max_connections: int = 20,
+        retries: int = 2,
+        retry_backoff: float = 0.3,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        self.api_url = api_url.rstrip('/')
+        self._auth = (account_id, secret_key)
+        self._timeout = httpx.Timeout(timeout, connect=min(timeout, 5.0))
+        self._limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self._transport = transport
+        self._client: httpx.AsyncClient | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    @staticmethod
+    async def _close_client(client: httpx.AsyncClient | None, loop: asyncio.AbstractEventLoop | None) -> None:
+        """Закрывает клиент: в его loop, если тот ещё работает в другом потоке, иначе в текущем."""
+        if client is None or client.is_closed:
+            return
+        if loop is not None and loop.is_running() and loop is not asyncio.get_running_loop():
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+            return
+        try:
+            await client.aclose()
+        except RuntimeError as exc:
+            # Loop клиента уже закрыт — сокеты закроются при сборке мусора, ссылка на клиент снята
+            logger.debug('YooKassa client of a closed event loop: %s', exc)
+
+    async def _get_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        client = self._client
+        if client is None or self._loop is not loop or client.is_closed:
+            stale, stale_loop = client, self._loop
+            # Новый клиент ставится до await: параллельные первые запросы в этом loop получат его же
+            self._client = client = httpx.AsyncClient(
+                base_url=self.api_url,
+                auth=self._auth,
+                timeout=self._timeout,
+                limits=self._limits,
+                transport=self._transport,
+            )
+            self._loop = loop
+            await self._close_client(stale, stale_loop)
+        return client
+
+    async def _request(self, method: str, path: str, *, json: dict | None = None, headers: dict | None = None) -> dict:
+        client = await self._get_client()
+        last_error = ''
+        for attempt in range(self.retries + 1):
+            if attempt:
+                await asyncio.sleep(self.retry_backoff * 2 ** (attempt - 1))
+            try:
+                response = await client.request(method, path, json=json, headers=headers)
+            except httpx.TransportError as exc:
+                last_error = f'{type(exc).__name__}: {exc}'
+                logger.warning('YooKassa %s %s failed (attempt %s): %s', method, path, attempt + 1, last_error)
+                continue
+            if response.status_code in RETRYABLE_STATUS_CODES:
+                last_error = f'HTTP {response.status_code}'
+                logger.warning('YooKassa %s %s failed (attempt %s): %s', method, path, attempt + 1, last_error)
+                continue
+            if response.status_code >= 400:
+                try:
+                    body = response.json()
+                except ValueError:
+                    body = {}
+                detail = body.get('description') or body.get('code') or response.text[:200]
+                if response.status_code == 404:
+                    raise PaymentNotFoundError(f'YooKassa error 404: {detail}')
+                raise PaymentGatewayError(f'YooKassa error {response.status_code}: {detail}')
+            return response.json()
+        raise PaymentGatewayError(f'YooKassa is unavailable: {last_error}')
+
+    async def create_payment(self, payload: dict, idempotence_key: str) -> ProviderPayment:
+        data = await self._request('POST', '/payments', json=payload, headers={'Idempotence-Key': idempotence_key})
+        return ProviderPayment.from_api(data)
+
+    async def get_payment(self, payment_id: str) -> ProviderPayment:
+        return ProviderPayment.from_api(await self._request('GET', f'/payments/{payment_id}'))
+
+    async def aclose(self) -> None:
+        client, loop = self._client, self._loop
+        self._client = None
+        self._loop = None
+        await self._close_client(client, loop)
+
+
+class StubPaymentGateway(PaymentGateway):
+    """Платежи в памяти процесса; latency_ms имитирует round trip к провайдеру."""
+
+    def __init__(self, *, latency_ms: float = 0):
+        self.latency = latency_ms / 1000
+        self.payments: dict[str, ProviderPayment] = {}
+        self._by_idempotence_key: dict[str, str] = {}
+
+    async def create_payment(self, payload: dict, idempotence_key: str) -> ProviderPayment:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if idempotence_key in self._by_idempotence_key:
+            return self.payments[self._by_idempotence_key[idempotence_key]]
+        payment_id = str(uuid.uuid4())
+        amount = payload.get('amount') or {}
+        payment = ProviderPayment(
+            id=payment_id,
+            status='pending',
+            paid=False,
+            amount_value=str(amount.get('value') or '0.00'),
+            amount_currency=str(amount.get('currency') or 'RUB'),
+            description=str(payload.get('description') or ''),
+            confirmation_url=f'https://yoomoney.example/confirm/{payment_id}',
+            created_at=datetime.now(UTC).strftime('%Y-%m-%dT%H:%M:%S.000Z'),
+            metadata=payload.get('metadata') or {},
+        )
+        self.payments[payment_id] = payment
+        self._by_idempotence_key[idempotence_key] = payment_id
+        return payment
+
+    async def get_payment(self, payment_id: str) -> ProviderPayment:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        try:
+            return self.payments[payment_id]
+        except KeyError:
+            raise PaymentNotFoundError(f'Payment {payment_id} not found') from None
+
+    def set_status(self, payment_id: str, status: str) -> ProviderPayment:
+        """Меняет статус платежа «на стороне провайдера» (оплата/отмена в тестах и бенчмарках)."""
+        payment = replace(self.payments[payment_id], status=status, paid=status in ('succeeded', 'waiting_for_capture'))
+        self.payments[payment_id] = payment
+        return payment
+
+
+_gateway: PaymentGateway | None = None
+
+
+def build_payment_gateway() -> PaymentGateway:
+    """Шлюз по настройке PAYMENTS_GATEWAY: 'yookassa' (по умолчанию) или 'stub'."""
+    if settings.PAYMENTS_GATEWAY == 'stub':
+        return StubPaymentGateway(latency_ms=settings.PAYMENTS_STUB_LATENCY_MS)
+    return YooKassaGateway(
+        api_url=settings.PAYMENTS_API_URL,
+        account_id=settings.PAYMENTS_ACCOUNT_ID,
+        secret_key=settings.PAYMENTS_SECRET_KEY,
+        timeout=settings.PAYMENTS_HTTP_TIMEOUT_SECONDS,
+        max_connections=settings.PAYMENTS_HTTP_MAX_CONNECTIONS,
+        retries=settings.PAYMENTS_HTTP_RETRIES,
+    )
+
+
+def get_payment_gateway() -> PaymentGateway:
+    """Общий шлюз процесса (один пул соединений на воркер)."""
+    global _gateway
+    if _gateway is None:
+        _gateway = build_payment_gateway()
+    return _gateway
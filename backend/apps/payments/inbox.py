@@ -0,0 +1,139 @@
+"""
+Очередь входящих уведомлений ЮKassa (inbox).
+
+Эндпоинт webhook только проверяет тело и сохраняет его одним INSERT (повтор от провайдера
+отсекается уникальностью (provider_payment_id, event)), после чего сразу отвечает 200.
+Обновление Payment и создание брони выполняет воркер process_payment_webhooks:
+
+- по каждому платежу уведомления обрабатываются строго в порядке получения — пока более раннее
+  уведомление того же платежа не обработано, следующие ждут;
+- ошибка обработки откатывает изменения и откладывает запись с экспоненциальной задержкой;
+  после PAYMENTS_WEBHOOK_MAX_ATTEMPTS попыток запись получает статус failed и видна в админке.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, Min, OuterRef
+from django.utils import timezone
+from yookassa.domain.notification import WebhookNotification
+
+from .models import WebhookInboxEntry
+from .services import apply_yookassa_notification, parse_yookassa_webhook
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_yookassa_webhook(raw_body: bytes) -> tuple[int, dict | None]:
+    """Проверяет уведомление и кладёт его в inbox. Дубликат (повтор провайдера) — тоже 200."""
+    event_json, notification_object, err = parse_yookassa_webhook(raw_body)
+    if err:
+        return err
+    WebhookInboxEntry.objects.bulk_create(
+        [
+            WebhookInboxEntry(
+                provider_payment_id=str(notification_object.object.id),
+                event=str(notification_object.event),
+                payload=event_json,
+            )
+        ],
+        ignore_conflicts=True,
+    )
+    return 200, None
+
+
+def _retry_delay(attempts: int) -> timedelta:
+    base = settings.PAYMENTS_WEBHOOK_RETRY_BASE_SECONDS
+    return timedelta(seconds=min(base * 2 ** (attempts - 1), settings.PAYMENTS_WEBHOOK_RETRY_MAX_SECONDS))
+
+
+def process_inbox_entry(entry: WebhookInboxEntry) -> bool:
+    """
+    Применяет одно уведомление. True — обработано; False — ошибка, запись отложена или помечена failed.
+
+    Используется и воркером, и повторным запуском (replay) — применение уведомления идемпотентно.
+    """
+    try:
+        with transaction.atomic():
+            apply_yookassa_notification(entry.payload, WebhookNotification(entry.payload))
+    except Exception as exc:
+        entry.attempts += 1
+        entry.last_error = f'{type(exc).__name__}: {exc}'
+        if entry.attempts >= settings.PAYMENTS_WEBHOOK_MAX_ATTEMPTS:
+            entry.status = WebhookInboxEntry.Status.FAILED
+            logger.exception('Webhook inbox entry %s failed permanently', entry.pk)
+        else:
+            entry.status = WebhookInboxEntry.Status.PENDING
+            entry.next_attempt_at = timezone.now() + _retry_delay(entry.attempts)
+            logger.warning('Webhook inbox entry %s failed (attempt %s): %s', entry.pk, entry.attempts, exc)
+        entry.save(update_fields=['status', 'attempts', 'last_error', 'next_attempt_at'])
+        return False
+
+    entry.status = WebhookInboxEntry.Status.PROCESSED
+    entry.attempts += 1
+    entry.last_error = ''
+    entry.processed_at = timezone.now()
+    entry.save(update_fields=['status', 'attempts', 'last_error', 'processed_at'])
+    return True
+
+
+def _due_entries(now, limit: int):
+    """Готовые к обработке записи; запись ждёт, пока не обработаны более ранние уведомления её платежа."""
+    earlier_pending = WebhookInboxEntry.objects.filter(
+        provider_payment_id=OuterRef('provider_payment_id'),
+        status=WebhookInboxEntry.Status.PENDING,
+        id__lt=OuterRef('id'),
+    )
+    return (
+        WebhookInboxEntry.objects.filter(status=WebhookInboxEntry.Status.PENDING, next_attempt_at__lte=now)
+        .filter(~Exists(earlier_pending))
+        .order_by('id')[:limit]
+    )
+
+
+def process_webhook_inbox(*, batch_size: int = 100) -> tuple[int, int]:
+    """
+    Один проход воркера (не более batch_size записей). Возвращает (обработано, ошибок).
+
+    Обработанная запись разблокирует следующее уведомление того же платежа в этом же проходе.
+    Несколько воркеров не мешают друг другу: запись берётся под select_for_update(skip_locked=True)
+    и перепроверяется после блокировки.
+    """
+    processed = failed = 0
+    seen: set[int] = set()
+    while processed + failed < batch_size:
+        entry_ids = [
+            entry_id
+            for entry_id in _due_entries(timezone.now(), batch_size).values_list('id', flat=True)
+            if entry_id not in seen
+        ][: batch_size - processed - failed]
+        if not entry_ids:
+            break
+        for entry_id in entry_ids:
+            seen.add(entry_id)
+            with transaction.atomic():
+                entry = (
+                    WebhookInboxEntry.objects.select_for_update(skip_locked=True)
+                    .filter(pk=entry_id, status=WebhookInboxEntry.Status.PENDING)
+                    .first()
+                )
+                if entry is None:
+                    continue
+                if process_inbox_entry(entry):
+                    processed += 1
+                else:
+                    failed += 1
+    return processed, failed
+
+
+def inbox_backlog() -> dict:
+    """Размер очереди и задержка самой старой необработанной записи (для админки и мониторинга)."""
+    pending = WebhookInboxEntry.objects.filter(status=WebhookInboxEntry.Status.PENDING)
+    oldest = pending.aggregate(oldest=Min('received_at'))['oldest']
+    return {
+        'pending': pending.count(),
+        'failed': WebhookInboxEntry.objects.filter(status=WebhookInboxEntry.Status.FAILED).count(),
+        'lag_seconds': (timezone.now() - oldest).total_seconds() if oldest else 0.0,
+    }
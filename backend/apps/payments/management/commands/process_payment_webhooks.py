@@ -0,0 +1,45 @@
+"""
+Воркер очереди уведомлений ЮKassa (apps.payments.inbox).
+
+  uv run manage.py process_payment_webhooks          # один проход
+  uv run manage.py process_payment_webhooks --loop   # постоянный процесс
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from apps.payments.inbox import process_webhook_inbox
+
+
+class Command(BaseCommand):
+    help = 'Обрабатывает очередь входящих уведомлений ЮKassa.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Работать постоянно')
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=0.5,
+            help='Пауза, когда очередь пуста, с',
+        )
+        parser.add_argument('--batch-size', type=int, default=100)
+
+    def handle(self, *args, **options):
+        if not options['loop']:
+            self._run_once(options['batch_size'])
+            return
+        try:
+            while True:
+                close_old_connections()
+                if not self._run_once(options['batch_size']):
+                    time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write('Остановлено.')
+
+    def _run_once(self, batch_size: int) -> int:
+        processed, failed = process_webhook_inbox(batch_size=batch_size)
+        if processed or failed:
+            self.stdout.write(f'Обработано: {processed}, ошибок: {failed}')
+        return processed + failed
@@ -0,0 +1,75 @@
+"""
+Сверка зависших платежей с ЮKassa (apps.payments.reconciliation).
+
+  uv run manage.py reconcile_payments                          # один проход (cron)
+  uv run manage.py reconcile_payments --loop --interval 300    # постоянный процесс
+
+Весь цикл работает в одном event loop — пул соединений шлюза переиспользуется между проходами.
+"""
+
+import asyncio
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from apps.payments.gateway import get_payment_gateway
+from apps.payments.reconciliation import ReconcileReport, reconcile_pending_payments
+
+
+class Command(BaseCommand):
+    help = 'Запрашивает у ЮKassa статус зависших платежей, отменяет брошенные и освобождает помещения.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Работать постоянно')
+        parser.add_argument('--interval', type=float, default=300, help='Пауза между проходами, с')
+        parser.add_argument('--batch-size', type=int, default=100, help='Платежей за один запрос к БД')
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=None,
+            help='Одновременных запросов к провайдеру (по умолчанию PAYMENTS_RECONCILE_CONCURRENCY)',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            async_to_sync(self._run)(options)
+        except KeyboardInterrupt:
+            self.stdout.write('Остановлено.')
+
+    async def _run(self, options) -> None:
+        gateway = get_payment_gateway()
+        try:
+            while True:
+                await sync_to_async(close_old_connections)()
+                total = await self._drain(options['batch_size'], options['concurrency'])
+                self._print(total)
+                if not options['loop']:
+                    return
+                await asyncio.sleep(options['interval'])
+        finally:
+            await gateway.aclose()
+
+    async def _drain(self, batch_size: int, concurrency: int | None) -> ReconcileReport:
+        """Проходы подряд, пока находятся зависшие платежи, которые удаётся сверить."""
+        total = ReconcileReport()
+        while True:
+            report = await reconcile_pending_payments(batch_size=batch_size, concurrency=concurrency)
+            total.checked += report.checked
+            total.updated += report.updated
+            total.timed_out += report.timed_out
+            total.errors += report.errors
+            total.released_premise_ids |= report.released_premise_ids
+            if report.checked < batch_size or report.errors == report.checked:
+                return total
+
+    def _print(self, report: ReconcileReport) -> None:
+        if not report.checked:
+            return
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Проверено платежей: {report.checked}, обновлено: {report.updated}, '
+                f'отменено брошенных: {report.timed_out}, ошибок: {report.errors}, '
+                f'помещений освобождено: {report.released_premises}'
+            )
+        )
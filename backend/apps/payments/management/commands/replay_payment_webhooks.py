@@ -0,0 +1,62 @@
+"""
+Повторная обработка сохранённых уведомлений ЮKassa (например, после исправления ошибки в обработчике).
+
+  uv run manage.py replay_payment_webhooks --failed
+  uv run manage.py replay_payment_webhooks --payment-id 2d6f3c1e-000f-5000-9000-1b2c3d4e5f60
+  uv run manage.py replay_payment_webhooks --id 15 --id 16
+  uv run manage.py replay_payment_webhooks --since 2026-10-01 --dry-run
+
+Записи применяются синхронно в порядке получения; применение уведомления идемпотентно.
+"""
+
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.payments.inbox import process_inbox_entry
+from apps.payments.models import WebhookInboxEntry
+
+
+class Command(BaseCommand):
+    help = 'Повторно применяет сохранённые уведомления ЮKassa из очереди.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--id', type=int, action='append', dest='ids', help='ID записи (можно несколько)')
+        parser.add_argument('--payment-id', help='ID платежа у провайдера')
+        parser.add_argument('--failed', action='store_true', help='Только записи со статусом failed')
+        parser.add_argument('--since', help='Получены не раньше даты/времени (ISO 8601)')
+        parser.add_argument('--dry-run', action='store_true', help='Только показать, что будет обработано')
+
+    def handle(self, *args, **options):
+        qs = WebhookInboxEntry.objects.order_by('id')
+        if options['ids']:
+            qs = qs.filter(pk__in=options['ids'])
+        if options['payment_id']:
+            qs = qs.filter(provider_payment_id=options['payment_id'])
+        if options['failed']:
+            qs = qs.filter(status=WebhookInboxEntry.Status.FAILED)
+        if options['since']:
+            try:
+                since = datetime.fromisoformat(options['since'])
+            except ValueError as exc:
+                raise CommandError(f'Некорректная дата --since: {exc}') from exc
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+            qs = qs.filter(received_at__gte=since)
+        if not (options['ids'] or options['payment_id'] or options['failed'] or options['since']):
+            raise CommandError('Укажите --id, --payment-id, --failed или --since')
+
+        ok = failed = 0
+        for entry in qs.iterator():
+            if options['dry_run']:
+                self.stdout.write(f'#{entry.pk} {entry}')
+                continue
+            entry.attempts = 0
+            if process_inbox_entry(entry):
+                ok += 1
+            else:
+                failed += 1
+                self.stderr.write(self.style.ERROR(f'#{entry.pk} {entry.event}: {entry.last_error}'))
+        if not options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f'Готово: обработано {ok}, ошибок {failed}.'))
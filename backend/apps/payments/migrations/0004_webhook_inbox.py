@@ -0,0 +1,61 @@
+# Generated by Django 5.2.1 on 2026-10-19 12:09
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('payments', '0003_payment_referral_link'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WebhookInboxEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('provider_payment_id', models.CharField(max_length=128, verbose_name='ID платежа у провайдера')),
+                ('event', models.CharField(max_length=64, verbose_name='Событие')),
+                ('payload', models.JSONField(verbose_name='Тело уведомления')),
+                (
+                    'status',
+                    models.CharField(
+                        choices=[
+                            ('pending', 'Ожидает обработки'),
+                            ('processed', 'Обработано'),
+                            ('failed', 'Ошибка (попытки исчерпаны)'),
+                        ],
+                        default='pending',
+                        max_length=16,
+                        verbose_name='Статус',
+                    ),
+                ),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Попыток')),
+                ('last_error', models.TextField(blank=True, verbose_name='Последняя ошибка')),
+                (
+                    'next_attempt_at',
+                    models.DateTimeField(default=django.utils.timezone.now, verbose_name='Следующая попытка'),
+                ),
+                ('received_at', models.DateTimeField(auto_now_add=True, verbose_name='Получено')),
+                ('processed_at', models.DateTimeField(blank=True, null=True, verbose_name='Обработано')),
+            ],
+            options={
+                'verbose_name': 'Уведомление ЮKassa',
+                'verbose_name_plural': 'Входящие уведомления ЮKassa',
+                'db_table': 'payments_webhook_inbox',
+                'ordering': ['-id'],
+                'indexes': [
+                    models.Index(
+                        condition=models.Q(('status', 'pending')),
+                        fields=['next_attempt_at', 'id'],
+                        name='payments_webhook_inbox_queue',
+                    )
+                ],
+                'constraints': [
+                    models.UniqueConstraint(
+                        fields=('provider_payment_id', 'event'), name='payments_webhook_inbox_payment_event_uniq'
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+"""Триграммный GIN-индекс под поиск платежей в админке по provider_payment_id (как re_objects 0041)."""
+
+from django.db import migrations
+
+INDEX = 'payments_provider_payment_id_trgm'
+
+
+def create_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        f'CREATE INDEX IF NOT EXISTS "{INDEX}" ON "payments" USING gin (UPPER("provider_payment_id"::text) gin_trgm_ops)'
+    )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f'DROP INDEX IF EXISTS "{INDEX}"')
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('payments', '0004_webhook_inbox'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 
 from apps.re_objects.models import Premise
 from apps.referrals.models import ReferralLink
@@ -48,3 +49,54 @@ class Payment(models.Model):
 
     def __str__(self) -> str:
         return f'{self.provider_payment_id} ({self.status})'
+
+
+class WebhookInboxEntry(models.Model):
+    """
+    Входящее уведомление ЮKassa: сохраняется до обработки, обработку выполняет process_payment_webhooks.
+
+    Повторы от провайдера отсекаются уникальностью (provider_payment_id, event).
+    """
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Ожидает обработки'
+        PROCESSED = 'processed', 'Обработано'
+        FAILED = 'failed', 'Ошибка (попытки исчерпаны)'
+
+    provider_payment_id = models.CharField(max_length=128, verbose_name='ID платежа у провайдера')
+    event = models.CharField(max_length=64, verbose_name='Событие')
+    payload = models.JSONField(verbose_name='Тело уведомления')
+    status = models.CharField(
+        max_length=16,
+        choices=Status.choices,
+        default=Status.PENDING,
+        verbose_name='Статус',
+    )
+    attempts = models.PositiveIntegerField(default=0, verbose_name='Попыток')
+    last_error = models.TextField(blank=True, verbose_name='Последняя ошибка')
+    next_attempt_at = models.DateTimeField(default=timezone.now, verbose_name='Следующая попытка')
+    received_at = models.DateTimeField(auto_now_add=True, verbose_name='Получено')
+    processed_at = models.DateTimeField(null=True, blank=True, verbose_name='Обработано')
+
+    class Meta:
+        db_table = 'payments_webhook_inbox'
+        verbose_name = 'Уведомление ЮKassa'
+        verbose_name_plural = 'Входящие уведомления ЮKassa'
+        ordering = ['-id']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['provider_payment_id', 'event'],
+                name='payments_webhook_inbox_payment_event_uniq',
+            ),
+        ]
+        indexes = [
+            # Очередь воркера: только необработанные записи
+            models.Index(
+                fields=['next_attempt_at', 'id'],
+                condition=models.Q(status='pending'),
+                name='payments_webhook_inbox_queue',
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.event} {self.provider_payment_id} ({self.status})'
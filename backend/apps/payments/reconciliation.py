@@ -0,0 +1,198 @@
+"""
+Сверка зависших платежей с провайдером.
+
+Платёж в pending/waiting_for_capture блокирует помещение в каталоге, на схеме этажа и в проверках
+брони/оплаты. Если webhook потерян, помещение так и остаётся заблокированным. Сверка берёт платежи,
+не менявшиеся дольше PAYMENTS_RECONCILE_AFTER_SECONDS, и параллельно (не больше concurrency запросов
+одновременно) запрашивает их статус у провайдера:
+
+- статус изменился — применяется так же, как уведомление (apply_yookassa_notification), в т.ч. бронь
+  при payment.succeeded;
+- платёж всё ещё pending (или провайдер его не знает — например, create_payment занял помещение, но не
+  дошёл до ЮKassa) и создан раньше PAYMENTS_PENDING_TIMEOUT_SECONDS назад — локально отменяется как брошенный;
+- платёж всё ещё открыт, но таймаут не наступил — следующая проверка не раньше чем через
+  PAYMENTS_RECONCILE_AFTER_SECONDS (updated_at сдвигается);
+- ошибка запроса — платёж остаётся как есть до следующего прохода.
+
+Сверка может идти одновременно с воркером inbox: опрошенный статус применяется под блокировкой строки
+Payment и только к ещё открытому платежу, брошенный платёж отменяется, только если с момента выборки его
+никто не менял.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from yookassa.domain.notification import WebhookNotification
+
+from .gateway import PaymentGateway, PaymentGatewayError, PaymentNotFoundError, ProviderPayment, get_payment_gateway
+from .models import Payment
+from .services import apply_yookassa_notification
+
+logger = logging.getLogger(__name__)
+
+OPEN_STATUSES = (Payment.Status.PENDING, Payment.Status.WAITING_FOR_CAPTURE)
+STATUS_EVENTS = {
+    Payment.Status.WAITING_FOR_CAPTURE: 'payment.waiting_for_capture',
+    Payment.Status.SUCCEEDED: 'payment.succeeded',
+    Payment.Status.CANCELED: 'payment.canceled',
+}
+
+
+@dataclass
+class ReconcileReport:
+    checked: int = 0
+    updated: int = 0
+    timed_out: int = 0
+    errors: int = 0
+    released_premise_ids: set[int] = field(default_factory=set)
+
+    @property
+    def released_premises(self) -> int:
+        return len(self.released_premise_ids)
+
+
+def stale_open_payments(now: datetime, limit: int):
+    """Открытые платежи без изменений дольше PAYMENTS_RECONCILE_AFTER_SECONDS, самые старые первыми."""
+    threshold = now - timedelta(seconds=settings.PAYMENTS_RECONCILE_AFTER_SECONDS)
+    return Payment.objects.filter(status__in=OPEN_STATUSES, updated_at__lt=threshold).order_by('updated_at')[:limit]
+
+
+def _notification_payload(provider_payment: ProviderPayment) -> dict:
+    return {
+        'type': 'notification',
+        'event': STATUS_EVENTS[provider_payment.status],
+        'object': {
+            'id': provider_payment.id,
+            'status': provider_payment.status,
+            'paid': provider_payment.paid,
+            'amount': {'value': provider_payment.amount_value, 'currency': provider_payment.amount_currency},
+            'description': provider_payment.description,
+            'created_at': provider_payment.created_at,
+            'metadata': provider_payment.metadata,
+            'test': False,
+            'refundable': False,
+        },
+    }
+
+
+def _apply_provider_state(payment: Payment, provider_payment: ProviderPayment) -> bool:
+    """
+    Применяет опрошенное состояние под блокировкой строки Payment. False — пока шёл опрос, платёж
+    закрыл воркер inbox (он держит ту же блокировку), и опрошенное состояние уже не нужно.
+    """
+    payload = _notification_payload(provider_payment)
+    with transaction.atomic():
+        if not Payment.objects.select_for_update().filter(pk=payment.pk, status__in=OPEN_STATUSES).exists():
+            return False
+        apply_yookassa_notification(payload, WebhookNotification(payload))
+    return True
+
+
+def _cancel_abandoned(payments: list[Payment]) -> list[Payment]:
+    """Отменяет брошенные платежи, которые не менялись с момента выборки (иначе их уже обновил webhook)."""
+    now = timezone.now()
+    canceled = []
+    with transaction.atomic():
+        for payment in payments:
+            if Payment.objects.filter(pk=payment.pk, status__in=OPEN_STATUSES, updated_at=payment.updated_at).update(
+                status=Payment.Status.CANCELED,
+                updated_at=now,
+            ):
+                canceled.append(payment)
+    return canceled
+
+
+def _defer(payment_ids: list[int]) -> None:
+    Payment.objects.filter(pk__in=payment_ids, status__in=OPEN_STATUSES).update(updated_at=timezone.now())
+
+
+def _still_locked_premise_ids(premise_ids: set[int]) -> set[int]:
+    return set(
+        Payment.objects.filter(premise_id__in=premise_ids, status__in=OPEN_STATUSES).values_list(
+            'premise_id', flat=True
+        )
+    )
+
+
+async def _poll(gateway: PaymentGateway, payments: list[Payment], concurrency: int) -> list:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def poll_one(payment: Payment):
+        async with semaphore:
+            try:
+                return await gateway.get_payment(payment.provider_payment_id)
+            except PaymentGatewayError as exc:
+                return exc
+
+    return await asyncio.gather(*(poll_one(payment) for payment in payments))
+
+
+async def reconcile_pending_payments(
+    *,
+    gateway: PaymentGateway | None = None,
+    batch_size: int = 100,
+    concurrency: int | None = None,
+    now: datetime | None = None,
+) -> ReconcileReport:
+    """Один проход сверки (до batch_size платежей)."""
+    gateway = gateway or get_payment_gateway()
+    concurrency = concurrency or settings.PAYMENTS_RECONCILE_CONCURRENCY
+    now = now or timezone.now()
+    timeout_threshold = now - timedelta(seconds=settings.PAYMENTS_PENDING_TIMEOUT_SECONDS)
+    report = ReconcileReport()
+
+    payments = [payment async for payment in stale_open_payments(now, batch_size)]
+    if not payments:
+        return report
+    results = await _poll(gateway, payments, concurrency)
+
+    closed_premise_ids: set[int] = set()
+    abandoned: list[Payment] = []
+    deferred: list[int] = []
+    for payment, result in zip(payments, results, strict=True):
+        report.checked += 1
+        if isinstance(result, PaymentNotFoundError):
+            result = None
+        elif isinstance(result, PaymentGatewayError):
+            report.errors += 1
+            logger.warning('Reconciliation of payment %s failed: %s', payment.provider_payment_id, result)
+            continue
+
+        if result is not None and result.status in STATUS_EVENTS and result.status != payment.status:
+            try:
+                applied = await sync_to_async(_apply_provider_state, thread_sensitive=True)(payment, result)
+            except Exception:
+                report.errors += 1
+                logger.exception('Failed to apply provider state of payment %s', payment.provider_payment_id)
+                continue
+            if not applied:
+                continue
+            report.updated += 1
+            if result.status == Payment.Status.CANCELED and payment.premise_id is not None:
+                closed_premise_ids.add(payment.premise_id)
+            continue
+
+        if payment.created_at < timeout_threshold and (result is None or result.status == Payment.Status.PENDING):
+            abandoned.append(payment)
+        else:
+            deferred.append(payment.pk)
+
+    if deferred:
+        await sync_to_async(_defer)(deferred)
+
+    if abandoned:
+        canceled = await sync_to_async(_cancel_abandoned)(abandoned)
+        report.timed_out = len(canceled)
+        closed_premise_ids.update(payment.premise_id for payment in canceled if payment.premise_id is not None)
+        logger.info('Canceled %s abandoned payments', report.timed_out)
+
+    if closed_premise_ids:
+        still_locked = await sync_to_async(_still_locked_premise_ids)(closed_premise_ids)
+        report.released_premise_ids = closed_premise_ids - still_locked
+    return report
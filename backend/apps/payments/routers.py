@@ -1,4 +1,3 @@
-from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.http import HttpResponse, JsonResponse
 from ninja import Router
@@ -6,8 +5,9 @@ from ninja import Router
 from api.schemas import ProblemDetail
 from apps.accounts.services.auth_service import jwt_auth
 
+from .inbox import enqueue_yookassa_webhook
 from .schemas import PaymentCreateIn, PaymentCreateOut
-from .services import create_payment, handle_yookassa_webhook
+from .services import create_payment
 
 payments_router = Router(tags=['Payments'])
 
@@ -20,7 +20,7 @@ payments_router = Router(tags=['Payments'])
     description='Создает платеж YooKassa для бронирования помещения по premise_uuid.',
 )
 async def create_payment_endpoint(request, data: PaymentCreateIn):
-    out, err = await sync_to_async(create_payment, thread_sensitive=True)(
+    out, err = await create_payment(
         request.auth.id,
         data.premise_uuid,
         request.COOKIES.get(settings.REFERRAL_CODE_COOKIE_NAME),
@@ -34,10 +34,10 @@ async def create_payment_endpoint(request, data: PaymentCreateIn):
 @payments_router.post(
     '/webhook',
     summary='Webhook от YooKassa',
-    description='Минимальная обработка событий платежей от YooKassa.',
+    description='Сохраняет уведомление в очередь и сразу отвечает 200; обработку выполняет process_payment_webhooks.',
 )
 def yookassa_webhook_endpoint(request):
-    status, body = handle_yookassa_webhook(request.body)
+    status, body = enqueue_yookassa_webhook(request.body)
     if body is None:
         return HttpResponse(status=status)
     return JsonResponse(body, status=status)
@@ -4,18 +4,20 @@ from datetime import timedelta
 from decimal import Decimal
 import uuid
 
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.db import transaction
 from django.utils import timezone
-from yookassa import Payment as YooKassaPayment
 from yookassa.domain.notification import WebhookNotification
 
 from apps.bookings.models import Booking
+from apps.bookings.services import insert_active_booking, lock_premise
 from apps.re_objects.availability import premise_is_available_for_deal
 from apps.re_objects.models import Premise
 from apps.referrals.models import ReferralLink
 
+from .gateway import PaymentGatewayError, ProviderPayment, get_payment_gateway
 from .models import Payment
 from .errors import PaymentsErrorCodes, create_payments_error
 from .schemas import PaymentAmountOut, PaymentConfirmationOut, PaymentCreateOut
@@ -31,6 +33,15 @@ def _resolve_payment_status(raw_status: str) -> str:
     return Payment.Status.PENDING
 
 
+# Порядок статусов платежа: уведомление не может вернуть платёж назад (succeeded и canceled — конечные).
+_STATUS_RANK = {
+    Payment.Status.PENDING: 0,
+    Payment.Status.WAITING_FOR_CAPTURE: 1,
+    Payment.Status.SUCCEEDED: 2,
+    Payment.Status.CANCELED: 2,
+}
+
+
 def _build_amount_value() -> str:
     return str(Decimal(settings.PAYMENTS_BOOKING_AMOUNT).quantize(Decimal('0.00')))
 
@@ -75,7 +86,7 @@ def _build_payment_description(premise: Premise) -> str:
     return f'Бронирование: {building_address} — {premise_name}'
 
 
-def _resolve_referral_link_for_payment(premise_id: int, referral_code: str | None) -> ReferralLink | None:
+async def _resolve_referral_link_for_payment(premise_id: int, referral_code: str | None) -> ReferralLink | None:
     if not isinstance(referral_code, str):
         return None
     normalized_referral_code = referral_code.strip()
@@ -87,11 +98,11 @@ def _resolve_referral_link_for_payment(premise_id: int, referral_code: str | Non
     except ValueError:
         return None
 
-    return ReferralLink.objects.select_related('referrer').filter(
+    return await ReferralLink.objects.select_related('referrer').filter(
         code=referral_uuid,
         is_active=True,
         premise_id=premise_id,
-    ).first()
+    ).afirst()
 
 
 def _resolve_referral_link_from_metadata(metadata: dict) -> ReferralLink | None:
@@ -117,12 +128,10 @@ def _ensure_sale_booking(metadata: dict, local_payment: Payment | None) -> None:
         premise_id = int(premise_id_raw)
 
     user = get_user_model().objects.filter(pk=int(user_id_raw)).first()
-    premise = Premise.objects.filter(pk=premise_id).first()
-    if user is None or premise is None:
+    if user is None:
         return
 
-    now = timezone.now()
-    expires_at = now + timedelta(days=3)
+    expires_at = timezone.now() + timedelta(days=3)
     referrer = None
     if local_payment is not None and local_payment.referral_link_id is not None:
         referral_link = local_payment.referral_link
@@ -130,13 +139,11 @@ def _ensure_sale_booking(metadata: dict, local_payment: Payment | None) -> None:
             referrer = referral_link.referrer
 
     with transaction.atomic():
-        active_booking_exists = Booking.objects.select_for_update().filter(
-            premise=premise,
-            expires_at__gt=now,
-        ).exists()
-        if active_booking_exists:
+        premise = lock_premise(premise_id)
+        if premise is None:
             return
-        Booking.objects.create(
+        # Уже есть активная бронь (в т.ч. от повторного webhook) — insert_active_booking вернёт None
+        insert_active_booking(
             user=user,
             premise=premise,
             deal_type=Booking.DealType.SALE,
@@ -146,13 +153,107 @@ def _ensure_sale_booking(metadata: dict, local_payment: Payment | None) -> None:
         )
 
 
-def create_payment(
+def _premise_payment_conflict(premise: Premise) -> tuple[int, dict] | None:
+    """Ошибка 409, если у помещения есть активная бронь или незавершённый платёж; вызывать под lock_premise."""
+    has_active_booking = Booking.objects.active().filter(premise=premise).exists()
+    has_active_pending_payment = Payment.objects.filter(
+        premise=premise,
+        status__in=(Payment.Status.PENDING, Payment.Status.WAITING_FOR_CAPTURE),
+    ).exists()
+    if premise_is_available_for_deal(
+        premise=premise,
+        deal_type=settings.RE_OBJECTS_SALE_TYPE_SALE,
+        has_active_booking=has_active_booking,
+        has_active_pending_payment=has_active_pending_payment,
+    ):
+        return None
+
+    if has_active_booking:
+        return (
+            409,
+            create_payments_error(
+                status=409,
+                code=PaymentsErrorCodes.ACTIVE_BOOKING_EXISTS,
+                title='Active booking exists',
+                detail='This premise already has an active booking',
+                instance='/api/v1/payments/',
+            ),
+        )
+
+    if has_active_pending_payment:
+        return (
+            409,
+            create_payments_error(
+                status=409,
+                code=PaymentsErrorCodes.PREMISE_UNAVAILABLE,
+                title='Payment in progress',
+                detail='This premise already has an active unfinished payment',
+                instance='/api/v1/payments/',
+            ),
+        )
+
+    return (
+        409,
+        create_payments_error(
+            status=409,
+            code=PaymentsErrorCodes.PREMISE_UNAVAILABLE,
+            title='Premise unavailable',
+            detail='This premise is currently unavailable for payment',
+            instance='/api/v1/payments/',
+        ),
+    )
+
+
+def _claim_premise_for_payment(premise: Premise, **fields) -> tuple[Payment | None, tuple[int, dict] | None]:
+    """
+    Занимает помещение локальным платежом до вызова ЮKassa.
+
+    Проверки брони и незавершённых платежей повторяются под lock_premise, и в той же транзакции
+    записывается платёж в статусе pending: параллельные create_payment и create_booking после
+    блокировки видят его и получают 409. provider_payment_id временный (claim-<idempotence_key>),
+    его заменяет id платежа провайдера (_attach_provider_payment).
+    """
+    with transaction.atomic():
+        lock_premise(premise.pk)
+        conflict = _premise_payment_conflict(premise)
+        if conflict is not None:
+            return None, conflict
+        payment = Payment.objects.create(
+            premise=premise,
+            provider_payment_id=f'claim-{fields["idempotence_key"]}',
+            status=Payment.Status.PENDING,
+            **fields,
+        )
+    return payment, None
+
+
+def _attach_provider_payment(claim: Payment, payment: ProviderPayment) -> None:
+    """
+    Привязывает занявший помещение платёж к платежу провайдера.
+
+    Webhook мог прийти раньше (платёж найден по payment_token) и уже продвинуть статус —
+    статус из ответа на создание записывается, только пока платёж ещё pending.
+    """
+    Payment.objects.filter(pk=claim.pk).update(
+        provider_payment_id=payment.id,
+        amount_value=Decimal(payment.amount_value),
+        amount_currency=payment.amount_currency,
+        description=payment.description,
+        updated_at=timezone.now(),
+    )
+    Payment.objects.filter(pk=claim.pk, status=Payment.Status.PENDING).update(
+        status=_resolve_payment_status(payment.status),
+        paid=payment.paid,
+    )
+
+
+async def create_payment(
     user_id: int,
     premise_uuid: uuid.UUID,
     referral_code: str | None = None,
 ) -> tuple[PaymentCreateOut | None, tuple[int, dict] | None]:
     try:
-        premise = Premise.objects.get(uuid=premise_uuid)
+        premise = await Premise.objects.select_related('building').aget(uuid=premise_uuid)
     except Premise.DoesNotExist:
         return None, (
             404,
@@ -179,55 +280,7 @@ def create_payment(
             ),
         )
 
-    now = timezone.now()
-    has_active_booking = Booking.objects.filter(premise=premise, expires_at__gt=now).exists()
-    has_active_pending_payment = Payment.objects.filter(
-        premise=premise,
-        status__in=(Payment.Status.PENDING, Payment.Status.WAITING_FOR_CAPTURE),
-    ).exists()
-
-    if not premise_is_available_for_deal(
-        premise=premise,
-        deal_type=settings.RE_OBJECTS_SALE_TYPE_SALE,
-        has_active_booking=has_active_booking,
-        has_active_pending_payment=has_active_pending_payment,
-    ):
-        if has_active_booking:
-            return None, (
-                409,
-                create_payments_error(
-                    status=409,
-                    code=PaymentsErrorCodes.ACTIVE_BOOKING_EXISTS,
-                    title='Active booking exists',
-                    detail='This premise already has an active booking',
-                    instance='/api/v1/payments/',
-                ),
-            )
-
-        if has_active_pending_payment:
-            return None, (
-                409,
-                create_payments_error(
-                    status=409,
-                    code=PaymentsErrorCodes.PREMISE_UNAVAILABLE,
-                    title='Payment in progress',
-                    detail='This premise already has an active unfinished payment',
-                    instance='/api/v1/payments/',
-                ),
-            )
-
-        return None, (
-            409,
-            create_payments_error(
-                status=409,
-                code=PaymentsErrorCodes.PREMISE_UNAVAILABLE,
-                title='Premise unavailable',
-                detail='This premise is currently unavailable for payment',
-                instance='/api/v1/payments/',
-            ),
-        )
-
-    user = get_user_model().objects.filter(pk=user_id).first()
+    user = await get_user_model().objects.filter(pk=user_id).afirst()
     if user is None:
         return None, (
             502,
@@ -243,7 +296,7 @@ def create_payment(
     amount_value = _build_amount_value()
     description = _build_payment_description(premise)
     idempotence_key = uuid.uuid4()
-    referral_link = _resolve_referral_link_for_payment(premise_id, referral_code)
+    referral_link = await _resolve_referral_link_for_payment(premise_id, referral_code)
     metadata = {
         'payment_token': str(idempotence_key),
         'user_id': str(user_id),
@@ -281,12 +334,23 @@ def create_payment(
             )
         payment_payload['receipt'] = _build_receipt(customer_email, amount_value)
 
+    claim, conflict = await sync_to_async(_claim_premise_for_payment)(
+        premise,
+        idempotence_key=idempotence_key,
+        amount_value=Decimal(amount_value),
+        amount_currency='RUB',
+        description=description,
+        metadata=metadata,
+        referral_link=referral_link,
+    )
+    if conflict is not None:
+        return None, conflict
+
     try:
-        payment = YooKassaPayment.create(
-            payment_payload,
-            str(idempotence_key),
-        )
-    except Exception as exc:
+        payment = await get_payment_gateway().create_payment(payment_payload, str(idempotence_key))
+    except PaymentGatewayError as exc:
+        # Платёж у провайдера не создан — помещение освобождается сразу, а не по таймауту сверки
+        await claim.adelete()
         return None, (
             502,
             create_payments_error(
@@ -298,69 +362,65 @@ def create_payment(
             ),
         )
 
-    Payment.objects.update_or_create(
-        provider_payment_id=str(payment.id),
-        defaults={
-            'premise': premise,
-            'idempotence_key': idempotence_key,
-            'status': _resolve_payment_status(str(payment.status)),
-            'paid': bool(payment.paid),
-            'amount_value': Decimal(str(payment.amount.value)),
-            'amount_currency': str(payment.amount.currency),
-            'description': str(payment.description or ''),
-            'metadata': metadata,
-            'referral_link': referral_link,
-        },
-    )
-
-    confirmation_url = None
-    confirmation_type = 'redirect'
-    try:
-        confirmation_url = payment.confirmation.confirmation_url
-        confirmation_type = payment.confirmation.type
-    except AttributeError:
-        pass
-
-    created_at = None
-    try:
-        created_at = payment.created_at
-    except AttributeError:
-        pass
+    await sync_to_async(_attach_provider_payment)(claim, payment)
 
     out = PaymentCreateOut(
-        id=str(payment.id),
-        status=_resolve_payment_status(str(payment.status)),
-        paid=bool(payment.paid),
+        id=payment.id,
+        status=_resolve_payment_status(payment.status),
+        paid=payment.paid,
         amount=PaymentAmountOut(
-            value=str(payment.amount.value),
-            currency=str(payment.amount.currency),
+            value=payment.amount_value,
+            currency=payment.amount_currency,
         ),
-        description=str(payment.description),
+        description=payment.description,
         premise_id=premise_id,
         confirmation=PaymentConfirmationOut(
-            type=confirmation_type,
-            confirmation_url=confirmation_url,
+            type=payment.confirmation_type,
+            confirmation_url=payment.confirmation_url,
         ),
-        created_at=str(created_at) if created_at else None,
+        created_at=str(payment.created_at) if payment.created_at else None,
     )
     return out, None
 
 
-def handle_yookassa_webhook(raw_body: bytes) -> tuple[int, dict | None]:
+def parse_yookassa_webhook(raw_body: bytes) -> tuple[dict | None, object | None, tuple[int, dict] | None]:
+    """
+    Разбор тела уведомления ЮKassa.
+
+    Возвращает (event_json, notification, None) или (None, None, (400, body)) для некорректного тела.
+    """
     try:
         event_json = json.loads(raw_body)
     except json.JSONDecodeError:
-        return 400, {
-            'detail': 'Invalid JSON payload',
-        }
+        return None, None, (
+            400,
+            {
+                'detail': 'Invalid JSON payload',
+            },
+        )
 
     try:
         notification_object = WebhookNotification(event_json)
+        if not notification_object.object or not notification_object.object.id:
+            raise ValueError('notification without payment object')
     except Exception:
-        return 400, {
-            'detail': 'Invalid YooKassa notification payload',
-        }
+        return None, None, (
+            400,
+            {
+                'detail': 'Invalid YooKassa notification payload',
+            },
+        )
+    return event_json, notification_object, None
 
+
+def apply_yookassa_notification(event_json: dict, notification_object) -> None:
+    """
+    Обновляет локальный Payment по уведомлению и при payment.succeeded создаёт бронь продажи.
+
+    Вызывается внутри transaction.atomic(): строка Payment блокируется до конца транзакции, поэтому
+    воркер inbox, replay и сверка применяют состояние платежа по очереди. Статус меняется только вперёд,
+    paid не сбрасывается — повтор старого уведомления после успешной оплаты ничего не откатывает.
+    """
     payment = notification_object.object
     event_name = str(notification_object.event)
     payment_id = str(payment.id)
@@ -377,7 +437,8 @@ def handle_yookassa_webhook(raw_body: bytes) -> tuple[int, dict | None]:
         if isinstance(raw_metadata, dict):
             event_metadata = raw_metadata
 
-    local_payment = Payment.objects.select_related('referral_link__referrer').filter(provider_payment_id=payment_id).first()
+    payments = Payment.objects.select_for_update(of=('self',)).select_related('referral_link__referrer')
+    local_payment = payments.filter(provider_payment_id=payment_id).first()
     if local_payment is None and event_metadata:
         payment_token = event_metadata.get('payment_token')
         if isinstance(payment_token, str):
@@ -386,9 +447,7 @@ def handle_yookassa_webhook(raw_body: bytes) -> tuple[int, dict | None]:
             except ValueError:
                 payment_token_uuid = None
             if payment_token_uuid is not None:
-                local_payment = Payment.objects.select_related('referral_link__referrer').filter(
-                    idempotence_key=payment_token_uuid
-                ).first()
+                local_payment = payments.filter(idempotence_key=payment_token_uuid).first()
 
     if local_payment is None:
         premise = None
@@ -419,11 +478,13 @@ def handle_yookassa_webhook(raw_body: bytes) -> tuple[int, dict | None]:
         )
     else:
         fields_to_update: list[str] = []
-        if local_payment.status != payment_status:
+        if _STATUS_RANK[payment_status] > _STATUS_RANK[local_payment.status]:
             local_payment.status = payment_status
             fields_to_update.append('status')
-        if local_payment.paid != payment_paid:
-            local_payment.paid = payment_paid
+        elif local_payment.status != payment_status:
+            logger.info('Ignoring %s for payment %s: already %s', event_name, local_payment.pk, local_payment.status)
+        if payment_paid and not local_payment.paid:
+            local_payment.paid = True
             fields_to_update.append('paid')
         if local_payment.amount_value != payment_amount_value:
             local_payment.amount_value = payment_amount_value
@@ -448,9 +509,7 @@ def handle_yookassa_webhook(raw_body: bytes) -> tuple[int, dict | None]:
     if event_metadata:
         resolved_metadata.update(event_metadata)
 
-    if event_name == 'payment.succeeded':
+    if event_name == 'payment.succeeded' and local_payment.status == Payment.Status.SUCCEEDED:
         _ensure_sale_booking(resolved_metadata, local_payment)
     elif event_name == 'payment.canceled':
         pass
-
-    return 200, None
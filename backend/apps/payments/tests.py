@@ -1,5 +1,5 @@
 from types import SimpleNamespace
-from unittest.mock import patch
+from unittest.mock import AsyncMock, patch
 from datetime import timedelta
 from decimal import Decimal
 import uuid
@@ -10,12 +10,30 @@ from django.utils import timezone
 
 from apps.accounts.services.auth_service import generate_jwt_tokens
 from apps.bookings.models import Booking
-from apps.payments.models import Payment
-from apps.payments.services import handle_yookassa_webhook
+from apps.payments.gateway import (
+    PaymentGatewayError,
+    ProviderPayment,
+    StubPaymentGateway,
+)
+from apps.payments.inbox import enqueue_yookassa_webhook, process_inbox_entry
+from apps.payments.models import Payment, WebhookInboxEntry
 from apps.re_objects.models import Building, City, Premise, Region
 from apps.referrals.models import ReferralLink
 
 
+def _deliver_webhook(raw_body: bytes) -> tuple[int, dict | None]:
+    """Полный путь уведомления: приём в inbox и обработка записи, как это делает воркер."""
+    status, body = enqueue_yookassa_webhook(raw_body)
+    for entry in WebhookInboxEntry.objects.filter(status=WebhookInboxEntry.Status.PENDING).order_by('id'):
+        process_inbox_entry(entry)
+    return status, body
+
+
+def _mock_create_payment(get_gateway_mock) -> AsyncMock:
+    get_gateway_mock.return_value.create_payment = AsyncMock()
+    return get_gateway_mock.return_value.create_payment
+
+
 @override_settings(
     PAYMENTS_REDIRECT_URL='https://www.example.com/return_url',
     PAYMENTS_BOOKING_AMOUNT=10000,
@@ -64,18 +82,18 @@ class PaymentsCreateEndpointTests(TestCase):
             title=title,
         )
 
-    @patch('apps.payments.services.YooKassaPayment.create')
-    def test_create_payment_success(self, payment_create_mock):
-        payment_create_mock.return_value = SimpleNamespace(
+    @patch('apps.payments.services.get_payment_gateway')
+    def test_create_payment_success(self, get_gateway_mock):
+        payment_create_mock = _mock_create_payment(get_gateway_mock)
+        payment_create_mock.return_value = ProviderPayment(
             id='23d93cac-000f-5000-8000-126628f15141',
             status='pending',
             paid=False,
-            amount=SimpleNamespace(value='10000.00', currency='RUB'),
+            amount_value='10000.00',
+            amount_currency='RUB',
             description='Бронирование помещения 123',
-            confirmation=SimpleNamespace(
-                type='redirect',
-                confirmation_url='https://yoomoney.ru/api-pages/v2/payment-confirm/example',
-            ),
+            confirmation_type='redirect',
+            confirmation_url='https://yoomoney.ru/api-pages/v2/payment-confirm/example',
             created_at='2026-05-09T12:00:00+00:00',
         )
 
@@ -119,9 +137,10 @@ class PaymentsCreateEndpointTests(TestCase):
         self.assertEqual(item['payment_subject'], 'service')
         self.assertEqual(item['payment_mode'], 'full_prepayment')
 
-    @patch('apps.payments.services.YooKassaPayment.create')
-    def test_create_payment_yookassa_error(self, payment_create_mock):
-        payment_create_mock.side_effect = Exception('gateway error')
+    @patch('apps.payments.services.get_payment_gateway')
+    def test_create_payment_yookassa_error(self, get_gateway_mock):
+        payment_create_mock = _mock_create_payment(get_gateway_mock)
+        payment_create_mock.side_effect = PaymentGatewayError('gateway error')
 
         response = self.client.post(
             self.url,
@@ -134,18 +153,18 @@ class PaymentsCreateEndpointTests(TestCase):
         body = response.json()
         self.assertEqual(body['code'], 'PAYMENTS_CREATION_ERROR')
 
-    @patch('apps.payments.services.YooKassaPayment.create')
-    def test_create_payment_sets_referral_link_from_cookie(self, payment_create_mock):
-        payment_create_mock.return_value = SimpleNamespace(
+    @patch('apps.payments.services.get_payment_gateway')
+    def test_create_payment_sets_referral_link_from_cookie(self, get_gateway_mock):
+        payment_create_mock = _mock_create_payment(get_gateway_mock)
+        payment_create_mock.return_value = ProviderPayment(
             id='23d93cac-000f-5000-8000-126628f15142',
             status='pending',
             paid=False,
-            amount=SimpleNamespace(value='10000.00', currency='RUB'),
+            amount_value='10000.00',
+            amount_currency='RUB',
             description='Бронирование помещения 123',
-            confirmation=SimpleNamespace(
-                type='redirect',
-                confirmation_url='https://yoomoney.ru/api-pages/v2/payment-confirm/example',
-            ),
+            confirmation_type='redirect',
+            confirmation_url='https://yoomoney.ru/api-pages/v2/payment-confirm/example',
             created_at='2026-05-09T12:00:00+00:00',
         )
         self.client.cookies['referral_code'] = str(self.valid_referral_link.code)
@@ -164,18 +183,18 @@ class PaymentsCreateEndpointTests(TestCase):
         payload = payment_create_mock.call_args.args[0]
         self.assertEqual(payload['metadata']['referral_link_id'], str(self.valid_referral_link.id))
 
-    @patch('apps.payments.services.YooKassaPayment.create')
-    def test_create_payment_ignores_referral_cookie_for_other_premise(self, payment_create_mock):
-        payment_create_mock.return_value = SimpleNamespace(
+    @patch('apps.payments.services.get_payment_gateway')
+    def test_create_payment_ignores_referral_cookie_for_other_premise(self, get_gateway_mock):
+        payment_create_mock = _mock_create_payment(get_gateway_mock)
+        payment_create_mock.return_value = ProviderPayment(
             id='23d93cac-000f-5000-8000-126628f15143',
             status='pending',
             paid=False,
-            amount=SimpleNamespace(value='10000.00', currency='RUB'),
+            amount_value='10000.00',
+            amount_currency='RUB',
             description='Бронирование помещения 123',
-            confirmation=SimpleNamespace(
-                type='redirect',
-                confirmation_url='https://yoomoney.ru/api-pages/v2/payment-confirm/example',
-            ),
+            confirmation_type='redirect',
+            confirmation_url='https://yoomoney.ru/api-pages/v2/payment-confirm/example',
             created_at='2026-05-09T12:00:00+00:00',
         )
         self.client.cookies['referral_code'] = str(self.other_referral_link.code)
@@ -194,6 +213,25 @@ class PaymentsCreateEndpointTests(TestCase):
         payload = payment_create_mock.call_args.args[0]
         self.assertNotIn('referral_link_id', payload['metadata'])
 
+    @patch('apps.payments.services.get_payment_gateway')
+    def test_create_payment_with_stub_gateway(self, get_gateway_mock):
+        gateway = StubPaymentGateway()
+        get_gateway_mock.return_value = gateway
+
+        response = self.client.post(
+            self.url,
+            data={'premise_uuid': str(self.premise.uuid)},
+            content_type='application/json',
+            HTTP_AUTHORIZATION=self.auth_header,
+        )
+
+        self.assertEqual(response.status_code, 201)
+        body = response.json()
+        self.assertIn(body['id'], gateway.payments)
+        local_payment = Payment.objects.get(provider_payment_id=body['id'])
+        self.assertEqual(local_payment.status, Payment.Status.PENDING)
+        self.assertEqual(str(local_payment.idempotence_key), local_payment.metadata['payment_token'])
+
     def test_create_payment_premise_not_found(self):
         response = self.client.post(
             self.url,
@@ -293,7 +331,7 @@ class PaymentsWebhookHandlerServiceTests(TestCase):
             contact_phone='+7 911 111-11-11',
         )
 
-    @patch('apps.payments.services.WebhookNotification')
+    @patch('apps.payments.inbox.WebhookNotification')
     def test_handle_webhook_payment_succeeded_returns_200(self, webhook_notification_mock):
         webhook_notification_mock.return_value = SimpleNamespace(
             event='payment.succeeded',
@@ -310,7 +348,7 @@ class PaymentsWebhookHandlerServiceTests(TestCase):
             f'"user_id":"{self.user.id}","premise_id":"{self.premise.id}"}}}}}}'
         ).encode()
 
-        status, body = handle_yookassa_webhook(payload)
+        status, body = _deliver_webhook(payload)
 
         self.assertEqual(status, 200)
         self.assertIsNone(body)
@@ -322,12 +360,12 @@ class PaymentsWebhookHandlerServiceTests(TestCase):
         self.assertEqual(booking.source_payment_id, payment.pk)
 
     def test_handle_webhook_invalid_json_returns_400(self):
-        status, body = handle_yookassa_webhook(b'{')
+        status, body = _deliver_webhook(b'{')
 
         self.assertEqual(status, 400)
         self.assertEqual(body['detail'], 'Invalid JSON payload')
 
-    @patch('apps.payments.services.WebhookNotification')
+    @patch('apps.payments.inbox.WebhookNotification')
     def test_handle_webhook_duplicate_event_updates_idempotently(self, webhook_notification_mock):
         payment = Payment.objects.create(
             premise=self.premise,
@@ -359,8 +397,8 @@ class PaymentsWebhookHandlerServiceTests(TestCase):
             f'"user_id":"{self.user.id}","premise_id":"{self.premise.id}"}}}}}}'
         ).encode()
 
-        first_status, first_body = handle_yookassa_webhook(payload)
-        second_status, second_body = handle_yookassa_webhook(payload)
+        first_status, first_body = _deliver_webhook(payload)
+        second_status, second_body = _deliver_webhook(payload)
 
         self.assertEqual(first_status, 200)
         self.assertIsNone(first_body)
@@ -373,7 +411,7 @@ class PaymentsWebhookHandlerServiceTests(TestCase):
         booking = Booking.objects.get(premise=self.premise, user=self.user)
         self.assertEqual(booking.source_payment_id, payment.pk)
 
-    @patch('apps.payments.services.WebhookNotification')
+    @patch('apps.payments.inbox.WebhookNotification')
     def test_handle_webhook_payment_canceled_does_not_create_booking(self, webhook_notification_mock):
         webhook_notification_mock.return_value = SimpleNamespace(
             event='payment.canceled',
@@ -390,13 +428,13 @@ class PaymentsWebhookHandlerServiceTests(TestCase):
             f'"user_id":"{self.user.id}","premise_id":"{self.premise.id}"}}}}}}'
         ).encode()
 
-        status, body = handle_yookassa_webhook(payload)
+        status, body = _deliver_webhook(payload)
 
         self.assertEqual(status, 200)
         self.assertIsNone(body)
         self.assertEqual(Booking.objects.filter(premise=self.premise, user=self.user).count(), 0)
 
-    @patch('apps.payments.services.WebhookNotification')
+    @patch('apps.payments.inbox.WebhookNotification')
     def test_handle_webhook_unknown_status_falls_back_to_pending(self, webhook_notification_mock):
         webhook_notification_mock.return_value = SimpleNamespace(
             event='payment.waiting_for_capture',
@@ -413,14 +451,14 @@ class PaymentsWebhookHandlerServiceTests(TestCase):
             f'{{"payment_token":"3fa85f64-5717-4562-b3fc-2c963f66afa6","user_id":"{self.user.id}","premise_id":"{self.premise.id}"}}}}}}'
         ).encode()
 
-        status, body = handle_yookassa_webhook(payload)
+        status, body = _deliver_webhook(payload)
 
         self.assertEqual(status, 200)
         self.assertIsNone(body)
         payment = Payment.objects.get(provider_payment_id='payment-unknown-status-id')
         self.assertEqual(payment.status, Payment.Status.PENDING)
 
-    @patch('apps.payments.services.WebhookNotification')
+    @patch('apps.payments.inbox.WebhookNotification')
     def test_handle_webhook_sets_booking_referrer_from_payment_referral_link(self, webhook_notification_mock):
         payment = Payment.objects.create(
             premise=self.premise,
@@ -454,7 +492,7 @@ class PaymentsWebhookHandlerServiceTests(TestCase):
             f'"premise_id":"{self.premise.id}"}}}}}}'
         ).encode()
 
-        status, body = handle_yookassa_webhook(payload)
+        status, body = _deliver_webhook(payload)
 
         self.assertEqual(status, 200)
         self.assertIsNone(body)
@@ -467,7 +505,7 @@ class PaymentsWebhookEndpointTests(TestCase):
     def setUp(self):
         self.url = '/api/v1/payments/webhook'
 
-    @patch('apps.payments.routers.handle_yookassa_webhook')
+    @patch('apps.payments.routers.enqueue_yookassa_webhook')
     def test_webhook_endpoint_success_returns_200(self, handle_webhook_mock):
         handle_webhook_mock.return_value = (200, None)
 
@@ -479,7 +517,7 @@ class PaymentsWebhookEndpointTests(TestCase):
 
         self.assertEqual(response.status_code, 200)
 
-    @patch('apps.payments.routers.handle_yookassa_webhook')
+    @patch('apps.payments.routers.enqueue_yookassa_webhook')
     def test_webhook_endpoint_invalid_payload_returns_400(self, handle_webhook_mock):
         handle_webhook_mock.return_value = (400, {'detail': 'Invalid YooKassa notification payload'})
 
@@ -491,3 +529,4 @@ class PaymentsWebhookEndpointTests(TestCase):
 
         self.assertEqual(response.status_code, 400)
         self.assertEqual(response.json()['detail'], 'Invalid YooKassa notification payload')
+
@@ -1,9 +1,16 @@
 """
 Админка для моделей объектов недвижимости.
 """
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ACTION_CHECKBOX_NAME
+from django.core.exceptions import PermissionDenied
+from django.template.response import TemplateResponse
+from django.urls import path
+from django.utils import timezone
 from django.utils.html import format_html
-from django.utils.safestring import mark_safe
+
+from core.admin import LargeTableAdminMixin, SelectRelatedFieldListFilter, SelectRelatedSearchMixin
 
 from .models import (
     Building,
@@ -11,91 +18,62 @@ from .models import (
     BuildingVideo,
     City,
     Floor,
+    MediaBlob,
+    MediaDerivativeJob,
     Premise,
     PremiseImage,
     PremiseVideo,
     Region,
 )
+from .services.bulk_pricing import PRICE_FIELDS, PriceChange, PriceChangeError, PriceChangeMode, apply_price_change
+from .services.catalog_import import CatalogImportError, import_catalog
 
+IMPORT_ERRORS_SHOWN = 200
 
-# Inline админки для медиафайлов помещений
-class PremiseImageInline(admin.TabularInline):
-    """Inline для изображений помещений."""
-    model = PremiseImage
+
+class MediaInline(admin.TabularInline):
+    """
+    Общая часть inline медиа. Превью — только миниатюра card (~100 px): detail и оригиналы в списке не
+    грузятся, у помещения с десятками фото страница иначе тянет мегабайты; оригинал — по ссылке виджета файла.
+    Заголовок строки inline — __str__ медиа, он читает владельца и его FK: owner_select_related подгружает
+    их в том же запросе, что и строки.
+    """
     extra = 1
-    fields = (
-        'original', 'card', 'detail', 'title', 'order', 'is_primary', 'file_preview',
-    )
-    readonly_fields = ('card', 'detail', 'file_preview')
-    verbose_name = 'Изображение'
-    verbose_name_plural = 'Изображения'
+    readonly_fields = ('file_preview',)
+    owner_select_related = ()
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related(*self.owner_select_related)
+
+    @admin.display(description='Превью')
     def file_preview(self, obj):
-        """Превью card и ссылки на original/detail."""
-        if not obj.pk:
+        if not obj.pk or not obj.card:
             return '-'
-        parts = []
-        if obj.card:
-            parts.append(
-                format_html(
-                    '<img src="{}" style="max-width: 100px; max-height: 56px; border-radius: 4px; object-fit: contain; background: #f0f0f0;" />',
-                    obj.card.url,
-                )
-            )
-        if obj.original:
-            parts.append(
-                format_html('<a href="{}" target="_blank">оригинал</a>', obj.original.url)
-            )
-        if obj.detail:
-            parts.append(
-                format_html('<a href="{}" target="_blank">detail</a>', obj.detail.url)
-            )
-        if not parts:
-            return '-'
-        if len(parts) == 1:
-            return parts[0]
-        return mark_safe('&nbsp;'.join(str(p) for p in parts))
+        return format_html(
+            '<img src="{}" loading="lazy" style="max-width: 100px; max-height: 56px; border-radius: 4px; '
+            'object-fit: contain; background: #f0f0f0;" />',
+            obj.card.url,
+        )
+
 
-    file_preview.short_description = 'Превью / ссылки'
+# Inline админки для медиафайлов помещений
+class PremiseImageInline(MediaInline):
+    """Inline для изображений помещений."""
+    model = PremiseImage
+    fields = ('original', 'title', 'order', 'is_primary', 'file_preview')
+    owner_select_related = ('premise__city', 'premise__building', 'premise__floor')
+    verbose_name = 'Изображение'
+    verbose_name_plural = 'Изображения'
 
 
-class PremiseVideoInline(admin.TabularInline):
+class PremiseVideoInline(MediaInline):
     """Inline для видео помещений."""
     model = PremiseVideo
-    extra = 1
-    fields = ('file', 'card', 'title', 'order', 'file_preview')
-    readonly_fields = ('card', 'file_preview')
+    fields = ('file', 'title', 'order', 'file_preview')
+    owner_select_related = ('premise__city', 'premise__building', 'premise__floor')
     verbose_name = 'Видео'
     verbose_name_plural = 'Видео'
 
-    def file_preview(self, obj):
-        """Превью кадра и ссылка на ролик."""
-        if not obj.pk:
-            return '-'
-        parts = []
-        if obj.card:
-            parts.append(
-                format_html(
-                    '<img src="{}" style="max-width: 100px; max-height: 56px; border-radius: 4px; object-fit: contain; background: #f0f0f0;" />',
-                    obj.card.url,
-                )
-            )
-        if obj.file:
-            parts.append(
-                format_html(
-                    '<a href="{}" target="_blank" style="display: inline-block; padding: 4px 8px; '
-                    'background: #007cba; color: white; text-decoration: none; border-radius: 3px;">видео</a>',
-                    obj.file.url,
-                )
-            )
-        if not parts:
-            return '-'
-        if len(parts) == 1:
-            return parts[0]
-        return mark_safe('&nbsp;'.join(str(p) for p in parts))
-
-    file_preview.short_description = 'Превью / ссылка'
-
 
 @admin.register(Region)
 class RegionAdmin(admin.ModelAdmin):
@@ -107,9 +85,10 @@ class RegionAdmin(admin.ModelAdmin):
 
 
 @admin.register(City)
-class CityAdmin(admin.ModelAdmin):
+class CityAdmin(SelectRelatedSearchMixin, admin.ModelAdmin):
     """Админка для городов."""
     list_display = ('name', 'region', 'is_default', 'created_at')
+    list_select_related = ('region',)
     list_filter = ('region', 'is_default', 'created_at')
     search_fields = ('name', 'region__name')
     ordering = ('region', 'name')
@@ -117,89 +96,30 @@ class CityAdmin(admin.ModelAdmin):
 
 
 # Inline админки для медиафайлов зданий
-class BuildingImageInline(admin.TabularInline):
+class BuildingImageInline(MediaInline):
     """Inline для изображений зданий."""
     model = BuildingImage
-    extra = 1
-    fields = (
-        'original', 'card', 'detail', 'title', 'category', 'order', 'is_primary', 'file_preview',
-    )
-    readonly_fields = ('card', 'detail', 'file_preview')
+    fields = ('original', 'title', 'category', 'order', 'is_primary', 'file_preview')
+    owner_select_related = ('building__city',)
     verbose_name = 'Изображение'
     verbose_name_plural = 'Изображения'
 
-    def file_preview(self, obj):
-        """Превью card и ссылки на original/detail."""
-        if not obj.pk:
-            return '-'
-        parts = []
-        if obj.card:
-            parts.append(
-                format_html(
-                    '<img src="{}" style="max-width: 100px; max-height: 56px; border-radius: 4px; object-fit: contain; background: #f0f0f0;" />',
-                    obj.card.url,
-                )
-            )
-        if obj.original:
-            parts.append(
-                format_html('<a href="{}" target="_blank">оригинал</a>', obj.original.url)
-            )
-        if obj.detail:
-            parts.append(
-                format_html('<a href="{}" target="_blank">detail</a>', obj.detail.url)
-            )
-        if not parts:
-            return '-'
-        if len(parts) == 1:
-            return parts[0]
-        return mark_safe('&nbsp;'.join(str(p) for p in parts))
-
-    file_preview.short_description = 'Превью / ссылки'
-
 
-class BuildingVideoInline(admin.TabularInline):
+class BuildingVideoInline(MediaInline):
     """Inline для видео зданий."""
     model = BuildingVideo
-    extra = 1
-    fields = ('file', 'card', 'title', 'category', 'order', 'file_preview')
-    readonly_fields = ('card', 'file_preview')
+    fields = ('file', 'title', 'category', 'order', 'file_preview')
+    owner_select_related = ('building__city',)
     verbose_name = 'Видео'
     verbose_name_plural = 'Видео'
 
-    def file_preview(self, obj):
-        """Превью кадра и ссылка на ролик."""
-        if not obj.pk:
-            return '-'
-        parts = []
-        if obj.card:
-            parts.append(
-                format_html(
-                    '<img src="{}" style="max-width: 100px; max-height: 56px; border-radius: 4px; object-fit: contain; background: #f0f0f0;" />',
-                    obj.card.url,
-                )
-            )
-        if obj.file:
-            parts.append(
-                format_html(
-                    '<a href="{}" target="_blank" style="display: inline-block; padding: 4px 8px; '
-                    'background: #007cba; color: white; text-decoration: none; border-radius: 3px;">видео</a>',
-                    obj.file.url,
-                )
-            )
-        if not parts:
-            return '-'
-        if len(parts) == 1:
-            return parts[0]
-        return mark_safe('&nbsp;'.join(str(p) for p in parts))
-
-    file_preview.short_description = 'Превью / ссылка'
-
 
 @admin.register(Building)
-class BuildingAdmin(admin.ModelAdmin):
+class BuildingAdmin(SelectRelatedSearchMixin, admin.ModelAdmin):
     """Админка для зданий."""
     list_display = ('name', 'address', 'city', 'latitude', 'longitude', 'total_floors', 'year_built', 'created_at')
-    list_filter = ('city', 'city__region', 'year_built', 'created_at')
+    list_select_related = ('city__region',)
+    list_filter = (('city', SelectRelatedFieldListFilter), 'city__region', 'year_built', 'created_at')
     search_fields = ('name', 'address', 'city__name')
     ordering = ('city', 'name')
     autocomplete_fields = ['city']
@@ -230,33 +150,97 @@ class BuildingAdmin(admin.ModelAdmin):
 
 
 @admin.register(Floor)
-class FloorAdmin(admin.ModelAdmin):
+class FloorAdmin(SelectRelatedSearchMixin, admin.ModelAdmin):
     """Админка для этажей."""
     list_display = ('building', 'number', 'title', 'created_at')
-    list_filter = ('building__city', 'created_at')
+    list_select_related = ('building__city',)
+    list_filter = (('building__city', SelectRelatedFieldListFilter), 'created_at')
     search_fields = ('building__name', 'title', 'number')
     ordering = ('building', 'number')
     autocomplete_fields = ['building']
     readonly_fields = ('created_at', 'updated_at')
 
 
+@admin.register(MediaDerivativeJob)
+class MediaDerivativeJobAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    """Очередь производных медиа (воркер build_media_derivatives): статус, ошибки и пик памяти."""
+    list_display = ('id', 'target', 'media_id', 'status', 'attempts', 'peak_memory_mb', 'created_at', 'processed_at')
+    list_filter = ('status', 'target')
+    search_fields = ('media_id',)
+    readonly_fields = (
+        'target',
+        'media_id',
+        'status',
+        'attempts',
+        'last_error',
+        'next_attempt_at',
+        'peak_memory',
+        'created_at',
+        'processed_at',
+    )
+    actions = ('retry_jobs',)
+
+    @admin.display(description='Пик памяти', ordering='peak_memory')
+    def peak_memory_mb(self, obj):
+        if obj.peak_memory is None:
+            return '—'
+        return f'{obj.peak_memory / (1024 * 1024):.1f} МБ'
+
+    @admin.action(description='Повторить')
+    def retry_jobs(self, request, queryset):
+        count = queryset.exclude(status=MediaDerivativeJob.Status.PENDING).update(
+            status=MediaDerivativeJob.Status.PENDING, attempts=0, next_attempt_at=timezone.now()
+        )
+        self.message_user(request, f'Поставлено в очередь повторно: {count}', messages.SUCCESS)
+
+    def has_add_permission(self, request):
+        return False
+
+
+class CatalogImportForm(forms.Form):
+    file = forms.FileField(label='Файл', help_text='CSV или XLSX, первая строка — заголовок')
+    create_floors = forms.BooleanField(label='Создавать недостающие этажи', required=False)
+    dry_run = forms.BooleanField(label='Только проверить (без записи)', required=False)
+
+
+class PriceChangeForm(forms.Form):
+    field = forms.ChoiceField(label='Цена', choices=list(PRICE_FIELDS.items()))
+    mode = forms.ChoiceField(label='Изменить', choices=PriceChangeMode.choices)
+    value = forms.DecimalField(
+        label='Значение',
+        max_digits=14,
+        decimal_places=2,
+        help_text='Процент (например, 7.5 или -10) или сумма в целых рублях; отрицательное значение — снижение',
+    )
+
+    def clean(self):
+        cleaned = super().clean()
+        if not self.errors:
+            try:
+                cleaned['change'] = PriceChange(cleaned['field'], cleaned['mode'], cleaned['value'])
+            except PriceChangeError as exc:
+                raise forms.ValidationError(str(exc)) from exc
+        return cleaned
+
+
 @admin.register(Premise)
-class PremiseAdmin(admin.ModelAdmin):
+class PremiseAdmin(LargeTableAdminMixin, SelectRelatedSearchMixin, admin.ModelAdmin):
     """Админка для помещений. Помещение привязано к зданию, этаж — из списка этажей этого здания."""
     list_display = (
         'room_number', 'title', 'city', 'building', 'floor_info',
         'area', 'price_per_month', 'premise_type',
         'available_for_rent', 'available_for_sale', 'show_rented_button', 'created_at'
     )
+    list_select_related = ('city__region', 'building__city', 'floor')
     list_filter = (
-        'city', 'city__region', 'building', 'premise_type',
+        ('city', SelectRelatedFieldListFilter), 'city__region', ('building', SelectRelatedFieldListFilter),
+        'premise_type',
         'available_for_rent', 'available_for_sale', 'show_rented_button',
         'has_windows', 'has_parking', 'is_furnished', 'created_at'
     )
-    search_fields = (
-        'room_number', 'title', 'city__name', 'building__name',
-        'description', 'building__address'
-    )
+    # Без description: icontains по длинному тексту не покрывается индексом (см. миграцию 0041)
+    search_fields = ('room_number', 'title', 'city__name', 'building__name', 'building__address')
+    autocomplete_fields = ('city', 'building', 'floor')
     ordering = ('city', 'building', 'floor__number', 'room_number', 'title')
     readonly_fields = ('created_at', 'updated_at', 'full_sell_price', 'presentation_preview')
     inlines = [PremiseImageInline, PremiseVideoInline]
@@ -301,6 +285,70 @@ class PremiseAdmin(admin.ModelAdmin):
         )
 
     presentation_preview.short_description = 'Скачать презентацию'
+
+    change_list_template = 'admin/re_objects/premise/change_list.html'
+    actions = ('change_prices',)
+
+    @admin.action(description='Изменить цены', permissions=['change'])
+    def change_prices(self, request, queryset):
+        """Индексация или акция для выбранных помещений одним UPDATE (services.bulk_pricing)."""
+        form = PriceChangeForm(request.POST if 'apply' in request.POST else None)
+        if form.is_valid():
+            try:
+                report = apply_price_change(queryset, form.cleaned_data['change'])
+            except PriceChangeError as exc:
+                form.add_error(None, str(exc))
+            else:
+                self.message_user(request, f'Цены изменены у помещений: {report.updated}', messages.SUCCESS)
+                return None
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'Изменить цены',
+            'form': form,
+            'count': queryset.count(),
+            'selected': request.POST.getlist(ACTION_CHECKBOX_NAME),
+            'select_across': request.POST.get('select_across', '0'),
+            'action_checkbox_name': ACTION_CHECKBOX_NAME,
+        }
+        return TemplateResponse(request, 'admin/re_objects/premise/change_prices.html', context)
+
+    def get_urls(self):
+        urls = [
+            path(
+                'import/',
+                self.admin_site.admin_view(self.import_catalog_view),
+                name='re_objects_premise_import',
+            ),
+        ]
+        return urls + super().get_urls()
+
+    def import_catalog_view(self, request):
+        """Загрузка таблицы помещений (CSV/XLSX) — та же логика, что у manage.py import_catalog."""
+        if not (self.has_add_permission(request) and self.has_change_permission(request)):
+            raise PermissionDenied
+        report = None
+        form = CatalogImportForm(request.POST or None, request.FILES or None)
+        if request.method == 'POST' and form.is_valid():
+            upload = form.cleaned_data['file']
+            try:
+                report = import_catalog(
+                    upload.read(),
+                    upload.name,
+                    create_floors=form.cleaned_data['create_floors'],
+                    dry_run=form.cleaned_data['dry_run'],
+                )
+            except CatalogImportError as exc:
+                form.add_error('file', str(exc))
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'Импорт помещений из CSV/XLSX',
+            'form': form,
+            'report': report,
+            'errors_shown': report.errors[:IMPORT_ERRORS_SHOWN] if report else [],
+        }
+        return TemplateResponse(request, 'admin/re_objects/premise/import_catalog.html', context)
     
     def floor_info(self, obj):
         """Информация об этаже."""
@@ -308,3 +356,35 @@ class PremiseAdmin(admin.ModelAdmin):
             return f"Этаж {obj.floor.number}"
         return '-'
     floor_info.short_description = 'Этаж'
+
+
+@admin.register(MediaBlob)
+class MediaBlobAdmin(admin.ModelAdmin):
+    """Файлы медиа по содержимому (services.media_store): ссылки и общие производные. Только просмотр."""
+    list_display = ('sha256', 'size_mb', 'ref_count', 'derivatives_key', 'build_seconds', 'created_at')
+    search_fields = ('sha256', 'original')
+    readonly_fields = (
+        'sha256',
+        'size',
+        'original',
+        'card',
+        'detail',
+        'derivatives_key',
+        'build_seconds',
+        'ref_count',
+        'created_at',
+    )
+
+    @admin.display(description='Размер, МБ', ordering='size')
+    def size_mb(self, obj):
+        return round(obj.size / 1024 / 1024, 2)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        # Удаляются вместе с последней ссылкой (release_blob)
+        return False
@@ -5,3 +5,6 @@ class ReObjectsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.re_objects'
     verbose_name = 'Объекты недвижимости'
+
+    def ready(self):
+        from . import signals  # noqa: F401
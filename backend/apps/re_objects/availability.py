@@ -2,8 +2,8 @@
 Правила доступности помещений без поля status.
 
 Фильтры каталога (query available, список зданий для фильтра): «свободно» — без активной брони
-и без незавершённой оплаты (pending / waiting_for_capture). Записи Deal (оформленные сделки)
-в эти фильтры не входят.
+(Booking.objects.active(): is_active; истёкшие снимает expire_bookings) и без незавершённой оплаты
+(pending / waiting_for_capture). Записи Deal (оформленные сделки) в эти фильтры не входят.
 
 Занятость по схеме этажа (is_occupied): см. premise_service._floor_premise_availability_rows —
 по флагам помещения и админке, не по броням и платежам.
@@ -14,7 +14,6 @@ from typing import TYPE_CHECKING
 
 from django.conf import settings
 from django.db.models import Exists, OuterRef, Q
-from django.utils import timezone
 
 from apps.bookings.models import Booking
 from apps.payments.models import Payment
@@ -25,15 +24,8 @@ if TYPE_CHECKING:
     from .models import Premise
 
 
-def _now():
-    return timezone.now()
-
-
 def active_booking_subquery():
-    return Booking.objects.filter(
-        premise_id=OuterRef('pk'),
-        expires_at__gt=_now(),
-    )
+    return Booking.objects.active().filter(premise_id=OuterRef('pk'))
 
 
 def active_pending_payment_subquery():
@@ -77,10 +69,7 @@ def premise_is_available_for_deal(
         return False
 
     if has_active_booking is None:
-        has_active_booking = Booking.objects.filter(
-            premise_id=premise.pk,
-            expires_at__gt=_now(),
-        ).exists()
+        has_active_booking = Booking.objects.active().filter(premise_id=premise.pk).exists()
     if has_active_pending_payment is None:
         has_active_pending_payment = Payment.objects.filter(
             premise_id=premise.pk,
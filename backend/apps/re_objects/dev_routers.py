@@ -6,13 +6,20 @@
 2) POST /api/v1/dev/buildings/{uuid}/floors — создание этажа в здании
 3) POST /api/v1/dev/buildings/{uuid}/media — добавление медиа здания с категорией
 4) POST /api/v1/dev/premises/{building_uuid} — создание помещения в здании + загрузка фото
+
+Заголовок Idempotency-Key (необязательный): успешный ответ сохраняется, повтор запроса с тем же
+ключом (после таймаута или 5xx у клиента) возвращает его без повторного создания объектов.
 """
+import functools
+from datetime import timedelta
 from decimal import Decimal
 from typing import List, Optional
 from uuid import UUID
 
+from django.conf import settings
 from django.core.exceptions import ValidationError
-from django.db import transaction
+from django.db import IntegrityError, transaction
+from django.utils import timezone
 from ninja import File, Form, Router, UploadedFile
 
 from .models import (
@@ -20,6 +27,7 @@ from .models import (
     BuildingImage,
     BuildingVideo,
     City,
+    DevIdempotencyKey,
     Floor,
     Premise,
     PremiseImage,
@@ -33,6 +41,52 @@ dev_router = Router(tags=["Dev / Test"])
 IMAGE_EXTENSIONS = {"jpg", "jpeg", "png", "webp", "gif"}
 VIDEO_EXTENSIONS = {"mp4", "mov", "avi", "webm"}
 
+# Ответы — произвольные dict; ошибки {"detail": ...} тоже объявлены, иначе Ninja превращает их в 500
+DEV_RESPONSES = {200: dict, 400: dict, 404: dict}
+
+
+def idempotent(view):
+    """
+    Повтор запроса с тем же Idempotency-Key возвращает сохранённый ответ.
+
+    Ключ действует в пределах метода и пути запроса и DEV_IDEMPOTENCY_KEY_TTL_HOURS часов;
+    просроченные ключи удаляются при записи нового. Ключ длиннее 200 символов — ошибка 400.
+    Представление и запись ключа выполняются в одной транзакции: ключ сохраняется только вместе
+    с созданными объектами. Ответы с ошибкой не сохраняются — их можно повторить.
+    """
+
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        key = request.headers.get("Idempotency-Key", "").strip()
+        if not key:
+            return view(request, *args, **kwargs)
+        if len(key) > DevIdempotencyKey.MAX_KEY_LENGTH:
+            return 400, {"detail": f"Idempotency-Key длиннее {DevIdempotencyKey.MAX_KEY_LENGTH} символов"}
+        cutoff = timezone.now() - timedelta(hours=settings.DEV_IDEMPOTENCY_KEY_TTL_HOURS)
+        stored_keys = DevIdempotencyKey.objects.filter(
+            key=key, method=request.method, path=request.path, created_at__gte=cutoff
+        )
+        stored = stored_keys.first()
+        if stored:
+            return stored.status_code, stored.response
+        try:
+            with transaction.atomic():
+                status, body = view(request, *args, **kwargs)
+                if status == 200:
+                    DevIdempotencyKey.objects.filter(created_at__lt=cutoff).delete()
+                    DevIdempotencyKey.objects.create(
+                        key=key, method=request.method, path=request.path, status_code=status, response=body
+                    )
+        except IntegrityError:
+            # Параллельный повтор с тем же ключом успел раньше — отдаём его ответ
+            stored = stored_keys.first()
+            if not stored:
+                raise
+            return stored.status_code, stored.response
+        return status, body
+
+    return wrapper
+
 
 def _file_extension(name: str) -> str:
     return name.rsplit(".", 1)[-1].lower() if "." in name else ""
@@ -72,7 +126,9 @@ def _validate_presentation_file(f: UploadedFile) -> Optional[str]:
         "Загружает фото и видео. Файлы: multipart/form-data. "
         "Варианты: images + videos отдельно, или files — все файлы (разделяются по расширению)."
     ),
+    response=DEV_RESPONSES,
 )
+@idempotent
 def create_building_with_floor(
     request,
     name: str = Form(..., description="Название здания"),
@@ -146,7 +202,9 @@ def create_building_with_floor(
     "/dev/buildings/{building_uuid}/floors",
     summary="Создание этажа в здании",
     description="Создаёт этаж в здании по UUID. Номер этажа должен быть уникальным в рамках здания.",
+    response=DEV_RESPONSES,
 )
+@idempotent
 def create_floor_in_building(
     request,
     building_uuid: UUID,
@@ -179,7 +237,9 @@ def create_floor_in_building(
     "/dev/buildings/{building_uuid}/media",
     summary="Добавление медиа здания с категорией",
     description="Добавляет фото к зданию с указанной категорией. Файлы: multipart/form-data.",
+    response=DEV_RESPONSES,
 )
+@idempotent
 def add_building_media(
     request,
     building_uuid: UUID,
@@ -196,21 +256,24 @@ def add_building_media(
     if not img_files:
         return 400, {"detail": "Не переданы изображения"}
 
-    max_order = (
-        BuildingImage.objects.filter(building=building).order_by("-order").values_list("order", flat=True).first()
-        or 0
-    )
     cat = (category or "").strip()
-    has_images = BuildingImage.objects.filter(building=building).exists()
-
-    for i, f in enumerate(img_files, start=1):
-        BuildingImage.objects.create(
-            building=building,
-            original=f,
-            order=max_order + i,
-            category=cat,
-            is_primary=(not has_images and i == 1),
+    with transaction.atomic():
+        # Параллельные загрузки в одно здание: блокировка строки здания сохраняет порядок и одно главное фото
+        Building.objects.select_for_update().filter(pk=building.pk).first()
+        max_order = (
+            BuildingImage.objects.filter(building=building).order_by("-order").values_list("order", flat=True).first()
+            or 0
         )
+        has_images = BuildingImage.objects.filter(building=building).exists()
+
+        for i, f in enumerate(img_files, start=1):
+            BuildingImage.objects.create(
+                building=building,
+                original=f,
+                order=max_order + i,
+                category=cat,
+                is_primary=(not has_images and i == 1),
+            )
 
     return 200, {
         "building_uuid": str(building.uuid),
@@ -228,7 +291,9 @@ def add_building_media(
         "Файлы: multipart/form-data, поле images или files — фото и видео; "
         "presentation — pdf/ppt/pptx."
     ),
+    response=DEV_RESPONSES,
 )
+@idempotent
 def create_premise_in_building(
     request,
     building_uuid: UUID,
@@ -11,6 +11,8 @@ class ReObjectsErrorCodes:
     """Коды ошибок API помещений (re_objects)."""
 
     NOT_FOUND = ErrorCode.RE_OBJECTS_NOT_FOUND
+    FORBIDDEN = ErrorCode.RE_OBJECTS_FORBIDDEN
+    UPLOAD_CONFLICT = ErrorCode.RE_OBJECTS_UPLOAD_CONFLICT
 
 
 def create_re_objects_error(
@@ -0,0 +1,62 @@
+"""
+Geohash зданий для карты без PostGIS.
+
+Building.geohash — строка geohash по координатам здания (GEOHASH_PRECISION символов, ~5 м). Общий префикс
+длины p означает общую ячейку сетки, поэтому кластеризация на карте — GROUP BY по префиксу geohash,
+а ячейка кластера однозначно задаёт область, которую фронт приближает по клику.
+"""
+
+from decimal import Decimal
+
+GEOHASH_PRECISION = 9
+GEOHASH_ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+
+def encode_geohash(latitude: float, longitude: float, precision: int = GEOHASH_PRECISION) -> str:
+    """Geohash точки (WGS-84): биты долготы и широты чередуются, по 5 бит на символ."""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bit = 0
+    value = 0
+    even = True
+    while len(chars) < precision:
+        coord, bounds = (longitude, lng_range) if even else (latitude, lat_range)
+        middle = (bounds[0] + bounds[1]) / 2
+        value <<= 1
+        if coord >= middle:
+            value |= 1
+            bounds[0] = middle
+        else:
+            bounds[1] = middle
+        even = not even
+        bit += 1
+        if bit == 5:
+            chars.append(GEOHASH_ALPHABET[value])
+            bit = 0
+            value = 0
+    return ''.join(chars)
+
+
+def building_geohash(latitude: Decimal | float | None, longitude: Decimal | float | None) -> str:
+    """Geohash для Building.geohash ('' — координаты не заданы)."""
+    if latitude is None or longitude is None:
+        return ''
+    return encode_geohash(float(latitude), float(longitude))
+
+
+def geohash_cell_width(precision: int) -> float:
+    """Ширина ячейки geohash данной длины по долготе, в градусах."""
+    return 360 / 2 ** ((5 * precision + 1) // 2)
+
+
+def cluster_precision(zoom: int) -> int:
+    """
+    Длина префикса geohash для кластеров на уровне zoom: самые мелкие ячейки, которые ещё не меньше
+    восьмой части тайла (тайл 256 px = 360 / 2**zoom градусов) — кластеры не сливаются в сплошную сетку.
+    """
+    min_width = 360 / 2**zoom / 8
+    precision = 1
+    while precision < GEOHASH_PRECISION and geohash_cell_width(precision + 1) >= min_width:
+        precision += 1
+    return precision
@@ -0,0 +1,51 @@
+"""
+Воркер очереди производных медиа (apps.re_objects.services.media_derivatives).
+
+  uv run manage.py build_media_derivatives          # один проход
+  uv run manage.py build_media_derivatives --loop   # постоянный процесс
+
+В режиме --loop раз в час отменяет брошенные загрузки по частям с истёкшим сроком.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from apps.re_objects.services.chunked_upload import purge_expired_uploads
+from apps.re_objects.services.media_derivatives import build_derivatives_batch
+
+PURGE_EVERY_SECONDS = 3600
+
+
+class Command(BaseCommand):
+    help = 'Строит производные (card/detail, превью видео) для медиа из загрузок по частям.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Работать постоянно')
+        parser.add_argument('--interval', type=float, default=2, help='Пауза, когда очередь пуста, с')
+        parser.add_argument('--batch-size', type=int, default=20, help='Задач за один проход')
+
+    def handle(self, *args, **options):
+        if not options['loop']:
+            self._run_once(options['batch_size'])
+            return
+        purged_at = 0.0
+        try:
+            while True:
+                close_old_connections()
+                if time.monotonic() - purged_at > PURGE_EVERY_SECONDS:
+                    purged = purge_expired_uploads()
+                    if purged:
+                        self.stdout.write(f'Отменено брошенных загрузок: {purged}')
+                    purged_at = time.monotonic()
+                if not self._run_once(options['batch_size']):
+                    time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write('Остановлено.')
+
+    def _run_once(self, batch_size: int) -> int:
+        done, failed = build_derivatives_batch(batch_size=batch_size)
+        if done or failed:
+            self.stdout.write(f'Готово: {done}, ошибок: {failed}')
+        return done + failed
@@ -0,0 +1,128 @@
+"""
+Перевод существующих медиа на хранение по содержимому (MediaBlob): одинаковые файлы — один раз.
+
+  uv run manage.py dedupe_media --dry-run   # только отчёт: сколько места и обработки освободится
+  uv run manage.py dedupe_media
+
+Файлы записей без blob хешируются (sha256). Первая запись с данным содержимым отдаёт свой файл blob
+на месте (без переноса в cas/), остальные переводятся на него, их копии оригиналов и card/detail удаляются.
+Счётчики ссылок blob пересчитываются по таблицам медиа.
+
+Сэкономленная обработка: каждая удалённая копия производных — одно построение, которое больше
+не понадобится (при пересборке производные строятся раз на содержимое). Время оценивается по среднему
+build_seconds blob того же вида; пока его нет — выводится только число построений.
+"""
+
+from collections import defaultdict
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db.models import Avg
+
+from apps.re_objects.models import MediaBlob
+from apps.re_objects.services.media_store import (
+    MEDIA_MODELS,
+    adopt_blob,
+    count_references,
+    hash_stored,
+    share_blob_derivatives,
+)
+
+
+def _size(name: str) -> int:
+    try:
+        return default_storage.size(name)
+    except OSError:
+        return 0
+
+
+def _mb(size: int) -> str:
+    return f'{size / 1024 / 1024:.1f} МБ'
+
+
+class Command(BaseCommand):
+    help = 'Дедуплицирует медиафайлы по содержимому и отчитывается о сэкономленном месте и обработке.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Только отчёт, без изменений')
+
+    def handle(self, *args, **options):
+        dry_run: bool = options['dry_run']
+        known = set(MediaBlob.objects.values_list('sha256', flat=True))
+        groups: dict[str, list[tuple]] = defaultdict(list)
+        errors = 0
+        for model in MEDIA_MODELS:
+            rows = model.objects.filter(blob__isnull=True).exclude(**{model.source_field: ''})
+            for media in rows.iterator():
+                name = getattr(media, model.source_field).name
+                try:
+                    hashed = hash_stored(name)
+                except OSError as exc:
+                    errors += 1
+                    self.stderr.write(self.style.ERROR(f'{model.__name__} pk={media.pk}: {exc}'))
+                    continue
+                groups[hashed[0]].append((media, hashed))
+
+        originals = originals_bytes = derivatives = derivatives_bytes = 0
+        builds_avoided: dict[str, int] = defaultdict(int)
+        for digest, members in groups.items():
+            # Первая запись без blob становится владельцем файла, остальные — дубликаты
+            duplicates = members
+            if digest not in known:
+                owner, owner_hashed = members[0]
+                duplicates = members[1:]
+                if not dry_run:
+                    adopt_blob(owner, hashed=owner_hashed)
+                    share_blob_derivatives(owner)
+            for media, (_, size) in duplicates:
+                own = [getattr(media, field).name for field in media.derivative_fields if getattr(media, field)]
+                if dry_run:
+                    originals += 1
+                    originals_bytes += size
+                    if len(own) == len(media.derivative_fields):
+                        derivatives += len(own)
+                        derivatives_bytes += sum(_size(name) for name in own)
+                        builds_avoided[media.media_kind] += 1
+                    continue
+                sizes = {name: _size(name) for name in own}
+                own_original = getattr(media, media.source_field).name
+                if adopt_blob(media, hashed=(digest, size)).original != own_original:
+                    originals += 1
+                    originals_bytes += size
+                released = share_blob_derivatives(media)
+                if released:
+                    derivatives += len(released)
+                    derivatives_bytes += sum(sizes.get(name, 0) for name in released)
+                    builds_avoided[media.media_kind] += 1
+
+        if not dry_run:
+            for blob in MediaBlob.objects.iterator():
+                refs = count_references(blob.pk)
+                if refs != blob.ref_count:
+                    MediaBlob.objects.filter(pk=blob.pk).update(ref_count=refs)
+
+        prefix = 'Сухой прогон: будет удалено' if dry_run else 'Удалено'
+        self.stdout.write(
+            f'{prefix} копий оригиналов: {originals} ({_mb(originals_bytes)}), '
+            f'копий производных: {derivatives} ({_mb(derivatives_bytes)}); '
+            f'всего {_mb(originals_bytes + derivatives_bytes)}.'
+        )
+        for kind, count in sorted(builds_avoided.items()):
+            self.stdout.write(self._builds_line(kind, count))
+        if errors:
+            self.stderr.write(self.style.WARNING(f'Не прочитано файлов: {errors}.'))
+        self.stdout.write(self.style.SUCCESS('Готово.'))
+
+    def _builds_line(self, kind: str, count: int) -> str:
+        label = 'фото' if kind == 'image' else 'видео'
+        line = f'Построений производных не понадобится ({label}): {count}'
+        blob_ids = set()
+        for model in MEDIA_MODELS:
+            if model.media_kind == kind:
+                blob_ids.update(model.objects.filter(blob__isnull=False).values_list('blob_id', flat=True))
+        avg = MediaBlob.objects.filter(pk__in=blob_ids, build_seconds__isnull=False).aggregate(
+            avg=Avg('build_seconds')
+        )['avg']
+        if avg is not None:
+            line += f', ≈ {count * avg:.1f} с CPU (среднее {avg:.2f} с на построение)'
+        return line
@@ -0,0 +1,71 @@
+import sys
+import time
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.re_objects.services.catalog_export import (
+    DEFAULT_CHUNK_SIZE,
+    EXPORT_FORMATS,
+    FORMAT_CSV,
+    ExportStats,
+    iter_catalog_export,
+    parse_export_columns,
+)
+from apps.re_objects.services.premise_service import parse_building_uuids
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает каталог помещений в CSV или NDJSON потоком (серверный курсор на PostgreSQL, '
+        'память не растёт с размером каталога); те же колонки, что у GET /premises/export.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл выгрузки; "-" — stdout')
+        parser.add_argument('--format', dest='fmt', choices=EXPORT_FORMATS, default=FORMAT_CSV)
+        parser.add_argument('--columns', default=None, help='Колонки через запятую (по умолчанию все)')
+        parser.add_argument('--gzip', action='store_true', help='Сжать выгрузку gzip')
+        parser.add_argument(
+            '--sale-type',
+            choices=(settings.RE_OBJECTS_SALE_TYPE_RENT, settings.RE_OBJECTS_SALE_TYPE_SALE),
+            default=None,
+            help='Только помещения с флагом аренды или продажи',
+        )
+        parser.add_argument('--building-uuids', default=None, help='Только эти здания (UUID через запятую)')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='Строк в чанке курсора')
+
+    def handle(self, *args: Any, **options):
+        try:
+            columns = parse_export_columns(options['columns'])
+        except ValueError as exc:
+            raise CommandError(str(exc)) from exc
+
+        stats = ExportStats()
+        chunks = iter_catalog_export(
+            fmt=options['fmt'],
+            columns=columns,
+            gzip=options['gzip'],
+            sale_type=options['sale_type'],
+            building_uuids=parse_building_uuids(options['building_uuids']),
+            chunk_size=options['chunk_size'],
+            stats=stats,
+        )
+        started = time.monotonic()
+        if options['path'] == '-':
+            for data in chunks:
+                sys.stdout.buffer.write(data)
+            sys.stdout.buffer.flush()
+        else:
+            with open(options['path'], 'wb') as fileobj:
+                for data in chunks:
+                    fileobj.write(data)
+        elapsed = max(time.monotonic() - started, 1e-6)
+
+        self.stderr.write(
+            self.style.SUCCESS(
+                f'Выгружено строк: {stats.rows} за {elapsed:.1f} с ({stats.rows / elapsed:.0f} строк/с), '
+                f'{stats.bytes / 1024 / 1024:.1f} МБ.'
+            )
+        )
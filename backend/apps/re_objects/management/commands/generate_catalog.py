@@ -0,0 +1,437 @@
+"""
+Синтетический каталог для нагрузочных прогонов и профилирования запросов.
+
+В отличие от scripts/seed_*.py (по одному объекту через dev API) пишет напрямую в БД пачками
+bulk_create: регионы, города, здания с этажами, помещения, пользователи, брони (активные и истёкшие),
+платежи во всех статусах, сделки, реферальные ссылки и, опционально, записи медиа-заглушек.
+
+Один и тот же --seed даёт один и тот же набор данных (включая UUID), поэтому прогоны можно
+сравнивать между собой:
+
+  uv run manage.py generate_catalog --premises 100000 --bookings 1000000 --seed 42
+  uv run manage.py generate_catalog --clear --premises 1000 --bookings 10000
+
+Сгенерированные данные помечены: код региона начинается с «gen-», email пользователей —
+@generated.invalid. --clear удаляет их перед генерацией (остальные данные не трогает).
+"""
+
+import math
+import random
+import time
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+from typing import Any
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from apps.bookings.models import Booking
+from apps.deals.models import Deal
+from apps.payments.models import Payment
+from apps.re_objects.geo import building_geohash
+from apps.re_objects.models import Building, BuildingImage, City, Floor, Premise, PremiseImage, Region
+from apps.referrals.models import ReferralLink
+
+REGION_CODE_PREFIX = 'gen-'
+USER_EMAIL_DOMAIN = 'generated.invalid'
+GENERATED_PASSWORD = 'generated-password'
+PLACEHOLDER_IMAGE = 'placeholders/generated.webp'
+
+# Доли статусов платежей (pending / waiting_for_capture блокируют помещение в каталоге — их немного)
+PAYMENT_STATUS_WEIGHTS = (
+    (Payment.Status.SUCCEEDED, 60),
+    (Payment.Status.CANCELED, 25),
+    (Payment.Status.PENDING, 10),
+    (Payment.Status.WAITING_FOR_CAPTURE, 5),
+)
+
+
+def _uuid(rng: random.Random) -> uuid.UUID:
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+def _chunks(total: int, size: int):
+    for start in range(0, total, size):
+        yield start, min(start + size, total)
+
+
+def _size(result) -> int:
+    """Число созданных записей по результату стадии (для вывода прогресса)."""
+    if isinstance(result, dict):
+        return sum(len(v) for v in result.values())
+    if isinstance(result, tuple):
+        return len(result[0])
+    return len(result)
+
+
+class Command(BaseCommand):
+    help = 'Генерирует синтетический каталог (bulk_create) с бронями, платежами, сделками и реферальными ссылками.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=42, help='Seed генератора (детерминированный набор данных)')
+        parser.add_argument('--regions', type=int, default=3)
+        parser.add_argument('--cities-per-region', type=int, default=3)
+        parser.add_argument('--premises', type=int, default=1000, help='Всего помещений')
+        parser.add_argument(
+            '--premises-per-building',
+            type=int,
+            default=100,
+            help='Среднее число помещений в здании (задаёт число зданий)',
+        )
+        parser.add_argument('--max-floors', type=int, default=25, help='Максимум этажей в здании')
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--agent-share', type=float, default=0.1, help='Доля агентов среди пользователей')
+        parser.add_argument('--bookings', type=int, default=10000)
+        parser.add_argument(
+            '--active-booking-share',
+            type=float,
+            default=0.05,
+            help='Доля помещений с активной бронью (не более одной активной брони на помещение)',
+        )
+        parser.add_argument('--payments', type=int, default=2000)
+        parser.add_argument('--deals', type=int, default=500)
+        parser.add_argument('--referral-links', type=int, default=500)
+        parser.add_argument(
+            '--media',
+            type=int,
+            default=0,
+            help='Записей-заглушек изображений на здание и на помещение (файлы не создаются)',
+        )
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--clear', action='store_true', help='Удалить ранее сгенерированные данные')
+
+    def handle(self, *args: Any, **options):
+        if options['premises'] < 1 or options['regions'] < 1 or options['cities_per_region'] < 1:
+            raise CommandError('--premises, --regions и --cities-per-region должны быть больше 0')
+        if options['users'] < 1 and (options['bookings'] or options['payments'] or options['deals']):
+            raise CommandError('Для броней, платежей и сделок нужен хотя бы один пользователь (--users)')
+
+        if options['clear']:
+            self._clear()
+        elif Region.objects.filter(code__startswith=REGION_CODE_PREFIX).exists():
+            raise CommandError('Сгенерированные данные уже есть в БД; запустите с --clear')
+
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.now = timezone.now()
+        started = time.monotonic()
+
+        cities = self._stage('Регионы и города', self._create_regions_and_cities, options)
+        buildings = self._stage('Здания', self._create_buildings, cities, options)
+        floors = self._stage('Этажи', self._create_floors, buildings, options)
+        premises = self._stage('Помещения', self._create_premises, buildings, floors, options)
+        user_ids, agent_ids = self._stage('Пользователи', self._create_users, options)
+        links = self._stage('Реферальные ссылки', self._create_referral_links, premises, agent_ids, options)
+        self._stage('Платежи', self._create_payments, premises, user_ids, links, options)
+        self._stage('Брони', self._create_bookings, premises, user_ids, agent_ids, options)
+        self._stage('Сделки', self._create_deals, premises, user_ids, options)
+        if options['media']:
+            self._stage('Медиа-заглушки', self._create_media, buildings, premises, options)
+
+        self.stdout.write(self.style.SUCCESS(f'Готово за {time.monotonic() - started:.1f} с.'))
+
+    def _stage(self, title: str, func, *args):
+        started = time.monotonic()
+        with transaction.atomic():
+            result = func(*args)
+        self.stdout.write(f'{title}: {_size(result)} ({time.monotonic() - started:.1f} с)')
+        return result
+
+    def _bulk(self, model, objs) -> list:
+        return model.objects.bulk_create(objs, batch_size=self.batch_size)
+
+    def _clear(self) -> None:
+        premises = Premise.objects.filter(building__city__region__code__startswith=REGION_CODE_PREFIX)
+        users = get_user_model().objects.filter(email__endswith=f'@{USER_EMAIL_DOMAIN}')
+        # Порядок важен: брони/сделки/платежи удаляются быстрыми DELETE без обхода каскадов по объектам
+        for qs in (
+            Booking.objects.filter(premise__in=premises),
+            Deal.objects.filter(premise__in=premises),
+            Payment.objects.filter(premise__in=premises),
+            ReferralLink.objects.filter(premise__in=premises),
+            PremiseImage.objects.filter(premise__in=premises),
+            BuildingImage.objects.filter(building__city__region__code__startswith=REGION_CODE_PREFIX),
+            premises,
+            Region.objects.filter(code__startswith=REGION_CODE_PREFIX),
+            users,
+        ):
+            deleted, _ = qs.delete()
+            if deleted:
+                self.stdout.write(f'Удалено {qs.model.__name__}: {deleted}')
+
+    def _create_regions_and_cities(self, options) -> list[City]:
+        rng = self.rng
+        regions = self._bulk(
+            Region,
+            [
+                Region(name=f'Синтетический регион {i}', code=f'{REGION_CODE_PREFIX}{i}')
+                for i in range(1, options['regions'] + 1)
+            ],
+        )
+        cities = []
+        for region_no, region in enumerate(regions, start=1):
+            for city_no in range(1, options['cities_per_region'] + 1):
+                city = City(name=f'Город {region_no}-{city_no}', region=region)
+                # Центр города — для координат зданий; в модели не хранится
+                city.center = (rng.uniform(44.0, 60.0), rng.uniform(30.0, 60.0))
+                cities.append(city)
+        centers = [c.center for c in cities]
+        cities = self._bulk(City, cities)
+        for city, center in zip(cities, centers, strict=True):
+            city.center = center
+        return cities
+
+    def _create_buildings(self, cities: list[City], options) -> list[Building]:
+        rng = self.rng
+        count = max(1, math.ceil(options['premises'] / max(1, options['premises_per_building'])))
+        # Крупные города получают больше зданий (распределение Ципфа по порядку города)
+        city_weights = [1 / (i + 1) for i in range(len(cities))]
+        buildings = []
+        for i in range(1, count + 1):
+            city = rng.choices(cities, weights=city_weights)[0]
+            lat, lon = city.center
+            building = Building(
+                uuid=_uuid(rng),
+                name=f'БЦ Синтетический {i}',
+                address=f'ул. Генерируемая, {i}',
+                city=city,
+                description='Сгенерировано generate_catalog',
+                total_floors=rng.randint(3, max(3, options['max_floors'])),
+                year_built=rng.randint(1960, 2025),
+                latitude=Decimal(f'{lat + rng.gauss(0, 0.05):.6f}'),
+                longitude=Decimal(f'{lon + rng.gauss(0, 0.08):.6f}'),
+            )
+            # bulk_create не вызывает save() — geohash для карты заполняем сами
+            building.geohash = building_geohash(building.latitude, building.longitude)
+            # Ценовой уровень здания: множитель к базовым ставкам аренды и продажи
+            building.price_level = rng.lognormvariate(0, 0.25)
+            buildings.append(building)
+        levels = [b.price_level for b in buildings]
+        buildings = self._bulk(Building, buildings)
+        for building, level in zip(buildings, levels, strict=True):
+            building.price_level = level
+        return buildings
+
+    def _create_floors(self, buildings: list[Building], options) -> dict[int, list[int]]:
+        floors = [
+            Floor(building_id=b.pk, number=number, title=f'Этаж {number}')
+            for b in buildings
+            for number in range(1, b.total_floors + 1)
+        ]
+        floor_ids: dict[int, list[int]] = {}
+        for floor in self._bulk(Floor, floors):
+            floor_ids.setdefault(floor.building_id, []).append(floor.pk)
+        return floor_ids
+
+    def _create_premises(self, buildings: list[Building], floors: dict[int, list[int]], options) -> list[tuple]:
+        """Возвращает (pk, available_for_rent, available_for_sale) для последующих стадий."""
+        rng = self.rng
+        total = options['premises']
+        result: list[tuple] = []
+        for start, end in _chunks(total, self.batch_size):
+            batch = []
+            for i in range(start, end):
+                building = buildings[i % len(buildings)]
+                # Площадь — логнормальное распределение: много небольших офисов, редкие крупные
+                area = Decimal(f'{min(3000.0, max(8.0, rng.lognormvariate(math.log(60), 0.7))):.2f}')
+                kind = rng.random()
+                for_rent = kind < 0.8
+                for_sale = kind >= 0.7
+                premise = Premise(
+                    uuid=_uuid(rng),
+                    building_id=building.pk,
+                    city_id=building.city_id,
+                    floor_id=rng.choice(floors[building.pk]),
+                    area=area,
+                    price_per_month=(
+                        int(float(area) * rng.gauss(1500, 300) * building.price_level) // 100 * 100 or 100
+                        if for_rent
+                        else None
+                    ),
+                    price_per_sqm=(
+                        int(rng.gauss(160_000, 35_000) * building.price_level) // 1000 * 1000 or 1000
+                        if for_sale
+                        else None
+                    ),
+                    premise_type=Premise.PremiseType.OFFICE if rng.random() < 0.85 else Premise.PremiseType.OTHER,
+                    available_for_rent=for_rent,
+                    available_for_sale=for_sale,
+                    show_rented_button=for_sale and rng.random() < 0.1,
+                    room_number=str(100 + i % 900),
+                    title=f'Помещение {i + 1}',
+                    ceiling_height=Decimal(f'{rng.uniform(2.6, 4.5):.2f}'),
+                    has_windows=rng.random() < 0.9,
+                    has_parking=rng.random() < 0.4,
+                    is_furnished=rng.random() < 0.3,
+                )
+                premise.full_sell_price = premise._compute_full_sell_price()
+                batch.append(premise)
+            result.extend((p.pk, p.available_for_rent, p.available_for_sale) for p in self._bulk(Premise, batch))
+        return result
+
+    def _create_users(self, options) -> tuple[list[int], list[int]]:
+        rng = self.rng
+        user_model = get_user_model()
+        # Один хеш на всех: хешировать пароль на каждого пользователя — минуты впустую
+        password = make_password(GENERATED_PASSWORD)
+        user_ids: list[int] = []
+        agent_ids: list[int] = []
+        for start, end in _chunks(options['users'], self.batch_size):
+            batch = []
+            for i in range(start, end):
+                is_agent = rng.random() < options['agent_share']
+                batch.append(
+                    user_model(
+                        username=f'generated-{i}',
+                        email=f'user{i}@{USER_EMAIL_DOMAIN}',
+                        password=password,
+                        full_name=f'Пользователь {i}',
+                        phone=f'+7000{i:07d}',
+                        user_type='agent' if is_agent else 'individual',
+                        organization_name=f'Агентство {i}' if is_agent else '',
+                    )
+                )
+            # SQLite и PostgreSQL возвращают pk из bulk_create
+            for user in self._bulk(user_model, batch):
+                user_ids.append(user.pk)
+                if user.user_type == 'agent':
+                    agent_ids.append(user.pk)
+        return user_ids, agent_ids
+
+    def _create_referral_links(self, premises: list[tuple], agent_ids: list[int], options) -> list[tuple]:
+        """Возвращает (pk, premise_id)."""
+        rng = self.rng
+        if not agent_ids:
+            return []
+        links = [
+            ReferralLink(
+                code=_uuid(rng),
+                referrer_id=rng.choice(agent_ids),
+                premise_id=rng.choice(premises)[0],
+                contact_phone=f'+7900{rng.randint(0, 9_999_999):07d}',
+                is_active=rng.random() < 0.9,
+            )
+            for _ in range(options['referral_links'])
+        ]
+        return [(link.pk, link.premise_id) for link in self._bulk(ReferralLink, links)]
+
+    def _create_payments(self, premises: list[tuple], user_ids: list[int], links: list[tuple], options) -> list:
+        rng = self.rng
+        sale_premises = [p for p in premises if p[2]] or premises
+        statuses = [s for s, _ in PAYMENT_STATUS_WEIGHTS]
+        weights = [w for _, w in PAYMENT_STATUS_WEIGHTS]
+        amount = Decimal(settings.PAYMENTS_BOOKING_AMOUNT).quantize(Decimal('0.01'))
+        created: list = []
+        for start, end in _chunks(options['payments'], self.batch_size):
+            batch = []
+            for _ in range(start, end):
+                link_pk = None
+                if links and rng.random() < 0.2:
+                    link_pk, premise_id = rng.choice(links)
+                else:
+                    premise_id = rng.choice(sale_premises)[0]
+                status = rng.choices(statuses, weights=weights)[0]
+                key = _uuid(rng)
+                metadata = {
+                    'payment_token': str(key),
+                    'user_id': str(rng.choice(user_ids)),
+                    'premise_id': str(premise_id),
+                }
+                if link_pk is not None:
+                    metadata['referral_link_id'] = str(link_pk)
+                batch.append(
+                    Payment(
+                        premise_id=premise_id,
+                        referral_link_id=link_pk,
+                        provider_payment_id=f'generated-{_uuid(rng)}',
+                        idempotence_key=key,
+                        status=status,
+                        paid=status in (Payment.Status.SUCCEEDED, Payment.Status.WAITING_FOR_CAPTURE),
+                        amount_value=amount,
+                        amount_currency='RUB',
+                        description=f'Бронирование помещения {premise_id}',
+                        metadata=metadata,
+                    )
+                )
+            created.extend(self._bulk(Payment, batch))
+        return created
+
+    def _create_bookings(self, premises: list[tuple], user_ids: list[int], agent_ids: list[int], options) -> range:
+        """
+        Брони: не более одной активной на помещение (expires_at в будущем), остальные — истёкшие
+        за последний год.
+        """
+        rng = self.rng
+        total = options['bookings']
+        active_count = min(total, int(len(premises) * options['active_booking_share']))
+        active_premises = rng.sample(premises, k=active_count)
+        for start, end in _chunks(total, self.batch_size):
+            batch = []
+            for i in range(start, end):
+                if i < active_count:
+                    premise = active_premises[i]
+                    expires_at = self.now + timedelta(minutes=rng.randint(10, 3 * 24 * 60))
+                else:
+                    premise = rng.choice(premises)
+                    expires_at = self.now - timedelta(minutes=rng.randint(1, 365 * 24 * 60))
+                pk, for_rent, _for_sale = premise
+                batch.append(
+                    Booking(
+                        user_id=rng.choice(user_ids),
+                        premise_id=pk,
+                        deal_type=Booking.DealType.RENT if for_rent else Booking.DealType.SALE,
+                        expires_at=expires_at,
+                        is_active=i < active_count,
+                        referrer_id=rng.choice(agent_ids) if agent_ids and rng.random() < 0.1 else None,
+                    )
+                )
+            self._bulk(Booking, batch)
+        return range(total)
+
+    def _create_deals(self, premises: list[tuple], user_ids: list[int], options) -> range:
+        rng = self.rng
+        today = self.now.date()
+        deals = []
+        for _ in range(options['deals']):
+            pk, for_rent, for_sale = rng.choice(premises)
+            rent = for_rent and not (for_sale and rng.random() < 0.5)
+            deals.append(
+                Deal(
+                    user_id=rng.choice(user_ids),
+                    premise_id=pk,
+                    deal_type=Deal.DealType.RENT if rent else Deal.DealType.SALE,
+                    rent_expires_at=today + timedelta(days=rng.randint(30, 3 * 365)) if rent else None,
+                    contract_type=None if rent else rng.choice(Deal.ContractType.values),
+                    contract_signed_on=None if rent else today - timedelta(days=rng.randint(0, 365)),
+                    commission_amount=rng.randint(10, 500) * 1000,
+                )
+            )
+        self._bulk(Deal, deals)
+        return range(len(deals))
+
+    def _create_media(self, buildings: list[Building], premises: list[tuple], options) -> range:
+        per_object = options['media']
+        placeholder = {'original': PLACEHOLDER_IMAGE, 'card': PLACEHOLDER_IMAGE, 'detail': PLACEHOLDER_IMAGE}
+        self._bulk(
+            BuildingImage,
+            [
+                BuildingImage(building_id=b.pk, order=order, is_primary=order == 1, **placeholder)
+                for b in buildings
+                for order in range(1, per_object + 1)
+            ],
+        )
+        for start, end in _chunks(len(premises), max(1, self.batch_size // per_object)):
+            self._bulk(
+                PremiseImage,
+                [
+                    PremiseImage(premise_id=p[0], order=order, is_primary=order == 1, **placeholder)
+                    for p in premises[start:end]
+                    for order in range(1, per_object + 1)
+                ],
+            )
+        return range((len(buildings) + len(premises)) * per_object)
@@ -0,0 +1,62 @@
+import time
+from pathlib import Path
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.re_objects.services.catalog_import import DEFAULT_BATCH_SIZE, CatalogImportError, import_catalog
+
+ERRORS_SHOWN = 20
+
+
+class Command(BaseCommand):
+    help = (
+        'Импортирует помещения из CSV/XLSX пачками: bulk-поиск зданий и этажей, upsert по uuid '
+        '(или зданию и номеру помещения), отчёт об ошибках по строкам.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл .csv или .xlsx (первая строка — заголовок)')
+        parser.add_argument('--dry-run', action='store_true', help='Только проверить файл, ничего не записывать')
+        parser.add_argument(
+            '--create-floors',
+            action='store_true',
+            help='Создавать этажи, которых нет в здании (иначе такие строки — ошибки)',
+        )
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Строк в пачке')
+        parser.add_argument('--report', default=None, help='Записать все ошибки строк в CSV-файл')
+
+    def handle(self, *args: Any, **options):
+        path = Path(options['path'])
+        if not path.is_file():
+            raise CommandError(f'Файл не найден: {path}')
+
+        started = time.monotonic()
+        try:
+            report = import_catalog(
+                path.read_bytes(),
+                path.name,
+                batch_size=options['batch_size'],
+                create_floors=options['create_floors'],
+                dry_run=options['dry_run'],
+            )
+        except CatalogImportError as exc:
+            raise CommandError(str(exc)) from exc
+
+        if report.ignored_columns:
+            self.stderr.write(self.style.WARNING(f'Колонки пропущены: {", ".join(report.ignored_columns)}'))
+        for error in report.errors[:ERRORS_SHOWN]:
+            self.stderr.write(self.style.ERROR(f'строка {error.row}, {error.column}: {error.message}'))
+        if len(report.errors) > ERRORS_SHOWN:
+            self.stderr.write(self.style.ERROR(f'... и ещё ошибок: {len(report.errors) - ERRORS_SHOWN}'))
+        if options['report']:
+            with open(options['report'], 'w', newline='', encoding='utf-8') as fileobj:
+                report.write_errors_csv(fileobj)
+
+        prefix = 'Проверка (без записи)' if report.dry_run else 'Готово'
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'{prefix} за {time.monotonic() - started:.1f} с. Строк: {report.rows}, создано: {report.created}, '
+                f'обновлено: {report.updated}, с ошибками: {report.failed}, этажей создано: {report.floors_created}.'
+            )
+        )
@@ -5,10 +5,12 @@
   uv run manage.py rebuild_media_derivatives --dry-run
 
 Для видео нужен ffmpeg в PATH (как при загрузке).
+Общие производные (MediaBlob) пересобираются один раз на содержимое; старые файлы удаляются после замены.
 """
 from django.core.management.base import BaseCommand
 
 from apps.re_objects.models import BuildingImage, BuildingVideo, PremiseImage, PremiseVideo
+from apps.re_objects.services.media_store import invalidate_blob_derivatives
 
 
 class Command(BaseCommand):
@@ -26,6 +28,8 @@ class Command(BaseCommand):
         n_img_ok = 0
         n_vid_ok = 0
         errors: list[str] = []
+        # Blob, производные которых уже пересобраны в этом прогоне (остальные записи получили их сразу)
+        rebuilt_blobs: set[int] = set()
 
         for model in (PremiseImage, BuildingImage):
             label = model.__name__
@@ -36,12 +40,19 @@ class Command(BaseCommand):
                     self.stdout.write(f'{label} pk={obj.pk} (dry-run)')
                     n_img_ok += 1
                     continue
+                if obj.blob_id in rebuilt_blobs:
+                    n_img_ok += 1
+                    continue
                 try:
-                    if obj.card:
-                        obj.card.delete(save=False)
+                    if obj.blob_id:
+                        invalidate_blob_derivatives(obj.blob_id)
+                        rebuilt_blobs.add(obj.blob_id)
+                    else:
+                        if obj.card:
+                            obj.card.delete(save=False)
+                        if obj.detail:
+                            obj.detail.delete(save=False)
                     obj.card = None
-                    if obj.detail:
-                        obj.detail.delete(save=False)
                     obj.detail = None
                     obj.save()
                     n_img_ok += 1
@@ -59,8 +70,14 @@ class Command(BaseCommand):
                     self.stdout.write(f'{label} pk={vid.pk} (dry-run)')
                     n_vid_ok += 1
                     continue
+                if vid.blob_id in rebuilt_blobs:
+                    n_vid_ok += 1
+                    continue
                 try:
-                    if vid.card:
+                    if vid.blob_id:
+                        invalidate_blob_derivatives(vid.blob_id)
+                        rebuilt_blobs.add(vid.blob_id)
+                    elif vid.card:
                         vid.card.delete(save=False)
                     vid.card = None
                     vid.save()
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.1 on 2026-10-19 12:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('re_objects', '0033_merge_20260624_2204'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GeocodeCacheEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                (
+                    'query_key',
+                    models.CharField(
+                        help_text='Нормализованная строка «город, адрес» (регистр и пробелы не важны)',
+                        max_length=900,
+                        unique=True,
+                        verbose_name='Ключ запроса',
+                    ),
+                ),
+                (
+                    'query',
+                    models.CharField(help_text='Строка, отправленная геокодеру', max_length=900, verbose_name='Запрос'),
+                ),
+                (
+                    'latitude',
+                    models.DecimalField(blank=True, decimal_places=6, max_digits=9, null=True, verbose_name='Широта'),
+                ),
+                (
+                    'longitude',
+                    models.DecimalField(blank=True, decimal_places=6, max_digits=10, null=True, verbose_name='Долгота'),
+                ),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Результат геокодирования',
+                'verbose_name_plural': 'Кэш геокодера',
+                'db_table': 're_geocode_cache',
+            },
+        ),
+    ]
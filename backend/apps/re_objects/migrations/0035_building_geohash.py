@@ -0,0 +1,42 @@
+# Generated by Django 5.2.1 on 2026-10-19 12:41
+
+from django.db import migrations, models
+
+from apps.re_objects.geo import building_geohash
+
+
+def fill_geohash(apps, schema_editor):
+    Building = apps.get_model('re_objects', 'Building')
+    buildings = list(
+        Building.objects.filter(latitude__isnull=False, longitude__isnull=False).only('latitude', 'longitude')
+    )
+    for building in buildings:
+        building.geohash = building_geohash(building.latitude, building.longitude)
+    Building.objects.bulk_update(buildings, ['geohash'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('re_objects', '0034_geocode_cache'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='building',
+            name='geohash',
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                default='',
+                editable=False,
+                help_text='Ячейка сетки по координатам (заполняется при сохранении); для кластеров на карте',
+                max_length=9,
+                verbose_name='Geohash',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='building',
+            index=models.Index(fields=['latitude', 'longitude'], name='re_buildings_lat_lng_idx'),
+        ),
+        migrations.RunPython(fill_geohash, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.1 on 2026-10-19 13:02
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('re_objects', '0035_building_geohash'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='premise',
+            options={'ordering': ['city', 'building', 'floor', 'room_number', 'title'], 'permissions': [('export_catalog', 'Может выгружать каталог помещений (/premises/export)')], 'verbose_name': 'Помещение', 'verbose_name_plural': 'Помещения'},
+        ),
+    ]
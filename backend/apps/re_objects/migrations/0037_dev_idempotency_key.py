@@ -0,0 +1,28 @@
+# Generated by Django 5.2.1 on 2026-10-19 13:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('re_objects', '0036_premise_export_permission'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DevIdempotencyKey',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=200, unique=True, verbose_name='Ключ')),
+                ('status_code', models.PositiveSmallIntegerField(verbose_name='HTTP-статус')),
+                ('response', models.JSONField(verbose_name='Ответ')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Ключ идемпотентности dev API',
+                'verbose_name_plural': 'Ключи идемпотентности dev API',
+                'db_table': 're_dev_idempotency_keys',
+            },
+        ),
+    ]
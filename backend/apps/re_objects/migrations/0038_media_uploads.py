@@ -0,0 +1,161 @@
+# Generated by Django 5.2.1 on 2026-10-19 13:28
+
+import uuid
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('re_objects', '0037_dev_idempotency_key'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaDerivativeJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                (
+                    'target',
+                    models.CharField(
+                        choices=[
+                            ('premise_image', 'Фото помещения'),
+                            ('premise_video', 'Видео помещения'),
+                            ('building_image', 'Фото здания'),
+                            ('building_video', 'Видео здания'),
+                        ],
+                        max_length=32,
+                        verbose_name='Тип медиа',
+                    ),
+                ),
+                ('media_id', models.PositiveBigIntegerField(verbose_name='ID записи медиа')),
+                (
+                    'status',
+                    models.CharField(
+                        choices=[('pending', 'Ожидает'), ('done', 'Готово'), ('failed', 'Ошибка (попытки исчерпаны)')],
+                        default='pending',
+                        max_length=16,
+                        verbose_name='Статус',
+                    ),
+                ),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Попыток')),
+                ('last_error', models.TextField(blank=True, verbose_name='Последняя ошибка')),
+                (
+                    'next_attempt_at',
+                    models.DateTimeField(default=django.utils.timezone.now, verbose_name='Следующая попытка'),
+                ),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True, verbose_name='Обработано')),
+            ],
+            options={
+                'verbose_name': 'Задача производных медиа',
+                'verbose_name_plural': 'Очередь производных медиа',
+                'db_table': 're_media_derivative_jobs',
+                'ordering': ['-id'],
+                'indexes': [
+                    models.Index(
+                        condition=models.Q(('status', 'pending')),
+                        fields=['next_attempt_at', 'id'],
+                        name='re_media_derivative_queue',
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name='MediaUpload',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('uuid', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                (
+                    'target',
+                    models.CharField(
+                        choices=[
+                            ('premise_image', 'Фото помещения'),
+                            ('premise_video', 'Видео помещения'),
+                            ('building_image', 'Фото здания'),
+                            ('building_video', 'Видео здания'),
+                        ],
+                        max_length=32,
+                        verbose_name='Назначение',
+                    ),
+                ),
+                ('object_id', models.PositiveBigIntegerField(verbose_name='ID помещения / здания')),
+                ('filename', models.CharField(max_length=255, verbose_name='Имя файла')),
+                ('storage_name', models.CharField(max_length=500, verbose_name='Путь в хранилище')),
+                ('size', models.PositiveBigIntegerField(verbose_name='Размер, байт')),
+                ('chunk_size', models.PositiveIntegerField(verbose_name='Размер части, байт')),
+                (
+                    's3_upload_id',
+                    models.CharField(blank=True, max_length=1024, verbose_name='ID multipart upload (S3)'),
+                ),
+                ('fields', models.JSONField(blank=True, default=dict, verbose_name='Поля записи медиа')),
+                (
+                    'status',
+                    models.CharField(
+                        choices=[('uploading', 'Загружается'), ('completed', 'Завершена'), ('aborted', 'Отменена')],
+                        default='uploading',
+                        max_length=16,
+                        verbose_name='Статус',
+                    ),
+                ),
+                (
+                    'media_id',
+                    models.PositiveBigIntegerField(blank=True, null=True, verbose_name='ID созданной записи медиа'),
+                ),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('expires_at', models.DateTimeField(verbose_name='Истекает')),
+                (
+                    'created_by',
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name='+',
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name='Кто загружает',
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name': 'Загрузка по частям',
+                'verbose_name_plural': 'Загрузки по частям',
+                'db_table': 're_media_uploads',
+            },
+        ),
+        migrations.CreateModel(
+            name='MediaUploadChunk',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('index', models.PositiveIntegerField(verbose_name='Номер части (с 0)')),
+                ('size', models.PositiveIntegerField(verbose_name='Размер, байт')),
+                ('etag', models.CharField(blank=True, max_length=255)),
+                ('created_at', models.DateTimeField(auto_now=True)),
+                (
+                    'upload',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, related_name='chunks', to='re_objects.mediaupload'
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name': 'Часть загрузки',
+                'verbose_name_plural': 'Части загрузок',
+                'db_table': 're_media_upload_chunks',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='mediaupload',
+            index=models.Index(
+                condition=models.Q(('status', 'uploading')), fields=['expires_at'], name='re_media_upload_expiry'
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name='mediauploadchunk',
+            constraint=models.UniqueConstraint(fields=('upload', 'index'), name='re_media_upload_chunk_unique'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.1 on 2026-10-19 13:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('re_objects', '0038_media_uploads'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mediaderivativejob',
+            name='peak_memory',
+            field=models.PositiveBigIntegerField(
+                blank=True,
+                help_text='Оценка пика памяти под пиксельные буферы Pillow при построении производных',
+                null=True,
+                verbose_name='Пик памяти, байт',
+            ),
+        ),
+    ]
@@ -0,0 +1,96 @@
+# Generated by Django 5.2.1 on 2026-10-19 13:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('re_objects', '0039_media_derivative_job_peak_memory'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True, verbose_name='SHA-256')),
+                ('size', models.PositiveBigIntegerField(verbose_name='Размер, байт')),
+                ('original', models.CharField(max_length=100, verbose_name='Оригинал')),
+                ('card', models.CharField(blank=True, max_length=100, verbose_name='Превью карточки')),
+                ('detail', models.CharField(blank=True, max_length=100, verbose_name='Детальное изображение')),
+                (
+                    'derivatives_key',
+                    models.CharField(
+                        blank=True,
+                        help_text='Ключ параметров обработки, с которыми построены card/detail; пусто — производных нет',
+                        max_length=16,
+                        verbose_name='Параметры производных',
+                    ),
+                ),
+                (
+                    'build_seconds',
+                    models.FloatField(blank=True, null=True, verbose_name='Время построения производных, с'),
+                ),
+                ('ref_count', models.PositiveIntegerField(default=0, verbose_name='Ссылок')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Файл медиа (по содержимому)',
+                'verbose_name_plural': 'Файлы медиа (по содержимому)',
+                'db_table': 're_media_blobs',
+            },
+        ),
+        migrations.AddField(
+            model_name='buildingimage',
+            name='blob',
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name='+',
+                to='re_objects.mediablob',
+                verbose_name='Файл по содержимому',
+            ),
+        ),
+        migrations.AddField(
+            model_name='buildingvideo',
+            name='blob',
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name='+',
+                to='re_objects.mediablob',
+                verbose_name='Файл по содержимому',
+            ),
+        ),
+        migrations.AddField(
+            model_name='premiseimage',
+            name='blob',
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name='+',
+                to='re_objects.mediablob',
+                verbose_name='Файл по содержимому',
+            ),
+        ),
+        migrations.AddField(
+            model_name='premisevideo',
+            name='blob',
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name='+',
+                to='re_objects.mediablob',
+                verbose_name='Файл по содержимому',
+            ),
+        ),
+    ]
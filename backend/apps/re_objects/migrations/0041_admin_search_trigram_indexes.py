@@ -0,0 +1,45 @@
+"""
+Триграммные GIN-индексы под поиск админки и автодополнение (autocomplete_fields).
+
+Поиск админки — icontains, в PostgreSQL это UPPER("col"::text) LIKE UPPER('%...%'): B-tree такое не
+ускоряет, на сотнях тысяч помещений каждый запрос автодополнения — полный проход таблицы. Индекс по тому же
+выражению с gin_trgm_ops подхватывается планировщиком без изменений в коде поиска. На других БД — no-op.
+"""
+
+from django.db import migrations
+
+INDEXES = (
+    ('re_premises_room_number_trgm', 're_premises', 'room_number'),
+    ('re_premises_title_trgm', 're_premises', 'title'),
+    ('re_buildings_name_trgm', 're_buildings', 'name'),
+    ('re_buildings_address_trgm', 're_buildings', 'address'),
+    ('re_cities_name_trgm', 're_cities', 'name'),
+    ('re_floors_title_trgm', 're_floors', 'title'),
+)
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, table, column in INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS "{name}" ON "{table}" USING gin (UPPER("{column}"::text) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _, _ in INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS "{name}"')
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('re_objects', '0040_media_blobs'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
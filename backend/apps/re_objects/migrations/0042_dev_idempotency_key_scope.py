@@ -0,0 +1,46 @@
+# Generated by Django 5.2.1 on 2026-10-19 16:05
+
+from django.db import migrations, models
+
+
+def drop_unscoped_keys(apps, schema_editor):
+    """Старые ключи не знают метода и пути — это лишь кэш повторов, их можно сбросить."""
+    apps.get_model('re_objects', 'DevIdempotencyKey').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('re_objects', '0041_admin_search_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_unscoped_keys, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='devidempotencykey',
+            name='key',
+            field=models.CharField(max_length=200, verbose_name='Ключ'),
+        ),
+        migrations.AddField(
+            model_name='devidempotencykey',
+            name='method',
+            field=models.CharField(default='', max_length=8, verbose_name='Метод'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='devidempotencykey',
+            name='path',
+            field=models.CharField(default='', max_length=255, verbose_name='Путь'),
+            preserve_default=False,
+        ),
+        migrations.AlterField(
+            model_name='devidempotencykey',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+        migrations.AddConstraint(
+            model_name='devidempotencykey',
+            constraint=models.UniqueConstraint(
+                fields=('key', 'method', 'path'), name='re_dev_idempotency_key_per_endpoint'
+            ),
+        ),
+    ]
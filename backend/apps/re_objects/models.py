@@ -1,12 +1,17 @@
 """
 Модели для объектов недвижимости (здания, помещения).
 """
+import time
 import uuid
 from decimal import Decimal, ROUND_HALF_UP
 
-from django.db import models
+from django.conf import settings
+from django.db import models, transaction
 from django.core.exceptions import ValidationError
 from django.core.validators import FileExtensionValidator, MaxValueValidator, MinValueValidator
+from django.utils import timezone
+
+from .geo import GEOHASH_PRECISION, building_geohash
 
 
 class Region(models.Model):
@@ -167,6 +172,15 @@ class Building(models.Model):
         help_text="Географическая долгота (WGS-84), от −180 до 180",
         validators=[MinValueValidator(Decimal("-180")), MaxValueValidator(Decimal("180"))],
     )
+    geohash = models.CharField(
+        max_length=GEOHASH_PRECISION,
+        blank=True,
+        default="",
+        editable=False,
+        db_index=True,
+        verbose_name="Geohash",
+        help_text="Ячейка сетки по координатам (заполняется при сохранении); для кластеров на карте",
+    )
     presentation = models.FileField(
         upload_to=building_presentation_upload_path,
         verbose_name='Презентация',
@@ -185,10 +199,81 @@ class Building(models.Model):
         verbose_name_plural = "Здания"
         ordering = ['name']
         db_table = 're_buildings'
+        indexes = [
+            # bbox карты: диапазон по широте по индексу, долгота — вторым ключом без обращения к таблице
+            models.Index(fields=['latitude', 'longitude'], name='re_buildings_lat_lng_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.city.name})"
 
+    def save(self, *args, **kwargs):
+        self.geohash = building_geohash(self.latitude, self.longitude)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'latitude', 'longitude'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'geohash'}
+        super().save(*args, **kwargs)
+
+
+class GeocodeCacheEntry(models.Model):
+    """
+    Кэш геокодера: нормализованная строка «город, адрес» -> координаты.
+    latitude/longitude = NULL — геокодер ничего не нашёл (повторно не спрашиваем, пока не задан --refresh).
+    """
+    query_key = models.CharField(
+        max_length=900,
+        unique=True,
+        verbose_name="Ключ запроса",
+        help_text="Нормализованная строка «город, адрес» (регистр и пробелы не важны)",
+    )
+    query = models.CharField(max_length=900, verbose_name="Запрос", help_text="Строка, отправленная геокодеру")
+    latitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True, verbose_name="Широта")
+    longitude = models.DecimalField(max_digits=10, decimal_places=6, null=True, blank=True, verbose_name="Долгота")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Результат геокодирования"
+        verbose_name_plural = "Кэш геокодера"
+        db_table = 're_geocode_cache'
+
+    def __str__(self):
+        return self.query
+
+    @property
+    def found(self) -> bool:
+        return self.latitude is not None and self.longitude is not None
+
+
+class DevIdempotencyKey(models.Model):
+    """
+    Ответ dev API на запрос с заголовком Idempotency-Key.
+
+    Скрипты загрузки повторяют запрос после таймаута или 502 — сервер мог его уже выполнить;
+    повтор с тем же ключом получает сохранённый ответ вместо второго здания/помещения.
+    Ключ действует в пределах метода и пути и хранится DEV_IDEMPOTENCY_KEY_TTL_HOURS часов.
+    """
+    MAX_KEY_LENGTH = 200
+
+    key = models.CharField(max_length=MAX_KEY_LENGTH, verbose_name="Ключ")
+    method = models.CharField(max_length=8, verbose_name="Метод")
+    path = models.CharField(max_length=255, verbose_name="Путь")
+    status_code = models.PositiveSmallIntegerField(verbose_name="HTTP-статус")
+    response = models.JSONField(verbose_name="Ответ")
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        verbose_name = "Ключ идемпотентности dev API"
+        verbose_name_plural = "Ключи идемпотентности dev API"
+        db_table = 're_dev_idempotency_keys'
+        constraints = [
+            models.UniqueConstraint(fields=['key', 'method', 'path'], name='re_dev_idempotency_key_per_endpoint'),
+        ]
+
+    def __str__(self):
+        return f"{self.method} {self.path}: {self.key}"
+
+
 def floor_schema_svg_upload_path(instance, filename):
     """Генерирует путь для SVG-схемы этажа."""
     safe_name = filename or "schema.svg"
@@ -269,6 +354,16 @@ def premise_presentation_upload_path(instance, filename):
     return f'premises/{instance.pk}/presentation/{uuid.uuid4().hex}.{ext}'
 
 
+def compute_full_sell_price(area, price_per_sqm, available_for_sale) -> int | None:
+    """Итоговая стоимость продажи (Premise.full_sell_price); вынесено для импорта без save()."""
+    if not available_for_sale:
+        return None
+    if price_per_sqm is not None and area is not None:
+        raw = Decimal(area) * Decimal(price_per_sqm)
+        return int(raw.quantize(Decimal("1"), rounding=ROUND_HALF_UP))
+    return None
+
+
 class Premise(models.Model):
     """
     Помещение (основная единица для поиска и аренды).
@@ -438,6 +533,9 @@ class Premise(models.Model):
             models.Index(fields=['area']),
             models.Index(fields=['price_per_month']),
         ]
+        permissions = [
+            ('export_catalog', 'Может выгружать каталог помещений (/premises/export)'),
+        ]
         db_table = 're_premises'
 
     def __str__(self):
@@ -466,12 +564,7 @@ class Premise(models.Model):
 
     def _compute_full_sell_price(self) -> int | None:
         """Полная стоимость продажи: площадь × цена за м², округление до целых рубля. Иначе None."""
-        if not self.available_for_sale:
-            return None
-        if self.price_per_sqm is not None and self.area is not None:
-            raw = self.area * Decimal(self.price_per_sqm)
-            return int(raw.quantize(Decimal("1"), rounding=ROUND_HALF_UP))
-        return None
+        return compute_full_sell_price(self.area, self.price_per_sqm, self.available_for_sale)
 
     def save(self, *args, **kwargs):
         self.full_sell_price = self._compute_full_sell_price()
@@ -545,6 +638,38 @@ def building_video_card_upload_path(instance, filename):
     return f'buildings/{instance.building_id}/videos/{_media_slot_subdir(instance)}/{filename}'
 
 
+class MediaBlob(models.Model):
+    """
+    Содержимое медиафайла, хранящееся один раз: оригинал по sha256 и его производные (services.media_store).
+
+    Записи фото/видео ссылаются на blob (поле blob) и повторяют имена его файлов в original/file, card, detail.
+    Производные строятся один раз на содержимое и набор параметров обработки (derivatives_key).
+    ref_count — число ссылающихся записей; когда он доходит до нуля, blob и его файлы удаляются.
+    """
+    sha256 = models.CharField(max_length=64, unique=True, verbose_name="SHA-256")
+    size = models.PositiveBigIntegerField(verbose_name="Размер, байт")
+    original = models.CharField(max_length=100, verbose_name="Оригинал")
+    card = models.CharField(max_length=100, blank=True, verbose_name="Превью карточки")
+    detail = models.CharField(max_length=100, blank=True, verbose_name="Детальное изображение")
+    derivatives_key = models.CharField(
+        max_length=16,
+        blank=True,
+        verbose_name="Параметры производных",
+        help_text="Ключ параметров обработки, с которыми построены card/detail; пусто — производных нет",
+    )
+    build_seconds = models.FloatField(null=True, blank=True, verbose_name="Время построения производных, с")
+    ref_count = models.PositiveIntegerField(default=0, verbose_name="Ссылок")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Файл медиа (по содержимому)"
+        verbose_name_plural = "Файлы медиа (по содержимому)"
+        db_table = 're_media_blobs'
+
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.ref_count})"
+
+
 class MediaFilesMixin(models.Model):
     """
     Миксин с общими полями для медиафайлов.
@@ -552,6 +677,15 @@ class MediaFilesMixin(models.Model):
     PremiseImage / BuildingImage: original, card, detail.
     PremiseVideo / BuildingVideo: file (оригинал ролика), card.
     """
+    blob = models.ForeignKey(
+        MediaBlob,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='+',
+        verbose_name="Файл по содержимому",
+    )
     title = models.CharField(
         max_length=200,
         blank=True,
@@ -566,9 +700,37 @@ class MediaFilesMixin(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # True — save() не строит производные (card/detail, превью видео): их строит воркер
+    # build_media_derivatives после загрузки по частям (services.chunked_upload)
+    defer_derivatives = False
+    # ImageStats последнего построения производных (размеры, пик памяти) — воркер пишет его в задачу
+    derivative_stats = None
+    # Вид медиа (ключ параметров производных), поле оригинала и поля производных — для services.media_store
+    media_kind = 'image'
+    source_field = 'original'
+    derivative_fields = ('card', 'detail')
+
     class Meta:
         abstract = True
 
+    def _attach_blob(self, save_kwargs: dict) -> int | None:
+        """
+        Новый загруженный оригинал → общий blob по содержимому (до построения производных).
+
+        Возвращает id прежнего blob — его ссылку снимает _release_blob после сохранения записи.
+        """
+        from .services.media_store import attach_blob
+
+        update_fields = save_kwargs.get('update_fields')
+        if update_fields is not None and self.source_field in update_fields:
+            save_kwargs['update_fields'] = {*update_fields, 'blob'}
+        return attach_blob(self, update_fields)
+
+    def _release_blob(self, blob_id: int | None) -> None:
+        from .services.media_store import release_blob
+
+        release_blob(blob_id)
+
 
 class PremiseImage(MediaFilesMixin, models.Model):
     """
@@ -641,30 +803,32 @@ class PremiseImage(MediaFilesMixin, models.Model):
         return old.original.name != self.original.name
 
     def _maybe_build_image_derivatives(self) -> None:
-        if not self.original or not self._derivatives_stale():
+        if self.defer_derivatives or not self.original or not self._derivatives_stale():
             return
-        if hasattr(self.original, 'read'):
-            self.original.seek(0)
-            raw = self.original.read()
-            self.original.seek(0)
-        else:
-            with self.original.open('rb') as src:
-                raw = src.read()
-        from .services.media_processing import process_raster_bytes
+        from .services.media_processing import ImageStats, process_raster_file
+        from .services.media_store import reuse_blob_derivatives, store_derivatives
 
+        # То же содержимое с теми же параметрами уже обработано — только ссылки на готовые card/detail
+        if reuse_blob_derivatives(self):
+            return
+        # Оригинал декодируется из файла (загруженного или из хранилища), без чтения целиком в память
+        stats = ImageStats()
+        started = time.monotonic()
         try:
-            card_cf, detail_cf = process_raster_bytes(raw)
+            self.original.seek(0)
+            card_cf, detail_cf = process_raster_file(self.original, stats)
+            self.original.seek(0)
         except Exception as exc:
             raise ValidationError(
                 {'original': f'Не удалось обработать изображение: {exc}'}
             ) from exc
-        if self.pk:
-            if self.card:
-                self.card.delete(save=False)
-            if self.detail:
-                self.detail.delete(save=False)
-        self.card = card_cf
-        self.detail = detail_cf
+        self.derivative_stats = stats
+        store_derivatives(self, {'card': card_cf, 'detail': detail_cf}, build_seconds=time.monotonic() - started)
+
+    def build_derivatives(self) -> None:
+        """Строит card/detail сохранённой записи (воркер build_media_derivatives)."""
+        self._maybe_build_image_derivatives()
+        self.save(update_fields=['card', 'detail'])
 
     def clean(self):
         """Валидация на уровне модели."""
@@ -685,10 +849,13 @@ class PremiseImage(MediaFilesMixin, models.Model):
             and self.card
             and self.detail
         )
-        if not skip_derivatives:
-            self._maybe_build_image_derivatives()
-        self.full_clean()
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            released_blob = self._attach_blob(kwargs)
+            if not skip_derivatives:
+                self._maybe_build_image_derivatives()
+            self.full_clean()
+            super().save(*args, **kwargs)
+            self._release_blob(released_blob)
 
 
 class PremiseVideo(MediaFilesMixin, models.Model):
@@ -723,6 +890,10 @@ class PremiseVideo(MediaFilesMixin, models.Model):
         validators=[FileExtensionValidator(allowed_extensions=['webp'])],
     )
 
+    media_kind = 'video'
+    source_field = 'file'
+    derivative_fields = ('card',)
+
     class Meta:
         verbose_name = 'Видео помещения'
         verbose_name_plural = 'Видео помещений'
@@ -766,19 +937,31 @@ class PremiseVideo(MediaFilesMixin, models.Model):
                 PremiseVideo.objects.filter(pk=self.pk).values_list('file', flat=True).first()
             )
 
-        self.full_clean()
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            released_blob = self._attach_blob(kwargs)
+            self.full_clean()
+            super().save(*args, **kwargs)
+            self._release_blob(released_blob)
 
-        if skip_card:
+        if skip_card or self.defer_derivatives:
             return
 
         if not self._needs_video_card(prev_file_name):
             return
+        self.build_derivatives()
 
-        from .services.media_processing import FFmpegNotFoundError, video_file_to_card_webp
+    def build_derivatives(self) -> None:
+        """Превью первого кадра (ffmpeg) для сохранённого ролика; вызывается и воркером build_media_derivatives."""
+        from .services.media_processing import FFmpegNotFoundError, ImageStats, video_file_to_card_webp
+        from .services.media_store import reuse_blob_derivatives, store_derivatives
 
+        if reuse_blob_derivatives(self):
+            self.save(update_fields=['card'])
+            return
+        stats = ImageStats()
+        started = time.monotonic()
         try:
-            card_cf = video_file_to_card_webp(self.file)
+            card_cf = video_file_to_card_webp(self.file, stats)
         except FFmpegNotFoundError as exc:
             raise ValidationError(
                 {'file': 'Для загрузки видео нужен ffmpeg в PATH сервера.'},
@@ -788,10 +971,9 @@ class PremiseVideo(MediaFilesMixin, models.Model):
                 {'file': f'Не удалось сделать превью видео: {exc}'},
             ) from exc
 
-        if self.card:
-            self.card.delete(save=False)
-        self.card = card_cf
-        super().save(update_fields=['card'])
+        store_derivatives(self, {'card': card_cf}, build_seconds=time.monotonic() - started)
+        self.derivative_stats = stats
+        self.save(update_fields=['card'])
 
 
 class BuildingImage(MediaFilesMixin, models.Model):
@@ -872,30 +1054,32 @@ class BuildingImage(MediaFilesMixin, models.Model):
         return old.original.name != self.original.name
 
     def _maybe_build_image_derivatives(self) -> None:
-        if not self.original or not self._derivatives_stale():
+        if self.defer_derivatives or not self.original or not self._derivatives_stale():
             return
-        if hasattr(self.original, 'read'):
-            self.original.seek(0)
-            raw = self.original.read()
-            self.original.seek(0)
-        else:
-            with self.original.open('rb') as src:
-                raw = src.read()
-        from .services.media_processing import process_raster_bytes
+        from .services.media_processing import ImageStats, process_raster_file
+        from .services.media_store import reuse_blob_derivatives, store_derivatives
 
+        # То же содержимое с теми же параметрами уже обработано — только ссылки на готовые card/detail
+        if reuse_blob_derivatives(self):
+            return
+        # Оригинал декодируется из файла (загруженного или из хранилища), без чтения целиком в память
+        stats = ImageStats()
+        started = time.monotonic()
         try:
-            card_cf, detail_cf = process_raster_bytes(raw)
+            self.original.seek(0)
+            card_cf, detail_cf = process_raster_file(self.original, stats)
+            self.original.seek(0)
         except Exception as exc:
             raise ValidationError(
                 {'original': f'Не удалось обработать изображение: {exc}'}
             ) from exc
-        if self.pk:
-            if self.card:
-                self.card.delete(save=False)
-            if self.detail:
-                self.detail.delete(save=False)
-        self.card = card_cf
-        self.detail = detail_cf
+        self.derivative_stats = stats
+        store_derivatives(self, {'card': card_cf, 'detail': detail_cf}, build_seconds=time.monotonic() - started)
+
+    def build_derivatives(self) -> None:
+        """Строит card/detail сохранённой записи (воркер build_media_derivatives)."""
+        self._maybe_build_image_derivatives()
+        self.save(update_fields=['card', 'detail'])
 
     def clean(self):
         """Валидация на уровне модели."""
@@ -916,10 +1100,13 @@ class BuildingImage(MediaFilesMixin, models.Model):
             and self.card
             and self.detail
         )
-        if not skip_derivatives:
-            self._maybe_build_image_derivatives()
-        self.full_clean()
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            released_blob = self._attach_blob(kwargs)
+            if not skip_derivatives:
+                self._maybe_build_image_derivatives()
+            self.full_clean()
+            super().save(*args, **kwargs)
+            self._release_blob(released_blob)
 
 
 class BuildingVideo(MediaFilesMixin, models.Model):
@@ -960,6 +1147,10 @@ class BuildingVideo(MediaFilesMixin, models.Model):
         help_text="Категория видео (например, 'тур', 'обзор', 'презентация')"
     )
 
+    media_kind = 'video'
+    source_field = 'file'
+    derivative_fields = ('card',)
+
     class Meta:
         verbose_name = "Видео здания"
         verbose_name_plural = "Видео зданий"
@@ -1004,19 +1195,31 @@ class BuildingVideo(MediaFilesMixin, models.Model):
                 BuildingVideo.objects.filter(pk=self.pk).values_list('file', flat=True).first()
             )
 
-        self.full_clean()
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            released_blob = self._attach_blob(kwargs)
+            self.full_clean()
+            super().save(*args, **kwargs)
+            self._release_blob(released_blob)
 
-        if skip_card:
+        if skip_card or self.defer_derivatives:
             return
 
         if not self._needs_video_card(prev_file_name):
             return
+        self.build_derivatives()
 
-        from .services.media_processing import FFmpegNotFoundError, video_file_to_card_webp
+    def build_derivatives(self) -> None:
+        """Превью первого кадра (ffmpeg) для сохранённого ролика; вызывается и воркером build_media_derivatives."""
+        from .services.media_processing import FFmpegNotFoundError, ImageStats, video_file_to_card_webp
+        from .services.media_store import reuse_blob_derivatives, store_derivatives
 
+        if reuse_blob_derivatives(self):
+            self.save(update_fields=['card'])
+            return
+        stats = ImageStats()
+        started = time.monotonic()
         try:
-            card_cf = video_file_to_card_webp(self.file)
+            card_cf = video_file_to_card_webp(self.file, stats)
         except FFmpegNotFoundError as exc:
             raise ValidationError(
                 {'file': 'Для загрузки видео нужен ffmpeg в PATH сервера.'}
@@ -1026,7 +1229,142 @@ class BuildingVideo(MediaFilesMixin, models.Model):
                 {'file': f'Не удалось сделать превью видео: {exc}'}
             ) from exc
 
-        if self.card:
-            self.card.delete(save=False)
-        self.card = card_cf
-        super().save(update_fields=['card'])
+        store_derivatives(self, {'card': card_cf}, build_seconds=time.monotonic() - started)
+        self.derivative_stats = stats
+        self.save(update_fields=['card'])
+
+
+class MediaTarget(models.TextChoices):
+    """Куда попадает загруженный файл: модель медиа и её родитель (помещение или здание)."""
+
+    PREMISE_IMAGE = 'premise_image', 'Фото помещения'
+    PREMISE_VIDEO = 'premise_video', 'Видео помещения'
+    BUILDING_IMAGE = 'building_image', 'Фото здания'
+    BUILDING_VIDEO = 'building_video', 'Видео здания'
+
+
+class MediaUpload(models.Model):
+    """
+    Сессия загрузки файла по частям (services.chunked_upload).
+
+    Части пишутся сразу в хранилище: в S3/MinIO — частями multipart upload (s3_upload_id),
+    иначе — в файл-черновик на диске. После обрыва клиент узнаёт принятые части и досылает остальные;
+    finalize собирает файл, создаёт запись медиа и ставит производные в очередь.
+    """
+
+    class Status(models.TextChoices):
+        UPLOADING = 'uploading', 'Загружается'
+        COMPLETED = 'completed', 'Завершена'
+        ABORTED = 'aborted', 'Отменена'
+
+    uuid = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    target = models.CharField(max_length=32, choices=MediaTarget.choices, verbose_name="Назначение")
+    object_id = models.PositiveBigIntegerField(verbose_name="ID помещения / здания")
+    filename = models.CharField(max_length=255, verbose_name="Имя файла")
+    storage_name = models.CharField(max_length=500, verbose_name="Путь в хранилище")
+    size = models.PositiveBigIntegerField(verbose_name="Размер, байт")
+    chunk_size = models.PositiveIntegerField(verbose_name="Размер части, байт")
+    s3_upload_id = models.CharField(max_length=1024, blank=True, verbose_name="ID multipart upload (S3)")
+    fields = models.JSONField(default=dict, blank=True, verbose_name="Поля записи медиа")
+    status = models.CharField(
+        max_length=16, choices=Status.choices, default=Status.UPLOADING, verbose_name="Статус"
+    )
+    media_id = models.PositiveBigIntegerField(null=True, blank=True, verbose_name="ID созданной записи медиа")
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name="Кто загружает",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    expires_at = models.DateTimeField(verbose_name="Истекает")
+
+    class Meta:
+        verbose_name = "Загрузка по частям"
+        verbose_name_plural = "Загрузки по частям"
+        db_table = 're_media_uploads'
+        indexes = [
+            models.Index(fields=['expires_at'], name='re_media_upload_expiry', condition=models.Q(status='uploading')),
+        ]
+
+    def __str__(self):
+        return f"{self.filename} ({self.status})"
+
+    @property
+    def chunk_count(self) -> int:
+        return max(1, -(-self.size // self.chunk_size))
+
+    def expected_chunk_size(self, index: int) -> int:
+        """Размер части index: все полные, кроме последней."""
+        if index < self.chunk_count - 1:
+            return self.chunk_size
+        return self.size - self.chunk_size * (self.chunk_count - 1)
+
+
+class MediaUploadChunk(models.Model):
+    """Принятая часть загрузки. etag — ответ S3 на upload_part (нужен для завершения multipart upload)."""
+
+    upload = models.ForeignKey(MediaUpload, on_delete=models.CASCADE, related_name='chunks')
+    index = models.PositiveIntegerField(verbose_name="Номер части (с 0)")
+    size = models.PositiveIntegerField(verbose_name="Размер, байт")
+    etag = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Часть загрузки"
+        verbose_name_plural = "Части загрузок"
+        db_table = 're_media_upload_chunks'
+        constraints = [
+            models.UniqueConstraint(fields=['upload', 'index'], name='re_media_upload_chunk_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.upload_id}#{self.index}"
+
+
+class MediaDerivativeJob(models.Model):
+    """
+    Задача на построение производных (card/detail WebP, превью видео) для записи медиа.
+
+    Ставится в транзакции, создающей запись; выполняет воркер build_media_derivatives —
+    повторы с экспоненциальной задержкой, после MEDIA_DERIVATIVES_MAX_ATTEMPTS попыток статус failed.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Ожидает'
+        DONE = 'done', 'Готово'
+        FAILED = 'failed', 'Ошибка (попытки исчерпаны)'
+
+    target = models.CharField(max_length=32, choices=MediaTarget.choices, verbose_name="Тип медиа")
+    media_id = models.PositiveBigIntegerField(verbose_name="ID записи медиа")
+    status = models.CharField(max_length=16, choices=Status.choices, default=Status.PENDING, verbose_name="Статус")
+    attempts = models.PositiveIntegerField(default=0, verbose_name="Попыток")
+    last_error = models.TextField(blank=True, verbose_name="Последняя ошибка")
+    next_attempt_at = models.DateTimeField(default=timezone.now, verbose_name="Следующая попытка")
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True, verbose_name="Обработано")
+    peak_memory = models.PositiveBigIntegerField(
+        null=True,
+        blank=True,
+        verbose_name="Пик памяти, байт",
+        help_text="Оценка пика памяти под пиксельные буферы Pillow при построении производных",
+    )
+
+    class Meta:
+        verbose_name = "Задача производных медиа"
+        verbose_name_plural = "Очередь производных медиа"
+        db_table = 're_media_derivative_jobs'
+        ordering = ['-id']
+        indexes = [
+            models.Index(
+                fields=['next_attempt_at', 'id'],
+                name='re_media_derivative_queue',
+                condition=models.Q(status='pending'),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.target} #{self.media_id} ({self.status})"
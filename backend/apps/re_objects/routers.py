@@ -9,10 +9,13 @@
    цена/площадь, order_by, page, page_size.
 2) GET /api/v1/premises/buildings — список зданий для фильтра; sale_type, available
    (тот же смысл, что в каталоге).
+2a) GET /api/v1/premises/export — полная выгрузка каталога потоком CSV/NDJSON (columns, gzip);
+   JWT и право re_objects.export_catalog.
 3) GET /api/v1/buildings/ — список зданий с пагинацией (page, page_size).
-4) GET /api/v1/buildings/{uuid} — информация о здании (floors, media_categories, media).
-5) GET /api/v1/floors/{building_uuid}/{floor_id} — этаж; обязательный query sale_type (rent|sale) для is_available.
-6) GET /api/v1/premises/{premise_uuid} — детальная карточка помещения по UUID (те же поля + description,
+4) GET /api/v1/buildings/map — здания для карты в области bbox: кластеры или точки в зависимости от zoom.
+5) GET /api/v1/buildings/{uuid} — информация о здании (floors, media_categories, media).
+6) GET /api/v1/floors/{building_uuid}/{floor_id} — этаж; обязательный query sale_type (rent|sale) для is_available.
+7) GET /api/v1/premises/{premise_uuid} — детальная карточка помещения по UUID (те же поля + description,
    price_per_sqm, ...). Всегда: sale_price, rent_price (по флагам available_for_sale / available_for_rent).
    Поле price — обратная совместимость (зависит от sale_type). 404 — ProblemDetail.
 
@@ -22,34 +25,50 @@
 from decimal import Decimal
 from uuid import UUID
 
+from asgiref.sync import sync_to_async
 from django.conf import settings
+from django.http import StreamingHttpResponse
 from ninja import Query, Router
 from ninja.errors import HttpError
 
 from api.schemas import ProblemDetail
+from apps.accounts.services.auth_service import jwt_auth
+from config.db_router import replica_reads
 
 from .errors import ReObjectsErrorCodes, create_re_objects_error
 from .schemas import (
     BuildingDetailOut,
     BuildingOptionOut,
+    BuildingsMapOut,
     FloorResponseOut,
     PremiseDetailOut,
     PremiseListResponse,
 )
 from .services import (
+    EXPORT_FORMATS,
     PremiseFilterParams,
+    aiter_catalog_export,
+    export_content_type,
+    export_filename,
     get_building,
     get_buildings,
     get_buildings_for_filter,
+    get_buildings_map,
     get_premise_by_uuid,
     get_premise_list,
     get_premises_for_floor,
     parse_building_uuids,
+    parse_export_columns,
+    parse_map_bbox,
 )
 
 premises_router = Router(tags=["Premises"])
 buildings_router = Router(tags=["Buildings"])
 floors_router = Router(tags=["Floors"])
+# Публичный каталог читается с реплик БД (config.db_router). Выгрузка отдаёт строки уже после выхода
+# из ручки — она читает с primary (долгий запрос на реплике может быть прерван применением WAL)
+for _router in (premises_router, buildings_router, floors_router):
+    _router.add_decorator(replica_reads)
 
 
 def _validated_floor_sale_type(sale_type: str) -> str:
@@ -93,6 +112,66 @@ async def building_filter_list(
     return 200, items
 
 
+@premises_router.get(
+    "/export",
+    response={401: ProblemDetail, 403: ProblemDetail},
+    auth=jwt_auth,
+    summary="Выгрузка каталога помещений (CSV / NDJSON)",
+    description=(
+        "Все помещения одним потоком, без пагинации: здание, этаж, цены, флаги и текущая доступность "
+        "(is_available_for_rent / is_available_for_sale — флаг и нет активной брони или незавершённой оплаты), "
+        "URL фото и видео. format: csv|ndjson; columns — список колонок через запятую (по умолчанию все); "
+        "gzip=true — файл .gz. Фильтры: sale_type, building_uuids. Нужно право re_objects.export_catalog."
+    ),
+)
+async def premise_export(
+    request,
+    fmt: str = Query("csv", alias="format", description="csv | ndjson"),
+    columns: str | None = Query(None, description="Колонки через запятую, в нужном порядке; по умолчанию все"),
+    gzip: bool = Query(False, description="Сжать выгрузку gzip (catalog.csv.gz)"),
+    sale_type: str | None = Query(
+        None,
+        description=(
+            f"{settings.RE_OBJECTS_SALE_TYPE_RENT} — только с флагом аренды; "
+            f"{settings.RE_OBJECTS_SALE_TYPE_SALE} — только с флагом продажи"
+        ),
+    ),
+    building_uuids: str | None = Query(None, description="Фильтр по UUID зданий (через запятую)"),
+):
+    """Поток строк каталога (StreamingHttpResponse с async-итератором). 403 — нет права на выгрузку."""
+    if not await sync_to_async(request.auth.has_perm)("re_objects.export_catalog"):
+        return 403, create_re_objects_error(
+            status=403,
+            code=ReObjectsErrorCodes.FORBIDDEN,
+            title="Forbidden",
+            detail="Нет права на выгрузку каталога.",
+            instance="/api/v1/premises/export",
+        )
+    if fmt not in EXPORT_FORMATS:
+        raise HttpError(422, f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+    st = _validated_floor_sale_type(sale_type) if sale_type is not None else None
+    try:
+        selected = parse_export_columns(columns)
+    except ValueError as exc:
+        raise HttpError(422, str(exc)) from None
+
+    response = StreamingHttpResponse(
+        aiter_catalog_export(
+            fmt=fmt,
+            columns=selected,
+            gzip=gzip,
+            sale_type=st,
+            building_uuids=parse_building_uuids(building_uuids),
+        ),
+        content_type=export_content_type(fmt, gzip=gzip),
+    )
+    response["Content-Disposition"] = f'attachment; filename="{export_filename(fmt, gzip=gzip)}"'
+    response["Cache-Control"] = "no-store"
+    # nginx (proxy_buffering on в /api/) иначе копит ответ в буферах вместо передачи по мере выгрузки
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
 # ─── Buildings (prefix /buildings) ───────────────────────────────────────────
 
 @buildings_router.get(
@@ -145,6 +224,59 @@ async def building_list(
     return 200, result
 
 
+@buildings_router.get(
+    "/map",
+    response={200: BuildingsMapOut},
+    summary="Здания на карте",
+    description=(
+        "Здания в области просмотра bbox (west,south,east,north) с фильтрами каталога. "
+        "На мелком zoom — кластеры по ячейкам geohash: [lat, lon, count, min_price, cell]; "
+        "на крупном — здания: [uuid, lat, lon, min_price, title] (порядок значений — в поле fields). "
+        "Если зданий в области слишком много, кластеры отдаются и на крупном zoom."
+    ),
+)
+async def building_map(
+    request,
+    bbox: str = Query(..., description="Область просмотра: west,south,east,north (градусы WGS-84)"),
+    zoom: int = Query(..., ge=0, le=22, description="Уровень масштаба карты"),
+    sale_type: str | None = Query(
+        None,
+        description=(
+            f"{settings.RE_OBJECTS_SALE_TYPE_RENT} — только здания с помещениями под аренду; "
+            f"{settings.RE_OBJECTS_SALE_TYPE_SALE} — только под продажу"
+        ),
+    ),
+    building_uuids: str | None = Query(None, description="Фильтр по UUID зданий (через запятую)"),
+    min_price: int | None = Query(
+        None,
+        description="Минимальная цена (целые ₽): при sale_type=sale — итог продажи, иначе аренда за месяц.",
+    ),
+    max_price: int | None = Query(
+        None,
+        description="Максимальная цена (целые ₽): при sale_type=sale — итог продажи, иначе аренда за месяц.",
+    ),
+    min_area: Decimal | None = Query(None, description="Минимальная площадь, м²"),
+    max_area: Decimal | None = Query(None, description="Максимальная площадь, м²"),
+):
+    """Кластеры или здания в области карты. Ответ: mode, zoom, precision, total, fields, items."""
+    st = _validated_floor_sale_type(sale_type) if sale_type is not None else None
+    try:
+        area = parse_map_bbox(bbox)
+    except ValueError as exc:
+        raise HttpError(422, str(exc)) from None
+    result = await get_buildings_map(
+        area,
+        zoom,
+        sale_type=st,
+        building_uuids=parse_building_uuids(building_uuids),
+        min_price=min_price,
+        max_price=max_price,
+        min_area=min_area,
+        max_area=max_area,
+    )
+    return 200, result
+
+
 @buildings_router.get(
     "/{building_uuid}",
     response={200: BuildingDetailOut, 404: ProblemDetail},
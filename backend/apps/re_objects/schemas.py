@@ -4,8 +4,10 @@
 Используются в GET /premises (список с фильтрами и пагинацией) и GET /premises/{uuid} (деталь).
 Поля ответа: uuid, name (название title, не room_number), price (legacy), sale_price, rent_price, адрес, floor, площадь, has_tenant, media.
 """
+from datetime import datetime
 from decimal import Decimal
 from typing import Literal, Optional
+from uuid import UUID
 
 from ninja import Schema
 
@@ -150,6 +152,23 @@ class BuildingListResponse(Schema):
     total_pages: int
 
 
+class BuildingsMapOut(Schema):
+    """Ответ карты: кластеры (mode=clusters) или здания (mode=buildings) компактными массивами.
+
+    fields — порядок значений в каждой строке items:
+    clusters -> [lat, lon, count, min_price, cell]; cell — префикс geohash (область кластера);
+    buildings -> [uuid, lat, lon, min_price, title].
+    min_price — по sale_type (sale — итог продажи, иначе аренда за месяц), с учётом фильтров.
+    """
+
+    mode: Literal["clusters", "buildings"]
+    zoom: int
+    precision: Optional[int] = None  # длина префикса geohash кластеров; None для mode=buildings
+    total: int  # зданий в области
+    fields: list[str]
+    items: list[list[str | float | int | None]]
+
+
 class FloorPremiseOut(Schema):
     """Помещение на этаже: name — номер для подписи на схеме (room_number), плюс площадь, цена, доступность."""
 
@@ -170,3 +189,50 @@ class FloorResponseOut(Schema):
     floor_number: int  # deprecated
     schema_svg: Optional[str] = None
     premises: list[FloorPremiseOut]
+
+
+class MediaUploadIn(Schema):
+    """Начало загрузки по частям: куда (target + uuid помещения/здания), имя и размер файла, поля записи медиа."""
+
+    target: Literal["premise_image", "premise_video", "building_image", "building_video"]
+    object_uuid: UUID  # помещение (premise_*) или здание (building_*)
+    filename: str
+    size: int  # байт
+    title: Optional[str] = None
+    order: Optional[int] = None  # по умолчанию — в конец
+    is_primary: Optional[bool] = None  # только фото
+    category: Optional[str] = None  # только медиа здания
+
+
+class MediaUploadOut(Schema):
+    """Состояние загрузки: для возобновления — какие части приняты (received_chunks), остальные дослать."""
+
+    uuid: UUID
+    target: str
+    filename: str
+    status: Literal["uploading", "completed", "aborted"]
+    size: int
+    chunk_size: int
+    chunk_count: int
+    received_chunks: list[int]
+    received_bytes: int
+    expires_at: datetime
+    media_id: Optional[int] = None
+
+
+class MediaUploadChunkOut(Schema):
+    """Принятая часть."""
+
+    index: int
+    size: int
+    received_bytes: int
+
+
+class MediaUploadFinalizeOut(Schema):
+    """Созданная запись медиа; производные (card/detail, превью видео) строятся в фоне — до тех пор url = оригинал."""
+
+    upload_uuid: UUID
+    target: str
+    media_id: int
+    url: str
+    derivatives: Literal["pending", "ready"]
@@ -12,6 +12,18 @@ from .premise_service import (
     get_premises_for_floor,
     parse_building_uuids,
 )
+from .catalog_export import (
+    EXPORT_FORMATS,
+    aiter_catalog_export,
+    export_content_type,
+    export_filename,
+    parse_export_columns,
+)
+from .map_service import (
+    MapBBox,
+    get_buildings_map,
+    parse_map_bbox,
+)
 
 __all__ = [
     "PremiseFilterParams",
@@ -23,4 +35,12 @@ __all__ = [
     "get_building",
     "get_premises_for_floor",
     "parse_building_uuids",
+    "MapBBox",
+    "get_buildings_map",
+    "parse_map_bbox",
+    "EXPORT_FORMATS",
+    "aiter_catalog_export",
+    "export_content_type",
+    "export_filename",
+    "parse_export_columns",
 ]
@@ -0,0 +1,150 @@
+"""
+Массовое изменение цен помещений (индексация, акции): действие «Изменить цены» в админке и вызовы из кода.
+
+Premise.save() на каждое помещение — full_clean и до трёх запросов (этаж, здание, город), а QuerySet.update()
+оставляет full_sell_price устаревшей. Здесь изменение применяется к набору помещений одним UPDATE:
+- новая цена (price_per_month или price_per_sqm) считается выражением в SQL: процент, сумма в рублях или
+  сумма за м² площади; помещения без цены не меняются;
+- full_sell_price пересчитывается в том же UPDATE, как compute_full_sell_price: площадь × цена за м²
+  с ROUND_HALF_UP до рубля. Счёт в целых (площадь в сотых м²), поэтому результат не зависит от float в БД;
+- цена не может стать нулевой или отрицательной (правило Premise.clean) — такой набор отклоняется целиком
+  (PriceChangeError) до записи;
+- после коммита один раз на набор отправляется сигнал catalog_prices_changed (здания с изменёнными ценами) —
+  для сброса зависимых кэшей.
+"""
+
+from dataclasses import dataclass, field
+from decimal import Decimal
+
+from django.db import models, transaction
+from django.db.models import BigIntegerField, Case, ExpressionWrapper, F, Q, QuerySet, Value, When
+from django.db.models.functions import Cast, Round
+from django.utils import timezone
+
+from ..models import Premise
+from ..signals import catalog_prices_changed
+
+PRICE_FIELDS = {
+    'price_per_month': 'Аренда в месяц',
+    'price_per_sqm': 'Продажа за м²',
+}
+
+
+class PriceChangeMode(models.TextChoices):
+    PERCENT = 'percent', 'На процент'
+    ABSOLUTE = 'absolute', 'На сумму, ₽'
+    PER_SQM = 'per_sqm', 'На сумму за м² площади, ₽'
+
+
+class PriceChangeError(Exception):
+    """Изменение нельзя применить (неверные параметры или цена стала бы не больше нуля)."""
+
+
+@dataclass(frozen=True)
+class PriceChange:
+    """
+    field — price_per_month | price_per_sqm; value — процент (до сотых, больше -100) или рубли (целое,
+    может быть отрицательным). PER_SQM для аренды — value × площадь к месячной цене, для продажи — к цене за м².
+    """
+
+    field: str
+    mode: str
+    value: Decimal
+
+    def __post_init__(self):
+        if self.field not in PRICE_FIELDS:
+            raise PriceChangeError(f'Неизвестное поле цены: {self.field}')
+        value = Decimal(self.value)
+        if self.mode == PriceChangeMode.PERCENT:
+            if value <= -100:
+                raise PriceChangeError('Процент должен быть больше -100')
+            if value != value.quantize(Decimal('0.01')):
+                raise PriceChangeError('Процент — не больше двух знаков после запятой')
+        elif self.mode in (PriceChangeMode.ABSOLUTE, PriceChangeMode.PER_SQM):
+            if value != value.to_integral_value():
+                raise PriceChangeError('Сумма — в целых рублях')
+        else:
+            raise PriceChangeError(f'Неизвестный способ изменения: {self.mode}')
+        object.__setattr__(self, 'value', value)
+
+
+@dataclass
+class PriceChangeReport:
+    updated: int = 0
+    building_ids: list[int] = field(default_factory=list)
+
+
+def _div_half_up(numerator, denominator: int):
+    """numerator / denominator с округлением половины вверх; для положительного целого numerator — как ROUND_HALF_UP."""
+    return ExpressionWrapper((numerator + Value(denominator // 2)) / Value(denominator), output_field=BigIntegerField())
+
+
+def _area_hundredths():
+    # Площадь — DecimalField с двумя знаками: в сотых м² она целая
+    return Cast(Round(F('area') * Value(100)), BigIntegerField())
+
+
+def new_price_expression(change: PriceChange):
+    """Новое значение change.field в SQL (NULL остаётся NULL)."""
+    price = F(change.field)
+    if change.mode == PriceChangeMode.PERCENT:
+        # Процент до сотых — в десятитысячных долях целым числом
+        factor = int((Decimal(100) + change.value) * 100)
+        return _div_half_up(price * Value(factor), 10000)
+    if change.mode == PriceChangeMode.PER_SQM and change.field == 'price_per_month':
+        return _div_half_up(price * Value(100) + _area_hundredths() * Value(int(change.value)), 100)
+    return ExpressionWrapper(price + Value(int(change.value)), output_field=BigIntegerField())
+
+
+def full_sell_price_expression(price_per_sqm=None):
+    """full_sell_price в SQL — как compute_full_sell_price (по умолчанию от текущей price_per_sqm)."""
+    if price_per_sqm is None:
+        price_per_sqm = F('price_per_sqm')
+    return Case(
+        When(available_for_sale=True, then=_div_half_up(_area_hundredths() * price_per_sqm, 100)),
+        default=Value(None),
+        output_field=BigIntegerField(),
+    )
+
+
+def _building_ids(queryset: QuerySet) -> list[int]:
+    return sorted(queryset.order_by().values_list('building_id', flat=True).distinct())
+
+
+def _notify(building_ids: list[int]) -> None:
+    if building_ids:
+        transaction.on_commit(lambda: catalog_prices_changed.send(sender=Premise, building_ids=building_ids))
+
+
+def apply_price_change(queryset: QuerySet, change: PriceChange) -> PriceChangeReport:
+    """Меняет change.field у помещений queryset одним UPDATE (вместе с full_sell_price для цены продажи)."""
+    queryset = queryset.filter(**{f'{change.field}__isnull': False})
+    new_price = new_price_expression(change)
+    updates = {change.field: new_price, 'updated_at': timezone.now()}
+    if change.field == 'price_per_sqm':
+        # В UPDATE правые части видят старые значения строки — подставляем новую цену выражением
+        updates['full_sell_price'] = full_sell_price_expression(new_price)
+
+    with transaction.atomic():
+        invalid = queryset.annotate(new_price=new_price).filter(new_price__lte=0).count()
+        if invalid:
+            raise PriceChangeError(f'Цена стала бы не больше нуля у помещений: {invalid}. Ничего не изменено.')
+        building_ids = _building_ids(queryset)
+        updated = queryset.update(**updates)
+        _notify(building_ids)
+    return PriceChangeReport(updated=updated, building_ids=building_ids)
+
+
+def recalculate_full_sell_price(queryset: QuerySet) -> int:
+    """Пересчитывает устаревшую full_sell_price одним UPDATE (например, после QuerySet.update цены или площади)."""
+    stale = queryset.annotate(expected_price=full_sell_price_expression()).filter(
+        Q(full_sell_price__isnull=True, expected_price__isnull=False)
+        | Q(full_sell_price__isnull=False, expected_price__isnull=True)
+        | Q(full_sell_price__lt=F('expected_price'))
+        | Q(full_sell_price__gt=F('expected_price'))
+    )
+    with transaction.atomic():
+        building_ids = _building_ids(stale)
+        updated = stale.update(full_sell_price=full_sell_price_expression(), updated_at=timezone.now())
+        _notify(building_ids)
+    return updated
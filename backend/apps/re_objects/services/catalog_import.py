@@ -0,0 +1,667 @@
+"""
+Импорт каталога помещений из таблиц CSV/XLSX (manage.py import_catalog и загрузка в админке).
+
+Раньше таблицы отдела продаж заводились по одному помещению: форма админки или dev API на каждую строку,
+то есть Premise.save() с full_clean и поиском этажа, города здания и города по умолчанию.
+Импорт идёт пачками по batch_size строк:
+- значения строк разбираются и проверяются (правила Premise.clean, длины и разрядность полей) без запросов к БД;
+- здания (UUID или точное название), этажи и уже существующие помещения находятся несколькими запросами
+  на пачку; найденные здания и этажи запоминаются на весь импорт;
+- помещение ищется по uuid, а без него — по зданию и номеру помещения, поэтому повторный импорт той же
+  таблицы обновляет строки, а не плодит дубли;
+- full_sell_price и город считаются в памяти; запись — upsert по uuid на пачку: на PostgreSQL COPY во временную
+  таблицу и один INSERT ... SELECT ... ON CONFLICT (uuid) DO UPDATE (без компиляции SQL Django на каждое значение,
+  которая съедала большую часть времени bulk_create), на других БД — bulk_create(update_conflicts=True).
+
+Ошибочные строки не записываются и попадают в отчёт (номер строки файла, колонка, текст); остальные
+записываются в одной транзакции на весь файл (при сбое БД не остаётся половины импорта).
+Колонки, которых нет в файле, у существующих помещений не меняются. Заголовки — имена полей Premise
+или русские названия из COLUMN_ALIASES. XLSX читается первым листом через zipfile без openpyxl.
+"""
+
+import csv
+import io
+import re
+import zipfile
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from uuid import UUID
+from xml.etree import ElementTree
+
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from ..models import Building, Floor, Premise, compute_full_sell_price
+
+DEFAULT_BATCH_SIZE = 5000
+MAX_BIGINT = 2**63 - 1
+
+# Каноническое имя колонки -> допустимые заголовки (после нормализации: регистр, пробелы -> '_')
+COLUMN_ALIASES: dict[str, tuple[str, ...]] = {
+    'uuid': ('uuid',),
+    'building': ('building', 'building_uuid', 'здание', 'бц'),
+    'floor': ('floor', 'floor_number', 'этаж'),
+    'room_number': ('room_number', 'number', 'номер', 'номер_помещения'),
+    'title': ('title', 'название'),
+    'description': ('description', 'описание'),
+    'area': ('area', 'площадь'),
+    'price_per_month': ('price_per_month', 'аренда_в_месяц', 'цена_аренды'),
+    'price_per_sqm': ('price_per_sqm', 'цена_за_м2', 'цена_продажи_за_м2'),
+    'premise_type': ('premise_type', 'тип'),
+    'available_for_rent': ('available_for_rent', 'аренда'),
+    'available_for_sale': ('available_for_sale', 'продажа'),
+    'show_rented_button': ('show_rented_button', 'сдано'),
+    'ceiling_height': ('ceiling_height', 'высота_потолков'),
+    'has_windows': ('has_windows', 'окна'),
+    'has_parking': ('has_parking', 'парковка'),
+    'is_furnished': ('is_furnished', 'мебель'),
+}
+REQUIRED_COLUMNS = ('building',)
+
+TEXT_FIELDS = {'room_number': 50, 'title': 50, 'description': None}
+DECIMAL_FIELDS = {'area': (10, 2), 'ceiling_height': (5, 2)}
+INTEGER_FIELDS = ('price_per_month', 'price_per_sqm')
+BOOLEAN_FIELDS = (
+    'available_for_rent',
+    'available_for_sale',
+    'show_rented_button',
+    'has_windows',
+    'has_parking',
+    'is_furnished',
+)
+TRUE_VALUES = frozenset({'1', 'true', 'yes', 'y', 'да', 'д', '+', 'x'})
+FALSE_VALUES = frozenset({'0', 'false', 'no', 'n', 'нет', 'н', '-'})
+
+# Поля, которые импорт перезаписывает у существующих помещений (ON CONFLICT (uuid) DO UPDATE)
+UPDATE_FIELDS = [
+    'building',
+    'city',
+    'floor',
+    'room_number',
+    'title',
+    'description',
+    'area',
+    'price_per_month',
+    'price_per_sqm',
+    'full_sell_price',
+    'premise_type',
+    'available_for_rent',
+    'available_for_sale',
+    'show_rented_button',
+    'ceiling_height',
+    'has_windows',
+    'has_parking',
+    'is_furnished',
+    'updated_at',
+]
+# Колонки COPY: ключ, поля upsert и created_at (при конфликте не меняется)
+COPY_FIELDS = ['uuid', 'created_at', *UPDATE_FIELDS]
+
+
+class CatalogImportError(Exception):
+    """Файл нельзя импортировать целиком (формат, заголовок, нет обязательных колонок)."""
+
+
+@dataclass
+class RowError:
+    row: int
+    column: str
+    message: str
+
+
+@dataclass
+class CatalogImportReport:
+    rows: int = 0
+    created: int = 0
+    updated: int = 0
+    floors_created: int = 0
+    dry_run: bool = False
+    ignored_columns: list[str] = field(default_factory=list)
+    errors: list[RowError] = field(default_factory=list)
+
+    @property
+    def failed(self) -> int:
+        return len({error.row for error in self.errors})
+
+    def write_errors_csv(self, fileobj) -> None:
+        writer = csv.writer(fileobj)
+        writer.writerow(['row', 'column', 'message'])
+        for error in self.errors:
+            writer.writerow([error.row, error.column, error.message])
+
+
+# ─── Чтение таблиц ────────────────────────────────────────────────────────────
+
+
+def _decode(data: bytes) -> str:
+    """Выгрузки из Excel бывают в cp1251 — пробуем UTF-8 (с BOM или без), затем cp1251."""
+    try:
+        return data.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        return data.decode('cp1251')
+
+
+def _read_csv(data: bytes) -> Iterator[tuple[int, list[str]]]:
+    text = _decode(data)
+    try:
+        dialect = csv.Sniffer().sniff(text[:4096], delimiters=',;\t')
+    except csv.Error:
+        dialect = csv.excel
+    reader = csv.reader(io.StringIO(text), dialect)
+    for cells in reader:
+        yield reader.line_num, cells
+
+
+_XLSX_NS = {
+    'main': 'http://schemas.openxmlformats.org/spreadsheetml/2006/main',
+    'rel': 'http://schemas.openxmlformats.org/officeDocument/2006/relationships',
+    'pkg': 'http://schemas.openxmlformats.org/package/2006/relationships',
+}
+_CELL_REF = re.compile(r'([A-Z]+)')
+
+
+def _xlsx_first_sheet(book: zipfile.ZipFile) -> str:
+    workbook = ElementTree.fromstring(book.read('xl/workbook.xml'))
+    sheet = workbook.find('main:sheets/main:sheet', _XLSX_NS)
+    if sheet is None:
+        raise CatalogImportError('XLSX: в книге нет листов')
+    rel_id = sheet.get(f'{{{_XLSX_NS["rel"]}}}id')
+    rels = ElementTree.fromstring(book.read('xl/_rels/workbook.xml.rels'))
+    for rel in rels.findall('pkg:Relationship', _XLSX_NS):
+        if rel.get('Id') == rel_id:
+            target = rel.get('Target', '')
+            return target.lstrip('/') if target.startswith('/') else f'xl/{target}'
+    raise CatalogImportError('XLSX: не найден файл первого листа')
+
+
+def _xlsx_shared_strings(book: zipfile.ZipFile) -> list[str]:
+    if 'xl/sharedStrings.xml' not in book.namelist():
+        return []
+    root = ElementTree.fromstring(book.read('xl/sharedStrings.xml'))
+    return [''.join(t.text or '' for t in si.iter(f'{{{_XLSX_NS["main"]}}}t')) for si in root]
+
+
+def _xlsx_column(ref: str) -> int:
+    index = 0
+    for char in _CELL_REF.match(ref).group(1):
+        index = index * 26 + ord(char) - ord('A') + 1
+    return index - 1
+
+
+def _xlsx_number(value: str) -> str:
+    """Числа в XLSX хранятся как double: 100000 -> '100000', 50.5 -> '50.5' (без хвостов float)."""
+    number = float(value)
+    return str(int(number)) if number.is_integer() else repr(number)
+
+
+def _read_xlsx(data: bytes) -> Iterator[tuple[int, list[str]]]:
+    try:
+        book = zipfile.ZipFile(io.BytesIO(data))
+    except zipfile.BadZipFile:
+        raise CatalogImportError('XLSX: файл повреждён или это не XLSX') from None
+    with book:
+        shared = _xlsx_shared_strings(book)
+        main = _XLSX_NS['main']
+        with book.open(_xlsx_first_sheet(book)) as sheet:
+            for position, (_, element) in enumerate(
+                (event for event in ElementTree.iterparse(sheet) if event[1].tag == f'{{{main}}}row'), start=1
+            ):
+                cells: dict[int, str] = {}
+                for cell in element.iter(f'{{{main}}}c'):
+                    kind = cell.get('t', 'n')
+                    if kind == 'inlineStr':
+                        value = ''.join(t.text or '' for t in cell.iter(f'{{{main}}}t'))
+                    else:
+                        raw = cell.findtext(f'{{{main}}}v')
+                        if raw is None:
+                            continue
+                        if kind == 's':
+                            value = shared[int(raw)]
+                        elif kind == 'n':
+                            value = _xlsx_number(raw)
+                        else:
+                            value = raw
+                    ref = cell.get('r')
+                    cells[_xlsx_column(ref) if ref else len(cells)] = value
+                number = int(element.get('r') or position)
+                element.clear()
+                yield number, [cells.get(i, '') for i in range(max(cells) + 1)] if cells else []
+
+
+def read_table(data: bytes, filename: str) -> Iterator[tuple[int, list[str]]]:
+    """(номер строки в файле, ячейки) из CSV или XLSX по расширению файла; первая строка — заголовок."""
+    name = filename.lower()
+    if name.endswith('.xlsx'):
+        return _read_xlsx(data)
+    if name.endswith(('.csv', '.txt')):
+        return _read_csv(data)
+    raise CatalogImportError('Поддерживаются файлы .csv и .xlsx')
+
+
+def _normalize_header(value: str) -> str:
+    return re.sub(r'[\s\-]+', '_', value.strip().casefold()).replace('²', '2')
+
+
+_HEADER_LOOKUP = {alias: column for column, aliases in COLUMN_ALIASES.items() for alias in aliases}
+
+
+# ─── Разбор значений ──────────────────────────────────────────────────────────
+
+
+class _CellError(ValueError):
+    pass
+
+
+def _clean_number(value: str) -> str:
+    return value.replace('\xa0', '').replace(' ', '').replace(',', '.')
+
+
+def _parse_decimal(value: str, max_digits: int, places: int) -> Decimal:
+    try:
+        number = Decimal(_clean_number(value))
+    except InvalidOperation:
+        raise _CellError('ожидается число') from None
+    if not number.is_finite() or number <= 0:
+        raise _CellError('ожидается положительное число')
+    if number != number.quantize(Decimal(1).scaleb(-places)):
+        raise _CellError(f'не больше {places} знаков после запятой')
+    if number.adjusted() >= max_digits - places:
+        raise _CellError(f'не больше {max_digits - places} знаков до запятой')
+    return number.quantize(Decimal(1).scaleb(-places))
+
+
+def _parse_integer(value: str) -> int:
+    try:
+        number = Decimal(_clean_number(value))
+    except InvalidOperation:
+        raise _CellError('ожидается целое число') from None
+    if not number.is_finite() or number != number.to_integral_value():
+        raise _CellError('ожидается целое число')
+    if number < 0 or number > MAX_BIGINT:
+        raise _CellError('число вне допустимого диапазона')
+    return int(number)
+
+
+def _parse_bool(value: str) -> bool:
+    normalized = value.strip().casefold()
+    if normalized in TRUE_VALUES:
+        return True
+    if normalized in FALSE_VALUES:
+        return False
+    raise _CellError('ожидается да/нет (1/0, true/false)')
+
+
+_PREMISE_TYPES = {
+    **{value.casefold(): value for value in Premise.PremiseType.values},
+    **{label.casefold(): value for value, label in Premise.PremiseType.choices},
+}
+
+
+def _parse_premise_type(value: str) -> str:
+    try:
+        return _PREMISE_TYPES[value.strip().casefold()]
+    except KeyError:
+        allowed = ', '.join(label for _, label in Premise.PremiseType.choices)
+        raise _CellError(f'допустимые значения: {allowed}') from None
+
+
+def _parse_uuid(value: str) -> UUID:
+    try:
+        return UUID(value.strip())
+    except ValueError:
+        raise _CellError('ожидается UUID') from None
+
+
+def _parse_value(column: str, raw: str):
+    if column in TEXT_FIELDS:
+        value = raw.strip()
+        limit = TEXT_FIELDS[column]
+        if limit is not None and len(value) > limit:
+            raise _CellError(f'не длиннее {limit} символов')
+        return value
+    if column in DECIMAL_FIELDS:
+        return _parse_decimal(raw, *DECIMAL_FIELDS[column])
+    if column in INTEGER_FIELDS:
+        return _parse_integer(raw)
+    if column in BOOLEAN_FIELDS:
+        return _parse_bool(raw)
+    if column == 'premise_type':
+        return _parse_premise_type(raw)
+    if column == 'uuid':
+        return _parse_uuid(raw)
+    if column == 'floor':
+        return _parse_integer(raw)
+    return raw.strip()  # building: UUID или название — разбирается при поиске здания
+
+
+@dataclass
+class _Row:
+    number: int
+    values: dict[str, object]
+    building_id: int | None = None
+    city_id: int | None = None
+
+
+# ─── Импорт ───────────────────────────────────────────────────────────────────
+
+
+class CatalogImporter:
+    def __init__(self, *, batch_size: int = DEFAULT_BATCH_SIZE, create_floors: bool = False, dry_run: bool = False):
+        self.batch_size = max(1, batch_size)
+        self.create_floors = create_floors
+        self.dry_run = dry_run
+        self.report = CatalogImportReport(dry_run=dry_run)
+        # Кэши на весь импорт: ссылка на здание -> (id, city_id) | None; (здание, номер этажа) -> id этажа
+        self._buildings: dict[str, tuple[int, int] | None] = {}
+        self._ambiguous_names: set[str] = set()
+        self._floors: dict[tuple[int, int], int] = {}
+        # Ключи помещений, уже встреченные в файле: uuid или (здание, номер помещения) -> номер строки
+        self._seen: dict[tuple, int] = {}
+
+    def run(self, rows: Iterable[tuple[int, list[str]]]) -> CatalogImportReport:
+        """Импортирует строки таблицы (первая — заголовок); при dry_run всё проверяется и откатывается."""
+        rows = iter(rows)
+        first = next(rows, None)
+        if first is None:
+            raise CatalogImportError('Файл пуст')
+        columns = self._map_header(first[1])
+        with transaction.atomic():
+            batch: list[_Row] = []
+            for number, cells in rows:
+                if not any(cell.strip() for cell in cells):
+                    continue
+                row = self._parse_row(number, columns, cells)
+                if row is not None:
+                    batch.append(row)
+                self.report.rows += 1
+                if len(batch) >= self.batch_size:
+                    self._import_batch(batch)
+                    batch = []
+            if batch:
+                self._import_batch(batch)
+            if self.dry_run:
+                transaction.set_rollback(True)
+        self.report.errors.sort(key=lambda error: error.row)
+        return self.report
+
+    def _map_header(self, header: list[str]) -> list[str | None]:
+        columns: list[str | None] = []
+        for title in header:
+            column = _HEADER_LOOKUP.get(_normalize_header(title))
+            if column is None or column in columns:
+                if title.strip():
+                    self.report.ignored_columns.append(title.strip())
+                column = None
+            columns.append(column)
+        missing = [column for column in REQUIRED_COLUMNS if column not in columns]
+        if missing:
+            raise CatalogImportError(f'Нет обязательных колонок: {", ".join(missing)}')
+        return columns
+
+    def _error(self, row: int, column: str, message: str) -> None:
+        self.report.errors.append(RowError(row=row, column=column, message=message))
+
+    def _parse_row(self, number: int, columns: list[str | None], cells: list[str]) -> _Row | None:
+        values: dict[str, object] = {}
+        ok = True
+        for column, raw in zip(columns, cells, strict=False):
+            if column is None or not raw.strip():
+                continue
+            try:
+                values[column] = _parse_value(column, raw)
+            except _CellError as exc:
+                self._error(number, column, str(exc))
+                ok = False
+        if 'building' not in values:
+            self._error(number, 'building', 'не указано здание')
+            ok = False
+        return _Row(number=number, values=values) if ok else None
+
+    # Пачка: здания -> этажи -> существующие помещения -> проверка -> upsert
+
+    def _import_batch(self, batch: list[_Row]) -> None:
+        batch = self._resolve_buildings(batch)
+        batch = self._resolve_floors(batch)
+        existing_by_uuid, existing_by_number = self._load_existing(batch)
+
+        premises: list[Premise] = []
+        for row in batch:
+            premise = self._build_premise(row, existing_by_uuid, existing_by_number)
+            if premise is not None:
+                premises.append(premise)
+        if not premises:
+            return
+        created = sum(1 for premise in premises if premise.pk is None)
+        if connection.vendor == 'postgresql':
+            _copy_upsert(premises)
+        else:
+            for premise in premises:
+                # Существующие помещения тоже идут INSERT ... ON CONFLICT (uuid): без id конфликт только по uuid
+                premise.pk = None
+            Premise.objects.bulk_create(
+                premises,
+                batch_size=1000,
+                update_conflicts=True,
+                unique_fields=['uuid'],
+                update_fields=UPDATE_FIELDS,
+            )
+        self.report.created += created
+        self.report.updated += len(premises) - created
+
+    def _resolve_buildings(self, batch: list[_Row]) -> list[_Row]:
+        refs = {str(row.values['building']) for row in batch} - self._buildings.keys()
+        if refs:
+            by_uuid: dict[UUID, list[str]] = {}
+            names = set()
+            for ref in refs:
+                try:
+                    by_uuid.setdefault(UUID(ref), []).append(ref)
+                except ValueError:
+                    names.add(ref)
+            found = Building.objects.filter(Q(uuid__in=by_uuid) | Q(name__in=names)).values_list(
+                'id', 'uuid', 'name', 'city_id'
+            )
+            for building_id, building_uuid, name, city_id in found:
+                for ref in by_uuid.get(building_uuid, ()):
+                    self._buildings[ref] = (building_id, city_id)
+                if name in names:
+                    if self._buildings.get(name) is not None:
+                        self._ambiguous_names.add(name)
+                    self._buildings[name] = (building_id, city_id)
+            for ref in refs:
+                self._buildings.setdefault(ref, None)
+
+        resolved = []
+        for row in batch:
+            ref = str(row.values['building'])
+            if ref in self._ambiguous_names:
+                self._error(row.number, 'building', f'несколько зданий с названием «{ref}» — укажите UUID')
+            elif self._buildings[ref] is None:
+                self._error(row.number, 'building', f'здание «{ref}» не найдено')
+            else:
+                row.building_id, row.city_id = self._buildings[ref]
+                resolved.append(row)
+        return resolved
+
+    def _resolve_floors(self, batch: list[_Row]) -> list[_Row]:
+        wanted = {(row.building_id, row.values['floor']) for row in batch if 'floor' in row.values}
+        missing = wanted - self._floors.keys()
+        if missing:
+            self._load_floors(missing)
+            missing -= self._floors.keys()
+            if missing and self.create_floors:
+                Floor.objects.bulk_create(
+                    [
+                        Floor(building_id=building_id, number=number, title=f'Этаж {number}')
+                        for building_id, number in missing
+                    ],
+                    batch_size=1000,
+                )
+                self.report.floors_created += len(missing)
+                self._load_floors(missing)
+
+        resolved = []
+        for row in batch:
+            if 'floor' in row.values and (row.building_id, row.values['floor']) not in self._floors:
+                self._error(row.number, 'floor', f'этаж {row.values["floor"]} не найден в здании')
+            else:
+                resolved.append(row)
+        return resolved
+
+    def _load_floors(self, keys: set[tuple[int, int]]) -> None:
+        floors = Floor.objects.filter(
+            building_id__in={building_id for building_id, _ in keys},
+            number__in={number for _, number in keys},
+        ).values_list('building_id', 'number', 'id')
+        for building_id, number, floor_id in floors:
+            self._floors[(building_id, number)] = floor_id
+
+    def _load_existing(self, batch: list[_Row]) -> tuple[dict[UUID, Premise], dict[tuple[int, str], Premise]]:
+        uuids = {row.values['uuid'] for row in batch if 'uuid' in row.values}
+        numbered = [row for row in batch if 'uuid' not in row.values and row.values.get('room_number')]
+        query = Q(uuid__in=uuids)
+        if numbered:
+            query |= Q(
+                building_id__in={row.building_id for row in numbered},
+                room_number__in={row.values['room_number'] for row in numbered},
+            )
+        by_uuid: dict[UUID, Premise] = {}
+        by_number: dict[tuple[int, str], Premise] = {}
+        for premise in Premise.objects.filter(query).order_by('id'):
+            by_uuid[premise.uuid] = premise
+            if premise.room_number:
+                by_number.setdefault((premise.building_id, premise.room_number), premise)
+        return by_uuid, by_number
+
+    def _build_premise(self, row: _Row, by_uuid: dict, by_number: dict) -> Premise | None:
+        values = dict(row.values)
+        del values['building']
+        floor_number = values.pop('floor', None)
+        premise_uuid = values.pop('uuid', None)
+        room_number = values.get('room_number')
+
+        if premise_uuid is not None:
+            premise = by_uuid.get(premise_uuid) or Premise(uuid=premise_uuid)
+        else:
+            premise = (room_number and by_number.get((row.building_id, room_number))) or Premise()
+        keys = [('uuid', premise.uuid)]
+        if room_number:
+            keys.append(('number', row.building_id, room_number))
+        duplicate_of = next((self._seen[key] for key in keys if key in self._seen), None)
+        if duplicate_of is not None:
+            self._error(row.number, 'uuid' if premise_uuid else 'room_number', f'повтор строки {duplicate_of}')
+            return None
+        for key in keys:
+            self._seen[key] = row.number
+
+        moved = premise.pk is not None and premise.building_id != row.building_id
+        for name, value in values.items():
+            setattr(premise, name, value)
+        premise.building_id = row.building_id
+        premise.city_id = row.city_id
+        if floor_number is not None:
+            premise.floor_id = self._floors[(row.building_id, floor_number)]
+        elif moved:
+            premise.floor_id = None  # этаж прежнего здания, как в Premise.save()
+
+        errors = self._validate(premise)
+        for column, message in errors:
+            self._error(row.number, column, message)
+        if errors:
+            return None
+        premise.full_sell_price = compute_full_sell_price(
+            premise.area, premise.price_per_sqm, premise.available_for_sale
+        )
+        return premise
+
+    @staticmethod
+    def _validate(premise: Premise) -> list[tuple[str, str]]:
+        """Правила Premise.clean и обязательные поля — без full_clean и запросов к БД."""
+        errors = []
+        if premise.area is None:
+            errors.append(('area', 'не указана площадь'))
+        if premise.available_for_sale and not premise.price_per_sqm:
+            errors.append(('price_per_sqm', 'Укажите цену продажи за м² больше 0.'))
+        if premise.available_for_rent and not premise.price_per_month:
+            errors.append(('price_per_month', 'Укажите цену аренды за месяц больше 0.'))
+        return errors
+
+
+# ─── Запись через COPY (PostgreSQL) ───────────────────────────────────────────
+
+_COPY_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+
+
+def _copy_value(value) -> str:
+    """Значение в текстовом формате COPY: NULL — \\N, bool — t/f, спецсимволы строк экранируются."""
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, str):
+        return value.translate(_COPY_ESCAPES)
+    return str(value)
+
+
+def _copy_rows(premises: list[Premise]) -> io.StringIO:
+    """Строки COPY_FIELDS в текстовом формате COPY; created_at/updated_at — как у auto_now_add/auto_now."""
+    now = timezone.now()
+    attnames = [Premise._meta.get_field(name).attname for name in COPY_FIELDS]
+    buffer = io.StringIO()
+    for premise in premises:
+        if premise.created_at is None:
+            premise.created_at = now
+        premise.updated_at = now
+        buffer.write('\t'.join(_copy_value(getattr(premise, attname)) for attname in attnames))
+        buffer.write('\n')
+    buffer.seek(0)
+    return buffer
+
+
+def _copy_from(cursor, sql: str, rows: io.StringIO) -> None:
+    """
+    COPY ... FROM STDIN через драйвер соединения: у psycopg2 — copy_expert, у psycopg 3 — cursor.copy
+    (Django берёт psycopg 3, если он установлен, например с extra native-db).
+    """
+    raw = cursor.cursor
+    if hasattr(raw, 'copy_expert'):
+        raw.copy_expert(sql, rows)
+        return
+    with raw.copy(sql) as copy:
+        copy.write(rows.getvalue())
+
+
+def _copy_upsert(premises: list[Premise]) -> None:
+    """COPY пачки во временную таблицу и один INSERT ... ON CONFLICT (uuid) DO UPDATE в re_premises."""
+    quote = connection.ops.quote_name
+    table = quote(Premise._meta.db_table)
+    columns = ', '.join(quote(Premise._meta.get_field(name).column) for name in COPY_FIELDS)
+    updates = ', '.join(
+        f'{quote(Premise._meta.get_field(name).column)} = EXCLUDED.{quote(Premise._meta.get_field(name).column)}'
+        for name in UPDATE_FIELDS
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'CREATE TEMP TABLE catalog_import_premises ON COMMIT DROP AS SELECT {columns} FROM {table} WITH NO DATA'
+        )
+        _copy_from(cursor, f'COPY catalog_import_premises ({columns}) FROM STDIN', _copy_rows(premises))
+        cursor.execute(
+            f'INSERT INTO {table} ({columns}) SELECT {columns} FROM catalog_import_premises '
+            f'ON CONFLICT ({quote(Premise._meta.get_field("uuid").column)}) DO UPDATE SET {updates}'
+        )
+        cursor.execute('DROP TABLE catalog_import_premises')
+
+
+def import_catalog(
+    data: bytes,
+    filename: str,
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    create_floors: bool = False,
+    dry_run: bool = False,
+) -> CatalogImportReport:
+    """Импорт файла CSV/XLSX; CatalogImportError — если файл не читается целиком."""
+    importer = CatalogImporter(batch_size=batch_size, create_floors=create_floors, dry_run=dry_run)
+    return importer.run(read_table(data, filename))
@@ -0,0 +1,369 @@
+"""
+Загрузка медиа по частям (/api/v1/uploads): сессия, части, завершение, возобновление после обрыва.
+
+Протокол:
+1) start_upload — сессия с размером файла; ответ: uuid, chunk_size, число частей;
+2) части index = 0..N-1 (все по chunk_size, последняя — остаток) — в любом порядке и параллельно;
+   повтор части перезаписывает её. После обрыва клиент запрашивает принятые части и досылает остальные;
+3) finalize_upload — собирает файл, создаёт запись медиа (без чтения файла) и ставит производные
+   в очередь (services.media_derivatives).
+
+Части сразу уходят в хранилище медиа: в S3/MinIO — частями multipart upload (в памяти не больше одной
+части), иначе — в файл-черновик в MEDIA_UPLOAD_TEMP_DIR, который при завершении переносится в хранилище
+(для FileSystemStorage — переименованием, без копирования). Память не зависит от размера файла.
+"""
+
+import contextlib
+import mimetypes
+import os
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import BinaryIO
+from uuid import UUID
+
+from django.conf import settings
+from django.core.files import File
+from django.core.validators import FileExtensionValidator
+from django.db import models, transaction
+from django.db.models import Max, Sum
+from django.utils import timezone
+
+from ..models import Building, MediaTarget, MediaUpload, MediaUploadChunk, Premise
+from .media_derivatives import TARGET_MODELS, enqueue_media_derivatives
+
+try:
+    from storages.backends.s3 import S3Storage
+except ImportError:  # django-storages не установлен — только локальное хранилище
+    S3Storage = None
+
+# Минимальная часть S3 multipart upload (кроме последней) и предел числа частей
+S3_MIN_PART_SIZE = 5 * 1024 * 1024
+S3_MAX_PARTS = 10_000
+COPY_BUFFER_SIZE = 1024 * 1024
+
+
+class ChunkedUploadError(Exception):
+    """Ошибка загрузки по частям; status — HTTP-статус ответа (404, 409, 422)."""
+
+    def __init__(self, message: str, status: int = 422):
+        super().__init__(message)
+        self.status = status
+
+
+@dataclass(frozen=True)
+class _TargetSpec:
+    parent_model: type[models.Model]
+    parent_field: str
+    file_field: str
+    fields: tuple[str, ...]
+
+
+TARGETS = {
+    MediaTarget.PREMISE_IMAGE: _TargetSpec(Premise, 'premise', 'original', ('title', 'order', 'is_primary')),
+    MediaTarget.PREMISE_VIDEO: _TargetSpec(Premise, 'premise', 'file', ('title', 'order')),
+    MediaTarget.BUILDING_IMAGE: _TargetSpec(
+        Building, 'building', 'original', ('title', 'order', 'is_primary', 'category')
+    ),
+    MediaTarget.BUILDING_VIDEO: _TargetSpec(Building, 'building', 'file', ('title', 'order', 'category')),
+}
+
+
+def _file_field(target: str):
+    return TARGET_MODELS[target]._meta.get_field(TARGETS[target].file_field)
+
+
+def _allowed_extensions(field) -> list[str]:
+    for validator in field.validators:
+        if isinstance(validator, FileExtensionValidator):
+            return list(validator.allowed_extensions)
+    return []
+
+
+class _LocalChunks:
+    """Черновик на диске: часть пишется по смещению index * chunk_size; finalize переносит файл в хранилище."""
+
+    def __init__(self, storage):
+        self.storage = storage
+
+    @staticmethod
+    def path(upload: MediaUpload) -> str:
+        return os.path.join(settings.MEDIA_UPLOAD_TEMP_DIR, f'{upload.uuid.hex}.part')
+
+    def start(self, upload: MediaUpload) -> str:
+        os.makedirs(settings.MEDIA_UPLOAD_TEMP_DIR, exist_ok=True)
+        return ''
+
+    def write(self, upload: MediaUpload, index: int, stream: BinaryIO, length: int) -> str:
+        # Без O_TRUNC: параллельные части пишут в свои диапазоны одного файла
+        fd = os.open(self.path(upload), os.O_RDWR | os.O_CREAT, 0o644)
+        with os.fdopen(fd, 'r+b') as f:
+            f.seek(index * upload.chunk_size)
+            remaining = length
+            while remaining:
+                block = stream.read(min(COPY_BUFFER_SIZE, remaining))
+                if not block:
+                    raise ChunkedUploadError(f'Часть {index} короче заявленных {length} байт')
+                f.write(block)
+                remaining -= len(block)
+        return ''
+
+    def complete(self, upload: MediaUpload, chunks: list[MediaUploadChunk]) -> str:
+        path = self.path(upload)
+        if not os.path.exists(path):
+            # Повтор finalize: файл уже перенесён, но запись медиа не успела создаться
+            if self.storage.exists(upload.storage_name):
+                return upload.storage_name
+            raise ChunkedUploadError('Черновик загрузки не найден — начните загрузку заново', status=409)
+        with _StagedFile(path, upload.filename) as staged:
+            name = self.storage.save(upload.storage_name, staged)
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(path)
+        return name
+
+    def abort(self, upload: MediaUpload) -> None:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self.path(upload))
+
+
+class _StagedFile(File):
+    """Черновик как загруженный файл: FileSystemStorage переносит его (file_move_safe), остальные читают потоком."""
+
+    def __init__(self, path: str, name: str):
+        super().__init__(open(path, 'rb'), name=name)  # noqa: SIM115 — закрывается в File.__exit__
+        self._path = path
+
+    def temporary_file_path(self) -> str:
+        return self._path
+
+
+class _S3Chunks:
+    """Части — S3 multipart upload прямо в ключ будущего файла; в памяти только текущая часть."""
+
+    def __init__(self, storage):
+        self.storage = storage
+
+    @property
+    def client(self):
+        return self.storage.connection.meta.client
+
+    def _key(self, upload: MediaUpload) -> str:
+        from storages.utils import clean_name
+
+        return self.storage._normalize_name(clean_name(upload.storage_name))
+
+    def _location(self, upload: MediaUpload) -> dict:
+        return {'Bucket': self.storage.bucket_name, 'Key': self._key(upload), 'UploadId': upload.s3_upload_id}
+
+    def start(self, upload: MediaUpload) -> str:
+        params = self.storage.get_object_parameters(upload.storage_name)
+        params.setdefault('ContentType', mimetypes.guess_type(upload.filename)[0] or self.storage.default_content_type)
+        if 'ACL' not in params and self.storage.default_acl:
+            params['ACL'] = self.storage.default_acl
+        response = self.client.create_multipart_upload(Bucket=self.storage.bucket_name, Key=self._key(upload), **params)
+        return response['UploadId']
+
+    def write(self, upload: MediaUpload, index: int, stream: BinaryIO, length: int) -> str:
+        data = stream.read(length)
+        if len(data) != length:
+            raise ChunkedUploadError(f'Часть {index} короче заявленных {length} байт')
+        response = self.client.upload_part(**self._location(upload), PartNumber=index + 1, Body=data)
+        return response['ETag']
+
+    def complete(self, upload: MediaUpload, chunks: list[MediaUploadChunk]) -> str:
+        from botocore.exceptions import ClientError
+
+        parts = [{'PartNumber': chunk.index + 1, 'ETag': chunk.etag} for chunk in chunks]
+        try:
+            self.client.complete_multipart_upload(**self._location(upload), MultipartUpload={'Parts': parts})
+        except ClientError as exc:
+            # Повтор finalize после успешного complete: upload id уже закрыт, объект на месте
+            if exc.response.get('Error', {}).get('Code') != 'NoSuchUpload' or not self.storage.exists(
+                upload.storage_name
+            ):
+                raise
+        return upload.storage_name
+
+    def abort(self, upload: MediaUpload) -> None:
+        from botocore.exceptions import ClientError
+
+        with contextlib.suppress(ClientError):
+            self.client.abort_multipart_upload(**self._location(upload))
+
+
+def _backend(storage) -> _LocalChunks | _S3Chunks:
+    if S3Storage is not None and isinstance(storage, S3Storage):
+        return _S3Chunks(storage)
+    return _LocalChunks(storage)
+
+
+def upload_backend(upload: MediaUpload) -> _LocalChunks | _S3Chunks:
+    return _backend(_file_field(upload.target).storage)
+
+
+def _chunk_size_for(size: int, s3: bool) -> int:
+    chunk_size = settings.MEDIA_UPLOAD_CHUNK_SIZE
+    if s3:
+        chunk_size = max(chunk_size, S3_MIN_PART_SIZE, -(-size // S3_MAX_PARTS))
+    return chunk_size
+
+
+def start_upload(
+    *,
+    target: str,
+    object_uuid: UUID,
+    filename: str,
+    size: int,
+    fields: dict | None = None,
+    user=None,
+) -> MediaUpload:
+    """Проверяет назначение, имя и размер файла и открывает сессию (для S3 — multipart upload)."""
+    if target not in TARGETS:
+        raise ChunkedUploadError(f'target: одно из {", ".join(TARGETS)}')
+    spec = TARGETS[target]
+    filename = os.path.basename(filename or '').strip()
+    if not filename:
+        raise ChunkedUploadError('Пустое имя файла')
+    field = _file_field(target)
+    allowed = _allowed_extensions(field)
+    ext = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    if allowed and ext not in allowed:
+        raise ChunkedUploadError(f'Недопустимое расширение .{ext or "?"}; допустимы: {", ".join(allowed)}')
+    if size <= 0 or size > settings.MEDIA_UPLOAD_MAX_SIZE:
+        raise ChunkedUploadError(f'Размер файла должен быть от 1 до {settings.MEDIA_UPLOAD_MAX_SIZE} байт')
+    unknown = set(fields or {}) - set(spec.fields)
+    if unknown:
+        raise ChunkedUploadError(f'Поля не поддерживаются для {target}: {", ".join(sorted(unknown))}')
+
+    object_id = spec.parent_model.objects.filter(uuid=object_uuid).values_list('pk', flat=True).first()
+    if object_id is None:
+        raise ChunkedUploadError(f'{spec.parent_model._meta.verbose_name} {object_uuid} не найдено', status=404)
+
+    # Путь строит upload_to модели (слот — временный токен, как при обычной загрузке до первого save)
+    media = TARGET_MODELS[target](**{f'{spec.parent_field}_id': object_id})
+    upload = MediaUpload(
+        target=target,
+        object_id=object_id,
+        filename=filename,
+        storage_name=field.generate_filename(media, filename),
+        size=size,
+        fields={key: value for key, value in (fields or {}).items() if value is not None},
+        created_by=user,
+        expires_at=timezone.now() + timedelta(hours=settings.MEDIA_UPLOAD_SESSION_TTL_HOURS),
+    )
+    backend = _backend(field.storage)
+    upload.chunk_size = _chunk_size_for(size, isinstance(backend, _S3Chunks))
+    upload.s3_upload_id = backend.start(upload)
+    upload.save()
+    return upload
+
+
+def get_upload(upload_uuid: UUID, user=None) -> MediaUpload:
+    """Сессия по uuid; чужая сессия (кроме суперпользователя) — как несуществующая."""
+    qs = MediaUpload.objects.filter(uuid=upload_uuid)
+    if user is not None and not user.is_superuser:
+        qs = qs.filter(created_by=user)
+    upload = qs.first()
+    if upload is None:
+        raise ChunkedUploadError('Загрузка не найдена', status=404)
+    return upload
+
+
+def _ensure_uploading(upload: MediaUpload) -> None:
+    if upload.status != MediaUpload.Status.UPLOADING:
+        raise ChunkedUploadError(f'Загрузка уже {upload.get_status_display().lower()}', status=409)
+    if upload.expires_at <= timezone.now():
+        raise ChunkedUploadError('Срок загрузки истёк — начните заново', status=409)
+
+
+def validate_chunk(upload: MediaUpload, index: int, length: int | None) -> int:
+    """Проверяет номер и размер части до чтения тела. Возвращает ожидаемый размер."""
+    _ensure_uploading(upload)
+    if not 0 <= index < upload.chunk_count:
+        raise ChunkedUploadError(f'Номер части — от 0 до {upload.chunk_count - 1}')
+    expected = upload.expected_chunk_size(index)
+    if length != expected:
+        raise ChunkedUploadError(f'Часть {index}: ожидается Content-Length {expected}, получено {length}')
+    return expected
+
+
+def write_chunk_data(upload: MediaUpload, index: int, stream: BinaryIO, length: int) -> str:
+    """Пишет тело части в хранилище (только ввод-вывод, без БД). Возвращает etag (для S3)."""
+    return upload_backend(upload).write(upload, index, stream, length)
+
+
+def record_chunk(upload: MediaUpload, index: int, length: int, etag: str) -> None:
+    """Отмечает часть принятой; повтор части обновляет etag."""
+    MediaUploadChunk.objects.update_or_create(upload=upload, index=index, defaults={'size': length, 'etag': etag})
+    MediaUpload.objects.filter(pk=upload.pk).update(updated_at=timezone.now())
+
+
+def received_chunks(upload: MediaUpload) -> tuple[list[int], int]:
+    """Принятые части (номера по возрастанию) и сумма их размеров."""
+    indexes = list(upload.chunks.order_by('index').values_list('index', flat=True))
+    received = upload.chunks.aggregate(total=Sum('size'))['total'] or 0
+    return indexes, received
+
+
+def _create_media(upload: MediaUpload, storage_name: str) -> models.Model:
+    spec = TARGETS[upload.target]
+    model = TARGET_MODELS[upload.target]
+    parent_filter = {f'{spec.parent_field}_id': upload.object_id}
+    fields = dict(upload.fields)
+    if not fields.get('order'):
+        fields['order'] = (model.objects.filter(**parent_filter).aggregate(m=Max('order'))['m'] or 0) + 1
+    media = model(**parent_filter, **fields)
+    setattr(media, spec.file_field, storage_name)
+    media.defer_derivatives = True
+    media.save()
+    enqueue_media_derivatives(upload.target, media.pk)
+    return media
+
+
+def finalize_upload(upload_uuid: UUID, user=None) -> models.Model:
+    """
+    Собирает файл из частей, создаёт запись медиа и ставит производные в очередь.
+
+    Идемпотентно: повтор для завершённой сессии возвращает ту же запись. Сессия блокируется на время
+    завершения — параллельный finalize ждёт и получает тот же результат.
+    """
+    with transaction.atomic():
+        upload = get_upload(upload_uuid, user)
+        upload = MediaUpload.objects.select_for_update().get(pk=upload.pk)
+        if upload.status == MediaUpload.Status.COMPLETED:
+            return TARGET_MODELS[upload.target].objects.get(pk=upload.media_id)
+        _ensure_uploading(upload)
+        chunks = list(upload.chunks.order_by('index'))
+        missing = sorted(set(range(upload.chunk_count)) - {chunk.index for chunk in chunks})
+        if missing:
+            shown = ', '.join(map(str, missing[:20])) + (' …' if len(missing) > 20 else '')
+            raise ChunkedUploadError(f'Не получены части: {shown}', status=409)
+
+        storage_name = upload_backend(upload).complete(upload, chunks)
+        media = _create_media(upload, storage_name)
+        upload.status = MediaUpload.Status.COMPLETED
+        upload.storage_name = storage_name
+        upload.media_id = media.pk
+        upload.save(update_fields=['status', 'storage_name', 'media_id', 'updated_at'])
+        upload.chunks.all().delete()
+    return media
+
+
+def abort_upload(upload: MediaUpload) -> None:
+    """Отменяет незавершённую загрузку: черновик / multipart upload удаляются."""
+    if upload.status != MediaUpload.Status.UPLOADING:
+        return
+    upload_backend(upload).abort(upload)
+    upload.status = MediaUpload.Status.ABORTED
+    upload.save(update_fields=['status', 'updated_at'])
+    upload.chunks.all().delete()
+
+
+def purge_expired_uploads(now=None) -> int:
+    """Отменяет брошенные загрузки с истёкшим сроком. Возвращает их число."""
+    now = now or timezone.now()
+    expired = MediaUpload.objects.filter(status=MediaUpload.Status.UPLOADING, expires_at__lte=now)
+    count = 0
+    for upload in expired.iterator():
+        abort_upload(upload)
+        count += 1
+    return count
@@ -0,0 +1,273 @@
+"""
+Геокодирование зданий через Yandex Geocoder API (management-команда geocode_buildings).
+
+- YandexGeocoder: общий httpx.AsyncClient (keep-alive), не больше concurrency запросов одновременно,
+  TokenBucket вместо фиксированных пауз, повторы с экспоненциальной задержкой при сетевых ошибках, 429 и 5xx;
+- кэш GeocodeCacheEntry по нормализованной строке «город, адрес»: одинаковые адреса геокодируются один раз,
+  повторный запуск не тратит лимит API (в том числе на адреса, по которым ничего не найдено);
+- координаты зданий (и geohash для карты) записываются одним bulk_update.
+
+Для прогонов без ключа и сети — заглушка loadtest.geocoder_stub (YANDEX_GEOCODER_URL).
+"""
+
+import asyncio
+import logging
+import re
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from decimal import Decimal
+
+import httpx
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils import timezone
+
+from ..geo import building_geohash
+from ..models import Building, GeocodeCacheEntry
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+COORD_QUANTUM = Decimal('0.000001')
+EMPTY_ADDRESS = 'пустой address'
+
+
+class GeocodingError(Exception):
+    """Геокодер не ответил (ошибка API, таймаут, исчерпаны повторы)."""
+
+
+def geocode_query(city_name: str, address: str) -> str:
+    return f'{city_name}, {address.strip()}'
+
+
+def normalize_geocode_query(query: str) -> str:
+    """Ключ кэша: регистр, лишние пробелы и пробелы вокруг запятых не влияют на результат геокодера."""
+    return re.sub(r'\s*,\s*', ', ', re.sub(r'\s+', ' ', query)).strip().casefold()
+
+
+def _quantize_coord(value: Decimal) -> Decimal:
+    return value.quantize(COORD_QUANTUM)
+
+
+class TokenBucket:
+    """Ограничение частоты: rate токенов в секунду, запас до burst; acquire() ждёт токен без блокировки loop."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.capacity = max(burst, 1)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class YandexGeocoder:
+    def __init__(
+        self,
+        *,
+        api_key: str,
+        url: str,
+        concurrency: int = 5,
+        rate_per_second: float = 10,
+        retries: int = 3,
+        retry_backoff: float = 0.5,
+        timeout: float = 15,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        self.api_key = api_key
+        self.url = url
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self.requests_sent = 0
+        self._semaphore = asyncio.Semaphore(max(concurrency, 1))
+        self._bucket = TokenBucket(rate_per_second, burst=max(concurrency, 1))
+        self._client = httpx.AsyncClient(
+            timeout=httpx.Timeout(timeout, connect=min(timeout, 5.0)),
+            limits=httpx.Limits(max_connections=max(concurrency, 1)),
+            transport=transport,
+        )
+
+    async def __aenter__(self) -> 'YandexGeocoder':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    async def geocode(self, query: str) -> tuple[Decimal, Decimal] | None:
+        """(широта, долгота) или None, если геокодер ничего не нашёл; GeocodingError — если не ответил."""
+        params = {'apikey': self.api_key, 'geocode': query, 'lang': 'ru_RU', 'format': 'json'}
+        last_error = ''
+        async with self._semaphore:
+            for attempt in range(self.retries + 1):
+                if attempt:
+                    await asyncio.sleep(self.retry_backoff * 2 ** (attempt - 1))
+                await self._bucket.acquire()
+                self.requests_sent += 1
+                try:
+                    response = await self._client.get(self.url, params=params)
+                except httpx.TransportError as exc:
+                    last_error = f'{type(exc).__name__}: {exc}'
+                    logger.warning('Geocoder request %r failed (attempt %s): %s', query, attempt + 1, last_error)
+                    continue
+                if response.status_code in RETRYABLE_STATUS_CODES:
+                    last_error = f'HTTP {response.status_code}'
+                    logger.warning('Geocoder request %r failed (attempt %s): %s', query, attempt + 1, last_error)
+                    continue
+                try:
+                    data = response.json()
+                except ValueError:
+                    raise GeocodingError(f'не JSON, status={response.status_code}') from None
+                if response.status_code != 200:
+                    raise GeocodingError(f'HTTP {response.status_code}: {data.get("message", response.text[:200])}')
+                return self._parse(data)
+        raise GeocodingError(f'геокодер недоступен: {last_error}')
+
+    @staticmethod
+    def _parse(data: dict) -> tuple[Decimal, Decimal] | None:
+        try:
+            members = data['response']['GeoObjectCollection']['featureMember']
+            if not members:
+                return None
+            lon_s, lat_s = members[0]['GeoObject']['Point']['pos'].split()
+            return _quantize_coord(Decimal(lat_s)), _quantize_coord(Decimal(lon_s))
+        except (KeyError, IndexError, ValueError, ArithmeticError) as exc:
+            raise GeocodingError(f'разбор ответа: {exc!r}') from exc
+
+
+@dataclass
+class GeocodeReport:
+    buildings: int = 0
+    updated: int = 0
+    not_found: int = 0
+    failed: int = 0
+    skipped: int = 0
+    cache_hits: int = 0
+    requests: int = 0
+    errors: dict[str, str] = field(default_factory=dict)
+
+
+def build_geocoder(**overrides) -> YandexGeocoder:
+    options = {
+        'api_key': settings.YANDEX_GEOCODER_API_KEY,
+        'url': settings.YANDEX_GEOCODER_URL,
+        'concurrency': settings.GEOCODER_CONCURRENCY,
+        'rate_per_second': settings.GEOCODER_RATE_PER_SECOND,
+        'retries': settings.GEOCODER_RETRIES,
+        'timeout': settings.GEOCODER_TIMEOUT_SECONDS,
+    }
+    options.update({key: value for key, value in overrides.items() if value is not None})
+    return YandexGeocoder(**options)
+
+
+def _load_cache(keys: Iterable[str]) -> dict[str, GeocodeCacheEntry]:
+    return {entry.query_key: entry for entry in GeocodeCacheEntry.objects.filter(query_key__in=list(keys))}
+
+
+def _save_cache(results: dict[str, tuple[str, tuple[Decimal, Decimal] | None]]) -> None:
+    entries = [
+        GeocodeCacheEntry(
+            query_key=key,
+            query=query,
+            latitude=coords[0] if coords else None,
+            longitude=coords[1] if coords else None,
+        )
+        for key, (query, coords) in results.items()
+    ]
+    GeocodeCacheEntry.objects.bulk_create(
+        entries,
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=['query_key'],
+        update_fields=['query', 'latitude', 'longitude', 'updated_at'],
+    )
+
+
+def _save_buildings(buildings: list[Building]) -> None:
+    now = timezone.now()
+    for building in buildings:
+        building.geohash = building_geohash(building.latitude, building.longitude)
+        building.updated_at = now
+    Building.objects.bulk_update(buildings, ['latitude', 'longitude', 'geohash', 'updated_at'], batch_size=500)
+
+
+async def geocode_buildings(
+    buildings: list[Building],
+    geocoder: YandexGeocoder,
+    *,
+    use_cache: bool = True,
+    progress=None,
+) -> GeocodeReport:
+    """
+    Геокодирует здания (с select_related('city')): уникальные адреса — параллельно, с учётом кэша.
+
+    progress(building, query, coords | None, error | None) вызывается по каждому зданию.
+    """
+    report = GeocodeReport(buildings=len(buildings))
+    by_key: dict[str, list[Building]] = {}
+    queries: dict[str, str] = {}
+    for building in buildings:
+        if not building.address or not building.address.strip():
+            report.skipped += 1
+            if progress:
+                progress(building, '', None, EMPTY_ADDRESS)
+            continue
+        query = geocode_query(building.city.name, building.address)
+        key = normalize_geocode_query(query)
+        by_key.setdefault(key, []).append(building)
+        queries.setdefault(key, query)
+
+    cached = await sync_to_async(_load_cache)(by_key) if use_cache else {}
+    resolved: dict[str, tuple[Decimal, Decimal] | None] = {}
+    for key, entry in cached.items():
+        resolved[key] = (entry.latitude, entry.longitude) if entry.found else None
+        report.cache_hits += len(by_key[key])
+
+    to_fetch = [key for key in by_key if key not in resolved]
+    results = await asyncio.gather(*(geocoder.geocode(queries[key]) for key in to_fetch), return_exceptions=True)
+    fetched: dict[str, tuple[str, tuple[Decimal, Decimal] | None]] = {}
+    for key, result in zip(to_fetch, results, strict=True):
+        if isinstance(result, GeocodingError):
+            report.errors[key] = str(result)
+            continue
+        if isinstance(result, BaseException):
+            raise result
+        resolved[key] = result
+        fetched[key] = (queries[key], result)
+    report.requests = geocoder.requests_sent
+    if fetched:
+        await sync_to_async(_save_cache)(fetched)
+
+    changed: list[Building] = []
+    for key, group in by_key.items():
+        error = report.errors.get(key)
+        coords = resolved.get(key)
+        for building in group:
+            if error:
+                report.failed += 1
+            elif coords is None:
+                report.not_found += 1
+            else:
+                building.latitude, building.longitude = coords
+                changed.append(building)
+            if progress:
+                progress(building, queries[key], coords, error)
+    if changed:
+        await sync_to_async(_save_buildings)(changed)
+    report.updated = len(changed)
+    return report
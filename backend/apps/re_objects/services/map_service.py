@@ -0,0 +1,198 @@
+"""
+Карта зданий (GET /buildings/map): выборка по области просмотра и серверная кластеризация.
+
+- область (bbox) ищется по индексу (latitude, longitude) зданий, без PostGIS; bbox через антимеридиан
+  (west > east) — два диапазона долготы;
+- фильтры каталога (sale_type, building_uuids, цена, площадь) — по помещениям, как в /buildings/;
+- zoom < RE_OBJECTS_MAP_CLUSTER_MAX_ZOOM: GROUP BY по префиксу Building.geohash (длина — geo.cluster_precision),
+  в кластере — число зданий, минимальная цена и центр охвата его зданий;
+- крупнее — отдельные здания; если их в области больше RE_OBJECTS_MAP_MAX_BUILDINGS, отдаются кластеры
+  (страница не получает десятки тысяч точек на любом zoom).
+
+Ответ — компактные массивы (BuildingsMapOut.fields задаёт порядок значений) вместо объектов на каждую точку.
+"""
+
+from dataclasses import dataclass
+from decimal import Decimal
+from uuid import UUID
+
+from django.conf import settings
+from django.db.models import Count, Max, Min, Q
+from django.db.models.functions import Substr
+
+from ..geo import cluster_precision
+from ..models import Premise
+from ..schemas import BuildingsMapOut
+
+CLUSTER_FIELDS = ['lat', 'lon', 'count', 'min_price', 'cell']
+BUILDING_FIELDS = ['uuid', 'lat', 'lon', 'min_price', 'title']
+COORD_DIGITS = 6
+
+
+@dataclass(frozen=True)
+class MapBBox:
+    west: float
+    south: float
+    east: float
+    north: float
+
+    @property
+    def crosses_antimeridian(self) -> bool:
+        return self.west > self.east
+
+
+def parse_map_bbox(value: str) -> MapBBox:
+    """bbox 'west,south,east,north' (градусы WGS-84); ValueError с текстом для ответа 422."""
+    parts = [part.strip() for part in value.split(',')]
+    if len(parts) != 4:
+        raise ValueError('bbox: ожидается west,south,east,north')
+    try:
+        west, south, east, north = (float(part) for part in parts)
+    except ValueError:
+        raise ValueError('bbox: координаты должны быть числами') from None
+    if not all(-180 <= lon <= 180 for lon in (west, east)):
+        raise ValueError('bbox: долгота должна быть в диапазоне от -180 до 180')
+    if not all(-90 <= lat <= 90 for lat in (south, north)):
+        raise ValueError('bbox: широта должна быть в диапазоне от -90 до 90')
+    if south > north:
+        raise ValueError('bbox: south больше north')
+    return MapBBox(west=west, south=south, east=east, north=north)
+
+
+def _price_field(sale_type: str | None) -> str:
+    return 'full_sell_price' if sale_type == settings.RE_OBJECTS_SALE_TYPE_SALE else 'price_per_month'
+
+
+def get_map_premise_queryset(
+    bbox: MapBBox,
+    *,
+    sale_type: str | None = None,
+    building_uuids: list[UUID] | None = None,
+    min_price: int | None = None,
+    max_price: int | None = None,
+    min_area: Decimal | None = None,
+    max_area: Decimal | None = None,
+):
+    """Помещения зданий из bbox, подходящие под фильтры каталога (lazy; группировку делает вызывающий)."""
+    qs = Premise.objects.filter(
+        building__latitude__gte=bbox.south,
+        building__latitude__lte=bbox.north,
+    ).exclude(building__geohash='')
+    if bbox.crosses_antimeridian:
+        qs = qs.filter(Q(building__longitude__gte=bbox.west) | Q(building__longitude__lte=bbox.east))
+    else:
+        qs = qs.filter(building__longitude__gte=bbox.west, building__longitude__lte=bbox.east)
+
+    if sale_type == settings.RE_OBJECTS_SALE_TYPE_RENT:
+        qs = qs.filter(available_for_rent=True)
+    elif sale_type == settings.RE_OBJECTS_SALE_TYPE_SALE:
+        qs = qs.filter(available_for_sale=True)
+    if building_uuids:
+        qs = qs.filter(building__uuid__in=building_uuids)
+
+    price_field = _price_field(sale_type)
+    if min_price is not None:
+        qs = qs.filter(**{f'{price_field}__gte': min_price})
+    if max_price is not None:
+        qs = qs.filter(**{f'{price_field}__lte': max_price})
+    if min_area is not None:
+        qs = qs.filter(area__gte=min_area)
+    if max_area is not None:
+        qs = qs.filter(area__lte=max_area)
+    return qs.order_by()
+
+
+def _coord(value) -> float:
+    return round(float(value), COORD_DIGITS)
+
+
+def _price(value) -> int | None:
+    return int(value) if value is not None else None
+
+
+async def _clusters(qs, precision: int, price_field: str) -> tuple[list[list], int]:
+    rows = (
+        qs.values(cell=Substr('building__geohash', 1, precision))
+        .annotate(
+            count=Count('building_id', distinct=True),
+            min_price=Min(price_field),
+            south=Min('building__latitude'),
+            north=Max('building__latitude'),
+            west=Min('building__longitude'),
+            east=Max('building__longitude'),
+        )
+        .order_by('cell')
+    )
+    items = []
+    total = 0
+    async for row in rows:
+        total += row['count']
+        items.append(
+            [
+                _coord((row['south'] + row['north']) / 2),
+                _coord((row['west'] + row['east']) / 2),
+                row['count'],
+                _price(row['min_price']),
+                row['cell'],
+            ]
+        )
+    return items, total
+
+
+async def _buildings(qs, price_field: str, limit: int) -> list[list]:
+    rows = (
+        qs.values('building__uuid', 'building__name', 'building__latitude', 'building__longitude')
+        .annotate(min_price=Min(price_field))
+        .order_by('building__name', 'building__uuid')
+    )[: limit + 1]
+    return [
+        [
+            str(row['building__uuid']),
+            _coord(row['building__latitude']),
+            _coord(row['building__longitude']),
+            _price(row['min_price']),
+            row['building__name'],
+        ]
+        async for row in rows
+    ]
+
+
+async def get_buildings_map(
+    bbox: MapBBox,
+    zoom: int,
+    *,
+    sale_type: str | None = None,
+    building_uuids: list[UUID] | None = None,
+    min_price: int | None = None,
+    max_price: int | None = None,
+    min_area: Decimal | None = None,
+    max_area: Decimal | None = None,
+) -> BuildingsMapOut:
+    """Кластеры или здания в области bbox на уровне zoom (см. описание модуля)."""
+    qs = get_map_premise_queryset(
+        bbox,
+        sale_type=sale_type,
+        building_uuids=building_uuids,
+        min_price=min_price,
+        max_price=max_price,
+        min_area=min_area,
+        max_area=max_area,
+    )
+    price_field = _price_field(sale_type)
+
+    if zoom >= settings.RE_OBJECTS_MAP_CLUSTER_MAX_ZOOM:
+        limit = settings.RE_OBJECTS_MAP_MAX_BUILDINGS
+        items = await _buildings(qs, price_field, limit)
+        if len(items) <= limit:
+            return BuildingsMapOut(mode='buildings', zoom=zoom, total=len(items), fields=BUILDING_FIELDS, items=items)
+
+    precision = cluster_precision(zoom)
+    items, total = await _clusters(qs, precision, price_field)
+    return BuildingsMapOut(
+        mode='clusters',
+        zoom=zoom,
+        precision=precision,
+        total=total,
+        fields=CLUSTER_FIELDS,
+        items=items,
+    )
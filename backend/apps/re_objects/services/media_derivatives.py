@@ -0,0 +1,103 @@
+"""
+Очередь производных медиа: card/detail WebP для фото, превью первого кадра для видео.
+
+Запись медиа, созданная с defer_derivatives=True (загрузка по частям), ставит задачу
+enqueue_media_derivatives в той же транзакции. Воркер build_media_derivatives строит производные
+вне запроса: ошибка откладывает задачу с экспоненциальной задержкой, после
+MEDIA_DERIVATIVES_MAX_ATTEMPTS попыток — статус failed (слишком большое изображение — сразу, без повторов).
+Пока производных нет, API отдаёт оригинал. Пик памяти обработки (ImageStats) сохраняется в задаче.
+Перед построением файл привязывается к blob по содержимому (media_store.adopt_blob): для уже известного
+содержимого производные не строятся повторно.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import BuildingImage, BuildingVideo, MediaDerivativeJob, MediaTarget, PremiseImage, PremiseVideo
+from .media_processing import ImageTooLargeError
+from .media_store import adopt_blob
+
+logger = logging.getLogger(__name__)
+
+TARGET_MODELS = {
+    MediaTarget.PREMISE_IMAGE: PremiseImage,
+    MediaTarget.PREMISE_VIDEO: PremiseVideo,
+    MediaTarget.BUILDING_IMAGE: BuildingImage,
+    MediaTarget.BUILDING_VIDEO: BuildingVideo,
+}
+
+
+def enqueue_media_derivatives(target: str, media_id: int) -> MediaDerivativeJob:
+    """Ставит построение производных в очередь (в текущей транзакции)."""
+    return MediaDerivativeJob.objects.create(target=target, media_id=media_id)
+
+
+def _retry_delay(attempts: int) -> timedelta:
+    base = settings.MEDIA_DERIVATIVES_RETRY_BASE_SECONDS
+    return timedelta(seconds=min(base * 2 ** (attempts - 1), settings.MEDIA_DERIVATIVES_RETRY_MAX_SECONDS))
+
+
+def process_derivative_job(job: MediaDerivativeJob) -> bool:
+    """Строит производные для одной записи. True — готово (или запись уже удалена); False — ошибка."""
+    job.attempts += 1
+    media = TARGET_MODELS[job.target].objects.filter(pk=job.media_id).first()
+    try:
+        if media is not None:
+            # Точка сохранения: ошибка БД при сохранении производных не ломает транзакцию воркера
+            with transaction.atomic():
+                # Файл загрузки по частям → blob по содержимому: дубликат не хранится и не обрабатывается
+                adopt_blob(media)
+                media.build_derivatives()
+    except Exception as exc:
+        job.last_error = '; '.join(exc.messages) if isinstance(exc, ValidationError) else f'{type(exc).__name__}: {exc}'
+        if job.attempts >= settings.MEDIA_DERIVATIVES_MAX_ATTEMPTS or isinstance(exc.__cause__, ImageTooLargeError):
+            job.status = MediaDerivativeJob.Status.FAILED
+            logger.error('Media derivatives %s #%s failed permanently: %s', job.target, job.media_id, job.last_error)
+        else:
+            job.next_attempt_at = timezone.now() + _retry_delay(job.attempts)
+            logger.warning(
+                'Media derivatives %s #%s failed (attempt %s): %s', job.target, job.media_id, job.attempts, exc
+            )
+        job.save(update_fields=['status', 'attempts', 'last_error', 'next_attempt_at'])
+        return False
+
+    job.status = MediaDerivativeJob.Status.DONE
+    job.last_error = ''
+    job.processed_at = timezone.now()
+    stats = getattr(media, 'derivative_stats', None)
+    job.peak_memory = stats.peak_bytes if stats else None
+    job.save(update_fields=['status', 'attempts', 'last_error', 'processed_at', 'peak_memory'])
+    return True
+
+
+def build_derivatives_batch(*, batch_size: int = 20) -> tuple[int, int]:
+    """
+    Один проход воркера. Возвращает (готово, ошибок).
+
+    Задача берётся под select_for_update(skip_locked=True) — несколько воркеров не обработают её дважды.
+    """
+    job_ids = list(
+        MediaDerivativeJob.objects.filter(status=MediaDerivativeJob.Status.PENDING, next_attempt_at__lte=timezone.now())
+        .order_by('next_attempt_at', 'id')
+        .values_list('id', flat=True)[:batch_size]
+    )
+    done = failed = 0
+    for job_id in job_ids:
+        with transaction.atomic():
+            job = (
+                MediaDerivativeJob.objects.select_for_update(skip_locked=True)
+                .filter(pk=job_id, status=MediaDerivativeJob.Status.PENDING)
+                .first()
+            )
+            if job is None:
+                continue
+            if process_derivative_job(job):
+                done += 1
+            else:
+                failed += 1
+    return done, failed
@@ -3,17 +3,26 @@
 
 Фото: из оригинала — card (560×300, cover) и detail (до 1920×1080, contain).
 Видео: кадр через ffmpeg → card WebP.
+
+Оригинал читается из файла, а не целиком в память; число пикселей ограничено MEDIA_IMAGE_MAX_PIXELS
+(защита от «декомпрессионных бомб»), пик памяти под пиксели пишется в ImageStats.
 """
 from __future__ import annotations
 
 import contextlib
+import hashlib
 import io
+import math
 import os
 import shutil
 import subprocess
 import tempfile
+from collections.abc import Iterator
+from dataclasses import dataclass
 from pathlib import Path
+from typing import BinaryIO
 
+from django.conf import settings
 from django.core.files.base import ContentFile
 from PIL import Image, ImageOps
 
@@ -21,59 +30,182 @@ from PIL import Image, ImageOps
 CARD_SIZE = (560, 300)
 DETAIL_MAX = (1920, 1080)
 WEBP_QUALITY = 85
+# Версия алгоритма производных: увеличить при изменении обработки — общие производные (MediaBlob) пересоберутся
+DERIVATIVES_VERSION = 1
+
+
+def derivatives_key(kind: str) -> str:
+    """Ключ параметров обработки ('image' / 'video'): готовые производные переиспользуются только при совпадении."""
+    params = (kind, CARD_SIZE, DETAIL_MAX if kind == 'image' else None, WEBP_QUALITY, DERIVATIVES_VERSION)
+    return hashlib.sha256(repr(params).encode()).hexdigest()[:8]
 
 
 class FFmpegNotFoundError(RuntimeError):
     """Бинарник ffmpeg недоступен в PATH."""
 
 
-def _to_rgb(image: Image.Image) -> Image.Image:
+class ImageTooLargeError(ValueError):
+    """Число пикселей оригинала больше MEDIA_IMAGE_MAX_PIXELS (или «бомба» по меркам Pillow)."""
+
+
+# Байт на пиксель в буфере Pillow (RGB хранится как 4 байта на пиксель)
+_BYTES_PER_PIXEL = {'1': 1, 'L': 1, 'P': 1, 'I;16': 2, 'LA': 4, 'PA': 4, 'RGB': 4, 'RGBA': 4, 'CMYK': 4}
+# Режимы, которые масштабируются без предварительной конвертации (RGBA/LA — с предумножением альфы)
+_RESIZE_MODES = {'RGB', 'RGBA', 'L', 'LA'}
+SPOOL_MAX_MEMORY = 8 * 1024 * 1024
+
+
+@dataclass
+class ImageStats:
+    """Сведения об обработке одного изображения (воркер пишет peak_bytes в MediaDerivativeJob)."""
+
+    source_size: tuple[int, int] = (0, 0)
+    source_mode: str = ''
+    decoded_size: tuple[int, int] = (0, 0)
+    # Оценка пика памяти под пиксельные буферы Pillow, одновременно живущие при обработке
+    peak_bytes: int = 0
+
+    def observe(self, *images: Image.Image | None) -> None:
+        live = sum(_buffer_bytes(im) for im in images if im is not None)
+        self.peak_bytes = max(self.peak_bytes, live)
+
+
+def _buffer_bytes(image: Image.Image) -> int:
+    return image.width * image.height * _BYTES_PER_PIXEL.get(image.mode, 4)
+
+
+def _decode_box(size: tuple[int, int]) -> tuple[int, int]:
+    """Минимальный размер декодирования, из которого ещё строятся detail (contain) и card (cover) без апскейла."""
+    w, h = size
+    scale = min(1.0, max(min(DETAIL_MAX[0] / w, DETAIL_MAX[1] / h), max(CARD_SIZE[0] / w, CARD_SIZE[1] / h)))
+    return max(1, math.ceil(w * scale)), max(1, math.ceil(h * scale))
+
+
+@contextlib.contextmanager
+def _seekable_source(fp: BinaryIO) -> Iterator[BinaryIO]:
+    """Pillow нужен seek: поток без него копируется блоками в SpooledTemporaryFile (большое — на диск)."""
+    seekable = False
+    with contextlib.suppress(AttributeError, OSError, ValueError):
+        seekable = fp.seekable()
+    if seekable:
+        yield fp
+        return
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY) as spool:
+        shutil.copyfileobj(fp, spool)
+        spool.seek(0)
+        yield spool
+
+
+def open_raster(fp: BinaryIO, stats: ImageStats | None = None) -> Image.Image:
+    """
+    Открывает изображение и декодирует первый кадр с ограничением памяти.
+
+    Размер проверяется по заголовку до декодирования: больше MEDIA_IMAGE_MAX_PIXELS пикселей —
+    ImageTooLargeError. JPEG декодируется сразу в уменьшенном масштабе (draft, 1/2–1/8), достаточном
+    для card и detail. Анимация не раскладывается на кадры — берётся первый.
+    """
+    stats = stats if stats is not None else ImageStats()
+    try:
+        image = Image.open(fp)
+    except Image.DecompressionBombError as exc:
+        raise ImageTooLargeError(str(exc)) from exc
+    stats.source_size, stats.source_mode = image.size, image.mode
+    width, height = image.size
+    if width * height > settings.MEDIA_IMAGE_MAX_PIXELS:
+        raise ImageTooLargeError(
+            f'Изображение {width}×{height} больше допустимых {settings.MEDIA_IMAGE_MAX_PIXELS} пикселей '
+            '(MEDIA_IMAGE_MAX_PIXELS)'
+        )
+    if image.format == 'JPEG':
+        image.draft(image.mode, _decode_box(image.size))
+    image.load()
+    stats.decoded_size = image.size
+    stats.observe(image)
+    return image
+
+
+def _prepare_mode(image: Image.Image, stats: ImageStats) -> Image.Image:
+    """
+    Приводит декодированный кадр к режиму, который можно масштабировать, с минимумом полноразмерных копий.
+
+    RGB/RGBA/L/LA — без копии; P без прозрачности — сразу в RGB (без промежуточного RGBA); P с одним
+    прозрачным индексом — цвет индекса заменяется белым в палитре, затем RGB; прочая прозрачность — RGBA.
+    """
+    if image.mode in _RESIZE_MODES:
+        return image
+    if image.mode == 'P':
+        transparency = image.info.get('transparency')
+        palette = image.getpalette() or []
+        if isinstance(transparency, int) and transparency * 3 + 3 <= len(palette):
+            palette[transparency * 3 : transparency * 3 + 3] = [255, 255, 255]
+            image.putpalette(palette)
+            del image.info['transparency']
+            transparency = None
+        if transparency is None:
+            converted = image.convert('RGB')
+            stats.observe(image, converted)
+            return converted
+    converted = image.convert('RGBA' if image.has_transparency_data else 'RGB')
+    stats.observe(image, converted)
+    return converted
+
+
+def _flatten(image: Image.Image) -> Image.Image:
+    """Уменьшенная производная → RGB; прозрачность — на белом фоне."""
     if image.mode == 'RGB':
         return image
-    if image.mode == 'RGBA':
+    if image.mode in ('RGBA', 'LA'):
         bg = Image.new('RGB', image.size, (255, 255, 255))
-        bg.paste(image, mask=image.split()[3])
+        bg.paste(image.convert('RGBA') if image.mode == 'LA' else image, mask=image.getchannel('A'))
         return bg
-    if image.mode == 'P':
-        return image.convert('RGBA').convert('RGB')
     return image.convert('RGB')
 
 
-def _first_frame_raster(im: Image.Image) -> Image.Image:
-    """Первый кадр (GIF/WebP-анимация и т.п.)."""
-    im.seek(0)
-    frame = im.copy()
-    return _to_rgb(frame)
-
-
-def _bytes_to_rgb_image(data: bytes) -> Image.Image:
-    im = Image.open(io.BytesIO(data))
-    if getattr(im, 'n_frames', 1) > 1:
-        return _first_frame_raster(im)
-    return _to_rgb(im)
-
-
 def _image_to_webp_bytes(image: Image.Image) -> bytes:
     buf = io.BytesIO()
     image.save(buf, format='WEBP', quality=WEBP_QUALITY, method=6)
     return buf.getvalue()
 
 
-def process_raster_bytes(data: bytes) -> tuple[ContentFile, ContentFile]:
+def process_raster_file(fp: BinaryIO, stats: ImageStats | None = None) -> tuple[ContentFile, ContentFile]:
     """
-    Из байтов растрового изображения — card и detail WebP.
+    Из файла растрового изображения (открытый поток, читается по мере декодирования) — card и detail WebP.
+
+    Память ограничена размером декодированного кадра: detail масштабируется из него в исходном режиме,
+    card — из detail, если тот покрывает 560×300; конвертация в RGB делается уже на уменьшенных копиях.
 
     Returns:
         (card ContentFile, detail ContentFile)
     """
-    rgb = _bytes_to_rgb_image(data)
-    detail_img = ImageOps.contain(rgb, DETAIL_MAX, method=Image.Resampling.LANCZOS)
-    card_img = ImageOps.fit(rgb, CARD_SIZE, method=Image.Resampling.LANCZOS)
-    card_cf = ContentFile(_image_to_webp_bytes(card_img), name='card.webp')
-    detail_cf = ContentFile(_image_to_webp_bytes(detail_img), name='detail.webp')
+    stats = stats if stats is not None else ImageStats()
+    # Полноразмерные кадры освобождаются сбросом ссылок (Image.close() закрыл бы и переданный поток)
+    with _seekable_source(fp) as source_fp:
+        source = _prepare_mode(open_raster(source_fp, stats), stats)
+    detail_img = ImageOps.contain(source, DETAIL_MAX, method=Image.Resampling.LANCZOS)
+    stats.observe(source, detail_img)
+    if detail_img.width >= CARD_SIZE[0] and detail_img.height >= CARD_SIZE[1]:
+        del source
+        card_img = ImageOps.fit(detail_img, CARD_SIZE, method=Image.Resampling.LANCZOS)
+        stats.observe(detail_img, card_img)
+    else:
+        card_img = ImageOps.fit(source, CARD_SIZE, method=Image.Resampling.LANCZOS)
+        stats.observe(source, detail_img, card_img)
+        del source
+    card_cf = ContentFile(_image_to_webp_bytes(_flatten(card_img)), name='card.webp')
+    detail_cf = ContentFile(_image_to_webp_bytes(_flatten(detail_img)), name='detail.webp')
     return card_cf, detail_cf
 
 
+def process_raster_bytes(data: bytes) -> tuple[ContentFile, ContentFile]:
+    """
+    Из байтов растрового изображения — card и detail WebP (см. process_raster_file).
+
+    Returns:
+        (card ContentFile, detail ContentFile)
+    """
+    return process_raster_file(io.BytesIO(data))
+
+
 def _video_input_path(field_file) -> tuple[str, bool]:
     """
     Путь к файлу для ffmpeg и флаг «временный — удалить после использования».
@@ -101,13 +233,15 @@ def _video_input_path(field_file) -> tuple[str, bool]:
     return tmp_path, True
 
 
-def video_file_to_card_webp(field_file) -> ContentFile:
+def video_file_to_card_webp(field_file, stats: ImageStats | None = None) -> ContentFile:
     """
     Первый кадр видео → card.webp (560×300 cover).
 
     Args:
         field_file: django FieldFile сохранённого видео.
+        stats: сюда пишутся размер кадра и пик памяти.
     """
+    stats = stats if stats is not None else ImageStats()
     if not shutil.which('ffmpeg'):
         raise FFmpegNotFoundError(
             'ffmpeg не найден в PATH; установите ffmpeg для превью видео.'
@@ -137,10 +271,10 @@ def video_file_to_card_webp(field_file) -> ContentFile:
             err = (result.stderr or b'').decode('utf-8', errors='replace')[-500:]
             raise RuntimeError(f'ffmpeg завершился с кодом {result.returncode}: {err}')
         with open(png_path, 'rb') as f:
-            frame_data = f.read()
-        rgb = _bytes_to_rgb_image(frame_data)
-        card_img = ImageOps.fit(rgb, CARD_SIZE, method=Image.Resampling.LANCZOS)
-        return ContentFile(_image_to_webp_bytes(card_img), name='card.webp')
+            frame = _prepare_mode(open_raster(f, stats), stats)
+            card_img = ImageOps.fit(frame, CARD_SIZE, method=Image.Resampling.LANCZOS)
+            stats.observe(frame, card_img)
+        return ContentFile(_image_to_webp_bytes(_flatten(card_img)), name='card.webp')
     finally:
         if is_temp:
             with contextlib.suppress(OSError):
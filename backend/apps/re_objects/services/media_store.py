@@ -0,0 +1,316 @@
+"""
+Хранение медиа по содержимому (MediaBlob): один файл на одинаковое содержимое, производные — один раз.
+
+- attach_blob — новая загрузка хешируется потоком (sha256). Такое содержимое уже есть — запись ссылается
+  на существующий blob, файл повторно не сохраняется; иначе он сохраняется в cas/<aa>/<sha256>.<ext> —
+  только после вставки строки blob, так что параллельная загрузка того же содержимого не трогает файл победителя.
+- adopt_blob — уже сохранённый файл без blob (загрузка по частям, записи до этой схемы): хешируется из
+  хранилища, дубликат заменяется ссылкой на blob и удаляется.
+- reuse_blob_derivatives / store_derivatives — card/detail (превью видео) строятся на blob и параметры
+  обработки (media_processing.derivatives_key); все записи с тем же содержимым получают одни и те же файлы.
+- release_blob — снимает ссылку (удаление записи, смена файла); на нуле blob удаляется, файлы — после коммита.
+  Счётчик меняется под блокировкой строки blob; перед удалением ссылки пересчитываются по таблицам медиа.
+"""
+
+import contextlib
+import hashlib
+import os
+from collections.abc import Iterable
+
+from django.core.files.base import File
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, models, transaction
+from django.db.models import F, Q
+
+from ..models import BuildingImage, BuildingVideo, MediaBlob, PremiseImage, PremiseVideo
+from ..storage import delete_files, save_files
+from .media_processing import derivatives_key
+
+CAS_PREFIX = 'cas'
+HASH_BLOCK_SIZE = 1024 * 1024
+# max_length полей original/file/card/detail медиа
+NAME_MAX_LENGTH = 100
+
+MEDIA_MODELS = (PremiseImage, BuildingImage, PremiseVideo, BuildingVideo)
+
+
+def _models_of_kind(kind: str) -> tuple[type[models.Model], ...]:
+    return tuple(model for model in MEDIA_MODELS if model.media_kind == kind)
+
+
+def hash_file(file) -> tuple[str, int]:
+    """sha256 и размер файла, блоками по 1 МБ (File.chunks перематывает файл в начало)."""
+    digest = hashlib.sha256()
+    size = 0
+    for block in file.chunks(HASH_BLOCK_SIZE):
+        digest.update(block)
+        size += len(block)
+    with contextlib.suppress(AttributeError, OSError, ValueError):
+        file.seek(0)
+    return digest.hexdigest(), size
+
+
+def cas_name(digest: str, filename: str) -> str:
+    return f'{CAS_PREFIX}/{digest[:2]}/{digest}{os.path.splitext(filename)[1].lower()}'
+
+
+def _derivative_name(blob: MediaBlob, field: str, key: str) -> str:
+    return f'{CAS_PREFIX}/{blob.sha256[:2]}/{blob.sha256}-{key}/{field}.webp'
+
+
+def _save_cas(files: dict[str, File]) -> dict[str, str]:
+    """
+    Сохраняет производные под адресами по содержимому (несколько — одновременно, см. storage.save_files);
+    вызывается под блокировкой строки blob.
+
+    Файл с тем же именем, на который никто не ссылается (остаток откатившейся транзакции или удалённой
+    базы), перезаписывается; занятое имя (пересборка с теми же параметрами) получает суффикс хранилища.
+    Хранилище с перезаписью (S3, AWS_S3_FILE_OVERWRITE) проверок не требует.
+    """
+    if not getattr(default_storage, 'file_overwrite', False):
+        orphans = [name for name in files if not name_in_use(name) and default_storage.exists(name)]
+        delete_files(default_storage, orphans)
+    return save_files(default_storage, files, max_length=NAME_MAX_LENGTH)
+
+
+def _delete_files(names: Iterable[str]) -> None:
+    delete_files(default_storage, names)
+
+
+def _delete_on_commit(names: Iterable[str]) -> None:
+    names = [name for name in names if name]
+    if names:
+        transaction.on_commit(lambda: _delete_files(names))
+
+
+def count_references(blob_id: int) -> int:
+    """Фактическое число записей медиа со ссылкой на blob."""
+    return sum(model.objects.filter(blob_id=blob_id).count() for model in MEDIA_MODELS)
+
+
+def name_in_use(name: str) -> bool:
+    """Файл упоминается какой-либо записью медиа или blob (перед удалением дубликата)."""
+    for model in MEDIA_MODELS:
+        fields = (model.source_field, *model.derivative_fields)
+        if model.objects.filter(Q.create([(field, name) for field in fields], connector=Q.OR)).exists():
+            return True
+    return MediaBlob.objects.filter(Q(original=name) | Q(card=name) | Q(detail=name)).exists()
+
+
+def _locked_blob(digest: str) -> MediaBlob | None:
+    return MediaBlob.objects.select_for_update().filter(sha256=digest).first()
+
+
+def _save_claimed(name: str, file) -> str:
+    """
+    Сохраняет оригинал под адресом по содержимому после вставки строки blob с этим sha256.
+
+    Уникальный sha256 гарантирует, что другой живой транзакции с этим содержимым нет: файл под этим
+    именем — остаток откатившейся загрузки, его можно заменить. До вставки имя не трогается — иначе
+    проигравшая загрузка удалила бы файл победившей, ещё не закоммиченной.
+    """
+    if not getattr(default_storage, 'file_overwrite', False) and default_storage.exists(name):
+        default_storage.delete(name)
+    return save_files(default_storage, {name: file}, max_length=NAME_MAX_LENGTH)[name]
+
+
+def acquire_blob(file, filename: str) -> MediaBlob:
+    """Blob для загруженного файла: существующий по sha256 (+1 ссылка) или новый с сохранённым файлом."""
+    digest, size = hash_file(file)
+    with transaction.atomic():
+        blob = _locked_blob(digest)
+        if blob is None:
+            name = cas_name(digest, filename)
+            try:
+                with transaction.atomic():
+                    blob = MediaBlob.objects.create(sha256=digest, size=size, original=name, ref_count=1)
+            except IntegrityError:
+                # Параллельная загрузка того же содержимого успела первой — её файл не трогаем
+                blob = MediaBlob.objects.select_for_update().get(sha256=digest)
+            else:
+                saved = _save_claimed(name, file)
+                if saved != name:
+                    MediaBlob.objects.filter(pk=blob.pk).update(original=saved)
+                    blob.original = saved
+                return blob
+        MediaBlob.objects.filter(pk=blob.pk).update(ref_count=F('ref_count') + 1)
+        blob.ref_count += 1
+    return blob
+
+
+def attach_blob(media, update_fields=None) -> int | None:
+    """
+    Перед сохранением записи медиа: новый загруженный файл заменяется ссылкой на blob.
+
+    Возвращает id прежнего blob, если запись на него больше не ссылается (снять через release_blob
+    после сохранения), иначе None.
+    """
+    field = media.source_field
+    if update_fields is not None and field not in update_fields:
+        return None
+    file = getattr(media, field)
+    previous = media.blob_id
+    if file and not file._committed:
+        blob = acquire_blob(file, file.name)
+        setattr(media, field, blob.original)
+        media.blob = blob
+        return previous
+    if previous and (not file or file.name != media.blob.original):
+        media.blob = None
+        return previous
+    return None
+
+
+def hash_stored(name: str) -> tuple[str, int]:
+    with default_storage.open(name, 'rb') as stored:
+        return hash_file(stored)
+
+
+def adopt_blob(media, hashed: tuple[str, int] | None = None) -> MediaBlob | None:
+    """
+    Уже сохранённый файл записи без blob → blob по содержимому.
+
+    Если такое содержимое уже есть, запись переводится на файл blob, а её копия удаляется после коммита.
+    hashed — уже посчитанные (sha256, размер) файла, чтобы не читать его повторно.
+    """
+    field = media.source_field
+    file = getattr(media, field)
+    if media.blob_id or not file:
+        return media.blob if media.blob_id else None
+    own_name = file.name
+    digest, size = hashed or hash_stored(own_name)
+    with transaction.atomic():
+        blob = _locked_blob(digest)
+        if blob is None:
+            try:
+                with transaction.atomic():
+                    blob = MediaBlob.objects.create(sha256=digest, size=size, original=own_name, ref_count=1)
+            except IntegrityError:
+                blob = MediaBlob.objects.select_for_update().get(sha256=digest)
+            else:
+                type(media).objects.filter(pk=media.pk).update(blob=blob)
+                media.blob = blob
+                return blob
+        MediaBlob.objects.filter(pk=blob.pk).update(ref_count=F('ref_count') + 1)
+        type(media).objects.filter(pk=media.pk).update(**{field: blob.original, 'blob': blob})
+        setattr(media, field, blob.original)
+        media.blob = blob
+        if own_name != blob.original and not name_in_use(own_name):
+            _delete_on_commit([own_name])
+    return blob
+
+
+def reuse_blob_derivatives(media) -> bool:
+    """Производные содержимого с текущими параметрами уже есть — подставляет их в запись. True — подставлены."""
+    if not media.blob_id:
+        return False
+    blob = MediaBlob.objects.filter(pk=media.blob_id).first()
+    if blob is None or blob.derivatives_key != derivatives_key(media.media_kind):
+        return False
+    names = {field: getattr(blob, field) for field in media.derivative_fields}
+    if not all(names.values()):
+        return False
+    for field, name in names.items():
+        setattr(media, field, name)
+    return True
+
+
+def store_derivatives(media, files: dict, *, build_seconds: float | None = None) -> None:
+    """
+    Сохраняет построенные производные записи.
+
+    Запись с blob: файлы становятся производными blob (cas/…-card-<ключ>.webp), их получают все записи
+    с тем же содержимым; прежние производные blob удаляются после коммита. Без blob — как раньше:
+    собственные файлы записи, старые удаляются.
+    """
+    if not media.blob_id:
+        if media.pk:
+            delete_files(default_storage, [getattr(media, field).name for field in files if getattr(media, field)])
+        targets = {
+            media._meta.get_field(field).generate_filename(media, content.name): field
+            for field, content in files.items()
+        }
+        saved = save_files(
+            default_storage, {name: files[field] for name, field in targets.items()}, max_length=NAME_MAX_LENGTH
+        )
+        for name, field in targets.items():
+            setattr(media, field, saved[name])
+        return
+
+    key = derivatives_key(media.media_kind)
+    with transaction.atomic():
+        blob = MediaBlob.objects.select_for_update().get(pk=media.blob_id)
+        if blob.derivatives_key == key and all(getattr(blob, field) for field in files):
+            # Другой процесс построил их, пока строили мы
+            names = {field: getattr(blob, field) for field in files}
+        else:
+            stale = [getattr(blob, field) for field in files]
+            targets = {_derivative_name(blob, field, key): field for field in files}
+            saved = _save_cas({name: files[field] for name, field in targets.items()})
+            names = {field: saved[name] for name, field in targets.items()}
+            for field, name in names.items():
+                setattr(blob, field, name)
+            blob.derivatives_key = key
+            blob.build_seconds = build_seconds
+            blob.save(update_fields=[*files, 'derivatives_key', 'build_seconds'])
+            for model in _models_of_kind(media.media_kind):
+                model.objects.filter(blob=blob).update(**names)
+            _delete_on_commit(name for name in stale if name not in names.values())
+    for field, name in names.items():
+        setattr(media, field, name)
+
+
+def share_blob_derivatives(media) -> list[str]:
+    """
+    Собственные производные записи (до этой схемы) → общие производные blob.
+
+    У blob их ещё нет — файлы записи становятся производными blob (без повторной обработки); есть — запись
+    переводится на них, её копии удаляются после коммита. Возвращает имена удаляемых файлов.
+    """
+    fields = media.derivative_fields
+    own = {field: getattr(media, field).name for field in fields if getattr(media, field)}
+    if not media.blob_id or len(own) != len(fields):
+        return []
+    key = derivatives_key(media.media_kind)
+    with transaction.atomic():
+        blob = MediaBlob.objects.select_for_update().get(pk=media.blob_id)
+        if blob.derivatives_key != key or not all(getattr(blob, field) for field in fields):
+            for field, name in own.items():
+                setattr(blob, field, name)
+            blob.derivatives_key = key
+            blob.save(update_fields=[*fields, 'derivatives_key'])
+            return []
+        shared = {field: getattr(blob, field) for field in fields}
+        if shared == own:
+            return []
+        type(media).objects.filter(pk=media.pk).update(**shared)
+        for field, name in shared.items():
+            setattr(media, field, name)
+        released = [name for name in own.values() if name not in shared.values() and not name_in_use(name)]
+        _delete_on_commit(released)
+    return released
+
+
+def invalidate_blob_derivatives(blob_id: int) -> None:
+    """Сбрасывает ключ производных blob: следующее построение создаст их заново (rebuild_media_derivatives)."""
+    MediaBlob.objects.filter(pk=blob_id).update(derivatives_key='')
+
+
+def release_blob(blob_id: int | None) -> None:
+    """Снимает ссылку на blob; последняя ссылка — blob удаляется, его файлы — после коммита."""
+    if not blob_id:
+        return
+    with transaction.atomic():
+        blob = MediaBlob.objects.select_for_update().filter(pk=blob_id).first()
+        if blob is None:
+            return
+        refs = blob.ref_count - 1
+        if refs <= 0:
+            # Перед удалением файлов — фактические ссылки (счётчик мог разойтись после сбоя)
+            refs = count_references(blob.pk)
+        if refs > 0:
+            MediaBlob.objects.filter(pk=blob.pk).update(ref_count=refs)
+            return
+        names = [blob.original, blob.card, blob.detail]
+        blob.delete()
+        _delete_on_commit(name for name in names if not name_in_use(name))
@@ -0,0 +1,346 @@
+"""
+Горячие запросы каталога нативным async-путём (core.async_db, NATIVE_ASYNC_DB).
+
+Те же queryset, что у ORM-версий в premise_service (фильтры, доступность, сортировка), но без экземпляров
+моделей и prefetch: нужные колонки через values(), медиа страницы — двумя запросами на том же соединении
+из пула, строки сразу собираются в словари ответа. Отличия от ORM-пути только в числе запросов:
+флаги этажей здания и доступность помещений этажа считаются в основном запросе (Exists), а не отдельно.
+
+Функции вызываются из premise_service; alias — БД для чтения (primary или реплика каталога).
+"""
+
+import math
+from types import SimpleNamespace
+from uuid import UUID
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Exists, OuterRef
+
+from core.async_db import fetch_count, fetch_values, native_connection
+
+from ..availability import (
+    annotate_premise_availability,
+    floor_is_occupied_value,
+    has_tenant_value,
+    premise_is_available_for_deal,
+)
+from ..models import Building, BuildingImage, BuildingVideo, Floor, Premise, PremiseImage, PremiseVideo
+from ..schemas import BuildingDetailOut, FloorResponseOut
+from .premise_service import (
+    PremiseFilterParams,
+    _format_area,
+    _format_floor_label_price,
+    _premise_label_for_floor_schema,
+    _premise_price_for_api,
+    _premise_rent_price_for_api,
+    _premise_sale_price_for_api,
+    empty_floor_response,
+    get_building_detail_queryset,
+    read_schema_svg_file,
+)
+
+PREMISE_LIST_FIELDS = (
+    'id',
+    'uuid',
+    'title',
+    'area',
+    'price_per_month',
+    'full_sell_price',
+    'available_for_rent',
+    'available_for_sale',
+    'building__uuid',
+    'building__name',
+    'building__address',
+    'floor_id',
+    'floor__title',
+)
+BUILDING_FIELDS = ('id', 'uuid', 'name', 'address', 'description', 'latitude', 'longitude', 'min_rent', 'min_sale')
+FLOOR_PREMISE_FIELDS = (
+    'uuid',
+    'room_number',
+    'title',
+    'area',
+    'price_per_month',
+    'full_sell_price',
+    'available_for_rent',
+    'available_for_sale',
+    'show_rented_button',
+    '_active_booking',
+    '_active_pending_payment',
+)
+
+
+def _storage(model, field: str):
+    return model._meta.get_field(field).storage
+
+
+def _photo_urls(row: dict, storage) -> tuple[str | None, str | None]:
+    """Как premise_service._photo_api_urls: card/detail, до бэкфилла — оригинал."""
+    if row['card'] and row['detail']:
+        return storage.url(row['card']), storage.url(row['detail'])
+    if row['original']:
+        url = storage.url(row['original'])
+        return url, url
+    return None, None
+
+
+def _video_urls(row: dict, storage) -> tuple[str | None, str | None]:
+    """Как premise_service._video_api_urls: превью card и файл."""
+    if row['file'] and row['card']:
+        return storage.url(row['card']), storage.url(row['file'])
+    if row['file']:
+        url = storage.url(row['file'])
+        return url, url
+    return None, None
+
+
+async def _media_by_owner(
+    connection, alias: str, owner: str, image_model, video_model, owner_ids: list[int], *, detail: bool = False
+) -> dict[int, list[dict]]:
+    """
+    Медиа владельцев (помещений или зданий) одним запросом на фото и одним на видео.
+
+    Порядок — как в ORM-пути: основное фото первое, далее по order и id. detail=True — с category и title
+    (деталь здания).
+    """
+    if not owner_ids:
+        return {}
+    extra = ('category', 'title') if detail else ()
+    images = await fetch_values(
+        connection,
+        image_model.objects.filter(**{f'{owner}_id__in': owner_ids})
+        .order_by()
+        .values(f'{owner}_id', 'id', 'order', 'is_primary', 'original', 'card', 'detail', *extra),
+        alias,
+    )
+    videos = await fetch_values(
+        connection,
+        video_model.objects.filter(**{f'{owner}_id__in': owner_ids})
+        .order_by()
+        .values(f'{owner}_id', 'id', 'order', 'file', 'card', *extra),
+        alias,
+    )
+    image_storage, video_storage = _storage(image_model, 'card'), _storage(video_model, 'file')
+    ranked: dict[int, list[tuple]] = {}
+    for row in images:
+        url, full_url = _photo_urls(row, image_storage)
+        if url and full_url:
+            rank = 0 if row['is_primary'] else 1
+            ranked.setdefault(row[f'{owner}_id'], []).append(
+                (rank, row['order'], row['id'], 'photo', url, full_url, row)
+            )
+    for row in videos:
+        url, full_url = _video_urls(row, video_storage)
+        if url and full_url:
+            ranked.setdefault(row[f'{owner}_id'], []).append((1, row['order'], row['id'], 'video', url, full_url, row))
+
+    media: dict[int, list[dict]] = {}
+    for owner_id, items in ranked.items():
+        items.sort(key=lambda item: item[:3])
+        out = media[owner_id] = []
+        for *_, kind, url, full_url, row in items:
+            item = {'type': kind, 'url': url, 'full_url': full_url}
+            if detail:
+                item['category'] = row['category'].strip() if row['category'] else ''
+                item['title'] = row['title'] or None
+            out.append(item)
+    return media
+
+
+def _page(items: list, total: int, page: int, page_size: int) -> dict:
+    return {
+        'items': items,
+        'total': total,
+        'page': page,
+        'page_size': page_size,
+        'total_pages': math.ceil(total / page_size) if page_size > 0 else 0,
+    }
+
+
+def _geo_point(row: dict) -> dict | None:
+    if row['latitude'] is None or row['longitude'] is None:
+        return None
+    return {'lat': float(row['latitude']), 'lon': float(row['longitude'])}
+
+
+def _int_or_none(value) -> int | None:
+    return int(value) if value is not None else None
+
+
+async def native_premise_list(alias: str, queryset, params: PremiseFilterParams) -> dict:
+    """Страница get_filtered_premise_queryset: items, total, page, page_size, total_pages."""
+    qs = queryset.prefetch_related(None).values(*PREMISE_LIST_FIELDS)
+    start = (params.page - 1) * params.page_size
+    async with native_connection(alias) as connection:
+        total = await fetch_count(connection, qs, alias)
+        rows = await fetch_values(connection, qs[start : start + params.page_size], alias)
+        media = await _media_by_owner(
+            connection, alias, 'premise', PremiseImage, PremiseVideo, [row['id'] for row in rows]
+        )
+
+    items = []
+    for row in rows:
+        # Правила цены — общие с ORM-путём (хелперам нужны только атрибуты помещения)
+        premise = SimpleNamespace(**row)
+        items.append(
+            {
+                'uuid': str(row['uuid']),
+                'building_uuid': str(row['building__uuid']),
+                'name': row['title'] or row['building__name'] or '',
+                'price': _premise_price_for_api(premise, params.sale_type),
+                'sale_price': _premise_sale_price_for_api(premise),
+                'rent_price': _premise_rent_price_for_api(premise),
+                'address': row['building__address'],
+                'floor': {'id': str(row['floor_id']), 'title': row['floor__title']} if row['floor_id'] else None,
+                'area': row['area'],
+                'has_tenant': has_tenant_value(available_for_rent=row['available_for_rent']),
+                'media': media.get(row['id'], []),
+            }
+        )
+    return _page(items, total, params.page, params.page_size)
+
+
+async def native_buildings(alias: str, queryset, *, page: int, page_size: int, sale_type: str | None) -> dict:
+    """Страница get_filtered_buildings_queryset в формате get_buildings."""
+    qs = queryset.prefetch_related(None).values(*BUILDING_FIELDS)
+    start = (page - 1) * page_size
+    async with native_connection(alias) as connection:
+        total = await fetch_count(connection, qs, alias)
+        rows = await fetch_values(connection, qs[start : start + page_size], alias)
+        media = await _media_by_owner(
+            connection, alias, 'building', BuildingImage, BuildingVideo, [row['id'] for row in rows]
+        )
+
+    items = []
+    for row in rows:
+        item = {
+            'uuid': str(row['uuid']),
+            'title': row['name'],
+            'address': row['address'],
+            'description': row['description'] or '',
+            'geo_point': _geo_point(row),
+            'media': media.get(row['id'], []),
+        }
+        # Как building_to_list_out: по sale_type — только своя минимальная цена
+        if sale_type != settings.RE_OBJECTS_SALE_TYPE_RENT:
+            item['min_sale_price'] = _int_or_none(row['min_sale'])
+        if sale_type != settings.RE_OBJECTS_SALE_TYPE_SALE:
+            item['min_rent_price'] = _int_or_none(row['min_rent'])
+        items.append(item)
+    return _page(items, total, page, page_size)
+
+
+async def native_building(alias: str, building_uuid: UUID) -> BuildingDetailOut | None:
+    """Деталь здания (как get_building); флаги has_sale / has_rent этажей — в том же запросе, что и этажи."""
+    floors_qs = (
+        Floor.objects.annotate(
+            has_sale=Exists(Premise.objects.filter(floor=OuterRef('pk'), available_for_sale=True)),
+            has_rent=Exists(Premise.objects.filter(floor=OuterRef('pk'), available_for_rent=True)),
+        )
+        .order_by('number')
+        .values('id', 'title', 'has_sale', 'has_rent')
+    )
+    async with native_connection(alias) as connection:
+        rows = await fetch_values(
+            connection,
+            get_building_detail_queryset()
+            .filter(uuid=building_uuid)
+            .values(*BUILDING_FIELDS, 'year_built', 'presentation'),
+            alias,
+        )
+        if not rows:
+            return None
+        row = rows[0]
+        floors = await fetch_values(connection, floors_qs.filter(building_id=row['id']), alias)
+        media = await _media_by_owner(
+            connection, alias, 'building', BuildingImage, BuildingVideo, [row['id']], detail=True
+        )
+
+    items = media.get(row['id'], [])
+    presentation = row['presentation']
+    return BuildingDetailOut(
+        uuid=str(row['uuid']),
+        title=row['name'],
+        address=row['address'],
+        description=row['description'] or '',
+        geo_point=_geo_point(row),
+        floors=[
+            {
+                'key': str(floor['id']),
+                'title': floor['title'],
+                'has_sale': floor['has_sale'],
+                'has_rent': floor['has_rent'],
+            }
+            for floor in floors
+        ],
+        year_built=row['year_built'],
+        presentation=_storage(Building, 'presentation').url(presentation) if presentation else None,
+        min_sale_price=_int_or_none(row['min_sale']),
+        min_rent_price=_int_or_none(row['min_rent']),
+        media_categories=sorted({item['category'] for item in items if item['category']}),
+        media=items,
+    )
+
+
+async def native_premises_for_floor(alias: str, building_uuid: UUID, floor_id: str, sale_type: str) -> FloorResponseOut:
+    """Этаж (как get_premises_for_floor); активные брони и оплаты — в запросе помещений (Exists)."""
+    try:
+        floor_id_int = int(floor_id)
+    except (ValueError, TypeError):
+        return empty_floor_response(building_uuid, floor_id)
+
+    async with native_connection(alias) as connection:
+        floors = await fetch_values(
+            connection,
+            Floor.objects.filter(building__uuid=building_uuid, id=floor_id_int).values(
+                'id', 'number', 'title', 'schema_svg', 'building__uuid'
+            ),
+            alias,
+        )
+        if not floors:
+            return empty_floor_response(building_uuid, floor_id)
+        floor = floors[0]
+        rows = await fetch_values(
+            connection,
+            annotate_premise_availability(Premise.objects.filter(floor_id=floor['id']))
+            .order_by('room_number', 'title', 'id')
+            .values(*FLOOR_PREMISE_FIELDS),
+            alias,
+        )
+
+    items = []
+    for row in rows:
+        premise = SimpleNamespace(**row)
+        is_available = premise_is_available_for_deal(
+            premise=premise,
+            deal_type=sale_type,
+            has_active_booking=row['_active_booking'],
+            has_active_pending_payment=row['_active_pending_payment'],
+        )
+        price = row['full_sell_price'] if sale_type == settings.RE_OBJECTS_SALE_TYPE_SALE else row['price_per_month']
+        items.append(
+            {
+                'uuid': str(row['uuid']),
+                'name': _premise_label_for_floor_schema(premise),
+                'label_area': _format_area(row['area']),
+                'label_price': _format_floor_label_price(price),
+                'is_available': is_available,
+                'is_occupied': floor_is_occupied_value(sale_type, show_rented_button=row['show_rented_button']),
+            }
+        )
+
+    schema_svg = None
+    if floor['schema_svg']:
+        # Чтение файла без БД — в общем пуле потоков, не в потоке ORM
+        schema_svg = await sync_to_async(read_schema_svg_file, thread_sensitive=False)(
+            _storage(Floor, 'schema_svg'), floor['schema_svg']
+        )
+    return FloorResponseOut(
+        building_uuid=str(floor['building__uuid']),
+        floor_id=str(floor['id']),
+        title=floor['title'],
+        floor_number=floor['number'],
+        schema_svg=schema_svg,
+        premises=items,
+    )
@@ -12,6 +12,9 @@
 Рассчитан на async-контекст (Uvicorn + Django 5 + Ninja):
 - публичные функции — async, обращаются к БД через async ORM (aget, acount, async for);
 - построение queryset и маппинг в DTO — синхронные хелперы, без I/O.
+
+При NATIVE_ASYNC_DB get_premise_list, get_buildings, get_building и get_premises_for_floor выполняют те же
+queryset через пул psycopg 3 в event loop (native_catalog, core.async_db) — ответ тот же.
 """
 from decimal import Decimal
 from typing import Optional
@@ -20,8 +23,8 @@ from uuid import UUID
 from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.db.models import Min, Q, Subquery
-from django.utils import timezone
 
+from core.async_db import native_read_alias
 from core.pagination import get_paginated_list
 
 from apps.bookings.models import Booking
@@ -365,6 +368,37 @@ async def get_buildings(
     - min/max area
     Пагинация: page, page_size. Ответ: { items, total, page, page_size, total_pages }.
     """
+    qs = get_filtered_buildings_queryset(
+        sale_type=sale_type,
+        building_uuids=building_uuids,
+        min_price=min_price,
+        max_price=max_price,
+        min_area=min_area,
+        max_area=max_area,
+    )
+    alias = await native_read_alias(Building)
+    if alias is not None:
+        from .native_catalog import native_buildings
+
+        return await native_buildings(alias, qs, page=page, page_size=page_size, sale_type=sale_type)
+    result = await get_paginated_list(
+        qs,
+        page=page,
+        page_size=page_size,
+        to_out=lambda building: building_to_list_out(building, sale_type=sale_type),
+    )
+    return result
+
+
+def get_filtered_buildings_queryset(
+    sale_type: Optional[str] = None,
+    building_uuids: Optional[list[UUID]] = None,
+    min_price: Optional[int] = None,
+    max_price: Optional[int] = None,
+    min_area: Optional[Decimal] = None,
+    max_area: Optional[Decimal] = None,
+):
+    """get_buildings_queryset с фильтрами any-premise списка зданий (lazy, без пагинации)."""
     qs = get_buildings_queryset(sale_type=sale_type)
     if building_uuids:
         qs = qs.filter(uuid__in=building_uuids)
@@ -383,14 +417,7 @@ async def get_buildings(
     if max_area is not None:
         qs = qs.filter(premises__area__lte=max_area)
 
-    qs = qs.distinct().order_by("name")
-    result = await get_paginated_list(
-        qs,
-        page=page,
-        page_size=page_size,
-        to_out=lambda building: building_to_list_out(building, sale_type=sale_type),
-    )
-    return result
+    return qs.distinct().order_by("name")
 
 
 def _build_building_detail_media(building: Building) -> tuple[list[str], list[BuildingMediaItemOut]]:
@@ -431,6 +458,23 @@ def _build_building_detail_media(building: Building) -> tuple[list[str], list[Bu
     return (sorted(categories), media)
 
 
+def get_building_detail_queryset():
+    """Здания с помещениями и аннотациями min_rent, min_sale (деталь здания)."""
+    return (
+        Building.objects.annotate(
+            min_rent=Min(
+                "premises__price_per_month",
+                filter=Q(premises__available_for_rent=True),
+            ),
+            min_sale=Min(
+                "premises__full_sell_price",
+                filter=Q(premises__available_for_sale=True),
+            ),
+        )
+        .filter(premises__isnull=False)
+    )
+
+
 async def get_building(building_uuid: UUID) -> Optional[BuildingDetailOut]:
     """
     Здание по UUID: uuid, title, address, description, floors, year_built, min_sale_price, min_rent_price, media_categories, media.
@@ -438,21 +482,16 @@ async def get_building(building_uuid: UUID) -> Optional[BuildingDetailOut]:
     Только здания с помещениями. Использует aget() и prefetch images, videos.
     В media для детали: url — превью (card), full_url — полный URL медиа.
     """
+    alias = await native_read_alias(Building)
+    if alias is not None:
+        from .native_catalog import native_building
+
+        return await native_building(alias, building_uuid)
     try:
         b = await (
-            Building.objects.select_related("city")
+            get_building_detail_queryset()
+            .select_related("city")
             .prefetch_related("images", "videos")
-            .annotate(
-                min_rent=Min(
-                    "premises__price_per_month",
-                    filter=Q(premises__available_for_rent=True),
-                ),
-                min_sale=Min(
-                    "premises__full_sell_price",
-                    filter=Q(premises__available_for_sale=True),
-                ),
-            )
-            .filter(premises__isnull=False)
             .aget(uuid=building_uuid)
         )
     except Building.DoesNotExist:
@@ -581,6 +620,11 @@ async def get_premise_list(params: PremiseFilterParams) -> PremiseListResponse:
     Использует get_paginated_list (core.pagination).
     """
     qs = get_filtered_premise_queryset(params)
+    alias = await native_read_alias(Premise)
+    if alias is not None:
+        from .native_catalog import native_premise_list
+
+        return PremiseListResponse(**await native_premise_list(alias, qs, params))
     result = await get_paginated_list(
         qs,
         page=params.page,
@@ -642,10 +686,7 @@ def _floor_premise_availability_rows(
 
     pids = [p.pk for p in premises]
     active_booking_pids = set(
-        Booking.objects.filter(
-            premise_id__in=pids,
-            expires_at__gt=timezone.now(),
-        ).values_list('premise_id', flat=True)
+        Booking.objects.active().filter(premise_id__in=pids).values_list('premise_id', flat=True)
     )
     active_pending_payment_pids = set(
         Payment.objects.filter(
@@ -681,6 +722,19 @@ def _floor_premise_availability_rows(
     return out
 
 
+def empty_floor_response(building_uuid: UUID, floor_id: str) -> FloorResponseOut:
+    """Ответ для несуществующего этажа: пустой список помещений."""
+    floor_number = int(floor_id) if str(floor_id).isdigit() else 0
+    return FloorResponseOut(
+        building_uuid=str(building_uuid),
+        floor_id=floor_id,
+        floor_number=floor_number,
+        title='',
+        schema_svg=None,
+        premises=[],
+    )
+
+
 async def get_premises_for_floor(
     building_uuid: UUID,
     floor_id: str,
@@ -691,6 +745,11 @@ async def get_premises_for_floor(
 
     sale_type: rent|sale — is_available по типу сделки; is_occupied см. _floor_premise_availability_rows.
     """
+    alias = await native_read_alias(Floor)
+    if alias is not None:
+        from .native_catalog import native_premises_for_floor
+
+        return await native_premises_for_floor(alias, building_uuid, floor_id, sale_type)
     try:
         floor_id_int = int(floor_id)
         floor = await Floor.objects.select_related("building").aget(
@@ -698,15 +757,7 @@ async def get_premises_for_floor(
             id=floor_id_int,
         )
     except (ValueError, TypeError, Floor.DoesNotExist):
-        floor_number = int(floor_id) if str(floor_id).isdigit() else 0
-        return FloorResponseOut(
-            building_uuid=str(building_uuid),
-            floor_id=floor_id,
-            floor_number=floor_number,
-            title='',
-            schema_svg=None,
-            premises=[],
-        )
+        return empty_floor_response(building_uuid, floor_id)
 
     premises = [
         p
@@ -746,17 +797,16 @@ def _read_floor_schema_svg(floor: Floor) -> Optional[str]:
     """Читает SVG-схему этажа и возвращает её как текст."""
     if not floor.schema_svg:
         return None
+    return read_schema_svg_file(floor.schema_svg.storage, floor.schema_svg.name)
+
 
+def read_schema_svg_file(storage, name: str) -> Optional[str]:
+    """Текст SVG-схемы этажа из storage; нет файла или ошибка чтения — None."""
     try:
-        floor.schema_svg.open("rb")
-        data = floor.schema_svg.read()
+        with storage.open(name, "rb") as fh:
+            data = fh.read()
     except (OSError, ValueError):
         return None
-    finally:
-        try:
-            floor.schema_svg.close()
-        except (OSError, ValueError):
-            pass
 
     if isinstance(data, bytes):
         return data.decode("utf-8", errors="replace")
@@ -0,0 +1,23 @@
+"""
+Сигналы re_objects: снятие ссылки на общий файл медиа (MediaBlob) при удалении записи.
+
+catalog_prices_changed — цены помещений изменены массово (services.bulk_pricing), без Premise.save()
+и post_save; отправляется после коммита один раз на набор, аргумент building_ids — здания с изменёнными ценами.
+"""
+
+from django.db.models.signals import post_delete
+from django.dispatch import Signal, receiver
+
+from .models import BuildingImage, BuildingVideo, PremiseImage, PremiseVideo
+from .services.media_store import release_blob
+
+catalog_prices_changed = Signal()
+
+
+@receiver(post_delete, sender=PremiseImage)
+@receiver(post_delete, sender=BuildingImage)
+@receiver(post_delete, sender=PremiseVideo)
+@receiver(post_delete, sender=BuildingVideo)
+def release_media_blob(sender, instance, **kwargs):
+    # Удаляется и каскадом (помещение, здание); файлы удаляются вместе с последней ссылкой
+    release_blob(instance.blob_id)
@@ -0,0 +1,125 @@
+"""
+Хранилище медиа для S3/MinIO (USE_MINIO=True) и пакетные операции с файлами для любого хранилища.
+
+MediaS3Storage — S3Storage django-storages, у которого:
+- большие файлы (видео, презентации, оригиналы) уходят multipart upload с параллельными частями
+  (MEDIA_S3_MULTIPART_THRESHOLD, MEDIA_S3_MULTIPART_CHUNKSIZE, MEDIA_S3_MAX_CONCURRENCY);
+- save_many пишет несколько файлов одновременно (card и detail одного фото);
+- delete_many удаляет пачками через DeleteObjects (до MEDIA_S3_DELETE_BATCH_SIZE ключей за запрос).
+
+save_files / delete_files используют эти методы, если хранилище их поддерживает, иначе — по одному файлу
+(локальное FileSystemStorage).
+"""
+
+import threading
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+from django.conf import settings
+from django.core.files.base import File
+from storages.backends.s3 import S3Storage
+from storages.utils import clean_name
+
+# Предел ключей в одном запросе DeleteObjects
+S3_DELETE_MAX_KEYS = 1000
+
+
+class MediaS3Storage(S3Storage):
+    """S3Storage с параллельными частями multipart upload, save_many и пакетным delete_many."""
+
+    def get_default_settings(self):
+        return {
+            **super().get_default_settings(),
+            'multipart_threshold': settings.MEDIA_S3_MULTIPART_THRESHOLD,
+            'multipart_chunksize': settings.MEDIA_S3_MULTIPART_CHUNKSIZE,
+            'max_concurrency': settings.MEDIA_S3_MAX_CONCURRENCY,
+            'delete_batch_size': settings.MEDIA_S3_DELETE_BATCH_SIZE,
+        }
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._executor: ThreadPoolExecutor | None = None
+        self._pool_lock = threading.Lock()
+        # Явно заданные AWS_S3_TRANSFER_CONFIG / AWS_S3_CLIENT_CONFIG (или параметры STORAGES) не трогаем
+        if 'transfer_config' not in kwargs and getattr(settings, 'AWS_S3_TRANSFER_CONFIG', None) is None:
+            self.transfer_config = TransferConfig(
+                multipart_threshold=self.multipart_threshold,
+                multipart_chunksize=self.multipart_chunksize,
+                max_concurrency=self.max_concurrency,
+                use_threads=True,
+            )
+        if 'client_config' not in kwargs and getattr(settings, 'AWS_S3_CLIENT_CONFIG', None) is None:
+            # Части одного файла идут параллельно через клиент потока — пул соединений не меньше их числа
+            self.client_config = self.client_config.merge(Config(max_pool_connections=max(10, self.max_concurrency)))
+
+    def _pool(self) -> ThreadPoolExecutor:
+        # Потоки живут вместе с хранилищем: клиент boto3 (connection — свой на поток) создаётся один раз
+        with self._pool_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix='media-s3')
+            return self._executor
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        state.pop('_executor', None)
+        state.pop('_pool_lock', None)
+        return state
+
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        self._executor = None
+        self._pool_lock = threading.Lock()
+
+    def save_many(self, files: dict[str, File], max_length: int | None = None) -> dict[str, str]:
+        """
+        Сохраняет файлы одновременно (до max_concurrency потоков). Возвращает {запрошенное имя: сохранённое}.
+
+        Ошибка одного файла — уже сохранённые удаляются, исключение пробрасывается.
+        """
+        if len(files) < 2:
+            return {name: self.save(name, content, max_length=max_length) for name, content in files.items()}
+        futures = {name: self._pool().submit(self.save, name, content, max_length) for name, content in files.items()}
+        wait(futures.values())
+        saved = {name: future.result() for name, future in futures.items() if future.exception() is None}
+        failed = next((future.exception() for future in futures.values() if future.exception() is not None), None)
+        if failed is not None:
+            self.delete_many(saved.values())
+            raise failed
+        return saved
+
+    def delete_many(self, names: Iterable[str]) -> None:
+        """Удаляет объекты пачками DeleteObjects; отсутствующие ключи — не ошибка (как delete)."""
+        keys = list(dict.fromkeys(self._normalize_name(clean_name(name)) for name in names if name))
+        client = self.connection.meta.client
+        batch_size = max(1, min(self.delete_batch_size, S3_DELETE_MAX_KEYS))
+        errors = []
+        for start in range(0, len(keys), batch_size):
+            response = client.delete_objects(
+                Bucket=self.bucket_name,
+                Delete={'Objects': [{'Key': key} for key in keys[start : start + batch_size]], 'Quiet': True},
+            )
+            errors += [error for error in response.get('Errors', []) if error.get('Code') != 'NoSuchKey']
+        if errors:
+            details = ', '.join(f'{error.get("Key")}: {error.get("Code")}' for error in errors[:5])
+            raise OSError(f'Не удалось удалить объектов: {len(errors)} ({details})')
+
+
+def save_files(storage, files: dict[str, File], max_length: int | None = None) -> dict[str, str]:
+    """Сохраняет несколько файлов (одновременно, если хранилище умеет save_many)."""
+    if hasattr(storage, 'save_many'):
+        return storage.save_many(files, max_length=max_length)
+    return {name: storage.save(name, content, max_length=max_length) for name, content in files.items()}
+
+
+def delete_files(storage, names: Iterable[str]) -> None:
+    """Удаляет несколько файлов (одним пакетом, если хранилище умеет delete_many)."""
+    names = [name for name in names if name]
+    if not names:
+        return
+    if hasattr(storage, 'delete_many'):
+        storage.delete_many(names)
+        return
+    for name in names:
+        storage.delete(name)
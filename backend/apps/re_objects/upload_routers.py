@@ -0,0 +1,198 @@
+"""
+Загрузка медиа по частям (/api/v1/uploads, services.chunked_upload).
+
+1) POST /uploads — сессия: target, uuid помещения/здания, имя и размер файла → uuid, chunk_size, chunk_count;
+2) PUT /uploads/{uuid}/chunks/{index} — тело части (application/octet-stream), Content-Length — точный
+   размер части; части можно слать параллельно и повторять;
+3) GET /uploads/{uuid} — принятые части: после обрыва дослать остальные;
+4) POST /uploads/{uuid}/finalize — запись медиа; производные строит воркер build_media_derivatives;
+5) DELETE /uploads/{uuid} — отмена.
+
+Нужны JWT и право на добавление медиа нужного типа (например, re_objects.add_premiseimage).
+Запись части в хранилище выполняется вне потока синхронных обработчиков (thread_sensitive=False).
+"""
+
+from uuid import UUID
+
+from asgiref.sync import sync_to_async
+from ninja import Router
+from ninja.errors import HttpError
+
+from api.schemas import ProblemDetail
+from apps.accounts.services.auth_service import jwt_auth
+
+from .errors import ReObjectsErrorCodes, create_re_objects_error
+from .models import MediaUpload
+from .schemas import MediaUploadChunkOut, MediaUploadFinalizeOut, MediaUploadIn, MediaUploadOut
+from .services.chunked_upload import (
+    TARGETS,
+    ChunkedUploadError,
+    abort_upload,
+    finalize_upload,
+    get_upload,
+    received_chunks,
+    record_chunk,
+    start_upload,
+    validate_chunk,
+    write_chunk_data,
+)
+from .services.media_derivatives import TARGET_MODELS
+
+uploads_router = Router(tags=['Uploads'])
+
+ERROR_RESPONSES = {401: ProblemDetail, 403: ProblemDetail, 404: ProblemDetail, 409: ProblemDetail}
+
+
+def _error(exc: ChunkedUploadError, instance: str) -> tuple[int, dict]:
+    """404/409 — ProblemDetail; ошибки данных (422) — как HttpError валидации."""
+    if exc.status == 404:
+        code, title = ReObjectsErrorCodes.NOT_FOUND, 'Not Found'
+    elif exc.status == 409:
+        code, title = ReObjectsErrorCodes.UPLOAD_CONFLICT, 'Conflict'
+    else:
+        raise HttpError(exc.status, str(exc))
+    return exc.status, create_re_objects_error(
+        status=exc.status, code=code, title=title, detail=str(exc), instance=instance
+    )
+
+
+def _upload_out(upload: MediaUpload) -> dict:
+    indexes, received = received_chunks(upload)
+    return {
+        'uuid': upload.uuid,
+        'target': upload.target,
+        'filename': upload.filename,
+        'status': upload.status,
+        'size': upload.size,
+        'chunk_size': upload.chunk_size,
+        'chunk_count': upload.chunk_count,
+        'received_chunks': indexes,
+        'received_bytes': received,
+        'expires_at': upload.expires_at,
+        'media_id': upload.media_id,
+    }
+
+
+def _content_length(request) -> int | None:
+    try:
+        return int(request.META.get('CONTENT_LENGTH') or '')
+    except ValueError:
+        return None
+
+
+@uploads_router.post(
+    '',
+    response={201: MediaUploadOut, **ERROR_RESPONSES},
+    auth=jwt_auth,
+    summary='Начать загрузку файла по частям',
+    description=(
+        'Открывает сессию загрузки фото/видео помещения или здания. Ответ: uuid сессии, chunk_size и '
+        'chunk_count — части 0..chunk_count-1 (все по chunk_size, последняя — остаток) отправляются '
+        'PUT /uploads/{uuid}/chunks/{index}. Сессия действует MEDIA_UPLOAD_SESSION_TTL_HOURS часов.'
+    ),
+)
+async def upload_create(request, payload: MediaUploadIn):
+    """Сессия загрузки. 403 — нет права на добавление медиа этого типа, 404 — нет помещения/здания."""
+    model = TARGET_MODELS[payload.target]
+    if not await sync_to_async(request.auth.has_perm)(f're_objects.add_{model._meta.model_name}'):
+        return 403, create_re_objects_error(
+            status=403,
+            code=ReObjectsErrorCodes.FORBIDDEN,
+            title='Forbidden',
+            detail=f'Нет права на добавление: {model._meta.verbose_name}.',
+            instance='/api/v1/uploads',
+        )
+    fields = payload.dict(include=set(TARGETS[payload.target].fields), exclude_none=True)
+    try:
+        upload = await sync_to_async(start_upload)(
+            target=payload.target,
+            object_uuid=payload.object_uuid,
+            filename=payload.filename,
+            size=payload.size,
+            fields=fields,
+            user=request.auth,
+        )
+    except ChunkedUploadError as exc:
+        return _error(exc, '/api/v1/uploads')
+    return 201, await sync_to_async(_upload_out)(upload)
+
+
+@uploads_router.get(
+    '/{upload_uuid}',
+    response={200: MediaUploadOut, **ERROR_RESPONSES},
+    auth=jwt_auth,
+    summary='Состояние загрузки по частям',
+    description='received_chunks — принятые части; после обрыва отправьте недостающие и вызовите finalize.',
+)
+async def upload_status(request, upload_uuid: UUID):
+    try:
+        upload = await sync_to_async(get_upload)(upload_uuid, request.auth)
+    except ChunkedUploadError as exc:
+        return _error(exc, f'/api/v1/uploads/{upload_uuid}')
+    return 200, await sync_to_async(_upload_out)(upload)
+
+
+@uploads_router.put(
+    '/{upload_uuid}/chunks/{index}',
+    response={200: MediaUploadChunkOut, **ERROR_RESPONSES},
+    auth=jwt_auth,
+    summary='Часть файла',
+    description=(
+        'Тело — байты части (Content-Type: application/octet-stream), Content-Length — ровно размер части. '
+        'Повтор части перезаписывает её; части можно отправлять параллельно и в любом порядке.'
+    ),
+)
+async def upload_chunk(request, upload_uuid: UUID, index: int):
+    """Пишет часть в хранилище (S3 — upload_part, иначе — черновик на диске) и отмечает её принятой."""
+    instance = f'/api/v1/uploads/{upload_uuid}/chunks/{index}'
+    try:
+        upload = await sync_to_async(get_upload)(upload_uuid, request.auth)
+        length = validate_chunk(upload, index, _content_length(request))
+        etag = await sync_to_async(write_chunk_data, thread_sensitive=False)(upload, index, request, length)
+        await sync_to_async(record_chunk)(upload, index, length, etag)
+    except ChunkedUploadError as exc:
+        return _error(exc, instance)
+    _, received = await sync_to_async(received_chunks)(upload)
+    return 200, {'index': index, 'size': length, 'received_bytes': received}
+
+
+@uploads_router.post(
+    '/{upload_uuid}/finalize',
+    response={200: MediaUploadFinalizeOut, **ERROR_RESPONSES},
+    auth=jwt_auth,
+    summary='Завершить загрузку по частям',
+    description=(
+        'Собирает файл, создаёт запись медиа и ставит построение производных в очередь; до их готовности '
+        'API отдаёт оригинал. 409 — не все части получены (список в detail). Повтор возвращает ту же запись.'
+    ),
+)
+async def upload_finalize(request, upload_uuid: UUID):
+    try:
+        media = await sync_to_async(finalize_upload)(upload_uuid, request.auth)
+        upload = await sync_to_async(get_upload)(upload_uuid, request.auth)
+    except ChunkedUploadError as exc:
+        return _error(exc, f'/api/v1/uploads/{upload_uuid}/finalize')
+    file = getattr(media, TARGETS[upload.target].file_field)
+    derivatives_ready = bool(media.card) if upload.target.endswith('_video') else bool(media.card and media.detail)
+    return 200, {
+        'upload_uuid': upload.uuid,
+        'target': upload.target,
+        'media_id': media.pk,
+        'url': file.url,
+        'derivatives': 'ready' if derivatives_ready else 'pending',
+    }
+
+
+@uploads_router.delete(
+    '/{upload_uuid}',
+    response={204: None, **ERROR_RESPONSES},
+    auth=jwt_auth,
+    summary='Отменить загрузку по частям',
+)
+async def upload_abort(request, upload_uuid: UUID):
+    try:
+        upload = await sync_to_async(get_upload)(upload_uuid, request.auth)
+        await sync_to_async(abort_upload)(upload)
+    except ChunkedUploadError as exc:
+        return _error(exc, f'/api/v1/uploads/{upload_uuid}')
+    return 204, None
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import ReferralLink
+from .models import ReferralDailyStats, ReferralLink
 
 
 @admin.register(ReferralLink)
@@ -10,3 +10,18 @@ class ReferralLinkAdmin(admin.ModelAdmin):
     search_fields = ('code', 'contact_phone', 'referrer__email', 'referrer__username')
     raw_id_fields = ('referrer', 'premise')
 
+
+
+@admin.register(ReferralDailyStats)
+class ReferralDailyStatsAdmin(admin.ModelAdmin):
+    list_display = ('link', 'day', 'clicks', 'bookings', 'payments', 'updated_at')
+    list_filter = ('day',)
+    search_fields = ('link__code', 'link__referrer__email')
+    raw_id_fields = ('link',)
+    date_hierarchy = 'day'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
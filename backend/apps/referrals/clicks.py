@@ -0,0 +1,111 @@
+"""
+Учёт переходов по реферальным ссылкам с буферизацией записи.
+
+POST /referrals/clicks только кладёт (code, время) в буфер процесса — без запросов к БД. Буфер сбрасывается
+одной пачкой: коды переводятся в id ссылок одним SELECT, переходы пишутся bulk_create в журнал
+ReferralClick (отдельная таблица только на вставку, ReferralLink/Payment/Booking не трогаются).
+
+Сброс: когда в буфере набралось REFERRAL_CLICKS_FLUSH_SIZE событий (его выполняет запрос, переполнивший
+буфер), раз в REFERRAL_CLICKS_FLUSH_SECONDS из фонового потока и при остановке процесса. При недоступной БД
+события остаются в буфере, но не больше REFERRAL_CLICKS_BUFFER_MAX — лишние отбрасываются и считаются.
+"""
+
+import atexit
+import logging
+import threading
+import time
+from datetime import datetime
+from uuid import UUID
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from .models import ReferralClick, ReferralLink
+
+logger = logging.getLogger(__name__)
+
+BULK_BATCH_SIZE = 1000
+
+
+class ClickBuffer:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._events: list[tuple[UUID, datetime]] = []
+        self._dropped = 0
+        self._flusher: threading.Thread | None = None
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    @property
+    def dropped(self) -> int:
+        return self._dropped
+
+    def add(self, code: UUID, clicked_at: datetime) -> bool:
+        """Добавляет переход; True — буфер набрал REFERRAL_CLICKS_FLUSH_SIZE и его пора сбросить."""
+        self._ensure_flusher()
+        with self._lock:
+            if len(self._events) >= settings.REFERRAL_CLICKS_BUFFER_MAX:
+                self._dropped += 1
+                return True
+            self._events.append((code, clicked_at))
+            return len(self._events) >= settings.REFERRAL_CLICKS_FLUSH_SIZE
+
+    def flush(self) -> int:
+        """Пишет накопленные переходы в БД; возвращает число записанных (неизвестные коды отбрасываются)."""
+        if not self._flush_lock.acquire(blocking=False):
+            return 0  # буфер уже сбрасывает другой поток
+        try:
+            with self._lock:
+                events, self._events = self._events, []
+            if not events:
+                return 0
+            try:
+                return self._write(events)
+            except Exception:
+                logger.exception('Failed to flush %s referral clicks, keeping them for the next flush', len(events))
+                with self._lock:
+                    room = max(settings.REFERRAL_CLICKS_BUFFER_MAX - len(self._events), 0)
+                    self._dropped += max(len(events) - room, 0)
+                    self._events[:0] = events[:room]
+                return 0
+        finally:
+            self._flush_lock.release()
+
+    @staticmethod
+    def _write(events: list[tuple[UUID, datetime]]) -> int:
+        link_ids = dict(
+            ReferralLink.objects.filter(code__in={code for code, _ in events}, is_active=True).values_list('code', 'id')
+        )
+        clicks = [
+            ReferralClick(link_id=link_ids[code], clicked_at=clicked_at)
+            for code, clicked_at in events
+            if code in link_ids
+        ]
+        ReferralClick.objects.bulk_create(clicks, batch_size=BULK_BATCH_SIZE)
+        return len(clicks)
+
+    def _ensure_flusher(self) -> None:
+        interval = settings.REFERRAL_CLICKS_FLUSH_SECONDS
+        if interval <= 0 or self._flusher is not None:
+            return
+        with self._lock:
+            if self._flusher is not None:
+                return
+            self._flusher = threading.Thread(
+                target=self._flush_periodically, args=(interval,), name='referral-clicks-flush', daemon=True
+            )
+            self._flusher.start()
+            atexit.register(self.flush)
+
+    def _flush_periodically(self, interval: float) -> None:
+        while True:
+            time.sleep(interval)
+            try:
+                self.flush()
+            finally:
+                close_old_connections()
+
+
+click_buffer = ClickBuffer()
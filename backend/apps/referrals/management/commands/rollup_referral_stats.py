@@ -0,0 +1,48 @@
+"""
+Свертка переходов, оплат и броней по реферальным ссылкам в дневные счётчики (apps.referrals.rollup).
+
+  uv run manage.py rollup_referral_stats                          # один проход (cron)
+  uv run manage.py rollup_referral_stats --loop --interval 300    # постоянный процесс
+  uv run manage.py rollup_referral_stats --days 30                # пересчитать последние 30 дней
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from apps.referrals.rollup import purge_old_clicks, rollup_referral_stats
+
+PURGE_EVERY_SECONDS = 3600
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает дневную статистику реферальных ссылок и чистит старый журнал переходов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Работать постоянно')
+        parser.add_argument('--interval', type=float, default=300, help='Пауза между проходами, с')
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=None,
+            help='Сколько последних дней пересчитать (по умолчанию REFERRAL_ROLLUP_LOOKBACK_DAYS)',
+        )
+
+    def handle(self, *args, **options):
+        purged_at = 0.0
+        try:
+            while True:
+                close_old_connections()
+                rows = rollup_referral_stats(days=options['days'])
+                self.stdout.write(f'Строк статистики: {rows}')
+                if time.monotonic() - purged_at > PURGE_EVERY_SECONDS:
+                    purged = purge_old_clicks()
+                    purged_at = time.monotonic()
+                    if purged:
+                        self.stdout.write(f'Удалено старых переходов: {purged}')
+                if not options['loop']:
+                    return
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write('Остановлено.')
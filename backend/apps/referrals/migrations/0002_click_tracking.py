@@ -0,0 +1,63 @@
+# Generated by Django 5.2.1 on 2026-10-19 12:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('referrals', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReferralClick',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('clicked_at', models.DateTimeField(db_index=True, verbose_name='Время перехода')),
+                (
+                    'link',
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='clicks',
+                        to='referrals.referrallink',
+                        verbose_name='Ссылка',
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name': 'Переход по реферальной ссылке',
+                'verbose_name_plural': 'Переходы по реферальным ссылкам',
+                'db_table': 'referrals_click',
+            },
+        ),
+        migrations.CreateModel(
+            name='ReferralDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='День')),
+                ('clicks', models.PositiveIntegerField(default=0, verbose_name='Переходы')),
+                ('bookings', models.PositiveIntegerField(default=0, verbose_name='Брони')),
+                ('payments', models.PositiveIntegerField(default=0, verbose_name='Оплаты')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Пересчитано')),
+                (
+                    'link',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='daily_stats',
+                        to='referrals.referrallink',
+                        verbose_name='Ссылка',
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name': 'Статистика ссылки за день',
+                'verbose_name_plural': 'Статистика ссылок по дням',
+                'db_table': 'referrals_daily_stats',
+                'ordering': ['-day'],
+                'indexes': [models.Index(fields=['day'], name='referrals_daily_stats_day')],
+                'constraints': [models.UniqueConstraint(fields=('link', 'day'), name='referrals_daily_stats_link_day')],
+            },
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.1 on 2026-10-19 15:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def deactivate_duplicate_links(apps, schema_editor):
+    """Из нескольких активных ссылок на (реферер, помещение, телефон) остаётся самая ранняя — её и отдавал API."""
+    ReferralLink = apps.get_model('referrals', 'ReferralLink')
+    seen = set()
+    duplicate_ids = []
+    for link_id, *key in (
+        ReferralLink.objects.filter(is_active=True)
+        .order_by('referrer_id', 'premise_id', 'contact_phone', 'created_at', 'id')
+        .values_list('id', 'referrer_id', 'premise_id', 'contact_phone')
+        .iterator()
+    ):
+        key = tuple(key)
+        if key in seen:
+            duplicate_ids.append(link_id)
+        else:
+            seen.add(key)
+    if duplicate_ids:
+        ReferralLink.objects.filter(pk__in=duplicate_ids).update(is_active=False)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('re_objects', '0041_admin_search_trigram_indexes'),
+        ('referrals', '0002_click_tracking'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(deactivate_duplicate_links, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='referrallink',
+            constraint=models.UniqueConstraint(
+                condition=models.Q(('is_active', True)),
+                fields=('referrer', 'premise', 'contact_phone'),
+                name='referrals_one_active_link_per_contact',
+                violation_error_message='У реферера уже есть активная ссылка на это помещение для этого телефона',
+            ),
+        ),
+    ]
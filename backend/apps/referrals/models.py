@@ -29,7 +29,66 @@ class ReferralLink(models.Model):
         verbose_name_plural = 'Реферальные ссылки'
         ordering = ['-created_at']
         db_table = 'referrals_referral_link'
+        constraints = [
+            models.UniqueConstraint(
+                fields=('referrer', 'premise', 'contact_phone'),
+                condition=models.Q(is_active=True),
+                name='referrals_one_active_link_per_contact',
+                violation_error_message='У реферера уже есть активная ссылка на это помещение для этого телефона',
+            ),
+        ]
 
     def __str__(self) -> str:
         return f'{self.code} ({self.referrer_id} -> {self.premise_id})'
 
+
+class ReferralClick(models.Model):
+    """
+    Переход по реферальной ссылке — журнал только на вставку.
+
+    Пишется пачками из буфера (apps.referrals.clicks), читается только сверткой rollup_referral_stats;
+    старые записи удаляются после свертки (REFERRAL_CLICKS_KEEP_DAYS).
+    """
+
+    link = models.ForeignKey(
+        ReferralLink,
+        on_delete=models.CASCADE,
+        related_name='clicks',
+        db_index=False,
+        verbose_name='Ссылка',
+    )
+    clicked_at = models.DateTimeField(db_index=True, verbose_name='Время перехода')
+
+    class Meta:
+        verbose_name = 'Переход по реферальной ссылке'
+        verbose_name_plural = 'Переходы по реферальным ссылкам'
+        db_table = 'referrals_click'
+
+
+class ReferralDailyStats(models.Model):
+    """Счётчики ссылки за день (свертка rollup_referral_stats); статистика для агентов читает только их."""
+
+    link = models.ForeignKey(
+        ReferralLink,
+        on_delete=models.CASCADE,
+        related_name='daily_stats',
+        verbose_name='Ссылка',
+    )
+    day = models.DateField(verbose_name='День')
+    clicks = models.PositiveIntegerField(default=0, verbose_name='Переходы')
+    bookings = models.PositiveIntegerField(default=0, verbose_name='Брони')
+    payments = models.PositiveIntegerField(default=0, verbose_name='Оплаты')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Пересчитано')
+
+    class Meta:
+        verbose_name = 'Статистика ссылки за день'
+        verbose_name_plural = 'Статистика ссылок по дням'
+        ordering = ['-day']
+        db_table = 'referrals_daily_stats'
+        constraints = [
+            models.UniqueConstraint(fields=['link', 'day'], name='referrals_daily_stats_link_day'),
+        ]
+        indexes = [models.Index(fields=['day'], name='referrals_daily_stats_day')]
+
+    def __str__(self) -> str:
+        return f'{self.link_id} {self.day}: {self.clicks}/{self.bookings}/{self.payments}'
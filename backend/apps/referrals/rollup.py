@@ -0,0 +1,110 @@
+"""
+Свертка реферальной активности в дневные счётчики ReferralDailyStats.
+
+Каждый проход заново считает последние REFERRAL_ROLLUP_LOOKBACK_DAYS дней (включая сегодня) и заменяет
+их строки — свертка идемпотентна, повторный или параллельный запуск не удваивает счётчики:
+- clicks — записи журнала ReferralClick по дню перехода;
+- payments — успешные платежи по ссылке по дню создания платежа. Платёж, ставший успешным уже после окна
+  (изменён — updated_at — в окне, создан раньше), пересчитывает payments своего дня создания: иначе
+  поздняя оплата не попала бы ни в один проход;
+- bookings — брони, созданные оплатой по ссылке (Booking.source_payment.referral_link).
+
+Журнал переходов старше REFERRAL_CLICKS_KEEP_DAYS удаляется: эти дни давно свернуты. Для дней, журнал которых
+мог быть удалён (окно --days шире срока хранения), clicks берутся из уже свернутых строк, а не обнуляются.
+"""
+
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from apps.bookings.models import Booking
+from apps.payments.models import Payment
+
+from .models import ReferralClick, ReferralDailyStats
+
+
+def _daily_counts(queryset, link_field: str, date_field: str):
+    return (
+        queryset.annotate(day=TruncDate(date_field))
+        .values_list(link_field, 'day')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+
+
+def _start_of(day: date) -> datetime:
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def _succeeded_referral_payments():
+    return Payment.objects.filter(referral_link__isnull=False, status=Payment.Status.SUCCEEDED)
+
+
+def _recount_late_payments(start: datetime) -> None:
+    """Пересчитывает payments дней создания платежей до окна, ставших успешными (updated_at) в окне."""
+    late_days = set(
+        _succeeded_referral_payments()
+        .filter(created_at__lt=start, updated_at__gte=start)
+        .annotate(day=TruncDate('created_at'))
+        .values_list('day', flat=True)
+    )
+    if not late_days:
+        return
+    rows = [
+        ReferralDailyStats(link_id=link_id, day=day, payments=count)
+        for link_id, day, count in _daily_counts(
+            _succeeded_referral_payments().filter(created_at__date__in=late_days), 'referral_link_id', 'created_at'
+        )
+    ]
+    # Остальные счётчики этих дней не трогаются: их журнал может быть уже удалён
+    ReferralDailyStats.objects.bulk_create(
+        rows, batch_size=1000, update_conflicts=True, unique_fields=['link', 'day'], update_fields=['payments']
+    )
+
+
+def rollup_referral_stats(*, days: int | None = None, today: date | None = None) -> int:
+    """Пересчитывает счётчики за последние days дней; возвращает число записанных строк."""
+    days = settings.REFERRAL_ROLLUP_LOOKBACK_DAYS if days is None else days
+    today = today or timezone.localdate()
+    since = today - timedelta(days=max(days, 1) - 1)
+    start = _start_of(since)
+    # Первый день, журнал переходов которого purge_old_clicks ещё не трогал целиком
+    clicks_since = max(since, today - timedelta(days=settings.REFERRAL_CLICKS_KEEP_DAYS - 1))
+
+    counters: dict[tuple[int, date], dict[str, int]] = defaultdict(lambda: {'clicks': 0, 'bookings': 0, 'payments': 0})
+    sources = (
+        ('clicks', ReferralClick.objects.filter(clicked_at__gte=_start_of(clicks_since)), 'link_id', 'clicked_at'),
+        ('payments', _succeeded_referral_payments().filter(created_at__gte=start), 'referral_link_id', 'created_at'),
+        (
+            'bookings',
+            Booking.objects.filter(source_payment__referral_link__isnull=False, created_at__gte=start),
+            'source_payment__referral_link_id',
+            'created_at',
+        ),
+    )
+    for counter, queryset, link_field, date_field in sources:
+        for link_id, day, count in _daily_counts(queryset, link_field, date_field):
+            counters[(link_id, day)][counter] = count
+
+    with transaction.atomic():
+        if clicks_since > since:
+            stored = ReferralDailyStats.objects.filter(day__gte=since, day__lt=clicks_since, clicks__gt=0)
+            for link_id, day, clicks in stored.values_list('link_id', 'day', 'clicks'):
+                counters[(link_id, day)]['clicks'] = clicks
+        rows = [ReferralDailyStats(link_id=link_id, day=day, **values) for (link_id, day), values in counters.items()]
+        ReferralDailyStats.objects.filter(day__gte=since, day__lte=today).delete()
+        ReferralDailyStats.objects.bulk_create(rows, batch_size=1000)
+        _recount_late_payments(start)
+    return len(rows)
+
+
+def purge_old_clicks(*, now: datetime | None = None) -> int:
+    """Удаляет журнал переходов старше REFERRAL_CLICKS_KEEP_DAYS."""
+    cutoff = (now or timezone.now()) - timedelta(days=settings.REFERRAL_CLICKS_KEEP_DAYS)
+    deleted, _ = ReferralClick.objects.filter(clicked_at__lt=cutoff).delete()
+    return deleted
@@ -1,11 +1,15 @@
+from datetime import timedelta
+
 from asgiref.sync import sync_to_async
-from ninja import Router
+from django.utils import timezone
+from ninja import Query, Router
 
 from api.schemas import ProblemDetail
 from apps.accounts.services.auth_service import jwt_auth
 
-from .schemas import ReferralLinkCreateIn, ReferralLinkOut
-from .services import create_referral_link
+from .clicks import click_buffer
+from .schemas import ReferralClickIn, ReferralLinkCreateIn, ReferralLinkOut, ReferralPeriodStatsOut
+from .services import create_referral_link, get_referral_period_stats
 
 referrals_router = Router(tags=['Referrals'])
 
@@ -15,7 +19,10 @@ referrals_router = Router(tags=['Referrals'])
     response={201: ReferralLinkOut, 401: ProblemDetail, 404: ProblemDetail},
     auth=jwt_auth,
     summary='Сгенерировать реферальную ссылку',
-    description='Создает уникальную ссылку для помещения и возвращает URL с query-параметром ref.',
+    description=(
+        'Создает ссылку для помещения и возвращает URL с query-параметром ref. '
+        'Повторный вызов с тем же помещением и телефоном возвращает уже существующую активную ссылку.'
+    ),
 )
 async def create_referral_link_endpoint(request, data: ReferralLinkCreateIn):
     out, err = await sync_to_async(create_referral_link, thread_sensitive=True)(
@@ -28,3 +35,37 @@ async def create_referral_link_endpoint(request, data: ReferralLinkCreateIn):
         return status, body
     return 201, out
 
+
+
+@referrals_router.post(
+    '/clicks',
+    response={202: None},
+    summary='Отметить переход по реферальной ссылке',
+    description=(
+        'Фронтенд вызывает при открытии страницы с ?ref=. Событие буферизуется и записывается пачкой; '
+        'неизвестные и неактивные коды игнорируются. Всегда 202.'
+    ),
+)
+async def track_referral_click(request, data: ReferralClickIn):
+    if click_buffer.add(data.code, timezone.now()):
+        await sync_to_async(click_buffer.flush)()
+    return 202, None
+
+
+@referrals_router.get(
+    '/stats',
+    response={200: ReferralPeriodStatsOut, 401: ProblemDetail},
+    auth=jwt_auth,
+    summary='Статистика моих реферальных ссылок',
+    description=(
+        'Переходы, брони и оплаты по ссылкам текущего пользователя за последние days дней: итоги, по дням '
+        'и по ссылкам. Данные из дневной свертки (обновляется раз в несколько минут).'
+    ),
+)
+async def get_referral_stats_endpoint(
+    request,
+    days: int = Query(30, ge=1, le=366, description='Период, дней (включая сегодня)'),
+):
+    date_to = timezone.localdate()
+    date_from = date_to - timedelta(days=days - 1)
+    return 200, await get_referral_period_stats(request.auth, date_from, date_to)
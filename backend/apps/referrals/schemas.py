@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import date, datetime
 from uuid import UUID
 
 from ninja import Schema
@@ -15,3 +15,40 @@ class ReferralLinkOut(Schema):
     premise_uuid: str
     created_at: datetime
 
+
+
+class ReferralStatsOut(Schema):
+    links_total: int
+    links_active: int
+    referred_bookings: int
+    paid_payments: int
+    paid_amount: str
+
+
+class ReferralClickIn(Schema):
+    code: UUID
+
+
+class ReferralDailyStatsOut(Schema):
+    day: date
+    clicks: int
+    bookings: int
+    payments: int
+
+
+class ReferralLinkStatsOut(Schema):
+    code: str
+    premise_uuid: str
+    clicks: int
+    bookings: int
+    payments: int
+
+
+class ReferralPeriodStatsOut(Schema):
+    date_from: date
+    date_to: date
+    clicks: int
+    bookings: int
+    payments: int
+    days: list[ReferralDailyStatsOut]
+    links: list[ReferralLinkStatsOut]
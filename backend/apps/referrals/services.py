@@ -1,13 +1,23 @@
+from datetime import date
 from typing import Optional
 from uuid import UUID
 
 from django.conf import settings
+from django.db.models import Count, Q, Sum
 
+from apps.bookings.models import Booking
+from apps.payments.models import Payment
 from apps.re_objects.errors import ReObjectsErrorCodes, create_re_objects_error
 from apps.re_objects.models import Premise
 
-from .models import ReferralLink
-from .schemas import ReferralLinkOut
+from .models import ReferralDailyStats, ReferralLink
+from .schemas import (
+    ReferralDailyStatsOut,
+    ReferralLinkOut,
+    ReferralLinkStatsOut,
+    ReferralPeriodStatsOut,
+    ReferralStatsOut,
+)
 
 
 def _build_referral_url(premise: Premise, referral_link: ReferralLink) -> str:
@@ -37,10 +47,13 @@ def create_referral_link(
             ),
         )
 
-    referral_link = ReferralLink.objects.create(
+    # Активная ссылка на (реферер, помещение, телефон) одна — её гарантирует referrals_one_active_link_per_contact.
+    # get_or_create ловит IntegrityError параллельной вставки и возвращает ссылку, созданную первым запросом.
+    referral_link, _ = ReferralLink.objects.get_or_create(
         referrer=referrer,
         premise=premise,
         contact_phone=phone.strip(),
+        is_active=True,
     )
     return ReferralLinkOut(
         code=str(referral_link.code),
@@ -49,3 +62,50 @@ def create_referral_link(
         created_at=referral_link.created_at,
     ), None
 
+
+
+async def get_referral_stats(referrer) -> ReferralStatsOut:
+    """Сводка по реферальным ссылкам пользователя: ссылки, приведённые брони и оплаты."""
+    links = await ReferralLink.objects.filter(referrer=referrer).aaggregate(
+        total=Count('id'),
+        active=Count('id', filter=Q(is_active=True)),
+    )
+    referred_bookings = await Booking.objects.filter(referrer=referrer).acount()
+    payments = await Payment.objects.filter(
+        referral_link__referrer=referrer,
+        status=Payment.Status.SUCCEEDED,
+    ).aaggregate(count=Count('id'), amount=Sum('amount_value'))
+    return ReferralStatsOut(
+        links_total=links['total'],
+        links_active=links['active'],
+        referred_bookings=referred_bookings,
+        paid_payments=payments['count'],
+        paid_amount=f'{payments["amount"] or 0:.2f}',
+    )
+
+
+async def get_referral_period_stats(referrer, date_from: date, date_to: date) -> ReferralPeriodStatsOut:
+    """Статистика ссылок реферера за период — только из дневных счётчиков (rollup_referral_stats)."""
+    counters = ('clicks', 'bookings', 'payments')
+    rows = ReferralDailyStats.objects.filter(link__referrer=referrer, day__gte=date_from, day__lte=date_to)
+
+    totals = {counter: 0 for counter in counters}
+    days = []
+    async for row in rows.values('day').annotate(**{c: Sum(c) for c in counters}).order_by('day'):
+        days.append(ReferralDailyStatsOut(**row))
+        for counter in counters:
+            totals[counter] += row[counter]
+
+    links = [
+        ReferralLinkStatsOut(
+            code=str(row['link__code']),
+            premise_uuid=str(row['link__premise__uuid']),
+            clicks=row['clicks'],
+            bookings=row['bookings'],
+            payments=row['payments'],
+        )
+        async for row in rows.values('link__code', 'link__premise__uuid')
+        .annotate(**{c: Sum(c) for c in counters})
+        .order_by('-clicks', 'link__code')
+    ]
+    return ReferralPeriodStatsOut(date_from=date_from, date_to=date_to, **totals, days=days, links=links)
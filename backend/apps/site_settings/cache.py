@@ -0,0 +1,99 @@
+"""
+Процессный кэш singleton-настроек сайта.
+
+Раньше каждый публичный запрос делал SingletonModel.load() — get_or_create(pk=1), то есть потенциальную
+запись в БД на каждой странице. Теперь экземпляры хранятся в памяти процесса и читаются без вставок
+(нет строки — отдаётся несохранённый экземпляр с пустыми полями, как раньше после get_or_create).
+
+Инвалидация: SingletonModel.save() записывает новый токен в SiteSettingsVersion (одна строка на все
+воркеры) и сразу сбрасывает кэш своего процесса. Остальные процессы сверяют токен не чаще раза
+в SITE_SETTINGS_CACHE_CHECK_SECONDS — это одно чтение по первичному ключу вместо четырёх get_or_create.
+
+Вместе с экземплярами кэшируются производные значения (memoize) — например, готовое тело и ETag
+для /site-settings/all; они живут до следующей смены версии.
+"""
+
+import threading
+import time
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .models import SiteSettingsVersion
+
+VERSION_PK = 1
+
+
+def read_settings_version() -> str:
+    """Текущий токен версии из БД ('' — настройки ещё ни разу не сохранялись)."""
+    return SiteSettingsVersion.objects.filter(pk=VERSION_PK).values_list('token', flat=True).first() or ''
+
+
+def bump_settings_version() -> str:
+    """Новая версия настроек: видна остальным воркерам после коммита, своему процессу — сразу."""
+    token = uuid.uuid4().hex
+    SiteSettingsVersion.objects.update_or_create(pk=VERSION_PK, defaults={'token': token})
+    site_settings_cache.clear()
+    return token
+
+
+class SiteSettingsCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version: str | None = None
+        self._checked_at = 0.0
+        self._instances: dict[type, object] = {}
+        self._memo: dict[str, object] = {}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._version = None
+            self._checked_at = 0.0
+            self._instances.clear()
+            self._memo.clear()
+
+    def _sync_version(self) -> None:
+        fresh = time.monotonic() - self._checked_at < settings.SITE_SETTINGS_CACHE_CHECK_SECONDS
+        if self._version is not None and fresh:
+            return
+        version = read_settings_version()
+        with self._lock:
+            if version != self._version:
+                self._instances.clear()
+                self._memo.clear()
+                self._version = version
+            self._checked_at = time.monotonic()
+
+    def get(self, model):
+        """Единственный экземпляр model (из кэша процесса или одним SELECT без вставки)."""
+        self._sync_version()
+        with self._lock:
+            instance = self._instances.get(model)
+        if instance is None:
+            instance = model.objects.filter(pk=1).first() or model()
+            with self._lock:
+                self._instances[model] = instance
+        return instance
+
+    def memoize(self, key: str, build):
+        """Значение build(), закэшированное до следующей смены версии настроек."""
+        self._sync_version()
+        with self._lock:
+            if key in self._memo:
+                return self._memo[key]
+        value = build()
+        with self._lock:
+            self._memo[key] = value
+        return value
+
+
+site_settings_cache = SiteSettingsCache()
+
+
+def get_site_settings(model):
+    return site_settings_cache.get(model)
+
+
+async def aget_site_settings(model):
+    return await sync_to_async(site_settings_cache.get)(model)
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.1 on 2026-10-19 12:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('site_settings', '0014_agent_settings'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SiteSettingsVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=32, verbose_name='Токен версии')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Изменено')),
+            ],
+            options={
+                'verbose_name': 'Версия настроек сайта',
+                'verbose_name_plural': 'Версия настроек сайта',
+                'db_table': 'site_settings_version',
+            },
+        ),
+    ]
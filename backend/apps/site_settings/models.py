@@ -20,9 +20,13 @@ class SingletonModel(models.Model):
     def save(self, *args, **kwargs):
         """
         Переопределяем save, чтобы гарантировать только один экземпляр.
+        После сохранения сбрасываем кэш настроек во всех воркерах (см. cache.py).
         """
         self.pk = 1
         super().save(*args, **kwargs)
+        from .cache import bump_settings_version
+
+        bump_settings_version()
 
     def delete(self, *args, **kwargs):
         """
@@ -35,6 +39,8 @@ class SingletonModel(models.Model):
         """
         Получить единственный экземпляр модели.
         Если его нет, создает новый.
+
+        Для админки; публичные ручки читают через cache.get_site_settings (без записи в БД).
         """
         obj, created = cls.objects.get_or_create(pk=1)
         return obj
@@ -47,6 +53,23 @@ class SingletonModel(models.Model):
             raise ValidationError("Может существовать только один экземпляр этой модели.")
 
 
+class SiteSettingsVersion(models.Model):
+    """
+    Версия настроек сайта — общая для всех воркеров метка для сброса их локальных кэшей.
+    Меняется при каждом сохранении любой из singleton-моделей.
+    """
+    token = models.CharField(max_length=32, verbose_name="Токен версии")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Изменено")
+
+    class Meta:
+        verbose_name = "Версия настроек сайта"
+        verbose_name_plural = "Версия настроек сайта"
+        db_table = "site_settings_version"
+
+    def __str__(self):
+        return f"Версия настроек {self.token}"
+
+
 def main_settings_document_privacy_pdf_path(_instance, _filename):
     """Фиксированный путь в MEDIA (нейтральный каталог documents/)."""
     return "documents/privacy.pdf"
@@ -1,15 +1,22 @@
 """
 Роутер для настроек сайта.
 """
+import hashlib
+import json
+
 from asgiref.sync import sync_to_async
+from django.http import HttpResponse
 from ninja import Router
 
 from api.schemas import ProblemDetail
+from config.db_router import replica_reads
 
+from .cache import aget_site_settings, get_site_settings, site_settings_cache
 from .errors import SiteSettingsErrorCodes, create_site_settings_error
 from .models import AgentSettings, ContactsSettings, InvestorSettings, MainSettings
 from .schemas import (
     AgentSettingsOut,
+    AllSiteSettingsOut,
     ContactsSettingsOut,
     CoordinatesOut,
     InvestorSettingsOut,
@@ -17,6 +24,8 @@ from .schemas import (
 )
 
 site_settings_router = Router()
+# Настройки только читаются — с реплик БД (config.db_router)
+site_settings_router.add_decorator(replica_reads)
 
 
 def _file_field_url(field_file) -> str | None:
@@ -33,6 +42,64 @@ def _canonical_public_pdf_path(field_file, path: str) -> str | None:
     return path
 
 
+def _main_settings_out(settings: MainSettings) -> MainSettingsOut:
+    return MainSettingsOut(
+        phone=settings.phone,
+        display_phone=settings.display_phone or settings.phone,
+        email=settings.email,
+        max_link=settings.max_link or None,
+        telegram_link=settings.telegram_link or None,
+        description=settings.description or None,
+        org_name=settings.org_name or None,
+        inn=settings.inn or None,
+        cases=_file_field_url(settings.cases_pdf),
+        privacy_pdf=_canonical_public_pdf_path(settings.privacy_pdf, "/privacy.pdf"),
+        oplata_pdf=_canonical_public_pdf_path(settings.oplata_pdf, "/oplata.pdf"),
+    )
+
+
+def _contacts_settings_out(contacts_settings: ContactsSettings) -> ContactsSettingsOut:
+    return ContactsSettingsOut(
+        ogrn=contacts_settings.ogrn or None,
+        legal_address=contacts_settings.legal_address or None,
+        coordinates=(
+            CoordinatesOut(lat=contacts_settings.latitude, lng=contacts_settings.longitude)
+            if contacts_settings.latitude is not None and contacts_settings.longitude is not None
+            else None
+        ),
+        sales_center_address=contacts_settings.sales_center_address or None,
+    )
+
+
+def _investor_settings_out(settings: InvestorSettings) -> InvestorSettingsOut:
+    return InvestorSettingsOut(
+        document_1=_file_field_url(settings.document_1),
+        document_2=_file_field_url(settings.document_2),
+        document_3=_file_field_url(settings.document_3),
+    )
+
+
+def _agent_settings_out(settings: AgentSettings) -> AgentSettingsOut:
+    return AgentSettingsOut(table_link=settings.table_link or None)
+
+
+def _build_all_settings_body() -> tuple[bytes, str]:
+    """Тело ответа /all и его ETag (хеш содержимого) — считаются один раз на версию настроек."""
+    out = AllSiteSettingsOut(
+        main=_main_settings_out(get_site_settings(MainSettings)),
+        contacts=_contacts_settings_out(get_site_settings(ContactsSettings)),
+        investors=_investor_settings_out(get_site_settings(InvestorSettings)),
+        agents=_agent_settings_out(get_site_settings(AgentSettings)),
+    )
+    body = json.dumps(out.model_dump(mode="json"), ensure_ascii=False, separators=(",", ":")).encode()
+    return body, f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag in tags or "*" in tags
+
+
 @site_settings_router.get(
     "/main-info",
     response={200: MainSettingsOut, 404: ProblemDetail},
@@ -59,24 +126,8 @@ async def get_main_settings(request):
     При отсутствии настроек в БД возвращает 404.
     """
     try:
-        settings = await sync_to_async(MainSettings.load)()
-
-        def build_out():
-            return MainSettingsOut(
-                phone=settings.phone,
-                display_phone=settings.display_phone or settings.phone,
-                email=settings.email,
-                max_link=settings.max_link or None,
-                telegram_link=settings.telegram_link or None,
-                description=settings.description or None,
-                org_name=settings.org_name or None,
-                inn=settings.inn or None,
-                cases=_file_field_url(settings.cases_pdf),
-                privacy_pdf=_canonical_public_pdf_path(settings.privacy_pdf, "/privacy.pdf"),
-                oplata_pdf=_canonical_public_pdf_path(settings.oplata_pdf, "/oplata.pdf"),
-            )
-
-        return 200, await sync_to_async(build_out)()
+        settings = await aget_site_settings(MainSettings)
+        return 200, await sync_to_async(_main_settings_out)(settings)
         
     except Exception as e:
         return 404, create_site_settings_error(
@@ -108,18 +159,8 @@ async def get_contacts_settings(request):
     При отсутствии настроек в БД возвращает 404.
     """
     try:
-        contacts_settings = await sync_to_async(ContactsSettings.load)()
-
-        return 200, ContactsSettingsOut(
-            ogrn=contacts_settings.ogrn or None,
-            legal_address=contacts_settings.legal_address or None,
-            coordinates=(
-                CoordinatesOut(lat=contacts_settings.latitude, lng=contacts_settings.longitude)
-                if contacts_settings.latitude is not None and contacts_settings.longitude is not None
-                else None
-            ),
-            sales_center_address=contacts_settings.sales_center_address or None,
-        )
+        contacts_settings = await aget_site_settings(ContactsSettings)
+        return 200, _contacts_settings_out(contacts_settings)
     except Exception as e:
         return 404, create_site_settings_error(
             status=404,
@@ -144,16 +185,8 @@ async def get_investor_settings(request):
     Публичный эндпоинт: URL файлов из DEFAULT_FILE_STORAGE (как у cases в /main-info).
     """
     try:
-        settings = await sync_to_async(InvestorSettings.load)()
-
-        def build_out():
-            return InvestorSettingsOut(
-                document_1=_file_field_url(settings.document_1),
-                document_2=_file_field_url(settings.document_2),
-                document_3=_file_field_url(settings.document_3),
-            )
-
-        return 200, await sync_to_async(build_out)()
+        settings = await aget_site_settings(InvestorSettings)
+        return 200, await sync_to_async(_investor_settings_out)(settings)
     except Exception as e:
         return 404, create_site_settings_error(
             status=404,
@@ -180,8 +213,8 @@ async def get_agent_settings(request):
     Публичный эндпоинт: ссылка на таблицу комиссий для страницы агентов.
     """
     try:
-        settings = await sync_to_async(AgentSettings.load)()
-        return 200, AgentSettingsOut(table_link=settings.table_link or None)
+        settings = await aget_site_settings(AgentSettings)
+        return 200, _agent_settings_out(settings)
     except Exception as e:
         return 404, create_site_settings_error(
             status=404,
@@ -192,3 +225,38 @@ async def get_agent_settings(request):
             ),
             instance="/api/v1/site-settings/agents",
         )
+
+
+@site_settings_router.get(
+    "/all",
+    response={200: AllSiteSettingsOut, 304: None, 404: ProblemDetail},
+    summary="Все настройки сайта одним запросом",
+    description=(
+        "Разделы main-info, contacts, investors и agents в одном ответе (main, contacts, investors, agents). "
+        "Ответ содержит ETag; при совпадении If-None-Match возвращается 304 без тела."
+    ),
+)
+async def get_all_settings(request):
+    """
+    Публичный эндпоинт для начальной загрузки страницы вместо нескольких запросов к /site-settings/*.
+
+    Тело и ETag считаются один раз на версию настроек (кэш процесса, см. apps.site_settings.cache).
+    """
+    try:
+        body, etag = await sync_to_async(site_settings_cache.memoize)("all", _build_all_settings_body)
+    except Exception as e:
+        return 404, create_site_settings_error(
+            status=404,
+            code=SiteSettingsErrorCodes.NOT_FOUND,
+            title="Settings not found",
+            detail=f"Site settings not found. Create them in admin panel. Error: {str(e)}",
+            instance="/api/v1/site-settings/all",
+        )
+
+    if _etag_matches(request.headers.get("If-None-Match", ""), etag):
+        response = HttpResponse(status=304)
+    else:
+        response = HttpResponse(body, content_type="application/json; charset=utf-8")
+    response["ETag"] = etag
+    response["Cache-Control"] = "no-cache"
+    return response
@@ -46,3 +46,12 @@ class AgentSettingsOut(Schema):
     """Настройки для раздела «Агентам»."""
 
     table_link: str | None = None
+
+
+class AllSiteSettingsOut(Schema):
+    """Все разделы настроек сайта одним ответом (/site-settings/all)."""
+
+    main: MainSettingsOut
+    contacts: ContactsSettingsOut
+    investors: InvestorSettingsOut
+    agents: AgentSettingsOut
@@ -0,0 +1,222 @@
+"""
+Чтение каталога с реплик БД (DATABASE_REPLICAS) с привязкой к primary после записи.
+
+- Запись — всегда в default (primary). Чтение — тоже, кроме ручек, обёрнутых replica_reads (публичный
+  каталог: помещения, здания, этажи, настройки сайта). Бронирование, оплата, webhook и авторизация
+  в этот контекст не входят и читают с primary.
+- Внутри replica_reads чтение всё равно идёт в primary, если:
+  - запрос закреплён за primary (cookie DATABASE_REPLICA_PIN_COOKIE — пользователь недавно что-то записал,
+    см. middleware.db_pin) или уже писал в этом запросе;
+  - открыта транзакция на primary (transaction.atomic);
+  - модель из PRIMARY_ONLY_APPS (пользователи, права, сессии);
+  - нет реплики с отставанием не больше DATABASE_REPLICA_MAX_LAG_SECONDS.
+- Отставание реплик (ReplicaMonitor) измеряется лениво — не чаще раза в DATABASE_REPLICA_LAG_CHECK_SECONDS
+  на процесс; недоступная реплика выключается до следующей проверки.
+"""
+
+import functools
+import inspect
+import itertools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+# Модели этих приложений читаются только с primary (авторизация, права, сессии)
+PRIMARY_ONLY_APPS = frozenset({'accounts', 'auth', 'admin', 'contenttypes', 'sessions'})
+
+# Отставание реплики PostgreSQL, с. Реплика без новых WAL (всё применено) — 0, иначе время с последней
+# применённой транзакции; сам primary (pg_is_in_recovery() = false) — 0
+POSTGRES_LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+
+@dataclass
+class RoutingState:
+    """Маршрутизация чтения в рамках одного запроса (один объект на запрос — общий для всех потоков ORM)."""
+
+    replica: bool = False
+    pinned: bool = False
+    wrote: bool = False
+
+
+_state: ContextVar[RoutingState | None] = ContextVar('db_routing_state', default=None)
+
+
+def current_state() -> RoutingState | None:
+    return _state.get()
+
+
+@contextmanager
+def routing_state(*, pinned: bool = False):
+    """Новый контекст маршрутизации (на запрос — в middleware.db_pin)."""
+    state = RoutingState(pinned=pinned)
+    token = _state.set(state)
+    try:
+        yield state
+    finally:
+        _state.reset(token)
+
+
+@contextmanager
+def replica_context():
+    state = _state.get()
+    token = None
+    if state is None:
+        state = RoutingState()
+        token = _state.set(state)
+    previous, state.replica = state.replica, True
+    try:
+        yield state
+    finally:
+        state.replica = previous
+        if token is not None:
+            _state.reset(token)
+
+
+def replica_reads(func):
+    """
+    Разрешает чтение с реплик внутри func (sync или async). Для ручек ninja —
+    router.add_decorator(replica_reads): обёртка ставится после авторизации и валидации.
+    """
+    if inspect.iscoroutinefunction(func):
+
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            with replica_context():
+                return await func(*args, **kwargs)
+
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with replica_context():
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+def measure_lag(alias: str) -> float:
+    """Отставание реплики, с. Не PostgreSQL (SQLite в тестах) — 0: реплика — та же БД."""
+    connection = connections[alias]
+    if connection.vendor != 'postgresql':
+        return 0.0
+    with connection.cursor() as cursor:
+        cursor.execute(POSTGRES_LAG_SQL)
+        (lag,) = cursor.fetchone()
+    return float(lag or 0)
+
+
+class ReplicaMonitor:
+    """Отставание реплик (кэш на процесс) и выбор реплики для чтения по кругу."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._lag: dict[str, float | None] = {}
+        self._checked_at: dict[str, float] = {}
+        self._checking: set[str] = set()
+        self._counter = itertools.count()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._lag.clear()
+            self._checked_at.clear()
+
+    def lag(self, alias: str) -> float | None:
+        """Отставание alias, с; None — реплика недоступна. Проверка — не чаще DATABASE_REPLICA_LAG_CHECK_SECONDS."""
+        now = time.monotonic()
+        with self._lock:
+            checked_at = self._checked_at.get(alias)
+            fresh = checked_at is not None and now - checked_at < settings.DATABASE_REPLICA_LAG_CHECK_SECONDS
+            # Пока другой поток проверяет реплику, остальные берут прошлое значение
+            if fresh or (checked_at is not None and alias in self._checking):
+                return self._lag.get(alias)
+            self._checking.add(alias)
+        try:
+            lag = measure_lag(alias)
+        except DatabaseError as exc:
+            lag = None
+            logger.warning('Реплика %s недоступна, чтение идёт в primary: %s', alias, exc)
+        with self._lock:
+            previous = self._lag.get(alias, 0.0)
+            self._lag[alias] = lag
+            self._checked_at[alias] = time.monotonic()
+            self._checking.discard(alias)
+        self._log_transition(alias, previous, lag)
+        return lag
+
+    @staticmethod
+    def _usable(lag: float | None) -> bool:
+        return lag is not None and lag <= settings.DATABASE_REPLICA_MAX_LAG_SECONDS
+
+    def _log_transition(self, alias: str, previous: float | None, lag: float | None) -> None:
+        if lag is None or self._usable(lag) == self._usable(previous):
+            return
+        if self._usable(lag):
+            logger.info('Реплика %s снова используется: отставание %.1f с', alias, lag)
+        else:
+            logger.warning(
+                'Реплика %s отстаёт на %.1f с (порог %s с), чтение идёт в primary',
+                alias,
+                lag,
+                settings.DATABASE_REPLICA_MAX_LAG_SECONDS,
+            )
+
+    def pick(self) -> str | None:
+        """Реплика для чтения (по кругу среди годных) или None — читать с primary."""
+        usable = [alias for alias in settings.DATABASE_REPLICAS if self._usable(self.lag(alias))]
+        if not usable:
+            return None
+        return usable[next(self._counter) % len(usable)]
+
+    def status(self) -> list[tuple[str, float | None, bool]]:
+        """(alias, отставание, используется ли) по каждой реплике — для диагностики."""
+        result = []
+        for alias in settings.DATABASE_REPLICAS:
+            lag = self.lag(alias)
+            result.append((alias, lag, self._usable(lag)))
+        return result
+
+
+replica_monitor = ReplicaMonitor()
+
+
+class ReplicaRouter:
+    """DATABASE_ROUTERS: запись и миграции — default, чтение в replica_reads — реплики (см. модуль)."""
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or not state.replica or state.pinned or state.wrote or not settings.DATABASE_REPLICAS:
+            return DEFAULT_DB_ALIAS
+        if model._meta.app_label in PRIMARY_ONLY_APPS or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return replica_monitor.pick() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            # Дальнейшее чтение в этом запросе и следующих (cookie) — с primary: видно только что записанное
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # primary и реплики — одни и те же данные
+        aliases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.DATABASE_REPLICAS
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 import sys
 from pathlib import Path
 
@@ -32,10 +33,19 @@ DEBUG = config('DEBUG', cast=bool, default=False)
 ALLOWED_HOSTS = config('ALLOWED_HOSTS', cast=Csv(), default='localhost,127.0.0.1')
 CORS_ALLOWED_ORIGINS = config('CORS_ALLOWED_ORIGINS', cast=Csv(), default='http://localhost, http://127.0.0.1')
 CORS_ALLOW_ALL_ORIGINS = config('CORS_ALLOW_ALL_ORIGINS', cast=bool, default=False)
+# Метаданные пагинации списков-массивов (/profile/bookings) — фронтенд с другого origin должен их видеть
+CORS_EXPOSE_HEADERS = ['X-Total-Count', 'Link']
 CSRF_TRUSTED_ORIGINS = config('CSRF_TRUSTED_ORIGINS', cast=Csv(), default='')
 
 # Yandex Geocoder API (management command geocode_buildings)
 YANDEX_GEOCODER_API_KEY = config('YANDEX_GEOCODER_API_KEY', default='')
+# URL API (для прогонов против локальной заглушки loadtest.geocoder_stub), одновременных запросов,
+# лимит запросов в секунду (token bucket) и повторы при сетевых ошибках, 429 и 5xx
+YANDEX_GEOCODER_URL = config('YANDEX_GEOCODER_URL', default='https://geocode-maps.yandex.ru/v1/')
+GEOCODER_CONCURRENCY = config('GEOCODER_CONCURRENCY', cast=int, default=5)
+GEOCODER_RATE_PER_SECOND = config('GEOCODER_RATE_PER_SECOND', cast=float, default=10)
+GEOCODER_RETRIES = config('GEOCODER_RETRIES', cast=int, default=3)
+GEOCODER_TIMEOUT_SECONDS = config('GEOCODER_TIMEOUT_SECONDS', cast=float, default=15)
 
 # Application definition
 
@@ -56,11 +66,13 @@ INSTALLED_APPS = [
     'apps.deals',
     "apps.payments.apps.PaymentsConfig",
     'apps.referrals',
+    'apps.notifications',
 ]
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'middleware.access_log.AccessLogStdoutMiddleware',
+    'middleware.db_pin.ReplicaPinMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.locale.LocaleMiddleware',  # Для перевода ошибок и интерфейса
@@ -105,6 +117,36 @@ DATABASES = {
     )
 }
 
+# Реплики только для чтения (config.db_router): URL через запятую, алиасы replica1, replica2, ...
+# С реплик читается только публичный каталог; после записи пользователь DATABASE_REPLICA_STICKY_SECONDS
+# читает с primary (cookie DATABASE_REPLICA_PIN_COOKIE). Реплика с отставанием больше
+# DATABASE_REPLICA_MAX_LAG_SECONDS (или недоступная) не используется; отставание проверяется
+# не чаще раза в DATABASE_REPLICA_LAG_CHECK_SECONDS. В URL реплики стоит задать ?connect_timeout=2
+DATABASE_REPLICA_URLS = config('DATABASE_REPLICA_URLS', cast=Csv(), default='')
+for _number, _url in enumerate(DATABASE_REPLICA_URLS, start=1):
+    DATABASES[f'replica{_number}'] = {
+        **dj_database_url.parse(
+            _url,
+            conn_max_age=DATABASE_CONN_MAX_AGE,
+            conn_health_checks=DATABASE_CONN_HEALTH_CHECKS,
+        ),
+        # В тестах реплика — та же тестовая БД
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['config.db_router.ReplicaRouter']
+DATABASE_REPLICA_STICKY_SECONDS = config('DATABASE_REPLICA_STICKY_SECONDS', cast=int, default=15)
+DATABASE_REPLICA_MAX_LAG_SECONDS = config('DATABASE_REPLICA_MAX_LAG_SECONDS', cast=float, default=5)
+DATABASE_REPLICA_LAG_CHECK_SECONDS = config('DATABASE_REPLICA_LAG_CHECK_SECONDS', cast=float, default=5)
+DATABASE_REPLICA_PIN_COOKIE = config('DATABASE_REPLICA_PIN_COOKIE', default='db_pin')
+# Нативный async-путь горячих запросов каталога (core.async_db): список и деталь зданий, список помещений,
+# этаж — через пул psycopg 3 прямо в event loop, без sync_to_async. Нужен psycopg[pool] и PostgreSQL,
+# иначе запросы идут через ORM. Пул — на процесс и алиас БД (primary / реплика)
+NATIVE_ASYNC_DB = config('NATIVE_ASYNC_DB', cast=bool, default=False)
+NATIVE_ASYNC_DB_POOL_MIN_SIZE = config('NATIVE_ASYNC_DB_POOL_MIN_SIZE', cast=int, default=2)
+NATIVE_ASYNC_DB_POOL_MAX_SIZE = config('NATIVE_ASYNC_DB_POOL_MAX_SIZE', cast=int, default=10)
+NATIVE_ASYNC_DB_POOL_TIMEOUT = config('NATIVE_ASYNC_DB_POOL_TIMEOUT', cast=float, default=5)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -176,12 +218,38 @@ if USE_MINIO:
     AWS_DEFAULT_ACL = 'public-read'
     AWS_QUERYSTRING_AUTH = False
     
-    # Используем MinIO для медиафайлов
-    DEFAULT_FILE_STORAGE = 'storages.backends.s3.S3Storage'
+    # Используем MinIO для медиафайлов (DEFAULT_FILE_STORAGE в Django 5.1+ не действует — только STORAGES)
+    STORAGES = {
+        'default': {'BACKEND': 'apps.re_objects.storage.MediaS3Storage'},
+        'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    }
     MEDIA_URL = f'{AWS_S3_ENDPOINT_URL}/{AWS_STORAGE_BUCKET_NAME}/'
-else:
-    # Локальное хранение (по умолчанию)
-    DEFAULT_FILE_STORAGE = 'django.core.files.storage.FileSystemStorage'
+# Иначе — локальное хранение (STORAGES по умолчанию: FileSystemStorage в MEDIA_ROOT)
+
+# S3/MinIO (apps.re_objects.storage.MediaS3Storage): файлы больше порога — multipart upload частями
+# указанного размера, до MEDIA_S3_MAX_CONCURRENCY частей (и файлов в save_many) одновременно;
+# удаление — пачками DeleteObjects (не больше 1000 ключей)
+MEDIA_S3_MULTIPART_THRESHOLD = config('MEDIA_S3_MULTIPART_THRESHOLD', cast=int, default=16 * 1024 * 1024)
+MEDIA_S3_MULTIPART_CHUNKSIZE = config('MEDIA_S3_MULTIPART_CHUNKSIZE', cast=int, default=16 * 1024 * 1024)
+MEDIA_S3_MAX_CONCURRENCY = config('MEDIA_S3_MAX_CONCURRENCY', cast=int, default=8)
+MEDIA_S3_DELETE_BATCH_SIZE = config('MEDIA_S3_DELETE_BATCH_SIZE', cast=int, default=1000)
+
+# Загрузка медиа по частям (apps.re_objects.services.chunked_upload, /api/v1/uploads): размер части
+# (для S3 multipart — не меньше 5 МБ), предел размера файла, срок жизни незавершённой сессии и каталог
+# черновиков для хранилища без S3 (по умолчанию MEDIA_ROOT/uploads-partial — тот же диск, что и медиа)
+MEDIA_UPLOAD_CHUNK_SIZE = config('MEDIA_UPLOAD_CHUNK_SIZE', cast=int, default=8 * 1024 * 1024)
+MEDIA_UPLOAD_MAX_SIZE = config('MEDIA_UPLOAD_MAX_SIZE', cast=int, default=2 * 1024 * 1024 * 1024)
+MEDIA_UPLOAD_SESSION_TTL_HOURS = config('MEDIA_UPLOAD_SESSION_TTL_HOURS', cast=int, default=24)
+MEDIA_UPLOAD_TEMP_DIR = config('MEDIA_UPLOAD_TEMP_DIR', default=str(MEDIA_ROOT / 'uploads-partial'))
+# Сколько часов dev API помнит ответ на запрос с Idempotency-Key (повторы скриптов загрузки)
+DEV_IDEMPOTENCY_KEY_TTL_HOURS = config('DEV_IDEMPOTENCY_KEY_TTL_HOURS', cast=int, default=24)
+# Очередь производных медиа (воркер build_media_derivatives): попытки и экспоненциальная задержка
+MEDIA_DERIVATIVES_MAX_ATTEMPTS = config('MEDIA_DERIVATIVES_MAX_ATTEMPTS', cast=int, default=5)
+MEDIA_DERIVATIVES_RETRY_BASE_SECONDS = config('MEDIA_DERIVATIVES_RETRY_BASE_SECONDS', cast=int, default=30)
+MEDIA_DERIVATIVES_RETRY_MAX_SECONDS = config('MEDIA_DERIVATIVES_RETRY_MAX_SECONDS', cast=int, default=3600)
+# Предел пикселей оригинала фото (проверяется по заголовку до декодирования): 50 Мп — снимки камер 48 Мп
+# проходят, PNG-«бомба» 20000×20000 — нет. JPEG декодируется в уменьшенном масштабе, PNG — целиком (~4 байта/пиксель)
+MEDIA_IMAGE_MAX_PIXELS = config('MEDIA_IMAGE_MAX_PIXELS', cast=int, default=50_000_000)
 
 
 # Default primary key field type
@@ -189,6 +257,10 @@ else:
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Кэш настроек сайта (apps.site_settings.cache): как часто воркер сверяет версию настроек в БД, с.
+# Столько максимум другие воркеры отдают старые настройки после сохранения в админке
+SITE_SETTINGS_CACHE_CHECK_SECONDS = config('SITE_SETTINGS_CACHE_CHECK_SECONDS', cast=float, default=5)
+
 # Custom User Model
 AUTH_USER_MODEL = 'accounts.CustomUser'
 
@@ -197,6 +269,12 @@ ACCESS_TOKEN_LIFETIME_MINUTES = config('ACCESS_TOKEN_LIFETIME_MINUTES', cast=int
 REFRESH_TOKEN_LIFETIME_DAYS = config('REFRESH_TOKEN_LIFETIME_DAYS', cast=int, default=7)
 PASSWORD_RESET_TOKEN_LIFETIME_HOURS = config('PASSWORD_RESET_TOKEN_LIFETIME_HOURS', cast=int, default=24)
 
+# Пул хеширования паролей (apps.accounts.services.password_hashing): потоков на процесс и сколько
+# задач может ждать в очереди; сверх этого login/register отвечают 503
+PASSWORD_HASHING_WORKERS = config('PASSWORD_HASHING_WORKERS', cast=int, default=min(4, os.cpu_count() or 1))
+PASSWORD_HASHING_MAX_QUEUE = config('PASSWORD_HASHING_MAX_QUEUE', cast=int, default=256)
+PASSWORD_HASHING_STATS_LOG_SECONDS = config('PASSWORD_HASHING_STATS_LOG_SECONDS', cast=int, default=60)
+
 # Email Settings (SMTP; задайте переменные в .env)
 EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.smtp.EmailBackend')
 EMAIL_HOST = config('EMAIL_HOST', default='smtp.gmail.com')
@@ -209,6 +287,15 @@ EMAIL_TIMEOUT = config('EMAIL_TIMEOUT', cast=int, default=3)
 EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
 DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default=EMAIL_HOST_USER or 'noreply@localhost')
+# Очередь писем (apps.notifications.outbox, воркер send_emails): попытки, задержка между ними,
+# ограничение скорости отправки (0 — без ограничения), срок хранения отправленных писем и аренда письма
+# воркером на время отправки (должна покрывать EMAIL_TIMEOUT с запасом)
+EMAIL_OUTBOX_MAX_ATTEMPTS = config('EMAIL_OUTBOX_MAX_ATTEMPTS', cast=int, default=6)
+EMAIL_OUTBOX_RETRY_BASE_SECONDS = config('EMAIL_OUTBOX_RETRY_BASE_SECONDS', cast=int, default=30)
+EMAIL_OUTBOX_RETRY_MAX_SECONDS = config('EMAIL_OUTBOX_RETRY_MAX_SECONDS', cast=int, default=3600)
+EMAIL_OUTBOX_RATE_PER_MINUTE = config('EMAIL_OUTBOX_RATE_PER_MINUTE', cast=int, default=120)
+EMAIL_OUTBOX_KEEP_SENT_DAYS = config('EMAIL_OUTBOX_KEEP_SENT_DAYS', cast=int, default=7)
+EMAIL_OUTBOX_LEASE_SECONDS = config('EMAIL_OUTBOX_LEASE_SECONDS', cast=int, default=300)
 
 # Frontend URLs:
 # - FRONTEND_AUTH_BASE_URL: для auth-ссылок (например, reset password)
@@ -224,6 +311,15 @@ REFERRAL_CODE_COOKIE_NAME = config(
     default=config('REFERRAL_COOKIE_NAME', default='referral_code'),
 )
 
+# Переходы по реферальным ссылкам (apps.referrals.clicks): буфер в памяти процесса сбрасывается в БД
+# пачкой при REFERRAL_CLICKS_FLUSH_SIZE событиях или раз в REFERRAL_CLICKS_FLUSH_SECONDS (0 — фоновый сброс
+# выключен); сверх REFERRAL_CLICKS_BUFFER_MAX события отбрасываются. Свертка по дням — rollup_referral_stats
+REFERRAL_CLICKS_FLUSH_SIZE = config('REFERRAL_CLICKS_FLUSH_SIZE', cast=int, default=500)
+REFERRAL_CLICKS_FLUSH_SECONDS = config('REFERRAL_CLICKS_FLUSH_SECONDS', cast=float, default=5)
+REFERRAL_CLICKS_BUFFER_MAX = config('REFERRAL_CLICKS_BUFFER_MAX', cast=int, default=50_000)
+REFERRAL_CLICKS_KEEP_DAYS = config('REFERRAL_CLICKS_KEEP_DAYS', cast=int, default=90)
+REFERRAL_ROLLUP_LOOKBACK_DAYS = config('REFERRAL_ROLLUP_LOOKBACK_DAYS', cast=int, default=2)
+
 # Logging options
 LOG_LEVEL = config('LOG_LEVEL', default='INFO')
 LOGGING = {
@@ -255,6 +351,10 @@ LOGGING = {
 # --- re_objects: значения параметров фильтра API помещений ---
 RE_OBJECTS_SALE_TYPE_RENT = "rent"
 RE_OBJECTS_SALE_TYPE_SALE = "sale"
+# Карта зданий (/buildings/map): с этого zoom — отдельные здания вместо кластеров,
+# но не больше RE_OBJECTS_MAP_MAX_BUILDINGS в области (иначе снова кластеры).
+RE_OBJECTS_MAP_CLUSTER_MAX_ZOOM = config('RE_OBJECTS_MAP_CLUSTER_MAX_ZOOM', cast=int, default=15)
+RE_OBJECTS_MAP_MAX_BUILDINGS = config('RE_OBJECTS_MAP_MAX_BUILDINGS', cast=int, default=1000)
 
 # --- bookings: список «Мои брони» в профиле ---
 # True — только актуальные (expires_at > now); False — все брони пользователя.
@@ -263,8 +363,25 @@ BOOKINGS_LIST_ONLY_ACTIVE = config('BOOKINGS_LIST_ONLY_ACTIVE', cast=bool, defau
 #PAYMENTS
 PAYMENTS_ACCOUNT_ID = config('PAYMENTS_ACCOUNT_ID', default='')
 PAYMENTS_SECRET_KEY = config('PAYMENTS_SECRET_KEY', default='')
+# Базовый URL API ЮKassa; для нагрузочных прогонов — локальная заглушка (loadtest.yookassa_stub)
+PAYMENTS_API_URL = config('PAYMENTS_API_URL', default='https://api.yookassa.ru/v3')
+# Шлюз создания платежей (apps.payments.gateway): 'yookassa' — REST API через пул httpx, 'stub' — в памяти
+PAYMENTS_GATEWAY = config('PAYMENTS_GATEWAY', default='yookassa')
+PAYMENTS_STUB_LATENCY_MS = config('PAYMENTS_STUB_LATENCY_MS', cast=float, default=0)
+PAYMENTS_HTTP_TIMEOUT_SECONDS = config('PAYMENTS_HTTP_TIMEOUT_SECONDS', cast=float, default=10)
+PAYMENTS_HTTP_MAX_CONNECTIONS = config('PAYMENTS_HTTP_MAX_CONNECTIONS', cast=int, default=20)
+PAYMENTS_HTTP_RETRIES = config('PAYMENTS_HTTP_RETRIES', cast=int, default=2)
 PAYMENTS_REDIRECT_URL = config('PAYMENTS_REDIRECT_URL', default='https://www.example.com/return_url')
 PAYMENTS_BOOKING_AMOUNT = config('PAYMENTS_BOOKING_AMOUNT', cast=int, default=10000)
+# Очередь webhook ЮKassa (apps.payments.inbox): число попыток и экспоненциальная задержка между ними
+PAYMENTS_WEBHOOK_MAX_ATTEMPTS = config('PAYMENTS_WEBHOOK_MAX_ATTEMPTS', cast=int, default=8)
+PAYMENTS_WEBHOOK_RETRY_BASE_SECONDS = config('PAYMENTS_WEBHOOK_RETRY_BASE_SECONDS', cast=int, default=5)
+PAYMENTS_WEBHOOK_RETRY_MAX_SECONDS = config('PAYMENTS_WEBHOOK_RETRY_MAX_SECONDS', cast=int, default=600)
+# Сверка зависших платежей (reconcile_payments): через сколько секунд без изменений платёж сверяется
+# с провайдером, через сколько незавершённый платёж считается брошенным и отменяется
+PAYMENTS_RECONCILE_AFTER_SECONDS = config('PAYMENTS_RECONCILE_AFTER_SECONDS', cast=int, default=900)
+PAYMENTS_PENDING_TIMEOUT_SECONDS = config('PAYMENTS_PENDING_TIMEOUT_SECONDS', cast=int, default=3600)
+PAYMENTS_RECONCILE_CONCURRENCY = config('PAYMENTS_RECONCILE_CONCURRENCY', cast=int, default=10)
 # Чек 54-ФЗ (обязателен, если в ЛК ЮKassa включена онлайн-касса)
 PAYMENTS_RECEIPT_ENABLED = config('PAYMENTS_RECEIPT_ENABLED', cast=bool, default=True)
 PAYMENTS_RECEIPT_ITEM_DESCRIPTION = config(
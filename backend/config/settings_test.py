@@ -11,8 +11,16 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": ":memory:",
-    }
+    },
+    # Реплика — зеркало тестовой БД (отдельное соединение к тем же данным)
+    "replica": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": ":memory:",
+        "TEST": {"MIRROR": "default"},
+    },
 }
+# Чтение с реплики включают отдельные тесты (settings.DATABASE_REPLICAS = ["replica"])
+DATABASE_REPLICAS = []
 
 # В тестах включаем валидацию паролей (в основном settings она может быть отключена)
 AUTH_PASSWORD_VALIDATORS = [
@@ -23,3 +31,9 @@ AUTH_PASSWORD_VALIDATORS = [
 
 # Не отправляем реальные письма при pytest (in-memory outbox)
 EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+
+# Транзакции тестов откатываются — версию настроек сайта сверяем на каждом запросе
+SITE_SETTINGS_CACHE_CHECK_SECONDS = 0
+
+# Буфер переходов по реферальным ссылкам сбрасывается в тестах явно (без фонового потока)
+REFERRAL_CLICKS_FLUSH_SECONDS = 0
@@ -0,0 +1,93 @@
+"""
+Общие части админки для больших таблиц (помещения, платежи, брони, сделки, очереди).
+
+- EstimatedCountPaginator: число строк для пагинации — оценка планировщика PostgreSQL (pg_class.reltuples
+  без фильтров, EXPLAIN с фильтрами), если она не меньше ESTIMATE_THRESHOLD; иначе и на других БД —
+  точный COUNT(*). На таблицах в миллионы строк точный COUNT в каждом открытии списка — секунды.
+- LargeTableAdminMixin: этот пагинатор и show_full_result_count = False (без второго COUNT по всей
+  таблице при фильтрах и поиске).
+- SelectRelatedSearchMixin: поиск и автодополнение (autocomplete_fields других админок) с list_select_related —
+  список автодополнения строится из __str__, а не через changelist.
+- SelectRelatedFieldListFilter: фильтр по FK, варианты которого строятся одним запросом — с
+  list_select_related админки связанной модели (её __str__ обычно читает FK: город — регион, здание — город).
+"""
+
+import json
+
+from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.utils.functional import cached_property
+
+# Меньше этой оценки — точный COUNT: на небольших выборках он дешёвый, а номер последней страницы точен
+ESTIMATE_THRESHOLD = 10_000
+
+
+def estimate_count(queryset) -> int | None:
+    """Оценка числа строк queryset планировщиком PostgreSQL или None (другая БД, нет статистики)."""
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    query = queryset.query
+    try:
+        with connection.cursor() as cursor:
+            if not query.where and not query.distinct and not query.combinator:
+                cursor.execute(
+                    'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [queryset.model._meta.db_table]
+                )
+            else:
+                sql, params = queryset.order_by().query.sql_with_params()
+                cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            row = cursor.fetchone()
+    except DatabaseError:
+        return None
+    if row is None:
+        return None
+    if isinstance(row[0], int):
+        # reltuples = -1 — таблицу ещё ни разу не анализировали
+        return row[0] if row[0] >= 0 else None
+    plan = row[0] if isinstance(row[0], list) else json.loads(row[0])
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator, у которого count на больших выборках — оценка PostgreSQL (см. модуль)."""
+
+    @cached_property
+    def count(self):
+        estimate = estimate_count(self.object_list)
+        if estimate is not None and estimate >= ESTIMATE_THRESHOLD:
+            return estimate
+        return super().count
+
+
+class LargeTableAdminMixin:
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+class SelectRelatedSearchMixin:
+    def get_search_results(self, request, queryset, search_term):
+        queryset, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        if self.list_select_related and self.list_select_related is not True:
+            queryset = queryset.select_related(*self.list_select_related)
+        return queryset, may_have_duplicates
+
+
+class SelectRelatedFieldListFilter(admin.RelatedFieldListFilter):
+    """RelatedFieldListFilter, варианты которого — один запрос с list_select_related админки связанной модели."""
+
+    def field_choices(self, field, request, model_admin):
+        related_model = field.remote_field.model
+        related_admin = model_admin.admin_site._registry.get(related_model)
+        queryset = related_model._default_manager.complex_filter(field.get_limit_choices_to())
+        select_related = getattr(related_admin, 'list_select_related', False)
+        if select_related is True:
+            queryset = queryset.select_related()
+        elif select_related:
+            queryset = queryset.select_related(*select_related)
+        ordering = self.field_admin_ordering(field, request, model_admin)
+        if ordering:
+            queryset = queryset.order_by(*ordering)
+        attname = field.remote_field.get_related_field().attname
+        return [(getattr(obj, attname), str(obj)) for obj in queryset]
@@ -0,0 +1,135 @@
+"""
+Нативный async-доступ к PostgreSQL (psycopg 3 + psycopg_pool) для горячих запросов.
+
+Async ORM Django (aget, acount, async for) выполняет каждый запрос через sync_to_async: переход в поток
+и своё соединение на поток. Здесь запрос выполняется прямо в event loop на соединении из AsyncConnectionPool
+(пул на алиас БД и процесс).
+
+SQL берётся из обычного queryset (fetch_values / fetch_count компилируют его тем же компилятором, что и ORM,
+и применяют те же конвертеры значений) — фильтры и аннотации остаются в одном месте, строки приходят
+словарями как у values().
+
+Включается NATIVE_ASYNC_DB; нужен psycopg[pool] >= 3 и PostgreSQL. native_read_alias(model) — алиас для
+запроса или None (выключено, нет пакета, SQLite): тогда вызывающий код идёт через ORM.
+"""
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import EmptyResultSet
+from django.db import DEFAULT_DB_ALIAS, connections, router
+from django.db.models import QuerySet
+
+try:
+    from psycopg import AsyncClientCursor
+    from psycopg_pool import AsyncConnectionPool
+except ImportError:  # psycopg 3 не установлен — только путь через Django ORM
+    AsyncConnectionPool = None
+
+logger = logging.getLogger(__name__)
+
+POSTGRES_ENGINE = 'django.db.backends.postgresql'
+
+# alias -> (event loop, пул): пул привязан к циклу, в котором открыт
+_pools: dict[str, tuple[asyncio.AbstractEventLoop, 'AsyncConnectionPool']] = {}
+_warned_unavailable = False
+
+
+def _native_supported(alias: str) -> bool:
+    global _warned_unavailable
+    if AsyncConnectionPool is not None and settings.DATABASES[alias]['ENGINE'] == POSTGRES_ENGINE:
+        return True
+    if not _warned_unavailable:
+        _warned_unavailable = True
+        logger.warning('NATIVE_ASYNC_DB включён, но нужен psycopg[pool] >= 3 и PostgreSQL — запросы идут через ORM')
+    return False
+
+
+async def native_read_alias(model) -> str | None:
+    """
+    Алиас БД для чтения model нативным путём или None — NATIVE_ASYNC_DB выключен или не поддерживается
+    (читать через ORM). Реплику выбирает config.db_router (может проверить отставание запросом — в потоке ORM).
+    """
+    if not settings.NATIVE_ASYNC_DB:
+        return None
+    alias = DEFAULT_DB_ALIAS
+    if settings.DATABASE_REPLICAS:
+        alias = await sync_to_async(router.db_for_read)(model)
+    return alias if _native_supported(alias) else None
+
+
+class NativeConnection:
+    """Соединение из пула: fetchall(sql, params) в event loop, без перехода в поток."""
+
+    def __init__(self, connection):
+        self._connection = connection
+
+    async def fetchall(self, sql: str, params) -> list[tuple]:
+        async with self._connection.cursor() as cursor:
+            await cursor.execute(sql, params)
+            return await cursor.fetchall()
+
+
+def _pool_kwargs(alias: str) -> dict:
+    # Те же параметры, что у соединений Django (адаптеры типов, OPTIONS), но async-курсор с подстановкой
+    # параметров на клиенте — как у ORM (server_side_binding выключен)
+    params = connections[alias].get_connection_params()
+    params['cursor_factory'] = AsyncClientCursor
+    params['autocommit'] = True
+    return params
+
+
+async def get_pool(alias: str) -> 'AsyncConnectionPool':
+    loop = asyncio.get_running_loop()
+    entry = _pools.get(alias)
+    if entry is None or entry[0] is not loop:
+        pool = AsyncConnectionPool(
+            kwargs=_pool_kwargs(alias),
+            min_size=settings.NATIVE_ASYNC_DB_POOL_MIN_SIZE,
+            max_size=settings.NATIVE_ASYNC_DB_POOL_MAX_SIZE,
+            timeout=settings.NATIVE_ASYNC_DB_POOL_TIMEOUT,
+            name=f'native-{alias}',
+            open=False,
+        )
+        _pools[alias] = entry = (loop, pool)
+    # Повторный open() открытого пула ничего не делает — параллельные первые запросы не создают второй пул
+    await entry[1].open()
+    return entry[1]
+
+
+@asynccontextmanager
+async def native_connection(alias: str):
+    """Соединение из пула alias на время блока (несколько запросов подряд — одно соединение)."""
+    pool = await get_pool(alias)
+    async with pool.connection() as connection:
+        yield NativeConnection(connection)
+
+
+async def fetch_values(connection: NativeConnection, queryset: QuerySet, alias: str) -> list[dict]:
+    """Строки queryset.values(...) словарями (имена ключей и конвертеры — как у ORM)."""
+    compiler = queryset.query.get_compiler(using=alias)
+    try:
+        sql, params = compiler.as_sql()
+    except EmptyResultSet:
+        return []
+    rows = await connection.fetchall(sql, params)
+    # Порядок колонок — как в SELECT (Django 5.2 сохраняет порядок полей и аннотаций из values())
+    select = compiler.select[: compiler.col_count]
+    converters = compiler.get_converters([column for column, _, _ in select])
+    if converters:
+        rows = compiler.apply_converters(rows, converters)
+    names = [alias for _, _, alias in select]
+    return [dict(zip(names, row, strict=True)) for row in rows]
+
+
+async def fetch_count(connection: NativeConnection, queryset: QuerySet, alias: str) -> int:
+    """COUNT(*) строк queryset (без сортировки), как QuerySet.count() для distinct/агрегатов — через подзапрос."""
+    try:
+        sql, params = queryset.order_by().query.get_compiler(using=alias).as_sql()
+    except EmptyResultSet:
+        return 0
+    rows = await connection.fetchall(f'SELECT COUNT(*) FROM ({sql}) AS native_count', params)
+    return rows[0][0]
@@ -0,0 +1,9 @@
+"""
+Нагрузочный стенд для API: async-драйвер HTTP-запросов, сценарии и отчёт по латентности.
+
+Запуск (из каталога backend, сервер уже поднят на засеянной БД):
+
+    uv run python -m loadtest --base-url http://127.0.0.1:8000 --duration 60 --users 50
+
+Подробности — в loadtest/README.md.
+"""
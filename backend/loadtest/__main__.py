@@ -0,0 +1,155 @@
+"""
+CLI нагрузочного стенда: подготовка (пользователи, снимок каталога), прогон, отчёт, сравнение с baseline.
+
+Код выхода: 0 — без регрессий, 1 — есть регрессии относительно baseline, 2 — ошибка подготовки.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+from datetime import UTC, datetime
+from functools import partial
+from pathlib import Path
+
+from .driver import RunContext, make_client, run_load
+from .scenarios import discover_catalog, login_burst, new_run_id, register_users, select_scenarios
+from .stats import compare_with_baseline, format_table, load_json, summarize, write_json
+from .yookassa_stub import YooKassaStub
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog='python -m loadtest', description='Нагрузочный прогон API')
+    parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+    parser.add_argument('--users', type=int, default=20, help='Число виртуальных пользователей')
+    parser.add_argument('--duration', type=float, default=30, help='Длительность прогона после разгона, с')
+    parser.add_argument('--ramp-up', type=float, default=5, help='Время разгона пользователей, с')
+    parser.add_argument('--think-time', type=float, default=0.5, help='Средняя пауза между сценариями, с')
+    parser.add_argument('--seed', type=int, default=1, help='Seed генератора сценариев')
+    parser.add_argument(
+        '--scenarios',
+        default='all',
+        help='Сценарии через запятую (catalog,building,floors,site_settings,auth,booking,payment) или all',
+    )
+    parser.add_argument('--connections', type=int, default=100, help='Размер пула соединений httpx')
+    parser.add_argument('--timeout', type=float, default=30, help='Таймаут запроса, с')
+    parser.add_argument('--out', type=Path, default=None, help='Куда записать JSON с результатами')
+    parser.add_argument('--baseline', type=Path, default=None, help='JSON прошлого прогона для сравнения')
+    parser.add_argument('--save-baseline', action='store_true', help='Записать результат в --baseline')
+    parser.add_argument('--tolerance', type=float, default=20.0, help='Допустимое ухудшение метрик, %%')
+    parser.add_argument(
+        '--stub-port',
+        type=int,
+        default=None,
+        help='Поднять заглушку ЮKassa на этом порту (сервер должен быть запущен с PAYMENTS_API_URL на неё)',
+    )
+    parser.add_argument('--stub-latency-ms', type=float, default=0, help='Задержка ответов заглушки ЮKassa, мс')
+    parser.add_argument(
+        '--login-burst',
+        type=int,
+        default=0,
+        help='Число одновременных логинов во всплеске поверх нагрузки (0 — без всплеска)',
+    )
+    parser.add_argument(
+        '--login-burst-at',
+        type=float,
+        default=None,
+        help='Через сколько секунд после старта запустить всплеск (по умолчанию — середина прогона)',
+    )
+    return parser.parse_args(argv)
+
+
+async def _run(args: argparse.Namespace) -> dict:
+    scenarios = select_scenarios([s.strip() for s in args.scenarios.split(',') if s.strip()])
+    run_id = new_run_id()
+    async with make_client(args.base_url, connections=args.connections, timeout=args.timeout) as client:
+        catalog = await discover_catalog(client)
+        if catalog.is_empty:
+            raise RuntimeError('Каталог пуст: засейте БД перед прогоном')
+        users = await register_users(client, args.users, run_id=run_id)
+        context = RunContext(catalog=catalog)
+        background = None
+        if args.login_burst > 0:
+            burst_at = args.login_burst_at
+            if burst_at is None:
+                burst_at = args.ramp_up + args.duration / 2
+            background = partial(
+                login_burst,
+                client=client,
+                context=context,
+                users=users,
+                count=args.login_burst,
+                delay=burst_at,
+            )
+        recorder, elapsed = await run_load(
+            client,
+            scenarios,
+            context=context,
+            background=background,
+            users=users,
+            duration=args.duration,
+            ramp_up=args.ramp_up,
+            think_time=args.think_time,
+            seed=args.seed,
+        )
+    meta = {
+        'run_id': run_id,
+        'started_at': datetime.now(UTC).isoformat(timespec='seconds'),
+        'base_url': args.base_url,
+        'users': args.users,
+        'duration_s': args.duration,
+        'think_time_s': args.think_time,
+        'seed': args.seed,
+        'scenarios': [s.name for s in scenarios],
+        'login_burst': args.login_burst,
+        'catalog': {
+            'buildings': len(catalog.building_uuids),
+            'rent_premises': len(catalog.rent_premise_uuids),
+            'sale_premises': len(catalog.sale_premise_uuids),
+        },
+    }
+    return summarize(recorder, elapsed, meta=meta)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(argv)
+    stub = None
+    if args.stub_port is not None:
+        stub = YooKassaStub(port=args.stub_port, latency_ms=args.stub_latency_ms).start()
+        print(f'YooKassa stub: {stub.api_url}')
+    try:
+        summary = asyncio.run(_run(args))
+    except (RuntimeError, ValueError) as exc:
+        print(f'Ошибка подготовки прогона: {exc}', file=sys.stderr)
+        return 2
+    finally:
+        if stub is not None:
+            stub.stop()
+
+    print(format_table(summary))
+    if args.out:
+        write_json(args.out, summary)
+
+    if args.baseline is None:
+        return 0
+    if args.save_baseline:
+        write_json(args.baseline, summary)
+        print(f'Baseline сохранён: {args.baseline}')
+        return 0
+    baseline = load_json(args.baseline)
+    if baseline is None:
+        print(f'Baseline {args.baseline} не найден, сравнение пропущено')
+        return 0
+    regressions = compare_with_baseline(summary, baseline, tolerance_pct=args.tolerance)
+    if not regressions:
+        print(f'Регрессий относительно {args.baseline} нет (допуск {args.tolerance}%)')
+        return 0
+    print(f'Регрессии относительно {args.baseline} (допуск {args.tolerance}%):')
+    for regression in regressions:
+        print(f'  {regression}')
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,138 @@
+"""
+Замер горячих запросов каталога: async ORM (sync_to_async, поток на запрос к БД) против нативного
+async-пути (NATIVE_ASYNC_DB: psycopg 3 + AsyncConnectionPool в event loop).
+
+Вызывает сервисы каталога в процессе — без HTTP и сериализации — из --concurrency корутин одновременно,
+по очереди в обоих режимах, и печатает p50/p95 и пропускную способность по каждому запросу. Нужны
+PostgreSQL с каталогом (manage.py generate_catalog), DATABASE_URL в окружении и psycopg[pool] >= 3
+(uv sync --extra native-db):
+
+    uv run python -m loadtest.catalog_db_bench --concurrency 200 --duration 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import time
+from collections.abc import Awaitable, Callable
+
+import django
+
+from .stats import percentile
+
+
+def _setup_django() -> None:
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    django.setup()
+
+
+async def _pick_targets() -> tuple:
+    """Здание с этажом и помещениями (первое по имени) — одинаковые запросы в обоих режимах."""
+    from apps.re_objects.models import Floor
+
+    floor = (
+        await Floor.objects.filter(premises__isnull=False)
+        .select_related('building')
+        .order_by('building__name')
+        .afirst()
+    )
+    if floor is None:
+        raise SystemExit('В БД нет этажей с помещениями: сначала manage.py generate_catalog')
+    return floor.building.uuid, str(floor.id)
+
+
+def _workload(building_uuid, floor_id: str) -> dict[str, Callable[[], Awaitable[object]]]:
+    from django.conf import settings
+
+    from apps.re_objects.services.premise_service import (
+        PremiseFilterParams,
+        get_building,
+        get_buildings,
+        get_premise_list,
+        get_premises_for_floor,
+    )
+
+    rent, sale = settings.RE_OBJECTS_SALE_TYPE_RENT, settings.RE_OBJECTS_SALE_TYPE_SALE
+    return {
+        'premises?sale_type=rent': lambda: get_premise_list(PremiseFilterParams(sale_type=rent)),
+        'premises?sale_type=sale&page=3': lambda: get_premise_list(PremiseFilterParams(sale_type=sale, page=3)),
+        'buildings/': lambda: get_buildings(page=1, page_size=6),
+        'buildings/{uuid}': lambda: get_building(building_uuid),
+        'floors/{uuid}/{id}': lambda: get_premises_for_floor(building_uuid, floor_id, rent),
+    }
+
+
+async def _run_mode(
+    workload: dict[str, Callable[[], Awaitable[object]]], concurrency: int, duration: float
+) -> dict[str, list[float]]:
+    """concurrency корутин по кругу вызывают запросы workload в течение duration секунд."""
+    latencies: dict[str, list[float]] = {label: [] for label in workload}
+    calls = list(workload.items())
+    deadline = time.perf_counter() + duration
+
+    async def worker(offset: int) -> None:
+        n = offset
+        while time.perf_counter() < deadline:
+            label, call = calls[n % len(calls)]
+            started = time.perf_counter()
+            await call()
+            latencies[label].append(time.perf_counter() - started)
+            n += 1
+
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    return latencies
+
+
+async def run(args: argparse.Namespace) -> list[tuple[str, str, int, float, float, float]]:
+    from django.conf import settings
+
+    building_uuid, floor_id = await _pick_targets()
+    workload = _workload(building_uuid, floor_id)
+    results = []
+    for mode, native in (('ORM', False), ('native', True)):
+        settings.NATIVE_ASYNC_DB = native
+        # Прогрев: пул соединений, потоки sync_to_async, кэш планов PostgreSQL
+        await _run_mode(workload, min(args.concurrency, 10), args.warmup)
+        latencies = await _run_mode(workload, args.concurrency, args.duration)
+        for label, values in latencies.items():
+            results.append(
+                (
+                    label,
+                    mode,
+                    len(values),
+                    percentile(values, 50) * 1000,
+                    percentile(values, 95) * 1000,
+                    len(values) / args.duration,
+                )
+            )
+    return results
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog='python -m loadtest.catalog_db_bench', description='Async ORM против нативного async-пути каталога'
+    )
+    parser.add_argument('--concurrency', type=int, default=200, help='Одновременных запросов')
+    parser.add_argument('--duration', type=float, default=20, help='Длительность замера каждого режима, с')
+    parser.add_argument('--warmup', type=float, default=3, help='Прогрев перед замером, с')
+    args = parser.parse_args(argv)
+    _setup_django()
+
+    from django.conf import settings
+
+    from apps.re_objects.models import Premise
+    from core.async_db import native_read_alias
+
+    settings.NATIVE_ASYNC_DB = True
+    if asyncio.run(native_read_alias(Premise)) is None:
+        raise SystemExit('Нативный путь недоступен: нужны psycopg[pool] >= 3 и PostgreSQL')
+
+    print(f'{"Запрос":<32} {"Режим":<7} {"Запросов":>9} {"p50, мс":>9} {"p95, мс":>9} {"RPS":>8}')
+    for label, mode, count, p50, p95, rps in asyncio.run(run(args)):
+        print(f'{label:<32} {mode:<7} {count:>9} {p50:>9.1f} {p95:>9.1f} {rps:>8.0f}')
+
+
+if __name__ == '__main__':
+    main()
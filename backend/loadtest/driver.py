@@ -0,0 +1,159 @@
+"""
+Async-драйвер нагрузки: виртуальные пользователи на общем пуле keep-alive соединений httpx.
+
+Каждый виртуальный пользователь в цикле выбирает сценарий по весам и выполняет его до истечения
+duration. Замеры пишутся в Recorder под меткой эндпоинта (шаблон пути без UUID и query).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass, field
+
+import httpx
+
+from .stats import Recorder
+
+API_PREFIX = '/api/v1'
+
+
+@dataclass
+class VirtualUser:
+    """Состояние одного виртуального пользователя: клиент, генератор случайностей, токены."""
+
+    index: int
+    client: httpx.AsyncClient
+    recorder: Recorder
+    rng: random.Random
+    context: RunContext
+    email: str | None = None
+    password: str | None = None
+    access_token: str | None = None
+    refresh_token: str | None = None
+    site_settings_etag: str | None = None
+
+    @property
+    def auth_headers(self) -> dict[str, str]:
+        if not self.access_token:
+            return {}
+        return {'Authorization': f'Bearer {self.access_token}'}
+
+    async def request(
+        self,
+        label: str,
+        method: str,
+        path: str,
+        *,
+        expected: Iterable[int] = (200,),
+        **kwargs,
+    ) -> httpx.Response | None:
+        """
+        Выполняет запрос к API (path без /api/v1) и пишет замер под label.
+
+        ok — код ответа входит в expected. Ошибка транспорта (таймаут, разрыв) — замер без кода, ok=False.
+        """
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, f'{API_PREFIX}{path}', **kwargs)
+        except httpx.HTTPError:
+            self.recorder.record(label, time.perf_counter() - start, None, ok=False)
+            return None
+        self.recorder.record(
+            label,
+            time.perf_counter() - start,
+            response.status_code,
+            ok=response.status_code in tuple(expected),
+        )
+        return response
+
+
+Scenario = Callable[[VirtualUser], Awaitable[None]]
+
+
+@dataclass
+class WeightedScenario:
+    name: str
+    func: Scenario
+    weight: int
+
+
+@dataclass
+class RunContext:
+    """Общие для всех пользователей данные прогона (снимок каталога, параметры)."""
+
+    catalog: object = None
+    options: dict = field(default_factory=dict)
+
+
+def _pick(rng: random.Random, scenarios: list[WeightedScenario]) -> WeightedScenario:
+    return rng.choices(scenarios, weights=[s.weight for s in scenarios], k=1)[0]
+
+
+async def _user_loop(
+    vu: VirtualUser,
+    scenarios: list[WeightedScenario],
+    deadline: float,
+    think_time: float,
+) -> None:
+    while time.monotonic() < deadline:
+        scenario = _pick(vu.rng, scenarios)
+        await scenario.func(vu)
+        if think_time > 0:
+            await asyncio.sleep(vu.rng.uniform(0, think_time * 2))
+
+
+def make_client(base_url: str, *, connections: int, timeout: float) -> httpx.AsyncClient:
+    """Общий AsyncClient: keep-alive пул на connections соединений."""
+    return httpx.AsyncClient(
+        base_url=base_url.rstrip('/'),
+        limits=httpx.Limits(max_connections=connections, max_keepalive_connections=connections),
+        timeout=httpx.Timeout(timeout),
+    )
+
+
+async def run_load(
+    client: httpx.AsyncClient,
+    scenarios: list[WeightedScenario],
+    *,
+    context: RunContext,
+    users: list[tuple[str, str]],
+    duration: float,
+    ramp_up: float,
+    think_time: float,
+    seed: int,
+    background: Callable[[Recorder], Awaitable[None]] | None = None,
+) -> tuple[Recorder, float]:
+    """
+    Запускает len(users) виртуальных пользователей на duration секунд.
+
+    users — пары (email, password), заранее созданные на этапе подготовки.
+    ramp_up — старт пользователей равномерно в течение ramp_up секунд.
+    background — корутина, запускаемая параллельно с пользователями (например, всплеск логинов).
+    Возвращает (recorder, фактическое время прогона в секундах).
+    """
+    recorder = Recorder()
+    started = time.monotonic()
+    deadline = started + ramp_up + duration
+
+    async def start_user(i: int, email: str, password: str) -> None:
+        if ramp_up > 0 and users:
+            await asyncio.sleep(ramp_up * i / len(users))
+        vu = VirtualUser(
+            index=i,
+            client=client,
+            recorder=recorder,
+            rng=random.Random(seed + i),
+            context=context,
+            email=email,
+            password=password,
+        )
+        await _user_loop(vu, scenarios, deadline, think_time)
+
+    tasks = [start_user(i, email, pwd) for i, (email, pwd) in enumerate(users)]
+    if background is not None:
+        tasks.append(background(recorder))
+    await asyncio.gather(*tasks)
+    return recorder, time.monotonic() - started
@@ -0,0 +1,140 @@
+"""
+Локальная заглушка Yandex Geocoder API для geocode_buildings и тестов.
+
+Отвечает как https://geocode-maps.yandex.ru/v1/: координаты детерминированно выводятся из строки geocode,
+адреса со словом «nowhere» не находятся. Считает запросы и максимум одновременных запросов, умеет
+отвечать 503 на несколько следующих запросов (проверка повторов):
+
+    uv run python -m loadtest.geocoder_stub --port 8098 --latency-ms 50
+    YANDEX_GEOCODER_URL=http://127.0.0.1:8098/v1/ YANDEX_GEOCODER_API_KEY=stub uv run manage.py geocode_buildings
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+@dataclass
+class GeocoderState:
+    queries: list[str] = field(default_factory=list)
+    in_flight: int = 0
+    max_in_flight: int = 0
+    # Ответить 503 на столько следующих запросов
+    fail_next: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+def stub_coordinates(query: str) -> tuple[float, float]:
+    """Широта и долгота, которые заглушка вернёт для query (в пределах Москвы)."""
+    digest = hashlib.sha256(query.encode()).digest()
+    lat = 55.5 + int.from_bytes(digest[:4], 'big') / 2**32 * 0.4
+    lon = 37.3 + int.from_bytes(digest[4:8], 'big') / 2**32 * 0.6
+    return round(lat, 6), round(lon, 6)
+
+
+def _response(query: str) -> dict:
+    members = []
+    if 'nowhere' not in query.lower():
+        lat, lon = stub_coordinates(query)
+        members.append({'GeoObject': {'name': query, 'Point': {'pos': f'{lon} {lat}'}}})
+    return {
+        'response': {
+            'GeoObjectCollection': {
+                'metaDataProperty': {'GeocoderResponseMetaData': {'request': query, 'found': str(len(members))}},
+                'featureMember': members,
+            }
+        }
+    }
+
+
+def _make_handler(state: GeocoderState, latency: float):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            return
+
+        def _send(self, status: int, body: dict) -> None:
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):  # noqa: N802
+            params = parse_qs(urlparse(self.path).query)
+            query = (params.get('geocode') or [''])[0]
+            with state.lock:
+                state.queries.append(query)
+                state.in_flight += 1
+                state.max_in_flight = max(state.max_in_flight, state.in_flight)
+                fail = state.fail_next > 0
+                if fail:
+                    state.fail_next -= 1
+            try:
+                if latency:
+                    time.sleep(latency)
+                if not params.get('apikey'):
+                    self._send(403, {'statusCode': 403, 'error': 'Forbidden', 'message': 'Invalid api key'})
+                elif fail:
+                    self._send(503, {'statusCode': 503, 'message': 'Service unavailable'})
+                else:
+                    self._send(200, _response(query))
+            finally:
+                with state.lock:
+                    state.in_flight -= 1
+
+    return Handler
+
+
+class GeocoderStub:
+    """HTTP-сервер заглушки в фоновом потоке: start() / stop(); url — значение для YANDEX_GEOCODER_URL."""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, *, latency_ms: float = 0):
+        self.state = GeocoderState()
+        self._server = ThreadingHTTPServer((host, port), _make_handler(self.state, latency_ms / 1000))
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}/v1/'
+
+    def start(self) -> GeocoderStub:
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Заглушка Yandex Geocoder API')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8098)
+    parser.add_argument('--latency-ms', type=float, default=0, help='Искусственная задержка ответа, мс')
+    args = parser.parse_args()
+    stub = GeocoderStub(args.host, args.port, latency_ms=args.latency_ms).start()
+    print(f'Geocoder stub: {stub.url}', flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        print(f'Запросов: {len(stub.state.queries)}, максимум одновременно: {stub.state.max_in_flight}')
+        stub.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+"""
+Замер записи медиа в S3/MinIO: одиночный PUT против multipart с параллельными частями, последовательная
+запись производных против save_many, удаление по одному против DeleteObjects.
+
+По умолчанию поднимает loadtest.s3_stub в процессе: --latency-ms — задержка каждого запроса (RTT до
+хранилища), --stream-mbps — предел скорости одного соединения (у облачного S3 один поток упирается
+в окно TCP, параллельные части — нет); --endpoint — настоящий MinIO (бакет должен существовать):
+
+    uv run python -m loadtest.s3_bench --size-mb 500 --latency-ms 20 --stream-mbps 40
+    uv run python -m loadtest.s3_bench --endpoint http://127.0.0.1:9000 --bucket aregrp-media \\
+        --access-key minioadmin --secret-key minioadmin
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+from collections.abc import Callable
+
+import django
+from django.conf import settings
+
+MB = 1024 * 1024
+
+
+def _configure_django() -> None:
+    # Только настройки хранилища: БД и приложения не нужны
+    if not settings.configured:
+        settings.configure(
+            MEDIA_S3_MULTIPART_THRESHOLD=16 * MB,
+            MEDIA_S3_MULTIPART_CHUNKSIZE=16 * MB,
+            MEDIA_S3_MAX_CONCURRENCY=8,
+            MEDIA_S3_DELETE_BATCH_SIZE=1000,
+        )
+        django.setup()
+
+
+def _timed(action: Callable[[], object]) -> float:
+    started = time.perf_counter()
+    action()
+    return time.perf_counter() - started
+
+
+def _write_source(size: int) -> str:
+    """Временный файл нужного размера (случайные блоки по 1 МБ — без сжатия по дороге)."""
+    block = os.urandom(MB)
+    with tempfile.NamedTemporaryFile(suffix='.mp4', delete=False) as tmp:
+        for _ in range(size // MB):
+            tmp.write(block)
+        tmp.write(block[: size % MB])
+    return tmp.name
+
+
+def run(args: argparse.Namespace) -> list[tuple[str, float, str]]:
+    _configure_django()
+    from django.core.files import File
+    from django.core.files.base import ContentFile
+
+    from apps.re_objects.storage import MediaS3Storage
+
+    from .s3_stub import S3Stub
+
+    stub = None
+    endpoint = args.endpoint
+    if endpoint is None:
+        stub = S3Stub(latency_ms=args.latency_ms, stream_mbps=args.stream_mbps, discard=True).start()
+        endpoint = stub.url
+    options = {
+        'endpoint_url': endpoint,
+        'bucket_name': args.bucket,
+        'access_key': args.access_key,
+        'secret_key': args.secret_key,
+        'region_name': 'us-east-1',
+        'multipart_chunksize': args.part_mb * MB,
+        'max_concurrency': args.concurrency,
+    }
+    single = MediaS3Storage(**options, multipart_threshold=args.size_mb * MB + 1)
+    parallel = MediaS3Storage(**options, multipart_threshold=args.part_mb * MB)
+    sequential_parts = MediaS3Storage(**{**options, 'max_concurrency': 1}, multipart_threshold=args.part_mb * MB)
+
+    results: list[tuple[str, float, str]] = []
+    source = _write_source(args.size_mb * MB)
+    try:
+        for label, storage in (
+            ('одиночный PUT', single),
+            ('multipart, части по очереди', sequential_parts),
+            (f'multipart, {args.concurrency} частей параллельно', parallel),
+        ):
+            with open(source, 'rb') as fh:
+                seconds = _timed(lambda storage=storage, fh=fh: storage.save('bench/video.mp4', File(fh)))
+            results.append((f'Видео {args.size_mb} МБ: {label}', seconds, f'{args.size_mb / seconds:.0f} МБ/с'))
+
+        derivatives = {
+            f'bench/{n}/{field}.webp': os.urandom(200 * 1024) for n in range(20) for field in ('card', 'detail')
+        }
+        seconds = _timed(lambda: [parallel.save(name, ContentFile(data)) for name, data in derivatives.items()])
+        results.append(('20 фото, card+detail по одному', seconds, f'{len(derivatives) / seconds:.0f} файлов/с'))
+        pairs = [dict(list(derivatives.items())[i : i + 2]) for i in range(0, len(derivatives), 2)]
+        seconds = _timed(
+            lambda: [parallel.save_many({name: ContentFile(data) for name, data in pair.items()}) for pair in pairs]
+        )
+        results.append(('20 фото, card+detail через save_many', seconds, f'{len(derivatives) / seconds:.0f} файлов/с'))
+
+        names = list(derivatives)
+        seconds = _timed(lambda: [parallel.delete(name) for name in names])
+        results.append((f'Удаление {len(names)} объектов по одному', seconds, f'{len(names) / seconds:.0f} объектов/с'))
+        for name, data in derivatives.items():
+            parallel.save(name, ContentFile(data))
+        seconds = _timed(lambda: parallel.delete_many(names))
+        results.append(
+            (f'Удаление {len(names)} объектов DeleteObjects', seconds, f'{len(names) / seconds:.0f} объектов/с')
+        )
+    finally:
+        os.unlink(source)
+        if stub is not None:
+            stub.stop()
+    return results
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog='python -m loadtest.s3_bench', description='Замер записи медиа в S3')
+    parser.add_argument('--size-mb', type=int, default=500, help='Размер «видео», МБ')
+    parser.add_argument('--part-mb', type=int, default=16, help='Размер части multipart, МБ (не меньше 5)')
+    parser.add_argument('--concurrency', type=int, default=8, help='Частей одновременно')
+    parser.add_argument('--latency-ms', type=float, default=20, help='Задержка запроса встроенной заглушки, мс')
+    parser.add_argument(
+        '--stream-mbps', type=float, default=40, help='Предел скорости одного соединения заглушки, МБ/с (0 — нет)'
+    )
+    parser.add_argument('--endpoint', default=None, help='URL настоящего S3/MinIO вместо заглушки')
+    parser.add_argument('--bucket', default='media')
+    parser.add_argument('--access-key', default='stub')
+    parser.add_argument('--secret-key', default='stub')
+    args = parser.parse_args(argv)
+    for label, seconds, rate in run(args):
+        print(f'{label:<45} {seconds:8.2f} с  {rate}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,380 @@
+"""
+Локальная S3-совместимая заглушка (вместо MinIO) для тестов MediaS3Storage и замеров s3_bench.
+
+Path-style адреса (/bucket/key): PutObject, GetObject (с Range), HeadObject, DeleteObject, DeleteObjects,
+multipart upload (create / upload part / complete / abort). Считает запросы по операциям, максимум
+одновременных запросов и принятые байты; --latency-ms добавляет задержку к каждому ответу (RTT до хранилища),
+--stream-mbps ограничивает скорость приёма тела одного запроса (как пропускная способность одного TCP-потока
+до облачного хранилища), --discard не хранит содержимое (замеры на сотнях мегабайт):
+
+    uv run python -m loadtest.s3_stub --port 9100 --latency-ms 20
+    USE_MINIO=True AWS_S3_ENDPOINT_URL=http://127.0.0.1:9100 AWS_ACCESS_KEY_ID=stub AWS_SECRET_ACCESS_KEY=stub \
+        uv run manage.py runserver
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import threading
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
+
+
+@dataclass
+class StoredObject:
+    data: bytes
+    size: int
+    etag: str
+    content_type: str = 'application/octet-stream'
+
+
+@dataclass
+class S3State:
+    objects: dict[tuple[str, str], StoredObject] = field(default_factory=dict)
+    # upload id → (bucket, key, {номер части: (данные, размер, etag)})
+    uploads: dict[str, tuple[str, str, dict[int, tuple[bytes, int, str]]]] = field(default_factory=dict)
+    operations: Counter = field(default_factory=Counter)
+    in_flight: int = 0
+    max_in_flight: int = 0
+    bytes_received: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def reset_counters(self) -> None:
+        with self.lock:
+            self.operations.clear()
+            self.max_in_flight = 0
+            self.bytes_received = 0
+
+
+BLOCK_SIZE = 1024 * 1024
+
+
+class _BodyReader:
+    """Тело запроса блоками, не больше Content-Length; aws-chunked (так botocore шлёт части с контрольной суммой)
+    раскодируется на лету — сотни мегабайт не держатся в памяти."""
+
+    def __init__(self, rfile, length: int, aws_chunked: bool):
+        self._rfile = rfile
+        self._remaining = length
+        self._aws_chunked = aws_chunked
+
+    def _read(self, size: int) -> bytes:
+        data = self._rfile.read(min(size, self._remaining))
+        self._remaining -= len(data)
+        return data
+
+    def _readline(self) -> bytes:
+        line = self._rfile.readline(self._remaining)
+        self._remaining -= len(line)
+        return line
+
+    def _raw(self, size: int):
+        while size > 0:
+            block = self._read(min(BLOCK_SIZE, size))
+            if not block:
+                return
+            size -= len(block)
+            yield block
+
+    def __iter__(self):
+        if not self._aws_chunked:
+            yield from self._raw(self._remaining)
+            return
+        while self._remaining:
+            size = int(self._readline().split(b';')[0].strip() or b'0', 16)
+            if size == 0:
+                break
+            yield from self._raw(size)
+            self._readline()
+        # Трейлер с контрольной суммой
+        for _ in self._raw(self._remaining):
+            pass
+
+
+def _tag(name: str) -> str:
+    return name.rsplit('}', 1)[-1]
+
+
+def _make_handler(state: S3State, latency: float, discard: bool, stream_rate: float):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            return
+
+        def _target(self) -> tuple[str, str, dict[str, list[str]]]:
+            url = urlparse(self.path)
+            bucket, _, key = url.path.lstrip('/').partition('/')
+            return bucket, unquote(key), parse_qs(url.query, keep_blank_values=True)
+
+        def _body(self) -> _BodyReader:
+            length = int(self.headers.get('Content-Length') or 0)
+            return _BodyReader(self.rfile, length, 'aws-chunked' in (self.headers.get('Content-Encoding') or ''))
+
+        def _read_body(self) -> bytes:
+            return b''.join(self._body())
+
+        def _send(self, status: int, body: bytes = b'', headers: dict | None = None, *, head: bool = False) -> None:
+            self.send_response(status)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            if 'Content-Length' not in (headers or {}):
+                self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            if not head:
+                self.wfile.write(body)
+
+        def _xml(self, status: int, xml: str) -> None:
+            self._send(status, xml.encode(), {'Content-Type': 'application/xml'})
+
+        def _error(self, status: int, code: str, *, head: bool = False) -> None:
+            if head:
+                self._send(status, head=True)
+            else:
+                self._xml(status, f'<Error><Code>{code}</Code><Message>{code}</Message></Error>')
+
+        def _handle(self, operation: str, action) -> None:
+            with state.lock:
+                state.operations[operation] += 1
+                state.in_flight += 1
+                state.max_in_flight = max(state.max_in_flight, state.in_flight)
+            try:
+                if latency:
+                    time.sleep(latency)
+                action()
+            finally:
+                with state.lock:
+                    state.in_flight -= 1
+
+        def _store(self, body: _BodyReader) -> tuple[bytes, int, str]:
+            digest = hashlib.md5()  # noqa: S324 — ETag, как у S3
+            kept = []
+            size = 0
+            started = time.monotonic()
+            for block in body:
+                digest.update(block)
+                size += len(block)
+                if not discard:
+                    kept.append(block)
+                if stream_rate:
+                    ahead = size / stream_rate - (time.monotonic() - started)
+                    if ahead > 0:
+                        time.sleep(ahead)
+            with state.lock:
+                state.bytes_received += size
+            return b''.join(kept), size, f'"{digest.hexdigest()}"'
+
+        def do_PUT(self):  # noqa: N802
+            bucket, key, query = self._target()
+            body = self._body()
+            if 'uploadId' in query:
+                upload_id = query['uploadId'][0]
+
+                def upload_part():
+                    upload = state.uploads.get(upload_id)
+                    if upload is None:
+                        for _ in body:
+                            pass
+                        return self._error(404, 'NoSuchUpload')
+                    part = self._store(body)
+                    with state.lock:
+                        upload[2][int(query['partNumber'][0])] = part
+                    self._send(200, headers={'ETag': part[2]})
+
+                return self._handle('UploadPart', upload_part)
+
+            def put_object():
+                data, size, etag = self._store(body)
+                content_type = self.headers.get('Content-Type') or 'application/octet-stream'
+                with state.lock:
+                    state.objects[(bucket, key)] = StoredObject(data, size, etag, content_type)
+                self._send(200, headers={'ETag': etag})
+
+            self._handle('PutObject', put_object)
+
+        def do_POST(self):  # noqa: N802
+            bucket, key, query = self._target()
+            body = self._read_body()
+            if 'uploads' in query:
+
+                def create():
+                    upload_id = uuid.uuid4().hex
+                    with state.lock:
+                        state.uploads[upload_id] = (bucket, key, {})
+                    self._xml(
+                        200,
+                        '<InitiateMultipartUploadResult>'
+                        f'<Bucket>{escape(bucket)}</Bucket><Key>{escape(key)}</Key><UploadId>{upload_id}</UploadId>'
+                        '</InitiateMultipartUploadResult>',
+                    )
+
+                return self._handle('CreateMultipartUpload', create)
+            if 'uploadId' in query:
+
+                def complete():
+                    upload_id = query['uploadId'][0]
+                    with state.lock:
+                        upload = state.uploads.pop(upload_id, None)
+                    if upload is None:
+                        return self._error(404, 'NoSuchUpload')
+                    numbers = [
+                        int(el.text)
+                        for el in ElementTree.fromstring(body).iter()
+                        if _tag(el.tag) == 'PartNumber' and el.text
+                    ]
+                    parts = [upload[2][number] for number in numbers]
+                    data = b''.join(part[0] for part in parts)
+                    etag = f'"{hashlib.md5(b"".join(p[2].encode() for p in parts)).hexdigest()}-{len(parts)}"'  # noqa: S324
+                    with state.lock:
+                        state.objects[(bucket, key)] = StoredObject(data, sum(part[1] for part in parts), etag)
+                    self._xml(
+                        200,
+                        '<CompleteMultipartUploadResult>'
+                        f'<Bucket>{escape(bucket)}</Bucket><Key>{escape(key)}</Key><ETag>{escape(etag)}</ETag>'
+                        '</CompleteMultipartUploadResult>',
+                    )
+
+                return self._handle('CompleteMultipartUpload', complete)
+            if 'delete' in query:
+
+                def delete_objects():
+                    keys = [el.text or '' for el in ElementTree.fromstring(body).iter() if _tag(el.tag) == 'Key']
+                    with state.lock:
+                        for name in keys:
+                            state.objects.pop((bucket, name), None)
+                    deleted = ''.join(f'<Deleted><Key>{escape(name)}</Key></Deleted>' for name in keys)
+                    self._xml(200, f'<DeleteResult>{deleted}</DeleteResult>')
+
+                return self._handle('DeleteObjects', delete_objects)
+            self._error(400, 'InvalidRequest')
+
+        def do_DELETE(self):  # noqa: N802
+            bucket, key, query = self._target()
+            if 'uploadId' in query:
+
+                def abort():
+                    with state.lock:
+                        state.uploads.pop(query['uploadId'][0], None)
+                    self._send(204)
+
+                return self._handle('AbortMultipartUpload', abort)
+
+            def delete_object():
+                with state.lock:
+                    state.objects.pop((bucket, key), None)
+                self._send(204)
+
+            self._handle('DeleteObject', delete_object)
+
+        def _object_headers(self, obj: StoredObject, length: int) -> dict:
+            return {
+                'Content-Length': str(length),
+                'Content-Type': obj.content_type,
+                'ETag': obj.etag,
+                'Last-Modified': formatdate(usegmt=True),
+                'Accept-Ranges': 'bytes',
+            }
+
+        def do_HEAD(self):  # noqa: N802
+            bucket, key, _ = self._target()
+
+            def head_object():
+                obj = state.objects.get((bucket, key))
+                if obj is None:
+                    return self._error(404, 'NoSuchKey', head=True)
+                self._send(200, headers=self._object_headers(obj, obj.size), head=True)
+
+            self._handle('HeadObject', head_object)
+
+        def do_GET(self):  # noqa: N802
+            bucket, key, _ = self._target()
+
+            def get_object():
+                obj = state.objects.get((bucket, key))
+                if obj is None:
+                    return self._error(404, 'NoSuchKey')
+                data = obj.data
+                byte_range = self.headers.get('Range')
+                if byte_range and byte_range.startswith('bytes='):
+                    start, _, end = byte_range[len('bytes=') :].partition('-')
+                    first = int(start)
+                    last = min(int(end), len(data) - 1) if end else len(data) - 1
+                    chunk = data[first : last + 1]
+                    headers = self._object_headers(obj, len(chunk))
+                    headers['Content-Range'] = f'bytes {first}-{last}/{len(data)}'
+                    return self._send(206, chunk, headers)
+                self._send(200, data, self._object_headers(obj, len(data)))
+
+            self._handle('GetObject', get_object)
+
+    return Handler
+
+
+class S3Stub:
+    """HTTP-сервер заглушки в фоновом потоке: start() / stop(); url — значение для AWS_S3_ENDPOINT_URL."""
+
+    def __init__(
+        self,
+        host: str = '127.0.0.1',
+        port: int = 0,
+        *,
+        latency_ms: float = 0,
+        stream_mbps: float = 0,
+        discard: bool = False,
+    ):
+        self.state = S3State()
+        handler = _make_handler(self.state, latency_ms / 1000, discard, stream_mbps * 1024 * 1024)
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def get(self, bucket: str, key: str) -> bytes | None:
+        obj = self.state.objects.get((bucket, key))
+        return None if obj is None else obj.data
+
+    def start(self) -> S3Stub:
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='S3-совместимая заглушка (MinIO) в памяти')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=9100)
+    parser.add_argument('--latency-ms', type=float, default=0, help='Искусственная задержка ответа, мс')
+    parser.add_argument('--stream-mbps', type=float, default=0, help='Предел скорости одного запроса, МБ/с (0 — нет)')
+    parser.add_argument('--discard', action='store_true', help='Не хранить содержимое объектов')
+    args = parser.parse_args()
+    stub = S3Stub(
+        args.host, args.port, latency_ms=args.latency_ms, stream_mbps=args.stream_mbps, discard=args.discard
+    ).start()
+    print(f'S3 stub: {stub.url}', flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        print(f'Запросов: {dict(stub.state.operations)}, максимум одновременно: {stub.state.max_in_flight}')
+        stub.stop()
+
+
+if __name__ == '__main__':
+    main()
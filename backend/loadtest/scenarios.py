@@ -0,0 +1,390 @@
+"""
+Сценарии нагрузки — приближение реального трафика фронтенда.
+
+- catalog: список помещений со случайными фильтрами (sale_type, цена, площадь, сортировка, страница);
+- building: список зданий и карточка здания;
+- map: карта зданий — область просмотра вокруг известной точки на случайном zoom и приближение;
+- floors: переключение этажей на схеме здания;
+- site_settings: разделы /site-settings/* отдельными запросами;
+- site_settings_all: те же данные одним GET /site-settings/all с If-None-Match (ETag браузера);
+- auth: login + refresh-token;
+- booking: создание брони (201 или 409 — оба ожидаемы на конечном каталоге);
+- payment: создание платежа (ЮKassa — заглушка loadtest.yookassa_stub) и webhook payment.succeeded.
+
+Отдельно от сценариев — login_burst: разовый всплеск одновременных логинов поверх обычной нагрузки
+(проверка, что хеширование паролей не замедляет остальные эндпоинты).
+
+Метки эндпоинтов — шаблоны путей ('GET /premises/{uuid}'), чтобы перцентили не дробились по UUID.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import random
+import uuid
+from dataclasses import dataclass, field
+
+import httpx
+
+from .driver import API_PREFIX, RunContext, VirtualUser, WeightedScenario
+from .stats import Recorder
+
+SALE_TYPES = ('rent', 'sale')
+ORDER_BY = ('default', 'price_asc', 'price_desc', 'area_asc', 'area_desc')
+SITE_SETTINGS_SECTIONS = ('main-info', 'contacts', 'investors', 'agents')
+LOADTEST_PASSWORD = 'LoadTest-Password-2026!'
+
+
+@dataclass
+class CatalogSnapshot:
+    """UUID из засеянной БД, собранные через API на этапе подготовки (в замеры не попадают)."""
+
+    building_uuids: list[str] = field(default_factory=list)
+    rent_premise_uuids: list[str] = field(default_factory=list)
+    sale_premise_uuids: list[str] = field(default_factory=list)
+    floor_keys: dict[str, list[str]] = field(default_factory=dict)
+    map_points: list[tuple[float, float]] = field(default_factory=list)
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.building_uuids
+
+
+async def discover_catalog(client: httpx.AsyncClient, *, max_pages: int = 5) -> CatalogSnapshot:
+    """Собирает UUID зданий, помещений и ключи этажей (первые max_pages страниц по 100)."""
+    snapshot = CatalogSnapshot()
+    for sale_type, target in (('rent', snapshot.rent_premise_uuids), ('sale', snapshot.sale_premise_uuids)):
+        for page in range(1, max_pages + 1):
+            r = await client.get(
+                f'{API_PREFIX}/premises',
+                params={'sale_type': sale_type, 'page': page, 'page_size': 100},
+            )
+            r.raise_for_status()
+            body = r.json()
+            target.extend(item['uuid'] for item in body['items'])
+            if page >= body['total_pages']:
+                break
+
+    r = await client.get(f'{API_PREFIX}/premises/buildings')
+    r.raise_for_status()
+    snapshot.building_uuids = [b['uuid'] for b in r.json()]
+    # Центры областей для сценария карты: здания (или кластеры, если зданий больше лимита ответа)
+    r = await client.get(f'{API_PREFIX}/buildings/map', params={'bbox': '-180,-90,180,90', 'zoom': 22})
+    r.raise_for_status()
+    body = r.json()
+    lat, lon = body['fields'].index('lat'), body['fields'].index('lon')
+    snapshot.map_points = [(row[lat], row[lon]) for row in body['items']]
+    for building_uuid in snapshot.building_uuids[: max_pages * 20]:
+        r = await client.get(f'{API_PREFIX}/buildings/{building_uuid}')
+        if r.status_code == 200:
+            snapshot.floor_keys[building_uuid] = [f['key'] for f in r.json()['floors']]
+    return snapshot
+
+
+async def register_users(client: httpx.AsyncClient, count: int, *, run_id: str) -> list[tuple[str, str]]:
+    """Регистрирует count пользователей для прогона; email уникален в пределах run_id."""
+    users: list[tuple[str, str]] = []
+    for i in range(count):
+        email = f'loadtest-{run_id}-{i}@example.com'
+        r = await client.post(
+            f'{API_PREFIX}/auth/register',
+            json={
+                'user_type': 'individual',
+                'full_name': f'Load Test {i}',
+                'email': email,
+                'phone': f'+7{int(run_id, 16) % 10_000:04d}{i:06d}',
+                'password1': LOADTEST_PASSWORD,
+                'password2': LOADTEST_PASSWORD,
+            },
+        )
+        if r.status_code != 200:
+            raise RuntimeError(f'Не удалось зарегистрировать {email}: {r.status_code} {r.text[:200]}')
+        users.append((email, LOADTEST_PASSWORD))
+    return users
+
+
+def _catalog(vu: VirtualUser):
+    return vu.context.catalog
+
+
+async def _ensure_logged_in(vu: VirtualUser) -> bool:
+    if vu.access_token:
+        return True
+    return await _login(vu)
+
+
+async def _login(vu: VirtualUser) -> bool:
+    r = await vu.request(
+        'POST /auth/login',
+        'POST',
+        '/auth/login',
+        json={'email': vu.email, 'password': vu.password, 'use_cookies': False},
+    )
+    if r is None or r.status_code != 200:
+        return False
+    body = r.json()
+    vu.access_token = body['access_token']
+    vu.refresh_token = body['refresh_token']
+    return True
+
+
+async def catalog_browsing(vu: VirtualUser) -> None:
+    """Список помещений со случайным набором фильтров; иногда — карточка помещения из выдачи."""
+    rng = vu.rng
+    params: dict[str, object] = {
+        'sale_type': rng.choice(SALE_TYPES),
+        'order_by': rng.choice(ORDER_BY),
+        'page': rng.choices((1, 2, 3), weights=(6, 3, 1))[0],
+        'page_size': rng.choice((12, 20)),
+    }
+    if rng.random() < 0.4:
+        params['min_area'] = rng.choice((20, 50, 100))
+        params['max_area'] = params['min_area'] * rng.choice((2, 4))
+    if rng.random() < 0.3:
+        if params['sale_type'] == 'sale':
+            params['max_price'] = rng.choice((5_000_000, 15_000_000, 50_000_000))
+        else:
+            params['max_price'] = rng.choice((50_000, 150_000, 500_000))
+    catalog = _catalog(vu)
+    if catalog.building_uuids and rng.random() < 0.3:
+        picked = rng.sample(catalog.building_uuids, k=min(3, len(catalog.building_uuids)))
+        params['building_uuids'] = ','.join(picked)
+
+    r = await vu.request('GET /premises', 'GET', '/premises', params=params)
+    if r is None or r.status_code != 200:
+        return
+    items = r.json()['items']
+    if items and rng.random() < 0.5:
+        premise_uuid = rng.choice(items)['uuid']
+        await vu.request(
+            'GET /premises/{uuid}',
+            'GET',
+            f'/premises/{premise_uuid}',
+            params={'sale_type': params['sale_type']},
+        )
+
+
+async def building_detail(vu: VirtualUser) -> None:
+    """Фильтр зданий, страница списка зданий и карточка случайного здания."""
+    rng = vu.rng
+    catalog = _catalog(vu)
+    if rng.random() < 0.3:
+        await vu.request(
+            'GET /premises/buildings',
+            'GET',
+            '/premises/buildings',
+            params={'sale_type': rng.choice(SALE_TYPES)},
+        )
+    await vu.request(
+        'GET /buildings/',
+        'GET',
+        '/buildings/',
+        params={'page': rng.randint(1, 3), 'page_size': 6, 'sale_type': rng.choice(SALE_TYPES)},
+    )
+    if catalog.building_uuids:
+        await vu.request('GET /buildings/{uuid}', 'GET', f'/buildings/{rng.choice(catalog.building_uuids)}')
+
+
+def _map_viewport(lat: float, lon: float, zoom: int) -> str:
+    """bbox окна карты 1280×800 px вокруг точки (без поправки Меркатора — для нагрузки достаточно)."""
+    half_width = 1280 / 256 * 360 / 2**zoom / 2
+    half_height = half_width * 800 / 1280
+    return ','.join(
+        f'{value:.6f}'
+        for value in (
+            max(lon - half_width, -180),
+            max(lat - half_height, -90),
+            min(lon + half_width, 180),
+            min(lat + half_height, 90),
+        )
+    )
+
+
+async def map_browsing(vu: VirtualUser) -> None:
+    """Карта: область вокруг известной точки на случайном zoom, затем иногда приближение к ней же."""
+    rng = vu.rng
+    catalog = _catalog(vu)
+    if not catalog.map_points:
+        return
+    lat, lon = rng.choice(catalog.map_points)
+    zoom = rng.randint(5, 17)
+    params: dict[str, object] = {'sale_type': rng.choice(SALE_TYPES)}
+    for step in range(2 if rng.random() < 0.5 else 1):
+        params.update(bbox=_map_viewport(lat, lon, zoom + 2 * step), zoom=zoom + 2 * step)
+        await vu.request('GET /buildings/map', 'GET', '/buildings/map', params=params)
+
+
+async def floor_switching(vu: VirtualUser) -> None:
+    """Пользователь на схеме здания переключает 2–4 этажа подряд."""
+    rng = vu.rng
+    catalog = _catalog(vu)
+    buildings = [b for b, floors in catalog.floor_keys.items() if floors]
+    if not buildings:
+        return
+    building_uuid = rng.choice(buildings)
+    floors = catalog.floor_keys[building_uuid]
+    sale_type = rng.choice(SALE_TYPES)
+    for floor_key in rng.sample(floors, k=min(len(floors), rng.randint(2, 4))):
+        await vu.request(
+            'GET /floors/{building}/{floor}',
+            'GET',
+            f'/floors/{building_uuid}/{floor_key}',
+            params={'sale_type': sale_type},
+        )
+
+
+async def site_settings(vu: VirtualUser) -> None:
+    """Загрузка страницы: main-info всегда, плюс один-два раздела."""
+    await vu.request('GET /site-settings/main-info', 'GET', '/site-settings/main-info')
+    for section in vu.rng.sample(SITE_SETTINGS_SECTIONS[1:], k=vu.rng.randint(1, 2)):
+        await vu.request(f'GET /site-settings/{section}', 'GET', f'/site-settings/{section}')
+
+
+async def site_settings_all(vu: VirtualUser) -> None:
+    """Загрузка страницы через /site-settings/all; повторный визит — условный запрос (304)."""
+    headers = {'If-None-Match': vu.site_settings_etag} if vu.site_settings_etag else {}
+    r = await vu.request('GET /site-settings/all', 'GET', '/site-settings/all', expected=(200, 304), headers=headers)
+    if r is not None and r.status_code in (200, 304):
+        vu.site_settings_etag = r.headers.get('ETag')
+
+
+async def login_refresh(vu: VirtualUser) -> None:
+    """Вход и обновление токенов по refresh-cookie."""
+    if not await _login(vu):
+        return
+    r = await vu.request(
+        'POST /auth/refresh-token',
+        'POST',
+        '/auth/refresh-token',
+        headers={'Cookie': f'refresh_token={vu.refresh_token}'},
+    )
+    if r is not None and r.status_code == 200:
+        body = r.json()
+        vu.access_token = body['access_token']
+        vu.refresh_token = body['refresh_token']
+
+
+async def booking(vu: VirtualUser) -> None:
+    """Бронь случайного помещения под аренду. 409 — помещение уже занято (ожидаемо)."""
+    catalog = _catalog(vu)
+    if not catalog.rent_premise_uuids or not await _ensure_logged_in(vu):
+        return
+    await vu.request(
+        'POST /bookings/',
+        'POST',
+        '/bookings/',
+        json={'premise_uuid': vu.rng.choice(catalog.rent_premise_uuids), 'deal_type': 'rent'},
+        headers=vu.auth_headers,
+        expected=(201, 409),
+    )
+    await vu.request('GET /profile/bookings', 'GET', '/profile/bookings', headers=vu.auth_headers)
+
+
+def _succeeded_notification(payment: dict) -> dict:
+    return {
+        'type': 'notification',
+        'event': 'payment.succeeded',
+        'object': {
+            'id': payment['id'],
+            'status': 'succeeded',
+            'paid': True,
+            'amount': payment['amount'],
+            'description': payment.get('description') or '',
+            'created_at': payment.get('created_at') or '2026-01-01T00:00:00.000Z',
+            'metadata': {},
+            'test': True,
+            'refundable': False,
+        },
+    }
+
+
+async def payment(vu: VirtualUser) -> None:
+    """Платёж за продажу через заглушку ЮKassa; при 201 — webhook payment.succeeded от «провайдера»."""
+    catalog = _catalog(vu)
+    if not catalog.sale_premise_uuids or not await _ensure_logged_in(vu):
+        return
+    r = await vu.request(
+        'POST /payments/',
+        'POST',
+        '/payments/',
+        json={'premise_uuid': vu.rng.choice(catalog.sale_premise_uuids)},
+        headers=vu.auth_headers,
+        expected=(201, 409),
+    )
+    if r is None or r.status_code != 201:
+        return
+    await vu.request(
+        'POST /payments/webhook',
+        'POST',
+        '/payments/webhook',
+        json=_succeeded_notification(r.json()),
+    )
+
+
+async def login_burst(
+    recorder: Recorder,
+    *,
+    client: httpx.AsyncClient,
+    context: RunContext,
+    users: list[tuple[str, str]],
+    count: int,
+    delay: float,
+) -> None:
+    """Через delay секунд — count одновременных POST /auth/login (503 — ожидаемый отказ по backpressure)."""
+    await asyncio.sleep(delay)
+    credentials = itertools.islice(itertools.cycle(users), count)
+    burst = [
+        VirtualUser(
+            index=-1 - i,
+            client=client,
+            recorder=recorder,
+            rng=random.Random(i),
+            context=context,
+            email=email,
+            password=password,
+        )
+        for i, (email, password) in enumerate(credentials)
+    ]
+    await asyncio.gather(
+        *(
+            vu.request(
+                'POST /auth/login (burst)',
+                'POST',
+                '/auth/login',
+                json={'email': vu.email, 'password': vu.password, 'use_cookies': False},
+                expected=(200, 503),
+            )
+            for vu in burst
+        )
+    )
+
+
+SCENARIOS: dict[str, WeightedScenario] = {
+    s.name: s
+    for s in (
+        WeightedScenario('catalog', catalog_browsing, 40),
+        WeightedScenario('building', building_detail, 20),
+        WeightedScenario('map', map_browsing, 15),
+        WeightedScenario('floors', floor_switching, 15),
+        WeightedScenario('site_settings', site_settings, 15),
+        WeightedScenario('site_settings_all', site_settings_all, 15),
+        WeightedScenario('auth', login_refresh, 5),
+        WeightedScenario('booking', booking, 3),
+        WeightedScenario('payment', payment, 2),
+    )
+}
+
+
+def select_scenarios(names: list[str] | None) -> list[WeightedScenario]:
+    """Сценарии по именам (None или 'all' — все с весами по умолчанию)."""
+    if not names or names == ['all']:
+        return list(SCENARIOS.values())
+    unknown = [n for n in names if n not in SCENARIOS]
+    if unknown:
+        raise ValueError(f'Неизвестные сценарии: {", ".join(unknown)}. Доступны: {", ".join(SCENARIOS)}')
+    return [SCENARIOS[n] for n in names]
+
+
+def new_run_id() -> str:
+    return uuid.uuid4().hex[:8]
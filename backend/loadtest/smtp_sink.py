@@ -0,0 +1,149 @@
+"""
+Локальный SMTP-приёмник (sink) для тестов и прогонов: принимает письма и хранит их в памяти.
+
+Считает соединения — по ним видно, что воркер send_emails отправляет пачку через одно соединение.
+
+    uv run python -m loadtest.smtp_sink --port 8025
+    EMAIL_HOST=127.0.0.1 EMAIL_PORT=8025 EMAIL_USE_TLS=False uv run manage.py send_emails --loop
+"""
+
+from __future__ import annotations
+
+import argparse
+import socketserver
+import threading
+from dataclasses import dataclass, field
+
+
+@dataclass
+class ReceivedMessage:
+    mail_from: str
+    rcpt_to: list[str]
+    data: str
+
+
+@dataclass
+class SinkState:
+    messages: list[ReceivedMessage] = field(default_factory=list)
+    connections: int = 0
+    # Ответить ошибкой на столько следующих команд DATA (имитация временного сбоя SMTP)
+    fail_next: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+def _address(argument: str) -> str:
+    return argument.split(':', 1)[-1].strip().strip('<>')
+
+
+def _make_handler(state: SinkState):
+    class Handler(socketserver.StreamRequestHandler):
+        def _reply(self, line: str) -> None:
+            self.wfile.write(f'{line}\r\n'.encode())
+            self.wfile.flush()
+
+        def _read_data(self) -> str:
+            lines = []
+            while True:
+                raw = self.rfile.readline()
+                if not raw or raw in (b'.\r\n', b'.\n'):
+                    break
+                line = raw.decode('utf-8', 'replace').rstrip('\r\n')
+                lines.append(line[1:] if line.startswith('..') else line)
+            return '\n'.join(lines)
+
+        def handle(self):
+            with state.lock:
+                state.connections += 1
+            self._reply('220 smtp-sink ready')
+            mail_from, rcpt_to = '', []
+            while True:
+                raw = self.rfile.readline()
+                if not raw:
+                    return
+                command, _, argument = raw.decode('utf-8', 'replace').strip().partition(' ')
+                command = command.upper()
+                if command == 'EHLO':
+                    self.wfile.write(b'250-smtp-sink\r\n250 8BITMIME\r\n')
+                    self.wfile.flush()
+                elif command == 'HELO':
+                    self._reply('250 smtp-sink')
+                elif command == 'MAIL':
+                    mail_from, rcpt_to = _address(argument), []
+                    self._reply('250 OK')
+                elif command == 'RCPT':
+                    rcpt_to.append(_address(argument))
+                    self._reply('250 OK')
+                elif command == 'DATA':
+                    self._reply('354 End data with <CR><LF>.<CR><LF>')
+                    data = self._read_data()
+                    with state.lock:
+                        if state.fail_next > 0:
+                            state.fail_next -= 1
+                            failed = True
+                        else:
+                            state.messages.append(ReceivedMessage(mail_from, rcpt_to, data))
+                            failed = False
+                    self._reply('451 Temporary failure' if failed else '250 OK')
+                elif command == 'RSET':
+                    mail_from, rcpt_to = '', []
+                    self._reply('250 OK')
+                elif command == 'NOOP':
+                    self._reply('250 OK')
+                elif command == 'QUIT':
+                    self._reply('221 Bye')
+                    return
+                else:
+                    self._reply('502 Command not implemented')
+
+    return Handler
+
+
+class SMTPSink:
+    """SMTP-сервер в фоновом потоке: start() / stop(); host и port — значения для EMAIL_HOST/EMAIL_PORT."""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0):
+        self.state = SinkState()
+        self._server = socketserver.ThreadingTCPServer((host, port), _make_handler(self.state))
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def host(self) -> str:
+        return self._server.server_address[0]
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    @property
+    def messages(self) -> list[ReceivedMessage]:
+        return self.state.messages
+
+    def start(self) -> SMTPSink:
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Локальный SMTP-приёмник')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8025)
+    args = parser.parse_args()
+    sink = SMTPSink(args.host, args.port).start()
+    print(f'SMTP sink: {sink.host}:{sink.port}', flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        print(f'Принято писем: {len(sink.messages)}, соединений: {sink.state.connections}')
+        sink.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+"""
+Сбор замеров и отчёт: throughput и p50/p95/p99 по каждому эндпоинту, сравнение с базовой линией.
+
+Результат — обычный dict (JSON-сериализуемый), чтобы его можно было сохранить как baseline
+и сравнивать прогоны в CI.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Перцентиль с линейной интерполяцией (как numpy.percentile по умолчанию). Пустой список — 0."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    if len(ordered) == 1:
+        return ordered[0]
+    rank = (len(ordered) - 1) * q / 100
+    low = math.floor(rank)
+    high = math.ceil(rank)
+    if low == high:
+        return ordered[low]
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+@dataclass
+class EndpointSamples:
+    """Сырые замеры одного эндпоинта: латентность (секунды), коды ответа, ошибки транспорта."""
+
+    latencies: list[float] = field(default_factory=list)
+    statuses: Counter = field(default_factory=Counter)
+    errors: int = 0
+
+
+class Recorder:
+    """Копит замеры по меткам эндпоинтов (метка — шаблон пути, а не конкретный URL)."""
+
+    def __init__(self):
+        self._samples: dict[str, EndpointSamples] = defaultdict(EndpointSamples)
+
+    def record(self, label: str, latency: float, status: int | None, *, ok: bool) -> None:
+        samples = self._samples[label]
+        samples.latencies.append(latency)
+        if status is not None:
+            samples.statuses[str(status)] += 1
+        if not ok:
+            samples.errors += 1
+
+    @property
+    def samples(self) -> dict[str, EndpointSamples]:
+        return dict(self._samples)
+
+
+def _endpoint_summary(samples: EndpointSamples, elapsed: float) -> dict:
+    latencies = samples.latencies
+    count = len(latencies)
+    summary = {
+        'count': count,
+        'rps': round(count / elapsed, 2) if elapsed > 0 else 0.0,
+        'errors': samples.errors,
+        'error_rate': round(samples.errors / count, 4) if count else 0.0,
+        'mean_ms': round(sum(latencies) / count * 1000, 2) if count else 0.0,
+        'max_ms': round(max(latencies) * 1000, 2) if count else 0.0,
+        'statuses': dict(sorted(samples.statuses.items())),
+    }
+    for q in PERCENTILES:
+        summary[f'p{q}_ms'] = round(percentile(latencies, q) * 1000, 2)
+    return summary
+
+
+def summarize(recorder: Recorder, elapsed: float, *, meta: dict | None = None) -> dict:
+    """Сводка прогона: meta, total и endpoints[label] с count, rps, p50/p95/p99, ошибками и кодами."""
+    endpoints = {label: _endpoint_summary(samples, elapsed) for label, samples in sorted(recorder.samples.items())}
+    total = EndpointSamples()
+    for samples in recorder.samples.values():
+        total.latencies.extend(samples.latencies)
+        total.statuses.update(samples.statuses)
+        total.errors += samples.errors
+    return {
+        'meta': {**(meta or {}), 'elapsed_s': round(elapsed, 3)},
+        'total': _endpoint_summary(total, elapsed),
+        'endpoints': endpoints,
+    }
+
+
+@dataclass
+class Regression:
+    """Ухудшение метрики относительно baseline."""
+
+    endpoint: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def change_pct(self) -> float:
+        if not self.baseline:
+            return math.inf
+        return (self.current - self.baseline) / self.baseline * 100
+
+    def __str__(self) -> str:
+        return f'{self.endpoint}: {self.metric} {self.baseline} -> {self.current} ({self.change_pct:+.1f}%)'
+
+
+def compare_with_baseline(summary: dict, baseline: dict, *, tolerance_pct: float = 20.0) -> list[Regression]:
+    """
+    Сравнивает прогон с baseline по эндпоинтам, которые есть в обоих.
+
+    Регрессия: p95/p99 выросли больше чем на tolerance_pct, rps упал больше чем на tolerance_pct,
+    либо доля ошибок выросла (любое увеличение при нулевом baseline).
+    """
+    regressions: list[Regression] = []
+    factor = tolerance_pct / 100
+    for label, current in summary.get('endpoints', {}).items():
+        base = baseline.get('endpoints', {}).get(label)
+        if not base:
+            continue
+        for metric in ('p95_ms', 'p99_ms'):
+            if current[metric] > base[metric] * (1 + factor):
+                regressions.append(Regression(label, metric, base[metric], current[metric]))
+        if current['rps'] < base['rps'] * (1 - factor):
+            regressions.append(Regression(label, 'rps', base['rps'], current['rps']))
+        if current['error_rate'] > base['error_rate'] * (1 + factor) and current['error_rate'] > 0:
+            regressions.append(Regression(label, 'error_rate', base['error_rate'], current['error_rate']))
+    return regressions
+
+
+def load_json(path: Path) -> dict | None:
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding='utf-8'))
+
+
+def write_json(path: Path, data: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, ensure_ascii=False, indent=2) + '\n', encoding='utf-8')
+
+
+def format_table(summary: dict) -> str:
+    """Текстовая таблица для консоли."""
+    header = f'{"endpoint":<44} {"count":>7} {"rps":>8} {"p50":>8} {"p95":>8} {"p99":>8} {"err":>6}'
+    lines = [header, '-' * len(header)]
+    rows = list(summary['endpoints'].items()) + [('TOTAL', summary['total'])]
+    for label, s in rows:
+        lines.append(
+            f'{label:<44} {s["count"]:>7} {s["rps"]:>8} {s["p50_ms"]:>8} {s["p95_ms"]:>8} '
+            f'{s["p99_ms"]:>8} {s["errors"]:>6}'
+        )
+    return '\n'.join(lines)
@@ -0,0 +1,165 @@
+"""
+Локальная заглушка API ЮKassa для нагрузочных прогонов.
+
+Отвечает как /v3 ЮKassa на создание и чтение платежа, с настраиваемой задержкой (имитация
+round trip к провайдеру). Сервер запускается так, чтобы backend ходил в неё вместо боевого API:
+
+    uv run python -m loadtest.yookassa_stub --port 8099 --latency-ms 150
+    PAYMENTS_API_URL=http://127.0.0.1:8099/v3 uv run uvicorn config.asgi:application ...
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import threading
+import time
+import uuid
+from datetime import UTC, datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class PaymentStore:
+    """Платежи заглушки в памяти (потокобезопасно)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._payments: dict[str, dict] = {}
+        self._by_idempotence_key: dict[str, str] = {}
+
+    def create(self, payload: dict, idempotence_key: str | None) -> dict:
+        with self._lock:
+            if idempotence_key and idempotence_key in self._by_idempotence_key:
+                return self._payments[self._by_idempotence_key[idempotence_key]]
+            payment_id = str(uuid.uuid4())
+            payment = {
+                'id': payment_id,
+                'status': 'pending',
+                'paid': False,
+                'amount': payload.get('amount') or {'value': '0.00', 'currency': 'RUB'},
+                'description': payload.get('description') or '',
+                'metadata': payload.get('metadata') or {},
+                'created_at': datetime.now(UTC).strftime('%Y-%m-%dT%H:%M:%S.000Z'),
+                'confirmation': {
+                    'type': 'redirect',
+                    'confirmation_url': f'https://yoomoney.example/confirm/{payment_id}',
+                },
+                'test': True,
+                'refundable': False,
+                'recipient': {'account_id': 'stub', 'gateway_id': 'stub'},
+            }
+            self._payments[payment_id] = payment
+            if idempotence_key:
+                self._by_idempotence_key[idempotence_key] = payment_id
+            return payment
+
+    def get(self, payment_id: str) -> dict | None:
+        with self._lock:
+            return self._payments.get(payment_id)
+
+    def set_status(self, payment_id: str, status: str) -> dict | None:
+        with self._lock:
+            payment = self._payments.get(payment_id)
+            if payment is None:
+                return None
+            payment['status'] = status
+            payment['paid'] = status in ('succeeded', 'waiting_for_capture')
+            return payment
+
+
+def _make_handler(store: PaymentStore, latency: float):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            return
+
+        def _send(self, status: int, body: dict) -> None:
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _read_json(self) -> dict:
+            length = int(self.headers.get('Content-Length') or 0)
+            if not length:
+                return {}
+            try:
+                return json.loads(self.rfile.read(length))
+            except ValueError:
+                return {}
+
+        def do_POST(self):  # noqa: N802
+            if latency:
+                time.sleep(latency)
+            parts = self.path.rstrip('/').split('/')
+            payload = self._read_json()
+            if parts[-1] == 'payments':
+                self._send(200, store.create(payload, self.headers.get('Idempotence-Key')))
+                return
+            if len(parts) >= 2 and parts[-2] != 'payments' and parts[-1] in ('capture', 'cancel'):
+                status = 'succeeded' if parts[-1] == 'capture' else 'canceled'
+                payment = store.set_status(parts[-2], status)
+                if payment is None:
+                    self._send(404, {'type': 'error', 'code': 'not_found'})
+                    return
+                self._send(200, payment)
+                return
+            self._send(404, {'type': 'error', 'code': 'not_found'})
+
+        def do_GET(self):  # noqa: N802
+            if latency:
+                time.sleep(latency)
+            payment = store.get(self.path.rstrip('/').split('/')[-1])
+            if payment is None:
+                self._send(404, {'type': 'error', 'code': 'not_found'})
+                return
+            self._send(200, payment)
+
+    return Handler
+
+
+class YooKassaStub:
+    """HTTP-сервер заглушки в фоновом потоке: start() / stop(); api_url — значение для PAYMENTS_API_URL."""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, *, latency_ms: float = 0):
+        self.store = PaymentStore()
+        self._server = ThreadingHTTPServer((host, port), _make_handler(self.store, latency_ms / 1000))
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def api_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}/v3'
+
+    def start(self) -> YooKassaStub:
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Заглушка API ЮKassa для нагрузочных прогонов')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8099)
+    parser.add_argument('--latency-ms', type=float, default=0, help='Искусственная задержка ответа, мс')
+    args = parser.parse_args()
+    stub = YooKassaStub(args.host, args.port, latency_ms=args.latency_ms).start()
+    print(f'YooKassa stub: {stub.api_url}', flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        stub.stop()
+
+
+if __name__ == '__main__':
+    main()
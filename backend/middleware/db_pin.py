@@ -0,0 +1,54 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from config.db_router import routing_state
+
+# Запрос, изменяющий данные, читает только с primary, даже если ничего не записал (проверки перед записью)
+UNSAFE_METHODS = frozenset({'POST', 'PUT', 'PATCH', 'DELETE'})
+
+
+class ReplicaPinMiddleware:
+    """
+    Контекст маршрутизации БД на запрос (config.db_router).
+
+    После записи (или любого изменяющего запроса) ответ ставит cookie DATABASE_REPLICA_PIN_COOKIE
+    на DATABASE_REPLICA_STICKY_SECONDS: пока она есть, каталог читается с primary — пользователь сразу видит
+    свою бронь, даже если реплика отстаёт.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with routing_state(pinned=self._pinned(request)) as state:
+            response = self.get_response(request)
+        return self._pin(request, response, state)
+
+    async def __acall__(self, request):
+        with routing_state(pinned=self._pinned(request)) as state:
+            response = await self.get_response(request)
+        return self._pin(request, response, state)
+
+    @staticmethod
+    def _pinned(request) -> bool:
+        return settings.DATABASE_REPLICA_PIN_COOKIE in request.COOKIES or request.method in UNSAFE_METHODS
+
+    @staticmethod
+    def _pin(request, response, state):
+        if settings.DATABASE_REPLICAS and (state.wrote or request.method in UNSAFE_METHODS):
+            response.set_cookie(
+                settings.DATABASE_REPLICA_PIN_COOKIE,
+                '1',
+                max_age=settings.DATABASE_REPLICA_STICKY_SECONDS,
+                httponly=True,
+                samesite='Lax',
+                secure=request.is_secure(),
+            )
+        return response
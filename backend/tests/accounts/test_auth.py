@@ -6,9 +6,11 @@ from unittest.mock import patch, AsyncMock
 from ninja.testing import TestAsyncClient
 
 from asgiref.sync import sync_to_async
+from django.core import mail
 from api.router import api
 from apps.accounts.models import CustomUser
 from apps.accounts.services.auth_service import generate_password_reset_token
+from apps.notifications.models import OutgoingEmail
 
 
 @pytest.mark.django_db
@@ -507,6 +509,21 @@ class TestPasswordReset:
         assert data.get("code") == "ACCOUNTS_PASSWORD_RESET_ERROR"
         mock_send_email.assert_called_once()
 
+    async def test_password_reset_queues_email_without_smtp(self, client, test_user):
+        """Письмо кладётся в очередь (outbox) и не отправляется в запросе."""
+        response = await client.post(
+            "/auth/password-reset",
+            json={"email": test_user.email},
+        )
+
+        assert response.status_code == 200
+        assert len(mail.outbox) == 0
+        queued = await OutgoingEmail.objects.filter(to_email=test_user.email).afirst()
+        assert queued is not None
+        assert queued.kind == OutgoingEmail.Kind.PASSWORD_RESET
+        assert queued.status == OutgoingEmail.Status.PENDING
+        assert "restore-password?token=" in queued.body
+
     async def test_password_reset_nonexistent_email_returns_200(self, client):
         """Для несуществующего email возвращается 200 (без раскрытия факта)."""
         response = await client.post(
@@ -0,0 +1,99 @@
+"""
+Тесты пула хеширования паролей (apps.accounts.services.password_hashing).
+"""
+
+import asyncio
+import threading
+from unittest.mock import patch
+
+import pytest
+from asgiref.sync import sync_to_async
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+from apps.accounts.models import CustomUser
+from apps.accounts.services.password_hashing import (
+    PasswordHasherPool,
+    PasswordHashingBusyError,
+    acheck_user_password,
+    aset_user_password,
+)
+
+
+async def test_pool_rejects_work_over_capacity():
+    pool = PasswordHasherPool(workers=1, max_queue=1)
+    release = threading.Event()
+    try:
+        running = [asyncio.ensure_future(pool.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+
+        with pytest.raises(PasswordHashingBusyError):
+            await pool.run(release.wait)
+        stats = pool.stats()
+        assert (stats['running'], stats['queued'], stats['rejected']) == (1, 1, 1)
+
+        release.set()
+        await asyncio.gather(*running)
+        stats = pool.stats()
+        assert (stats['completed'], stats['running'], stats['queued']) == (2, 0, 0)
+        assert stats['max_wait_ms'] > 0
+    finally:
+        release.set()
+        pool.shutdown()
+
+
+async def test_event_loop_stays_responsive_while_hashing():
+    pool = PasswordHasherPool(workers=2, max_queue=10)
+    hasher = PBKDF2PasswordHasher()
+    lags = []
+
+    async def ticker():
+        loop = asyncio.get_running_loop()
+        for _ in range(10):
+            started = loop.time()
+            await asyncio.sleep(0.01)
+            lags.append(loop.time() - started - 0.01)
+
+    try:
+        await asyncio.gather(
+            *(pool.run(hasher.encode, 'secret-password', f'salt{i}abcdefgh', 200_000) for i in range(4)),
+            ticker(),
+        )
+    finally:
+        pool.shutdown()
+    assert max(lags) < 0.1
+
+
+@pytest.mark.django_db
+class TestUserPasswordHelpers:
+    async def test_check_password_upgrades_weak_hash(self, test_user):
+        weak = PBKDF2PasswordHasher().encode('OldPassword-123', 'weaksalt1234567', iterations=1000)
+        test_user.password = weak
+        await test_user.asave(update_fields=['password'])
+
+        assert await acheck_user_password(test_user, 'wrong-password') is False
+        assert await acheck_user_password(test_user, 'OldPassword-123') is True
+
+        stored = await sync_to_async(lambda: CustomUser.objects.get(pk=test_user.pk).password)()
+        assert stored != weak
+        assert stored.startswith('pbkdf2_sha256$')
+
+    async def test_set_password_hashes_in_pool(self, test_user):
+        await aset_user_password(test_user, 'BrandNew-Password-1')
+        await test_user.asave()
+
+        fresh = await CustomUser.objects.aget(pk=test_user.pk)
+        assert await sync_to_async(fresh.check_password)('BrandNew-Password-1')
+
+
+@pytest.mark.django_db
+class TestBackpressureResponses:
+    @pytest.fixture
+    def client(self, api_client):
+        return api_client
+
+    @patch('apps.accounts.routers.auth.acheck_user_password', side_effect=PasswordHashingBusyError('full'))
+    async def test_login_returns_503_when_hashing_queue_is_full(self, _mock_check, client, test_user):
+        response = await client.post('/auth/login', json={'email': test_user.email, 'password': 'whatever'})
+
+        assert response.status_code == 503
+        assert response.json()['code'] == 'ACCOUNTS_PASSWORD_HASHING_BUSY'
@@ -1,7 +1,9 @@
 """
 Smoke тесты для эндпоинтов профиля.
 """
+import uuid
 from datetime import timedelta
+from decimal import Decimal
 
 import pytest
 from asgiref.sync import sync_to_async
@@ -11,7 +13,9 @@ from django.utils import timezone
 from apps.accounts.models import CustomUser
 from apps.bookings.models import Booking
 from apps.deals.models import Deal
+from apps.payments.models import Payment
 from apps.re_objects.models import Premise
+from apps.referrals.models import ReferralLink
 
 
 @pytest.mark.django_db
@@ -387,3 +391,118 @@ class TestProfileEndpoints:
         response = await client.get('/profile/bookings')
         assert response.status_code == 200
         assert len(response.json()) == 2
+
+    @override_settings(BOOKINGS_LIST_ONLY_ACTIVE=False)
+    async def test_profile_bookings_paginated(self, api_client, test_user, building_with_premise):
+        """page_size ограничивает список броней; page — смещение."""
+        _, premise = building_with_premise
+        expires = timezone.now() + timedelta(days=1)
+
+        def seed():
+            for _ in range(3):
+                Booking.objects.create(
+                    user_id=test_user.id,
+                    premise=premise,
+                    deal_type=Booking.DealType.RENT,
+                    expires_at=expires,
+                    is_active=False,
+                )
+
+        await sync_to_async(seed)()
+        client = await self.get_authenticated_client(api_client, test_user.email, 'TestPassword123!')
+        first = await client.get('/profile/bookings', query_params={'page_size': 2})
+        second = await client.get('/profile/bookings', query_params={'page_size': 2, 'page': 2})
+        too_large = await client.get('/profile/bookings', query_params={'page_size': 1000})
+
+        assert [len(first.json()), len(second.json())] == [2, 1]
+        assert first['X-Total-Count'] == second['X-Total-Count'] == '3'
+        # TestAsyncClient зовёт ручку без префикса /api/v1 — в Link путь запроса как есть
+        assert first['Link'] == '</profile/bookings?page=2&page_size=2>; rel="next"'
+        assert second['Link'] == '</profile/bookings?page=1&page_size=2>; rel="prev"'
+        assert too_large.status_code == 422
+
+    @override_settings(BOOKINGS_LIST_ONLY_ACTIVE=False)
+    async def test_profile_bookings_without_page_size_returns_all(self, api_client, test_user, building_with_premise):
+        """Без page_size — весь список, как раньше (фронтенд вызывает ручку без параметров)."""
+        _, premise = building_with_premise
+        expires = timezone.now() + timedelta(days=1)
+
+        def seed():
+            Booking.objects.bulk_create(
+                Booking(
+                    user_id=test_user.id,
+                    premise=premise,
+                    deal_type=Booking.DealType.RENT,
+                    expires_at=expires,
+                    is_active=False,
+                )
+                for _ in range(120)
+            )
+
+        await sync_to_async(seed)()
+        client = await self.get_authenticated_client(api_client, test_user.email, 'TestPassword123!')
+        response = await client.get('/profile/bookings')
+
+        assert response.status_code == 200
+        assert len(response.json()) == 120
+        assert not response.has_header('X-Total-Count')
+
+    async def test_dashboard_aggregates_sections(self, api_client, test_user, building_with_premise):
+        """/profile/dashboard: пользователь, брони, сделки аренды и продажи, статистика рефералов."""
+        _, premise = building_with_premise
+        now = timezone.now()
+
+        def seed():
+            Booking.objects.create(
+                user_id=test_user.id,
+                premise=premise,
+                deal_type=Booking.DealType.RENT,
+                expires_at=now + timedelta(days=1),
+            )
+            Deal.objects.create(
+                user_id=test_user.id,
+                premise=premise,
+                deal_type=Deal.DealType.SALE,
+                contract_type=Deal.ContractType.DKP,
+                commission_amount=0,
+            )
+            link = ReferralLink.objects.create(referrer=test_user, premise=premise, contact_phone='+79990000000')
+            ReferralLink.objects.create(
+                referrer=test_user, premise=premise, contact_phone='+79990000000', is_active=False
+            )
+            Payment.objects.create(
+                premise=premise,
+                referral_link=link,
+                provider_payment_id='dashboard-payment',
+                idempotence_key=uuid.uuid4(),
+                status=Payment.Status.SUCCEEDED,
+                paid=True,
+                amount_value=Decimal('1500.50'),
+                amount_currency='RUB',
+            )
+
+        await sync_to_async(seed)()
+        client = await self.get_authenticated_client(api_client, test_user.email, 'TestPassword123!')
+        response = await client.get('/profile/dashboard', query_params={'page_size': 5})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data['user']['email'] == test_user.email
+        assert data['bookings']['total'] == 1
+        assert data['bookings']['page_size'] == 5
+        assert data['bookings']['items'][0]['premise_uuid'] == str(premise.uuid)
+        assert data['rent']['total'] == 0
+        assert data['sale']['total'] == 1
+        assert data['referrals'] == {
+            'links_total': 2,
+            'links_active': 1,
+            'referred_bookings': 0,
+            'paid_payments': 1,
+            'paid_amount': '1500.50',
+        }
+
+    async def test_dashboard_unauthorized(self, api_client):
+        api_client.headers = {}
+        api_client.cookies = {}
+        response = await api_client.get('/profile/dashboard')
+        assert response.status_code == 401
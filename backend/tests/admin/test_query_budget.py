@@ -0,0 +1,245 @@
+"""
+Бюджет запросов админки: список, карточка, автодополнение и фильтры не растут с числом строк.
+
+Для каждой зарегистрированной админки re_objects, payments, bookings и deals нужна фабрика в FACTORIES —
+новая админка без неё роняет test_every_admin_has_factory.
+"""
+
+import itertools
+from datetime import timedelta
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+from django.contrib import admin
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.accounts.models import CustomUser
+from apps.bookings.models import Booking
+from apps.deals.models import Deal
+from apps.payments.models import Payment, WebhookInboxEntry
+from apps.re_objects.models import (
+    Building,
+    BuildingImage,
+    BuildingVideo,
+    City,
+    Floor,
+    MediaBlob,
+    MediaDerivativeJob,
+    Premise,
+    PremiseImage,
+    PremiseVideo,
+    Region,
+)
+from core import admin as core_admin
+
+APPS = {'re_objects', 'payments', 'bookings', 'deals'}
+# Запросов на страницу (сессия, пользователь, COUNT, строки, фильтры, выбранные значения autocomplete) — без N+1
+CHANGELIST_BUDGET = 12
+CHANGE_VIEW_BUDGET = 20
+
+_seq = itertools.count(1)
+
+
+def _user():
+    n = next(_seq)
+    return CustomUser.objects.create_user(
+        username=f'budget_{n}', email=f'budget_{n}@example.com', password='x', phone=f'+7999800{n:04d}'
+    )
+
+
+def _region():
+    n = next(_seq)
+    return Region.objects.create(name=f'Регион бюджета {n}', code=f'b{n}')
+
+
+def _city():
+    return City.objects.create(name=f'Город бюджета {next(_seq)}', region=_region())
+
+
+def _building():
+    return Building.objects.create(name=f'БЦ Бюджет {next(_seq)}', address='ул. Счётная, 1', city=_city())
+
+
+def _floor():
+    return Floor.objects.create(building=_building(), number=next(_seq), title='Этаж')
+
+
+def _premise():
+    floor = _floor()
+    return Premise.objects.create(
+        building=floor.building,
+        floor=floor,
+        city=floor.building.city,
+        area=Decimal('40'),
+        price_per_month=50_000,
+        room_number=str(next(_seq)),
+    )
+
+
+def _payment():
+    return Payment.objects.create(
+        premise=_premise(),
+        provider_payment_id=f'budget-{uuid4()}',
+        idempotence_key=uuid4(),
+        amount_value=Decimal('100.00'),
+        amount_currency='RUB',
+    )
+
+
+def _booking():
+    return Booking.objects.create(
+        user=_user(),
+        premise=_premise(),
+        deal_type=Booking.DealType.RENT,
+        expires_at=timezone.now() + timedelta(days=1),
+        source_payment=_payment(),
+        referrer=_user(),
+    )
+
+
+def _deal():
+    return Deal.objects.create(
+        user=_user(),
+        premise=_premise(),
+        deal_type=Deal.DealType.RENT,
+        rent_expires_at=timezone.now().date() + timedelta(days=300),
+        commission_amount=1000,
+    )
+
+
+FACTORIES = {
+    Region: _region,
+    City: _city,
+    Building: _building,
+    Floor: _floor,
+    Premise: _premise,
+    MediaDerivativeJob: lambda: MediaDerivativeJob.objects.create(target='premise_image', media_id=next(_seq)),
+    MediaBlob: lambda: MediaBlob.objects.create(sha256=f'{next(_seq):064x}', size=1024, original='blobs/x.jpg'),
+    Payment: _payment,
+    WebhookInboxEntry: lambda: WebhookInboxEntry.objects.create(
+        provider_payment_id=f'budget-{uuid4()}', event='payment.succeeded', payload={}
+    ),
+    Booking: _booking,
+    Deal: _deal,
+}
+
+REGISTERED = sorted(
+    (model for model in admin.site._registry if model._meta.app_label in APPS), key=lambda m: m._meta.label
+)
+
+
+@pytest.fixture
+def client(django_client, admin_user):
+    django_client.force_login(admin_user)
+    return django_client
+
+
+def _queries(client, url) -> int:
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    assert response.status_code == 200, url
+    return len(ctx.captured_queries)
+
+
+def test_every_admin_has_factory():
+    assert {model._meta.label for model in REGISTERED} <= {model._meta.label for model in FACTORIES}
+
+
+@pytest.mark.parametrize('model', REGISTERED, ids=lambda model: model._meta.label)
+def test_changelist_queries_do_not_grow_with_rows(client, model):
+    url = reverse(f'admin:{model._meta.app_label}_{model._meta.model_name}_changelist')
+    FACTORIES[model]()
+    client.get(url)  # прогрев: ContentType и прочие кэши процесса
+    single = _queries(client, url)
+    for _ in range(4):
+        FACTORIES[model]()
+    many = _queries(client, url)
+
+    assert many == single
+    assert many <= CHANGELIST_BUDGET
+
+
+@pytest.mark.parametrize('model', REGISTERED, ids=lambda model: model._meta.label)
+def test_change_view_within_budget(client, model):
+    obj = FACTORIES[model]()
+    url = reverse(f'admin:{model._meta.app_label}_{model._meta.model_name}_change', args=[obj.pk])
+    client.get(url)
+    assert _queries(client, url) <= CHANGE_VIEW_BUDGET
+
+
+def _media(owner, image_model, video_model, count):
+    field = owner._meta.model_name
+    image_model.objects.bulk_create(
+        image_model(
+            **{field: owner},
+            original=f'{field}s/b/{n}.jpg',
+            card=f'{field}s/b/{n}-card.webp',
+            detail=f'{field}s/b/{n}-detail.webp',
+            order=n,
+        )
+        for n in range(count)
+    )
+    video_model.objects.bulk_create(
+        video_model(**{field: owner}, file=f'{field}s/b/{n}.mp4', card=f'{field}s/b/{n}.webp', order=n)
+        for n in range(count)
+    )
+
+
+@pytest.mark.parametrize(
+    ('model', 'image_model', 'video_model'),
+    [(Premise, PremiseImage, PremiseVideo), (Building, BuildingImage, BuildingVideo)],
+    ids=['premise', 'building'],
+)
+def test_media_inlines_do_not_grow_with_rows(client, model, image_model, video_model):
+    first, second = FACTORIES[model](), FACTORIES[model]()
+    _media(first, image_model, video_model, 1)
+    _media(second, image_model, video_model, 6)
+    name = f'admin:re_objects_{model._meta.model_name}_change'
+    client.get(reverse(name, args=[first.pk]))
+
+    single = _queries(client, reverse(name, args=[first.pk]))
+    response = client.get(reverse(name, args=[second.pk]))
+    many = _queries(client, reverse(name, args=[second.pk]))
+
+    assert many == single
+    content = response.content.decode()
+    # В inline — только превью card, без ссылок на detail
+    assert content.count('-card.webp') >= 6
+    assert '-detail.webp' not in content
+
+
+@pytest.mark.parametrize('model', [Building, Floor, City, Premise], ids=lambda model: model._meta.label)
+def test_autocomplete_queries_do_not_grow_with_rows(client, model):
+    for _ in range(2):
+        FACTORIES[model]()
+    params = {'app_label': 're_objects', 'model_name': 'premise', 'field_name': model._meta.model_name}
+    if model is Premise:
+        params = {'app_label': 'deals', 'model_name': 'deal', 'field_name': 'premise'}
+    url = reverse('admin:autocomplete') + '?' + '&'.join(f'{k}={v}' for k, v in params.items())
+    client.get(url)
+    single = _queries(client, url)
+    for _ in range(5):
+        FACTORIES[model]()
+    assert _queries(client, url) == single
+
+
+def test_large_table_count_is_estimated(client, monkeypatch):
+    _payment()
+    monkeypatch.setattr(core_admin, 'estimate_count', lambda queryset: 2_500_000)
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(reverse('admin:payments_payment_changelist'))
+
+    assert response.status_code == 200
+    assert response.context['cl'].result_count == 2_500_000
+    assert not [q for q in ctx.captured_queries if 'COUNT(' in q['sql'] and '"payments"' in q['sql']]
+
+
+def test_small_estimate_falls_back_to_exact_count(client, monkeypatch):
+    _payment()
+    monkeypatch.setattr(core_admin, 'estimate_count', lambda queryset: 50)
+    response = client.get(reverse('admin:payments_payment_changelist'))
+    assert response.context['cl'].result_count == Payment.objects.count()
@@ -0,0 +1,24 @@
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+
+
+@pytest.fixture
+def premise(make_building, make_premise):
+    """Помещение без этажа, доступное и в аренду, и на продажу."""
+    building = make_building('БЦ Бронь', city='Бронеград', floors=(), address='ул. Брони, 1')
+    return make_premise(
+        building,
+        '301',
+        floor=None,
+        area=Decimal('45.00'),
+        price_per_month=120_000,
+        price_per_sqm=120_000,
+        available_for_sale=True,
+    )
+
+
+@pytest.fixture
+def user(db):
+    return get_user_model().objects.create_user(username='booking-user', email='booking@example.com', password='secret')
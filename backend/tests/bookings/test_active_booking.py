@@ -0,0 +1,44 @@
+"""Одна активная бронь на помещение: 409 на вторую, снятие истёкшей, частичный уникальный индекс."""
+
+from datetime import timedelta
+
+import pytest
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from apps.bookings.models import Booking
+from apps.bookings.services import create_booking
+
+
+def _booking(user, premise, expires_at) -> Booking:
+    return Booking.objects.create(user=user, premise=premise, deal_type=Booking.DealType.RENT, expires_at=expires_at)
+
+
+def test_second_active_booking_conflicts(premise, user):
+    out, err = create_booking(user, premise.uuid, Booking.DealType.RENT)
+    assert err is None and out is not None
+
+    out, err = create_booking(user, premise.uuid, Booking.DealType.SALE)
+
+    assert out is None
+    assert err[0] == 409 and err[1]['code'] == 'BOOKINGS_ACTIVE_BOOKING_EXISTS'
+    assert Booking.objects.filter(premise=premise, is_active=True).count() == 1
+
+
+def test_expired_active_booking_is_released(premise, user):
+    stale = _booking(user, premise, timezone.now() + timedelta(days=3))
+    Booking.objects.filter(pk=stale.pk).update(expires_at=timezone.now() - timedelta(minutes=1))
+
+    out, err = create_booking(user, premise.uuid, Booking.DealType.RENT)
+
+    assert err is None and out is not None
+    stale.refresh_from_db()
+    assert not stale.is_active
+    assert Booking.objects.filter(premise=premise, is_active=True).count() == 1
+
+
+def test_database_rejects_second_active_booking(premise, user):
+    _booking(user, premise, timezone.now() + timedelta(days=3))
+
+    with pytest.raises(IntegrityError), transaction.atomic():
+        _booking(user, premise, timezone.now() + timedelta(days=3))
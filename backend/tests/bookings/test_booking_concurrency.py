@@ -0,0 +1,102 @@
+"""Гонки броней: один победитель на помещение, проверка платежей и INSERT брони — под блокировкой помещения."""
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+import pytest
+from django.db import OperationalError, connection
+
+from apps.bookings import services as booking_services
+from apps.bookings.models import Booking
+from apps.bookings.services import create_booking
+from apps.payments import services as payment_services
+from apps.payments.models import Payment
+
+ATTEMPTS = 200
+WORKERS = 32
+
+
+def _book(user, premise):
+    # SQLite (тестовая БД) сериализует запись и отвечает «table is locked» вместо ожидания — повторяем;
+    # в PostgreSQL конфликт разрешает частичный уникальный индекс
+    try:
+        for _ in range(200):
+            try:
+                return create_booking(user, premise.uuid, Booking.DealType.RENT)
+            except OperationalError:
+                time.sleep(0.005)
+        raise AssertionError('Не удалось дождаться блокировки БД')
+    finally:
+        connection.close()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_parallel_bookings_single_winner(premise, user):
+    """Параллельные брони одного помещения: ровно одна успешна, остальные — 409."""
+    barrier = threading.Barrier(WORKERS)
+
+    def attempt(i):
+        if i < WORKERS:
+            barrier.wait()
+        return _book(user, premise)
+
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        results = list(pool.map(attempt, range(ATTEMPTS)))
+
+    winners = [out for out, err in results if err is None]
+    conflicts = [err for out, err in results if err is not None]
+    assert len(winners) == 1
+    assert len(conflicts) == ATTEMPTS - 1
+    assert all(status == 409 for status, _ in conflicts)
+    assert Booking.objects.filter(premise=premise).count() == 1
+
+
+def _pending_payment(premise, provider_payment_id: str) -> Payment:
+    return Payment.objects.create(
+        premise=premise,
+        provider_payment_id=provider_payment_id,
+        idempotence_key=uuid.uuid4(),
+        amount_value=Decimal('100.00'),
+        amount_currency='RUB',
+    )
+
+
+def test_booking_sees_payment_committed_while_waiting_for_premise_lock(premise, user, monkeypatch):
+    lock_premise = booking_services.lock_premise
+
+    def lock_after_payment(premise_id):
+        # Параллельный create_payment записал платёж, пока бронь ждала блокировку помещения
+        _pending_payment(premise, 'race-pending')
+        return lock_premise(premise_id)
+
+    monkeypatch.setattr(booking_services, 'lock_premise', lock_after_payment)
+
+    out, err = create_booking(user, premise.uuid, Booking.DealType.RENT)
+
+    assert out is None
+    assert err[0] == 409 and err[1]['title'] == 'Premise has payment in progress'
+    assert not Booking.objects.filter(premise=premise).exists()
+
+
+def test_sale_booking_and_payment_claim_take_premise_lock(premise, user, monkeypatch):
+    locks = []
+    lock_premise = booking_services.lock_premise
+
+    def spy(premise_id):
+        locks.append((premise_id, connection.in_atomic_block))
+        return lock_premise(premise_id)
+
+    monkeypatch.setattr(payment_services, 'lock_premise', spy)
+
+    claim, conflict = payment_services._claim_premise_for_payment(
+        premise, idempotence_key=uuid.uuid4(), amount_value=Decimal('100.00'), amount_currency='RUB'
+    )
+    payment_services._ensure_sale_booking({'user_id': str(user.pk), 'premise_id': str(premise.pk)}, None)
+
+    assert conflict is None
+    assert locks == [(premise.pk, True), (premise.pk, True)]
+    assert Payment.objects.filter(pk=claim.pk, premise=premise, status=Payment.Status.PENDING).exists()
+    assert Booking.objects.filter(premise=premise, deal_type=Booking.DealType.SALE, is_active=True).exists()
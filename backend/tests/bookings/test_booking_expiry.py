@@ -0,0 +1,104 @@
+"""Истечение броней: снятие флага is_active пачками и событие booking_expired после коммита."""
+
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from apps.bookings.models import Booking
+from apps.bookings.services import create_booking, expire_due_bookings, next_booking_expiry
+from apps.bookings.signals import booking_expired
+
+
+@pytest.fixture
+def premises(premise, make_premise):
+    return [premise, *(make_premise(premise.building, str(n), floor=None) for n in (1, 2))]
+
+
+@pytest.fixture
+def no_bookings(db):
+    """Async-тесты коммитят свои брони; удаление откатится вместе с транзакцией теста."""
+    Booking.objects.all().delete()
+
+
+@pytest.fixture
+def expired_events():
+    events = []
+
+    def receiver(sender, booking_ids, premise_ids, **kwargs):
+        events.append((booking_ids, premise_ids))
+
+    booking_expired.connect(receiver)
+    yield events
+    booking_expired.disconnect(receiver)
+
+
+def _booking(user, premise, expires_at) -> Booking:
+    booking = Booking.objects.create(
+        user=user, premise=premise, deal_type=Booking.DealType.RENT, expires_at=timezone.now() + timedelta(days=1)
+    )
+    Booking.objects.filter(pk=booking.pk).update(expires_at=expires_at)
+    return booking
+
+
+def test_expire_due_bookings_deactivates_and_emits_event(
+    no_bookings, user, premises, expired_events, django_capture_on_commit_callbacks
+):
+    now = timezone.now()
+    first = _booking(user, premises[0], now - timedelta(hours=1))
+    second = _booking(user, premises[1], now - timedelta(minutes=1))
+    active = _booking(user, premises[2], now + timedelta(hours=1))
+
+    with django_capture_on_commit_callbacks(execute=True):
+        expired = expire_due_bookings(now=now, batch_size=1)
+
+    assert sorted(expired) == sorted([(first.pk, first.premise_id), (second.pk, second.premise_id)])
+    assert expired_events == [([first.pk], [first.premise_id]), ([second.pk], [second.premise_id])]
+    assert list(Booking.objects.active().values_list('pk', flat=True)) == [active.pk]
+    assert next_booking_expiry() == Booking.objects.get(pk=active.pk).expires_at
+
+
+def test_expired_booking_holds_premise_until_swept(user, premise):
+    booking = _booking(user, premise, timezone.now() - timedelta(minutes=1))
+
+    assert list(Booking.objects.active().filter(premise=premise)) == [booking]
+    expire_due_bookings()
+    assert not Booking.objects.active().filter(premise=premise).exists()
+
+
+def test_rebooking_over_unswept_expired_booking_emits_event(
+    user, premise, expired_events, django_capture_on_commit_callbacks
+):
+    stale = _booking(user, premise, timezone.now() - timedelta(minutes=1))
+
+    with django_capture_on_commit_callbacks(execute=True):
+        out, err = create_booking(user, premise.uuid, Booking.DealType.RENT)
+
+    assert err is None
+    assert expired_events == [([stale.pk], [premise.pk])]
+
+
+def test_booking_saved_already_expired_emits_event(user, premise, expired_events, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        booking = Booking.objects.create(
+            user=user,
+            premise=premise,
+            deal_type=Booking.DealType.RENT,
+            expires_at=timezone.now() - timedelta(minutes=1),
+        )
+        Booking.objects.get(pk=booking.pk).save()
+
+    assert not booking.is_active
+    assert expired_events == [([booking.pk], [premise.pk])]
+
+
+def test_expire_bookings_command(no_bookings, user, premise):
+    _booking(user, premise, timezone.now() - timedelta(minutes=1))
+    out = StringIO()
+
+    call_command('expire_bookings', stdout=out)
+
+    assert not Booking.objects.active().exists()
+    assert 'Снято броней: 1' in out.getvalue()
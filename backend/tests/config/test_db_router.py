@@ -0,0 +1,119 @@
+"""Чтение каталога с реплики БД: маршрутизация, привязка к primary после записи, отставание реплики."""
+
+import pytest
+from asgiref.sync import sync_to_async
+from django.db import OperationalError
+from django.test import AsyncClient
+
+from apps.accounts.models import CustomUser
+from apps.re_objects.models import Building, Premise
+from config import db_router
+from config.db_router import ReplicaRouter, replica_context, replica_monitor, routing_state
+
+router = ReplicaRouter()
+
+
+@pytest.fixture
+def replicas(settings):
+    settings.DATABASE_REPLICAS = ['replica']
+    settings.DATABASE_REPLICA_LAG_CHECK_SECONDS = 60
+    replica_monitor.reset()
+    yield
+    replica_monitor.reset()
+
+
+def test_reads_outside_catalog_stay_on_primary(replicas):
+    assert router.db_for_read(Building) == 'default'
+    with routing_state():
+        assert router.db_for_read(Building) == 'default'
+
+
+def test_catalog_reads_go_to_replica_except_auth(replicas):
+    with replica_context():
+        assert router.db_for_read(Building) == 'replica'
+        assert router.db_for_read(CustomUser) == 'default'
+    assert router.db_for_write(Building) == 'default'
+
+
+def test_write_pins_rest_of_request_to_primary(replicas):
+    with replica_context() as state:
+        router.db_for_write(Premise)
+        assert state.wrote
+        assert router.db_for_read(Building) == 'default'
+
+
+def test_reads_inside_primary_transaction_stay_on_primary(replicas, db):
+    # pytest-django держит тест в транзакции на default
+    with replica_context():
+        assert router.db_for_read(Building) == 'default'
+
+
+def test_lagging_or_unreachable_replica_falls_back_to_primary(replicas, settings, monkeypatch):
+    settings.DATABASE_REPLICA_MAX_LAG_SECONDS = 5
+    settings.DATABASE_REPLICA_LAG_CHECK_SECONDS = 0
+    lag = {'replica': 30.0}
+
+    def measure(alias):
+        if lag[alias] is None:
+            raise OperationalError('connection refused')
+        return lag[alias]
+
+    monkeypatch.setattr(db_router, 'measure_lag', measure)
+    with replica_context():
+        assert router.db_for_read(Building) == 'default'
+        lag['replica'] = 1.0
+        assert router.db_for_read(Building) == 'replica'
+        lag['replica'] = None
+        assert router.db_for_read(Building) == 'default'
+    assert replica_monitor.status() == [('replica', None, False)]
+
+
+def test_lag_is_checked_once_per_interval(replicas, monkeypatch):
+    calls = []
+    monkeypatch.setattr(db_router, 'measure_lag', lambda alias: calls.append(alias) or 0.0)
+    with replica_context():
+        for _ in range(3):
+            router.db_for_read(Building)
+    assert calls == ['replica']
+
+
+def test_migrations_only_on_primary(replicas):
+    assert router.allow_migrate('replica', 're_objects') is False
+    assert router.allow_migrate('default', 're_objects') is True
+
+
+@pytest.mark.django_db(transaction=True, databases=['default', 'replica'])
+async def test_catalog_served_from_replica_until_user_writes(replicas, monkeypatch, make_building, make_premise):
+    routed = []
+    db_for_read = ReplicaRouter.db_for_read
+
+    def spy(self, model, **hints):
+        alias = db_for_read(self, model, **hints)
+        routed.append(alias)
+        return alias
+
+    def create_building():
+        building = make_building('БЦ Реплика', city='Репликск', address='ул. Зеркальная, 1')
+        make_premise(building, 'R1', area=40, price_per_month=1000)
+        return building
+
+    building = await sync_to_async(create_building)()
+    monkeypatch.setattr(ReplicaRouter, 'db_for_read', spy)
+    client = AsyncClient()
+
+    response = await client.get(f'/api/v1/buildings/{building.uuid}')
+
+    assert response.status_code == 200
+    assert response.json()['title'] == 'БЦ Реплика'
+    assert routed and set(routed) == {'replica'}
+    assert 'db_pin' not in response.cookies
+
+    # Изменяющий запрос (даже неудачный) закрепляет следующие чтения за primary
+    response = await client.post('/api/v1/auth/login', {'email': 'nobody@example.com', 'password': 'x'})
+    assert response.cookies['db_pin']['max-age'] == 15
+    routed.clear()
+
+    response = await client.get(f'/api/v1/buildings/{building.uuid}')
+
+    assert response.status_code == 200
+    assert routed and set(routed) == {'default'}
@@ -7,6 +7,7 @@ sync-код из async-контекста (Django запрещает это по
 """
 import pytest
 from asgiref.sync import sync_to_async
+from django.test import Client
 from ninja.testing import TestAsyncClient
 
 from api.router import api
@@ -38,38 +39,77 @@ def _create_region():
     return region
 
 
-def _create_city(region):
+def _create_city(region, name='Казань'):
     city, _ = City.objects.get_or_create(
-        name='Казань',
+        name=name,
         region=region,
-        defaults={'is_default': True},
+        defaults={'is_default': name == 'Казань'},
     )
     return city
 
 
-def _create_building_with_premise(city):
-    """Создаёт здание с этажом и помещением (для аренды, доступно)."""
-    building = Building.objects.create(
-        name='БЦ Тестовый',
-        address='ул. Тестовая, 1',
-        city=city,
-        description='Тестовое здание',
-    )
-    floor = Floor.objects.create(building=building, number=1, title='Этаж 1')
-    premise = Premise.objects.create(
+def _create_building(name='БЦ Тестовый', *, city='Казань', floors=(1,), **fields):
+    """
+    Создаёт здание с этажами floors (номера). city — объект City или имя города
+    в регионе по умолчанию: отдельный город изолирует данные модуля от остальных тестов.
+    """
+    if isinstance(city, str):
+        city = _create_city(_create_region(), city)
+    fields.setdefault('address', 'ул. Тестовая, 1')
+    building = Building.objects.create(name=name, city=city, **fields)
+    for number in floors:
+        Floor.objects.create(building=building, number=number, title=f'Этаж {number}')
+    return building
+
+
+def _create_premise(building, room_number='101', *, floor=1, **fields):
+    """Создаёт помещение здания на этаже с номером floor (None — без этажа); по умолчанию — аренда, доступно."""
+    fields.setdefault('area', 50)
+    if fields.setdefault('available_for_rent', True):
+        fields.setdefault('price_per_month', 100000)
+    return Premise.objects.create(
         building=building,
-        city=city,
-        floor=floor,
-        area=50,
-        price_per_month=100000,
-        available_for_rent=True,
-        available_for_sale=False,
-        room_number='101',
-        title='101',
+        city=building.city,
+        floor=None if floor is None else building.floors.get(number=floor),
+        room_number=room_number,
+        **fields,
     )
+
+
+def _create_building_with_premise(city):
+    """Создаёт здание с этажом и помещением (для аренды, доступно)."""
+    building = _create_building(city=city, description='Тестовое здание')
+    premise = _create_premise(building, available_for_sale=False, title='101')
     return building, premise
 
 
+@pytest.fixture
+def make_building(db):
+    """Sync-фабрика зданий (_create_building) для тестов сервисов, команд и админки."""
+    return _create_building
+
+
+@pytest.fixture
+def make_premise(db):
+    """Sync-фабрика помещений (_create_premise)."""
+    return _create_premise
+
+
+@pytest.fixture
+def ninja_skip_registry(monkeypatch):
+    """
+    Для тестов через полный URLconf (django.test.Client/AsyncClient): api.urls грузится после
+    TestAsyncClient (api_client), и реестр Ninja считает это вторым API.
+    """
+    monkeypatch.setenv('NINJA_SKIP_REGISTRY', '1')
+
+
+@pytest.fixture
+def django_client(db, ninja_skip_registry):
+    """django.test.Client для админки и ручек через полный URLconf."""
+    return Client()
+
+
 @pytest.fixture
 async def region(db):
     """Регион для тестов."""
@@ -0,0 +1,64 @@
+import pytest
+
+from loadtest.stats import Recorder, compare_with_baseline, percentile, summarize
+
+
+class TestPercentile:
+    def test_empty_is_zero(self):
+        assert percentile([], 95) == 0.0
+
+    def test_linear_interpolation(self):
+        values = [1.0, 2.0, 3.0, 4.0]
+        assert percentile(values, 50) == pytest.approx(2.5)
+        assert percentile(values, 100) == 4.0
+        assert percentile(values, 0) == 1.0
+
+
+class TestSummarize:
+    def test_per_endpoint_and_total(self):
+        recorder = Recorder()
+        for ms in (10, 20, 30, 40):
+            recorder.record('GET /premises', ms / 1000, 200, ok=True)
+        recorder.record('POST /bookings/', 0.05, 409, ok=True)
+        recorder.record('POST /bookings/', 0.5, None, ok=False)
+
+        summary = summarize(recorder, 2.0, meta={'users': 1})
+
+        premises = summary['endpoints']['GET /premises']
+        assert premises['count'] == 4
+        assert premises['rps'] == 2.0
+        assert premises['p50_ms'] == pytest.approx(25.0)
+        assert premises['statuses'] == {'200': 4}
+        bookings = summary['endpoints']['POST /bookings/']
+        assert bookings['errors'] == 1
+        assert bookings['error_rate'] == 0.5
+        assert bookings['statuses'] == {'409': 1}
+        assert summary['total']['count'] == 6
+        assert summary['meta'] == {'users': 1, 'elapsed_s': 2.0}
+
+
+class TestCompareWithBaseline:
+    @staticmethod
+    def _summary(p95, p99, rps, error_rate=0.0):
+        return {
+            'endpoints': {
+                'GET /premises': {'p95_ms': p95, 'p99_ms': p99, 'rps': rps, 'error_rate': error_rate},
+            },
+        }
+
+    def test_within_tolerance(self):
+        baseline = self._summary(100, 200, 50)
+        assert compare_with_baseline(self._summary(115, 230, 45), baseline, tolerance_pct=20) == []
+
+    def test_latency_and_throughput_regressions(self):
+        baseline = self._summary(100, 200, 50)
+        regressions = compare_with_baseline(self._summary(130, 200, 30), baseline, tolerance_pct=20)
+        assert {r.metric for r in regressions} == {'p95_ms', 'rps'}
+
+    def test_new_errors_are_regression(self):
+        baseline = self._summary(100, 200, 50, error_rate=0.0)
+        regressions = compare_with_baseline(self._summary(100, 200, 50, error_rate=0.01), baseline)
+        assert [r.metric for r in regressions] == ['error_rate']
+
+    def test_endpoints_missing_in_baseline_are_skipped(self):
+        assert compare_with_baseline(self._summary(999, 999, 1), {'endpoints': {}}) == []
@@ -0,0 +1,192 @@
+"""Очередь писем: пачки через одно SMTP-соединение, повторы, аренда письма воркером."""
+
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.utils import timezone
+
+from apps.notifications.models import OutgoingEmail
+from apps.notifications.outbox import RateLimiter, enqueue_email, purge_sent_emails, send_email_batch
+from loadtest.smtp_sink import SMTPSink
+
+
+def _enqueue(count: int) -> list[OutgoingEmail]:
+    return [enqueue_email(to=f'user{i}@example.com', subject=f'Subject {i}', body=f'Body {i}') for i in range(count)]
+
+
+class BrokenBackend:
+    """EMAIL_BACKEND, у которого SMTP всегда недоступен."""
+
+    def __init__(self, fail_silently=False, **kwargs):
+        self.fail_silently = fail_silently
+
+    def open(self):
+        raise ConnectionRefusedError('SMTP is down')
+
+    def close(self):
+        return None
+
+    def send_messages(self, messages):
+        raise ConnectionRefusedError('SMTP is down')
+
+
+class RecordingBackend:
+    """EMAIL_BACKEND, который запоминает статус письма в БД и глубину вложенности atomic в момент отправки."""
+
+    sends: list[tuple[str, int]] = []
+
+    def __init__(self, fail_silently=False, **kwargs):
+        pass
+
+    def open(self):
+        return None
+
+    def close(self):
+        return None
+
+    def send_messages(self, messages):
+        for message in messages:
+            status = OutgoingEmail.objects.get(to_email=message.to[0]).status
+            RecordingBackend.sends.append((status, len(connection.atomic_blocks)))
+        return len(messages)
+
+
+@pytest.fixture(autouse=True)
+def empty_outbox(db):
+    """Async-тесты коммитят свои письма; удаление откатится вместе с транзакцией теста."""
+    OutgoingEmail.objects.all().delete()
+
+
+@pytest.fixture
+def smtp_sink(settings):
+    sink = SMTPSink().start()
+    settings.EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+    settings.EMAIL_HOST = sink.host
+    settings.EMAIL_PORT = sink.port
+    settings.EMAIL_USE_TLS = False
+    settings.EMAIL_USE_SSL = False
+    settings.EMAIL_HOST_USER = ''
+    settings.EMAIL_HOST_PASSWORD = ''
+    yield sink
+    sink.stop()
+
+
+def test_enqueue_does_not_send(db, mailoutbox):
+    _enqueue(1)
+
+    assert len(mailoutbox) == 0
+    assert OutgoingEmail.objects.get().status == OutgoingEmail.Status.PENDING
+
+
+def test_batch_is_sent_and_marked(db, mailoutbox):
+    _enqueue(3)
+
+    assert send_email_batch() == (3, 0)
+
+    assert len(mailoutbox) == 3
+    assert mailoutbox[0].to == ['user0@example.com']
+    assert not OutgoingEmail.objects.exclude(status=OutgoingEmail.Status.SENT).exists()
+    assert send_email_batch() == (0, 0)
+
+
+def test_failures_are_retried_with_backoff_then_marked_failed(db, settings):
+    settings.EMAIL_OUTBOX_MAX_ATTEMPTS = 2
+    settings.EMAIL_BACKEND = 'tests.notifications.test_outbox.BrokenBackend'
+    email = _enqueue(1)[0]
+
+    assert send_email_batch() == (0, 1)
+    email.refresh_from_db()
+    assert email.status == OutgoingEmail.Status.PENDING
+    assert email.next_attempt_at > timezone.now()
+    assert 'SMTP is down' in email.last_error
+
+    assert send_email_batch() == (0, 0)
+    OutgoingEmail.objects.filter(pk=email.pk).update(next_attempt_at=timezone.now())
+    assert send_email_batch() == (0, 1)
+
+    email.refresh_from_db()
+    assert email.status == OutgoingEmail.Status.FAILED
+    assert email.attempts == 2
+
+
+def test_email_is_claimed_and_sent_outside_transaction(db, settings):
+    # тест сам идёт в транзакции (db), поэтому сравнивается глубина atomic, а не in_atomic_block
+    settings.EMAIL_BACKEND = 'tests.notifications.test_outbox.RecordingBackend'
+    RecordingBackend.sends = []
+    _enqueue(2)
+    depth = len(connection.atomic_blocks)
+
+    assert send_email_batch() == (2, 0)
+
+    assert RecordingBackend.sends == [(OutgoingEmail.Status.SENDING, depth)] * 2
+    assert not OutgoingEmail.objects.exclude(status=OutgoingEmail.Status.SENT).exists()
+
+
+def test_claimed_email_is_skipped_until_lease_expires(db, settings, mailoutbox):
+    settings.EMAIL_OUTBOX_LEASE_SECONDS = 300
+    email = _enqueue(1)[0]
+    # другой воркер забрал письмо и ещё отправляет его
+    OutgoingEmail.objects.filter(pk=email.pk).update(
+        status=OutgoingEmail.Status.SENDING, next_attempt_at=timezone.now() + timedelta(minutes=5)
+    )
+
+    assert send_email_batch() == (0, 0)
+    assert len(mailoutbox) == 0
+
+    # воркер упал, аренда истекла — письмо забирает следующий проход
+    OutgoingEmail.objects.filter(pk=email.pk).update(next_attempt_at=timezone.now() - timedelta(seconds=1))
+    assert send_email_batch() == (1, 0)
+    email.refresh_from_db()
+    assert email.status == OutgoingEmail.Status.SENT
+    assert len(mailoutbox) == 1
+
+
+def test_purge_removes_old_sent_emails_only(db):
+    old, recent, pending = _enqueue(3)
+    OutgoingEmail.objects.filter(pk=old.pk).update(
+        status=OutgoingEmail.Status.SENT, sent_at=timezone.now() - timedelta(days=30)
+    )
+    OutgoingEmail.objects.filter(pk=recent.pk).update(status=OutgoingEmail.Status.SENT, sent_at=timezone.now())
+
+    assert purge_sent_emails() == 1
+    assert set(OutgoingEmail.objects.values_list('pk', flat=True)) == {recent.pk, pending.pk}
+
+
+def test_rate_limiter_spaces_sends():
+    limiter = RateLimiter(per_minute=60 * 50)
+    started = timezone.now()
+    for _ in range(6):
+        limiter.wait()
+    assert (timezone.now() - started).total_seconds() >= 0.09
+    assert RateLimiter(per_minute=0).interval == 0
+
+
+def test_batch_reuses_one_smtp_connection(db, smtp_sink):
+    for i in range(5):
+        enqueue_email(to=f'sink{i}@example.com', subject='Привет', body=f'Письмо {i}')
+
+    assert send_email_batch(batch_size=10) == (5, 0)
+
+    assert smtp_sink.state.connections == 1
+    assert sorted(m.rcpt_to[0] for m in smtp_sink.messages) == [f'sink{i}@example.com' for i in range(5)]
+
+
+def test_temporary_smtp_error_is_retried_by_command(db, smtp_sink):
+    email = enqueue_email(to='retry@example.com', subject='Retry', body='Body')
+    smtp_sink.state.fail_next = 1
+
+    call_command('send_emails', '--rate-per-minute', '0', stdout=StringIO())
+    email.refresh_from_db()
+    assert (email.status, email.attempts) == (OutgoingEmail.Status.PENDING, 1)
+
+    OutgoingEmail.objects.filter(pk=email.pk).update(next_attempt_at=timezone.now())
+    stdout = StringIO()
+    call_command('send_emails', '--rate-per-minute', '0', stdout=stdout)
+
+    email.refresh_from_db()
+    assert email.status == OutgoingEmail.Status.SENT
+    assert len(smtp_sink.messages) == 1
+    assert 'Отправлено: 1' in stdout.getvalue()
@@ -0,0 +1,141 @@
+"""Клиент платёжного провайдера: повторы с тем же ключом идемпотентности, пул соединений, заглушка."""
+
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+
+from apps.payments.gateway import PaymentGateway, PaymentGatewayError, StubPaymentGateway, YooKassaGateway
+
+PAYLOAD = {'amount': {'value': '10000.00', 'currency': 'RUB'}, 'description': 'Gateway test'}
+
+
+def _gateway(handler, **kwargs) -> YooKassaGateway:
+    return YooKassaGateway(
+        api_url='https://yookassa.test/v3',
+        account_id='shop',
+        secret_key='secret',
+        retry_backoff=0,
+        transport=httpx.MockTransport(handler),
+        **kwargs,
+    )
+
+
+def _payment_response(request: httpx.Request) -> httpx.Response:
+    body = json.loads(request.content)
+    return httpx.Response(
+        200,
+        json={
+            'id': 'gw-payment',
+            'status': 'pending',
+            'paid': False,
+            'amount': body['amount'],
+            'description': body['description'],
+            'confirmation': {'type': 'redirect', 'confirmation_url': 'https://pay.test/confirm'},
+            'created_at': '2026-10-01T10:00:00.000Z',
+        },
+    )
+
+
+def test_retries_transient_errors_with_same_idempotence_key():
+    seen = []
+
+    def handler(request):
+        seen.append(request.headers['Idempotence-Key'])
+        if len(seen) == 1:
+            raise httpx.ConnectError('connection reset', request=request)
+        if len(seen) == 2:
+            return httpx.Response(503)
+        return _payment_response(request)
+
+    payment = asyncio.run(_gateway(handler).create_payment(PAYLOAD, 'key-1'))
+
+    assert payment.id == 'gw-payment'
+    assert payment.confirmation_url == 'https://pay.test/confirm'
+    assert seen == ['key-1', 'key-1', 'key-1']
+
+
+def test_client_errors_are_not_retried():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(400, json={'type': 'error', 'code': 'invalid_request', 'description': 'bad amount'})
+
+    with pytest.raises(PaymentGatewayError, match='bad amount'):
+        asyncio.run(_gateway(handler).create_payment(PAYLOAD, 'key-2'))
+    assert len(calls) == 1
+
+
+def test_gives_up_after_retries():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(502)
+
+    with pytest.raises(PaymentGatewayError):
+        asyncio.run(_gateway(handler, retries=2).create_payment(PAYLOAD, 'key-3'))
+    assert len(calls) == 3
+
+
+def test_concurrent_requests_do_not_serialize():
+    async def handler(request):
+        await asyncio.sleep(0.2)
+        return _payment_response(request)
+
+    async def create_many():
+        gateway = _gateway(handler)
+        try:
+            return await asyncio.gather(*(gateway.create_payment(PAYLOAD, f'key-{i}') for i in range(10)))
+        finally:
+            await gateway.aclose()
+
+    started = time.perf_counter()
+    payments = asyncio.run(create_many())
+
+    assert len(payments) == 10
+    assert time.perf_counter() - started < 1.0
+
+
+def test_incomplete_gateway_is_rejected_on_instantiation():
+    class CreateOnlyGateway(PaymentGateway):
+        async def create_payment(self, payload, idempotence_key):
+            return None
+
+    with pytest.raises(TypeError, match='get_payment'):
+        CreateOnlyGateway()
+
+
+def test_client_of_previous_event_loop_is_closed():
+    gateway = _gateway(_payment_response)
+
+    async def create(key):
+        await gateway.create_payment(PAYLOAD, key)
+        return gateway._client
+
+    first = asyncio.run(create('loop-1'))
+    second = asyncio.run(create('loop-2'))
+
+    assert first is not second
+    assert first.is_closed
+    assert not second.is_closed
+    asyncio.run(gateway.aclose())
+    assert second.is_closed
+
+
+def test_stub_gateway_is_idempotent():
+    gateway = StubPaymentGateway()
+
+    async def create_twice():
+        first = await gateway.create_payment(PAYLOAD, 'same-key')
+        second = await gateway.create_payment(PAYLOAD, 'same-key')
+        return first, second, await gateway.get_payment(first.id)
+
+    first, second, fetched = asyncio.run(create_twice())
+
+    assert first.id == second.id
+    assert fetched == first
+    assert first.amount_value == '10000.00'
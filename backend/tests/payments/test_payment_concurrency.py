@@ -0,0 +1,121 @@
+"""Гонки оплаты: помещение занимает один платёж или одна бронь, проверки — под блокировкой помещения."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.db import OperationalError, connection
+
+from apps.bookings.models import Booking
+from apps.bookings.services import create_booking
+from apps.payments import services as payment_services
+from apps.payments.gateway import PaymentGatewayError, StubPaymentGateway
+from apps.payments.models import Payment
+from apps.payments.services import create_payment
+
+ATTEMPTS = 40
+WORKERS = 16
+
+
+@pytest.fixture
+def premise(make_building, make_premise):
+    building = make_building('БЦ Гонка оплат', city='Платёжный', floors=(), address='ул. Оплат, 1')
+    return make_premise(
+        building,
+        '1',
+        floor=None,
+        area=Decimal('30.00'),
+        price_per_sqm=100_000,
+        available_for_rent=False,
+        available_for_sale=True,
+    )
+
+
+@pytest.fixture
+def user(db):
+    return get_user_model().objects.create_user(
+        username='payment-race', email='payment-race@example.com', password='secret'
+    )
+
+
+@pytest.fixture
+def gateway(monkeypatch):
+    gateway = StubPaymentGateway()
+    monkeypatch.setattr(payment_services, 'get_payment_gateway', lambda: gateway)
+    return gateway
+
+
+def _retrying(call):
+    # SQLite (тестовая БД) отвечает «table is locked» вместо ожидания блокировки — повторяем, как в гонке броней
+    try:
+        for _ in range(400):
+            try:
+                return call()
+            except OperationalError:
+                time.sleep(0.005)
+        raise AssertionError('Не удалось дождаться блокировки БД')
+    finally:
+        connection.close()
+
+
+def _race(calls) -> list:
+    barrier = threading.Barrier(WORKERS)
+
+    def attempt(i):
+        if i < WORKERS:
+            barrier.wait()
+        return _retrying(calls[i])
+
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        return list(pool.map(attempt, range(len(calls))))
+
+
+@pytest.mark.django_db(transaction=True)
+def test_parallel_payments_single_claim(premise, user, gateway):
+    results = _race([lambda: async_to_sync(create_payment)(user.pk, premise.uuid)] * ATTEMPTS)
+
+    # Победитель определяется по БД: повтор после «table is locked» на записи id провайдера сам получит 409
+    assert Payment.objects.filter(premise=premise).count() == 1
+    assert all(err is None or err[0] == 409 for _, err in results)
+    assert sum(err is None for _, err in results) <= 1
+    assert len(gateway.payments) == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_payment_and_booking_do_not_both_take_premise(premise, user, gateway):
+    pay = lambda: async_to_sync(create_payment)(user.pk, premise.uuid)  # noqa: E731
+    book = lambda: create_booking(user, premise.uuid, Booking.DealType.SALE)  # noqa: E731
+
+    results = _race([pay if i % 2 else book for i in range(ATTEMPTS)])
+
+    payments = Payment.objects.filter(premise=premise).count()
+    bookings = Booking.objects.filter(premise=premise).count()
+    assert payments + bookings == 1
+    assert all(err is None or err[0] == 409 for _, err in results)
+
+
+def test_gateway_error_releases_claim(premise, user, monkeypatch):
+    class FailingGateway(StubPaymentGateway):
+        async def create_payment(self, payload, idempotence_key):
+            raise PaymentGatewayError('YooKassa is unavailable')
+
+    monkeypatch.setattr(payment_services, 'get_payment_gateway', FailingGateway)
+
+    out, err = async_to_sync(create_payment)(user.pk, premise.uuid)
+
+    assert out is None and err[0] == 502
+    assert not Payment.objects.filter(premise=premise).exists()
+
+
+def test_created_payment_replaces_claim_id(premise, user, gateway):
+    out, err = async_to_sync(create_payment)(user.pk, premise.uuid)
+
+    assert err is None
+    payment = Payment.objects.get(premise=premise)
+    assert payment.provider_payment_id == out.id
+    assert payment.status == Payment.Status.PENDING
+    assert payment.metadata['payment_token'] == str(payment.idempotence_key)
@@ -0,0 +1,198 @@
+"""Сверка зависших платежей с провайдером: применение статусов, отмена брошенных, гонка с воркером inbox."""
+
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.utils import timezone
+
+from apps.bookings.models import Booking
+from apps.payments.gateway import PaymentGatewayError, StubPaymentGateway
+from apps.payments.models import Payment
+from apps.payments.reconciliation import reconcile_pending_payments
+from apps.re_objects.availability import premise_is_available_for_deal
+
+
+@pytest.fixture(autouse=True)
+def reconcile_settings(settings):
+    settings.PAYMENTS_RECONCILE_AFTER_SECONDS = 600
+    settings.PAYMENTS_PENDING_TIMEOUT_SECONDS = 3600
+
+
+@pytest.fixture
+def user(db):
+    return get_user_model().objects.create_user(
+        username='reconcile-user', email='reconcile@example.com', password='secret'
+    )
+
+
+@pytest.fixture
+def gateway():
+    return StubPaymentGateway()
+
+
+@pytest.fixture
+def new_premise(make_building, make_premise):
+    building = make_building('Reconcile building', city='Reconcile city', floors=(), address='Reconcile addr, 1')
+
+    def create(room_number: str):
+        return make_premise(
+            building,
+            room_number,
+            floor=None,
+            area=Decimal('40.00'),
+            price_per_sqm=90000,
+            available_for_rent=False,
+            available_for_sale=True,
+        )
+
+    return create
+
+
+@pytest.fixture
+def pending_payment(user, gateway):
+    """Открытый платёж возраста age; provider_status=None — провайдер платёж не знает."""
+
+    def create(premise, *, age: timedelta, provider_status: str | None = 'pending') -> Payment:
+        idempotence_key = uuid.uuid4()
+        metadata = {'payment_token': str(idempotence_key), 'user_id': str(user.id), 'premise_id': str(premise.id)}
+        provider_id = f'missing-{idempotence_key}'
+        if provider_status is not None:
+            provider_payment = async_to_sync(gateway.create_payment)(
+                {'amount': {'value': '10000.00', 'currency': 'RUB'}, 'metadata': metadata},
+                str(idempotence_key),
+            )
+            gateway.set_status(provider_payment.id, provider_status)
+            provider_id = provider_payment.id
+        payment = Payment.objects.create(
+            premise=premise,
+            provider_payment_id=provider_id,
+            idempotence_key=idempotence_key,
+            amount_value=Decimal('10000.00'),
+            amount_currency='RUB',
+            metadata=metadata,
+        )
+        moment = timezone.now() - age
+        Payment.objects.filter(pk=payment.pk).update(created_at=moment, updated_at=moment)
+        payment.refresh_from_db()
+        return payment
+
+    return create
+
+
+@pytest.fixture
+def reconcile(gateway):
+    return lambda **kwargs: async_to_sync(reconcile_pending_payments)(gateway=gateway, **kwargs)
+
+
+def _webhook_lands_during_poll(gateway, payment: Payment, status: str):
+    """Опрос провайдера, во время которого воркер inbox переводит платёж в status."""
+    get_payment = gateway.get_payment
+
+    async def poll(provider_payment_id):
+        await sync_to_async(Payment.objects.filter(pk=payment.pk).update)(status=status, updated_at=timezone.now())
+        return await get_payment(provider_payment_id)
+
+    return patch.object(gateway, 'get_payment', poll)
+
+
+def test_applies_provider_status_changes(user, new_premise, pending_payment, reconcile):
+    sold = new_premise('401')
+    released = new_premise('402')
+    succeeded = pending_payment(sold, age=timedelta(minutes=20), provider_status='succeeded')
+    canceled = pending_payment(released, age=timedelta(minutes=20), provider_status='canceled')
+
+    report = reconcile()
+
+    assert (report.checked, report.updated, report.timed_out, report.errors) == (2, 2, 0, 0)
+    assert report.released_premise_ids == {released.id}
+    succeeded.refresh_from_db()
+    canceled.refresh_from_db()
+    assert succeeded.status == Payment.Status.SUCCEEDED
+    assert canceled.status == Payment.Status.CANCELED
+    assert Booking.objects.active().filter(premise=sold, user=user).exists()
+    assert premise_is_available_for_deal(premise=released, deal_type='sale')
+
+
+def test_times_out_abandoned_payments_and_defers_recent_ones(new_premise, pending_payment, reconcile):
+    abandoned = pending_payment(new_premise('403'), age=timedelta(hours=2))
+    unknown = pending_payment(new_premise('404'), age=timedelta(hours=2), provider_status=None)
+    recent = pending_payment(new_premise('405'), age=timedelta(minutes=20))
+    fresh = pending_payment(new_premise('406'), age=timedelta(minutes=1))
+
+    report = reconcile()
+
+    assert (report.checked, report.updated, report.timed_out) == (3, 0, 2)
+    assert report.released_premises == 2
+    statuses = dict(Payment.objects.values_list('pk', 'status'))
+    assert statuses[abandoned.pk] == Payment.Status.CANCELED
+    assert statuses[unknown.pk] == Payment.Status.CANCELED
+    assert statuses[recent.pk] == Payment.Status.PENDING
+    assert statuses[fresh.pk] == Payment.Status.PENDING
+    # отложенный платёж не проверяется повторно до следующего интервала
+    assert reconcile().checked == 0
+
+
+def test_premise_with_another_open_payment_is_not_released(new_premise, pending_payment, reconcile):
+    premise = new_premise('407')
+    pending_payment(premise, age=timedelta(hours=2), provider_status='canceled')
+    pending_payment(premise, age=timedelta(minutes=1))
+
+    report = reconcile()
+
+    assert report.updated == 1
+    assert report.released_premises == 0
+
+
+def test_provider_errors_leave_payment_untouched(new_premise, pending_payment, gateway, reconcile):
+    payment = pending_payment(new_premise('408'), age=timedelta(hours=2))
+
+    with patch.object(gateway, 'get_payment', AsyncMock(side_effect=PaymentGatewayError('timeout'))):
+        report = reconcile()
+
+    assert (report.checked, report.errors, report.timed_out) == (1, 1, 0)
+    payment.refresh_from_db()
+    assert payment.status == Payment.Status.PENDING
+
+
+def test_polled_state_is_not_applied_over_webhook(new_premise, pending_payment, gateway, reconcile):
+    premise = new_premise('410')
+    payment = pending_payment(premise, age=timedelta(minutes=20), provider_status='canceled')
+
+    with _webhook_lands_during_poll(gateway, payment, Payment.Status.SUCCEEDED):
+        report = reconcile()
+
+    assert (report.checked, report.updated, report.errors) == (1, 0, 0)
+    assert report.released_premise_ids == set()
+    payment.refresh_from_db()
+    assert payment.status == Payment.Status.SUCCEEDED
+
+
+def test_abandoned_payment_updated_by_webhook_is_not_canceled(new_premise, pending_payment, gateway, reconcile):
+    payment = pending_payment(new_premise('411'), age=timedelta(hours=2))
+
+    with _webhook_lands_during_poll(gateway, payment, Payment.Status.WAITING_FOR_CAPTURE):
+        report = reconcile()
+
+    assert (report.timed_out, report.released_premises) == (0, 0)
+    payment.refresh_from_db()
+    assert payment.status == Payment.Status.WAITING_FOR_CAPTURE
+
+
+def test_command_reports_released_premises(new_premise, pending_payment, gateway):
+    pending_payment(new_premise('409'), age=timedelta(hours=2))
+    stdout = StringIO()
+
+    with (
+        patch('apps.payments.management.commands.reconcile_payments.get_payment_gateway', return_value=gateway),
+        patch('apps.payments.reconciliation.get_payment_gateway', return_value=gateway),
+    ):
+        call_command('reconcile_payments', '--concurrency', '4', stdout=stdout)
+
+    assert 'помещений освобождено: 1' in stdout.getvalue()
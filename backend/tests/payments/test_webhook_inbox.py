@@ -0,0 +1,192 @@
+"""Очередь уведомлений ЮKassa: приём, воркер с повторами и replay после успешной оплаты."""
+
+import json
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.bookings.models import Booking
+from apps.payments.inbox import enqueue_yookassa_webhook, process_webhook_inbox
+from apps.payments.models import Payment, WebhookInboxEntry
+
+PAYMENT_ID = 'inbox-payment'
+
+
+def _notification_body(payment_id: str, event: str, status: str, metadata: dict) -> bytes:
+    return json.dumps(
+        {
+            'type': 'notification',
+            'event': event,
+            'object': {
+                'id': payment_id,
+                'status': status,
+                'paid': status == 'succeeded',
+                'amount': {'value': '10000.00', 'currency': 'RUB'},
+                'description': 'Inbox payment',
+                'created_at': '2026-10-01T10:00:00.000Z',
+                'metadata': metadata,
+                'test': True,
+                'refundable': False,
+            },
+        }
+    ).encode()
+
+
+@pytest.fixture
+def user(db):
+    return get_user_model().objects.create_user(username='inbox-user', email='inbox@example.com', password='secret')
+
+
+@pytest.fixture
+def premise(make_building, make_premise):
+    building = make_building('Inbox building', city='Inbox city', floors=(), address='Inbox addr, 1')
+    return make_premise(
+        building,
+        '301',
+        floor=None,
+        area=Decimal('40.00'),
+        price_per_sqm=90000,
+        available_for_rent=False,
+        available_for_sale=True,
+    )
+
+
+@pytest.fixture
+def notify(user, premise):
+    """Кладёт в inbox уведомление о платеже PAYMENT_ID за premise и возвращает запись."""
+    metadata = {
+        'payment_token': '3fa85f64-5717-4562-b3fc-2c963f66abcd',
+        'user_id': str(user.id),
+        'premise_id': str(premise.id),
+    }
+
+    def enqueue(event: str, status: str) -> WebhookInboxEntry:
+        assert enqueue_yookassa_webhook(_notification_body(PAYMENT_ID, event, status, metadata)) == (200, None)
+        return WebhookInboxEntry.objects.get(provider_payment_id=PAYMENT_ID, event=event)
+
+    return enqueue
+
+
+def test_webhook_endpoint_stores_notification_and_dedups_retries(django_client, user, premise):
+    metadata = {'user_id': str(user.id), 'premise_id': str(premise.id)}
+    body = _notification_body(PAYMENT_ID, 'payment.succeeded', 'succeeded', metadata)
+
+    first = django_client.post('/api/v1/payments/webhook', data=body, content_type='application/json')
+    second = django_client.post('/api/v1/payments/webhook', data=body, content_type='application/json')
+
+    assert first.status_code == 200
+    assert second.status_code == 200
+    assert WebhookInboxEntry.objects.filter(provider_payment_id=PAYMENT_ID).count() == 1
+    assert not Payment.objects.filter(provider_payment_id=PAYMENT_ID).exists()
+    assert not Booking.objects.filter(premise=premise).exists()
+
+
+def test_enqueue_rejects_invalid_payload(db):
+    status, body = enqueue_yookassa_webhook(b'{"event": "payment.succeeded"}')
+
+    assert status == 400
+    assert body['detail'] == 'Invalid YooKassa notification payload'
+    assert not WebhookInboxEntry.objects.exists()
+
+
+def test_worker_applies_notifications_in_order(notify, user, premise):
+    notify('payment.waiting_for_capture', 'waiting_for_capture')
+    notify('payment.succeeded', 'succeeded')
+
+    assert process_webhook_inbox() == (2, 0)
+    assert Payment.objects.get(provider_payment_id=PAYMENT_ID).status == Payment.Status.SUCCEEDED
+    assert Booking.objects.filter(premise=premise, user=user).count() == 1
+    assert not WebhookInboxEntry.objects.exclude(status=WebhookInboxEntry.Status.PROCESSED).exists()
+
+
+def test_worker_retries_and_blocks_later_events_of_same_payment(notify, settings):
+    settings.PAYMENTS_WEBHOOK_MAX_ATTEMPTS = 2
+    first = notify('payment.waiting_for_capture', 'waiting_for_capture')
+    second = notify('payment.succeeded', 'succeeded')
+
+    with patch('apps.payments.inbox.apply_yookassa_notification', side_effect=RuntimeError('db down')):
+        assert process_webhook_inbox() == (0, 1)
+    first.refresh_from_db()
+    second.refresh_from_db()
+    assert first.status == WebhookInboxEntry.Status.PENDING
+    assert first.attempts == 1
+    assert 'db down' in first.last_error
+    assert first.next_attempt_at > timezone.now()
+    assert second.attempts == 0
+
+    WebhookInboxEntry.objects.filter(pk=first.pk).update(next_attempt_at=timezone.now())
+    with patch('apps.payments.inbox.apply_yookassa_notification', side_effect=RuntimeError('db down')):
+        # окончательно упавшее уведомление больше не блокирует следующее — оно пробуется в том же проходе
+        assert process_webhook_inbox() == (0, 2)
+    first.refresh_from_db()
+    assert first.status == WebhookInboxEntry.Status.FAILED
+
+    WebhookInboxEntry.objects.filter(pk=second.pk).update(next_attempt_at=timezone.now())
+    assert process_webhook_inbox() == (1, 0)
+    assert Payment.objects.get(provider_payment_id=PAYMENT_ID).status == Payment.Status.SUCCEEDED
+
+    call_command('replay_payment_webhooks', '--failed', stdout=StringIO(), stderr=StringIO())
+    first.refresh_from_db()
+    assert first.status == WebhookInboxEntry.Status.PROCESSED
+    # запоздавшее waiting_for_capture не откатывает успешный платёж
+    assert Payment.objects.get(provider_payment_id=PAYMENT_ID).status == Payment.Status.SUCCEEDED
+
+
+def test_replay_after_success_keeps_payment_succeeded(notify, user, premise):
+    waiting = notify('payment.waiting_for_capture', 'waiting_for_capture')
+    notify('payment.succeeded', 'succeeded')
+    assert process_webhook_inbox() == (2, 0)
+
+    call_command('replay_payment_webhooks', '--id', str(waiting.pk), stdout=StringIO(), stderr=StringIO())
+
+    payment = Payment.objects.get(provider_payment_id=PAYMENT_ID)
+    assert payment.status == Payment.Status.SUCCEEDED
+    assert payment.paid
+    assert Booking.objects.filter(premise=premise, user=user, is_active=True).count() == 1
+
+
+def test_late_cancel_does_not_reopen_succeeded_payment(notify, user, premise):
+    notify('payment.succeeded', 'succeeded')
+    assert process_webhook_inbox() == (1, 0)
+
+    notify('payment.canceled', 'canceled')
+    assert process_webhook_inbox() == (1, 0)
+
+    payment = Payment.objects.get(provider_payment_id=PAYMENT_ID)
+    assert payment.status == Payment.Status.SUCCEEDED
+    assert payment.paid
+    assert Booking.objects.filter(premise=premise, user=user, is_active=True).count() == 1
+
+
+def test_succeeded_after_cancel_creates_no_booking(notify, premise):
+    notify('payment.canceled', 'canceled')
+    notify('payment.succeeded', 'succeeded')
+
+    assert process_webhook_inbox() == (2, 0)
+
+    assert Payment.objects.get(provider_payment_id=PAYMENT_ID).status == Payment.Status.CANCELED
+    assert not Booking.objects.filter(premise=premise).exists()
+
+
+def test_admin_replay_after_success_keeps_payment_succeeded(notify, premise, django_client, admin_user):
+    waiting = notify('payment.waiting_for_capture', 'waiting_for_capture')
+    notify('payment.succeeded', 'succeeded')
+    assert process_webhook_inbox() == (2, 0)
+    django_client.force_login(admin_user)
+
+    response = django_client.post(
+        reverse('admin:payments_webhookinboxentry_changelist'),
+        {'action': 'replay_entries', '_selected_action': [waiting.pk]},
+    )
+
+    assert response.status_code == 302
+    waiting.refresh_from_db()
+    assert waiting.status == WebhookInboxEntry.Status.PROCESSED
+    assert Payment.objects.get(provider_payment_id=PAYMENT_ID).status == Payment.Status.SUCCEEDED
+    assert Booking.objects.filter(premise=premise, is_active=True).count() == 1
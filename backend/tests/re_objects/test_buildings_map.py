@@ -0,0 +1,183 @@
+"""GET /buildings/map: bbox, кластеры по geohash на мелком zoom, отдельные здания на крупном."""
+
+from decimal import Decimal
+
+import pytest
+from asgiref.sync import sync_to_async
+from django.test import override_settings
+
+from apps.re_objects.geo import GEOHASH_PRECISION, cluster_precision, encode_geohash
+from apps.re_objects.models import Building, Floor, Premise
+
+# Точки в южном полушарии: остальные тестовые здания без координат или далеко и в bbox не попадают
+AREA = '170,-41,172,-39'
+
+
+@pytest.fixture
+def client(api_client):
+    return api_client
+
+
+def _create_building(city, name: str, lat: str, lon: str, prices: list[tuple[int | None, int | None]]) -> Building:
+    building = Building.objects.create(
+        name=name,
+        address=f'{name}, 1',
+        city=city,
+        latitude=Decimal(lat),
+        longitude=Decimal(lon),
+    )
+    floor = Floor.objects.create(building=building, number=1, title='Этаж 1')
+    for i, (rent, sell_per_sqm) in enumerate(prices, start=1):
+        Premise.objects.create(
+            building=building,
+            city=city,
+            floor=floor,
+            area=100,
+            price_per_month=rent,
+            price_per_sqm=sell_per_sqm,
+            available_for_rent=rent is not None,
+            available_for_sale=sell_per_sqm is not None,
+            room_number=str(i),
+            title=str(i),
+        )
+    return building
+
+
+@pytest.fixture
+async def map_buildings(city):
+    """Два здания рядом (один кластер на мелком zoom) и одно в 1.5° от них."""
+
+    def create():
+        Building.objects.filter(name__startswith='Карта ').delete()
+        return [
+            _create_building(city, 'Карта А', '-40.000100', '171.000100', [(50_000, None), (30_000, 100_000)]),
+            _create_building(city, 'Карта Б', '-40.000300', '171.000400', [(80_000, None)]),
+            _create_building(city, 'Карта В', '-39.500000', '170.200000', [(None, 200_000)]),
+        ]
+
+    return await sync_to_async(create)()
+
+
+def test_encode_geohash_known_value():
+    assert encode_geohash(57.64911, 10.40744, 11) == 'u4pruydqqvj'
+
+
+def test_cluster_precision_grows_with_zoom():
+    precisions = [cluster_precision(zoom) for zoom in range(0, 23)]
+    assert precisions == sorted(precisions)
+    assert precisions[0] == 1
+    assert precisions[-1] == GEOHASH_PRECISION
+
+
+@pytest.mark.django_db
+def test_building_save_sets_geohash(city):
+    building = _create_building(city, 'Карта сохранение', '55.796127', '49.106414', [])
+    assert building.geohash == encode_geohash(55.796127, 49.106414)
+
+    building.latitude = None
+    building.save(update_fields=['latitude'])
+    building.refresh_from_db()
+    assert building.geohash == ''
+
+
+@pytest.mark.django_db
+class TestBuildingsMap:
+    async def test_low_zoom_returns_clusters(self, client, map_buildings):
+        response = await client.get('/buildings/map', query_params={'bbox': AREA, 'zoom': 5})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data['mode'] == 'clusters'
+        assert data['fields'] == ['lat', 'lon', 'count', 'min_price', 'cell']
+        assert data['precision'] == cluster_precision(5)
+        assert data['total'] == 3
+        assert sum(row[2] for row in data['items']) == 3
+        # без sale_type цена — аренда за месяц; здание только под продажу цену не добавляет
+        assert min(row[3] for row in data['items'] if row[3] is not None) == 30_000
+
+    async def test_mid_zoom_separates_distant_buildings(self, client, map_buildings):
+        response = await client.get('/buildings/map', query_params={'bbox': AREA, 'zoom': 10})
+
+        data = response.json()
+        assert data['mode'] == 'clusters'
+        counts = sorted(row[2] for row in data['items'])
+        assert counts == [1, 2]
+        pair = next(row for row in data['items'] if row[2] == 2)
+        assert pair[3] == 30_000
+        assert -40.0004 < pair[0] < -40.0 and 171.0 < pair[1] < 171.0005
+        assert encode_geohash(-40.0001, 171.0001).startswith(pair[4])
+
+    async def test_high_zoom_returns_buildings(self, client, map_buildings):
+        response = await client.get('/buildings/map', query_params={'bbox': AREA, 'zoom': 16})
+
+        data = response.json()
+        assert data['mode'] == 'buildings'
+        assert data['precision'] is None
+        assert data['fields'] == ['uuid', 'lat', 'lon', 'min_price', 'title']
+        rows = {row[4]: row for row in data['items']}
+        assert set(rows) == {'Карта А', 'Карта Б', 'Карта В'}
+        assert rows['Карта А'][0] == str(map_buildings[0].uuid)
+        assert rows['Карта А'][1:4] == [-40.0001, 171.0001, 30_000]
+        assert rows['Карта В'][3] is None
+
+    async def test_sale_type_filters_and_switches_price(self, client, map_buildings):
+        response = await client.get('/buildings/map', query_params={'bbox': AREA, 'zoom': 16, 'sale_type': 'sale'})
+
+        data = response.json()
+        rows = {row[4]: row for row in data['items']}
+        assert set(rows) == {'Карта А', 'Карта В'}
+        assert rows['Карта А'][3] == 100_000 * 100
+        assert rows['Карта В'][3] == 200_000 * 100
+
+    async def test_catalog_filters(self, client, map_buildings):
+        response = await client.get(
+            '/buildings/map',
+            query_params={'bbox': AREA, 'zoom': 16, 'sale_type': 'rent', 'min_price': 40_000},
+        )
+        rows = {row[4]: row for row in response.json()['items']}
+        assert set(rows) == {'Карта А', 'Карта Б'}
+        assert rows['Карта А'][3] == 50_000
+
+        response = await client.get(
+            '/buildings/map',
+            query_params={'bbox': AREA, 'zoom': 16, 'building_uuids': str(map_buildings[1].uuid)},
+        )
+        assert [row[4] for row in response.json()['items']] == ['Карта Б']
+
+    async def test_bbox_limits_result(self, client, map_buildings):
+        response = await client.get('/buildings/map', query_params={'bbox': '170.1,-39.6,170.3,-39.4', 'zoom': 16})
+
+        assert [row[4] for row in response.json()['items']] == ['Карта В']
+
+    async def test_too_many_buildings_fall_back_to_clusters(self, client, map_buildings):
+        with override_settings(RE_OBJECTS_MAP_MAX_BUILDINGS=2):
+            response = await client.get('/buildings/map', query_params={'bbox': AREA, 'zoom': 16})
+
+        data = response.json()
+        assert data['mode'] == 'clusters'
+        assert data['total'] == 3
+
+    async def test_bbox_across_antimeridian(self, client, city):
+        def create():
+            Building.objects.filter(name__startswith='Антимеридиан').delete()
+            _create_building(city, 'Антимеридиан восток', '-16.500000', '179.900000', [(10_000, None)])
+            _create_building(city, 'Антимеридиан запад', '-16.500000', '-179.900000', [(20_000, None)])
+
+        await sync_to_async(create)()
+        response = await client.get('/buildings/map', query_params={'bbox': '179,-17,-179,-16', 'zoom': 16})
+
+        assert sorted(row[4] for row in response.json()['items']) == ['Антимеридиан восток', 'Антимеридиан запад']
+
+    @pytest.mark.parametrize(
+        'bbox',
+        ['170,-41,172', '170,-41,abc,-39', '170,-39,172,-41', '170,-91,172,-39', '-181,-41,172,-39'],
+    )
+    async def test_invalid_bbox(self, client, bbox):
+        response = await client.get('/buildings/map', query_params={'bbox': bbox, 'zoom': 5})
+
+        assert response.status_code == 422
+
+    async def test_zoom_out_of_range(self, client):
+        response = await client.get('/buildings/map', query_params={'bbox': AREA, 'zoom': 25})
+
+        assert response.status_code == 422
@@ -0,0 +1,174 @@
+"""Массовое изменение цен: один UPDATE, full_sell_price в SQL как compute_full_sell_price, действие админки."""
+
+from decimal import ROUND_HALF_UP, Decimal
+
+import pytest
+from django.contrib.admin.helpers import ACTION_CHECKBOX_NAME
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.re_objects.models import Premise, compute_full_sell_price
+from apps.re_objects.services.bulk_pricing import (
+    PriceChange,
+    PriceChangeError,
+    PriceChangeMode,
+    apply_price_change,
+    recalculate_full_sell_price,
+)
+from apps.re_objects.signals import catalog_prices_changed
+
+
+@pytest.fixture
+def building(make_building):
+    return make_building('БЦ Индексация', city='Ценоград', floors=(), address='ул. Ценовая, 1')
+
+
+def _premise(building, number, area, *, rent=None, sqm=None):
+    return Premise.objects.create(
+        building=building,
+        city=building.city,
+        area=Decimal(area),
+        price_per_month=rent,
+        price_per_sqm=sqm,
+        available_for_rent=rent is not None,
+        available_for_sale=sqm is not None,
+        room_number=number,
+    )
+
+
+def _half_up(value: Decimal) -> int:
+    return int(value.quantize(Decimal('1'), rounding=ROUND_HALF_UP))
+
+
+@pytest.fixture
+def premises(building):
+    return [
+        _premise(building, '1', '33.33', rent=100_001, sqm=150_001),
+        # 0.50 × 3 = 1.5 — проверка округления половины вверх
+        _premise(building, '2', '0.50', sqm=3),
+        _premise(building, '3', '120.07', rent=250_000),
+        _premise(building, '4', '57.35', rent=99_999, sqm=123_457),
+    ]
+
+
+def _reload(premises):
+    return [Premise.objects.get(pk=premise.pk) for premise in premises]
+
+
+def test_percent_on_sale_price_recalculates_full_price_in_one_update(building, premises):
+    with CaptureQueriesContext(connection) as ctx:
+        report = apply_price_change(
+            Premise.objects.filter(building=building), PriceChange('price_per_sqm', PriceChangeMode.PERCENT, '7.5')
+        )
+
+    updates = [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('UPDATE')]
+    assert len(updates) == 1
+    assert report.updated == 3
+    assert report.building_ids == [building.id]
+    for before, after in zip(premises, _reload(premises), strict=True):
+        if before.price_per_sqm is None:
+            assert after.price_per_sqm is None and after.full_sell_price is None
+            continue
+        expected = _half_up(before.price_per_sqm * Decimal('1.075'))
+        assert after.price_per_sqm == expected
+        assert after.full_sell_price == compute_full_sell_price(after.area, expected, True)
+        # Аренда не меняется
+        assert after.price_per_month == before.price_per_month
+
+
+def test_full_price_rounds_half_up(building, premises):
+    apply_price_change(Premise.objects.filter(pk=premises[1].pk), PriceChange('price_per_sqm', 'absolute', 0))
+    assert Premise.objects.get(pk=premises[1].pk).full_sell_price == 2
+
+
+def test_absolute_and_per_sqm_on_rent(building, premises):
+    qs = Premise.objects.filter(building=building)
+    apply_price_change(qs, PriceChange('price_per_month', PriceChangeMode.ABSOLUTE, -1000))
+    after = _reload(premises)
+    assert [p.price_per_month for p in after] == [99_001, None, 249_000, 98_999]
+    # Цена продажи и итог не тронуты
+    assert [p.full_sell_price for p in after] == [p.full_sell_price for p in premises]
+
+    apply_price_change(qs, PriceChange('price_per_month', PriceChangeMode.PER_SQM, 150))
+    for before, now in zip(after, _reload(premises), strict=True):
+        if before.price_per_month is not None:
+            assert now.price_per_month == before.price_per_month + _half_up(before.area * 150)
+
+
+def test_non_positive_result_rejects_whole_set(building, premises):
+    with pytest.raises(PriceChangeError, match='не больше нуля у помещений: 1'):
+        apply_price_change(
+            Premise.objects.filter(building=building), PriceChange('price_per_month', 'absolute', -100_000)
+        )
+    assert [p.price_per_month for p in _reload(premises)] == [p.price_per_month for p in premises]
+
+
+@pytest.mark.parametrize(
+    ('field', 'mode', 'value'),
+    [
+        ('full_sell_price', 'percent', 5),
+        ('price_per_sqm', 'percent', -100),
+        ('price_per_sqm', 'percent', '1.005'),
+        ('price_per_sqm', 'absolute', '10.5'),
+        ('price_per_sqm', 'double', 2),
+    ],
+)
+def test_invalid_change_is_rejected(field, mode, value):
+    with pytest.raises(PriceChangeError):
+        PriceChange(field, mode, value)
+
+
+def test_signal_sent_once_per_batch_after_commit(building, premises, django_capture_on_commit_callbacks):
+    calls = []
+
+    def receiver(sender, building_ids, **kwargs):
+        calls.append(building_ids)
+
+    catalog_prices_changed.connect(receiver)
+    try:
+        with django_capture_on_commit_callbacks(execute=True):
+            apply_price_change(Premise.objects.filter(building=building), PriceChange('price_per_sqm', 'percent', 3))
+            assert calls == []
+    finally:
+        catalog_prices_changed.disconnect(receiver)
+    assert calls == [[building.id]]
+
+
+def test_recalculate_fixes_stale_full_price(building, premises):
+    # QuerySet.update обходит Premise.save — full_sell_price устаревает
+    Premise.objects.filter(pk=premises[0].pk).update(price_per_sqm=200_000)
+    Premise.objects.filter(pk=premises[2].pk).update(full_sell_price=1)
+
+    assert recalculate_full_sell_price(Premise.objects.filter(building=building)) == 2
+
+    first, _, third, _ = _reload(premises)
+    assert first.full_sell_price == compute_full_sell_price(first.area, 200_000, True)
+    assert third.full_sell_price is None
+    assert recalculate_full_sell_price(Premise.objects.filter(building=building)) == 0
+
+
+def test_admin_action(building, premises, django_client, admin_user):
+    client = django_client
+    client.force_login(admin_user)
+    url = reverse('admin:re_objects_premise_changelist')
+    selected = [premises[0].pk, premises[3].pk]
+    data = {'action': 'change_prices', ACTION_CHECKBOX_NAME: selected}
+
+    response = client.post(url, data)
+    assert response.status_code == 200
+    assert 'Изменить цены: 2 помещения' in response.content.decode()
+
+    response = client.post(url, {**data, 'apply': '1', 'field': 'price_per_sqm', 'mode': 'percent', 'value': '-10'})
+    assert response.status_code == 302
+    first, second, _, fourth = _reload(premises)
+    assert first.price_per_sqm == 135_001
+    assert fourth.price_per_sqm == _half_up(Decimal(123_457) * Decimal('0.9'))
+    assert fourth.full_sell_price == compute_full_sell_price(fourth.area, fourth.price_per_sqm, True)
+    assert second.price_per_sqm == 3
+
+    response = client.post(
+        url, {**data, 'apply': '1', 'field': 'price_per_month', 'mode': 'absolute', 'value': '-1000000'}
+    )
+    assert response.status_code == 200
+    assert 'не больше нуля' in response.content.decode()
@@ -0,0 +1,202 @@
+"""Выгрузка каталога: колонки, доступность, медиа, gzip, чанки; GET /premises/export и команда."""
+
+import csv
+import gzip
+import io
+import json
+from datetime import timedelta
+
+import pytest
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import Permission
+from django.core.management import call_command
+from django.test import AsyncClient
+from django.utils import timezone
+
+from apps.accounts.models import CustomUser
+from apps.accounts.services.auth_service import generate_jwt_tokens
+from apps.bookings.models import Booking
+from apps.re_objects.models import Building, PremiseImage
+from apps.re_objects.services.catalog_export import EXPORT_COLUMNS, iter_catalog_export, parse_export_columns
+
+
+def _create_catalog(make_building, make_premise):
+    """Здание с тремя помещениями: аренда (с активной бронью), продажа (с фото), аренда без этажа."""
+    Building.objects.filter(name__startswith='БЦ Выгрузка').delete()
+    building = make_building('БЦ Выгрузка', city='Выгрузкоград', floors=(3,), address='ул. Выгрузная, 5')
+    booked = make_premise(building, '301', floor=3, area='50.50', price_per_month=100_000, title='Офис, угловой')
+    sale = make_premise(
+        building,
+        '302',
+        floor=3,
+        area=100,
+        price_per_sqm=150_000,
+        available_for_rent=False,
+        available_for_sale=True,
+        title='302',
+    )
+    free = make_premise(building, '1', floor=None, area=20, price_per_month=30_000)
+    user = CustomUser.objects.create_user(
+        username='export-booker', email='export-booker@example.com', password='x', phone='+79990000888'
+    )
+    Booking.objects.create(
+        user=user,
+        premise=booked,
+        deal_type=Booking.DealType.RENT,
+        expires_at=timezone.now() + timedelta(days=1),
+    )
+    # bulk_create — без построения WebP-производных в save(): в выгрузку идёт оригинал
+    PremiseImage.objects.bulk_create(
+        [
+            PremiseImage(premise=sale, original='premises/images/second.jpg', order=1),
+            PremiseImage(premise=sale, original='premises/images/primary.jpg', order=2, is_primary=True),
+        ]
+    )
+    return building, {'booked': booked, 'sale': sale, 'free': free}
+
+
+@pytest.fixture
+def catalog(make_building, make_premise):
+    return _create_catalog(make_building, make_premise)
+
+
+@pytest.fixture
+async def async_catalog(make_building, make_premise):
+    return await sync_to_async(_create_catalog)(make_building, make_premise)
+
+
+async def _auth_headers(user, *, can_export: bool = True) -> dict:
+    def token():
+        if can_export:
+            user.user_permissions.add(Permission.objects.get(codename='export_catalog'))
+        return generate_jwt_tokens(user)[0]
+
+    return {'Authorization': f'Bearer {await sync_to_async(token)()}'}
+
+
+def _export(**options) -> bytes:
+    return b''.join(iter_catalog_export(building_uuids=[options.pop('building').uuid], **options))
+
+
+def test_parse_export_columns():
+    assert parse_export_columns(None) == list(EXPORT_COLUMNS)
+    assert parse_export_columns(' area, uuid,area ') == ['area', 'uuid']
+    with pytest.raises(ValueError, match='nope'):
+        parse_export_columns('uuid,nope')
+
+
+@pytest.mark.django_db
+def test_csv_export_with_selected_columns(catalog):
+    building, premises = catalog
+    columns = ['room_number', 'title', 'floor', 'area', 'full_sell_price', 'is_available_for_rent', 'photos']
+
+    data = _export(building=building, columns=columns)
+
+    rows = list(csv.DictReader(io.StringIO(data.decode())))
+    assert list(rows[0]) == columns
+    by_number = {row['room_number']: row for row in rows}
+    assert set(by_number) == {'301', '302', '1'}
+    assert by_number['301'] == {
+        'room_number': '301',
+        'title': 'Офис, угловой',
+        'floor': '3',
+        'area': '50.50',
+        'full_sell_price': '',
+        'is_available_for_rent': 'false',
+        'photos': '',
+    }
+    assert by_number['1']['is_available_for_rent'] == 'true' and by_number['1']['floor'] == ''
+    assert by_number['302']['full_sell_price'] == str(100 * 150_000)
+    assert [url.rsplit('/', 1)[1] for url in by_number['302']['photos'].split(' ')] == ['primary.jpg', 'second.jpg']
+
+
+@pytest.mark.django_db
+def test_ndjson_export_all_columns(catalog):
+    building, premises = catalog
+
+    lines = _export(building=building, fmt='ndjson').decode().splitlines()
+
+    rows = {row['uuid']: row for row in map(json.loads, lines)}
+    booked = rows[str(premises['booked'].uuid)]
+    assert list(booked) == list(EXPORT_COLUMNS)
+    assert booked['building'] == 'БЦ Выгрузка' and booked['building_uuid'] == str(building.uuid)
+    assert booked['area'] == '50.50' and booked['price_per_month'] == 100_000
+    assert booked['available_for_rent'] is True and booked['is_available_for_rent'] is False
+    assert rows[str(premises['sale'].uuid)]['is_available_for_sale'] is True
+    assert len(rows[str(premises['sale'].uuid)]['photos']) == 2
+
+
+@pytest.mark.django_db
+def test_gzip_and_small_chunks_match_plain_export(catalog):
+    building, _ = catalog
+    plain = _export(building=building, fmt='ndjson')
+
+    chunks = list(iter_catalog_export(fmt='ndjson', building_uuids=[building.uuid], chunk_size=1))
+    compressed = _export(building=building, fmt='ndjson', gzip=True, chunk_size=2)
+
+    assert len(chunks) == 3
+    assert b''.join(chunks) == plain
+    assert gzip.decompress(compressed) == plain
+
+
+@pytest.mark.django_db
+def test_sale_type_filter(catalog):
+    building, _ = catalog
+
+    data = _export(building=building, columns=['room_number'], sale_type='sale')
+
+    assert data.decode().split() == ['room_number', '302']
+
+
+@pytest.mark.django_db
+def test_export_catalog_command(catalog, tmp_path, capsys):
+    building, _ = catalog
+    path = tmp_path / 'catalog.csv.gz'
+
+    call_command(
+        'export_catalog', str(path), '--gzip', '--columns', 'uuid,room_number', '--building-uuids', str(building.uuid)
+    )
+
+    rows = list(csv.reader(io.StringIO(gzip.decompress(path.read_bytes()).decode())))
+    assert rows[0] == ['uuid', 'room_number'] and len(rows) == 4
+    assert 'Выгружено строк: 3' in capsys.readouterr().err
+
+
+@pytest.mark.django_db
+class TestPremiseExportEndpoint:
+    async def test_requires_auth(self, api_client):
+        response = await api_client.get('/premises/export')
+
+        assert response.status_code == 401
+
+    async def test_requires_export_permission(self, api_client, test_user):
+        headers = await _auth_headers(test_user, can_export=False)
+
+        response = await api_client.get('/premises/export', headers=headers)
+
+        assert response.status_code == 403
+        assert response.json()['code'] == 'RE_OBJECTS_FORBIDDEN'
+
+    async def test_invalid_format_and_columns(self, api_client, test_user):
+        headers = await _auth_headers(test_user)
+
+        response = await api_client.get('/premises/export', query_params={'format': 'xml'}, headers=headers)
+        assert response.status_code == 422
+        response = await api_client.get('/premises/export', query_params={'columns': 'uuid,nope'}, headers=headers)
+        assert response.status_code == 422
+
+    @pytest.mark.usefixtures('ninja_skip_registry')
+    async def test_streams_export(self, test_user, async_catalog):
+        building, _ = async_catalog
+
+        response = await AsyncClient().get(
+            '/api/v1/premises/export',
+            {'format': 'csv', 'gzip': 'true', 'columns': 'room_number', 'building_uuids': str(building.uuid)},
+            headers=await _auth_headers(test_user),
+        )
+
+        assert response.status_code == 200
+        assert response.streaming and response['Content-Type'] == 'application/gzip'
+        assert response['Content-Disposition'] == 'attachment; filename="catalog.csv.gz"'
+        body = b''.join([chunk async for chunk in response.streaming_content])
+        assert sorted(gzip.decompress(body).decode().split()) == ['1', '301', '302', 'room_number']
@@ -0,0 +1,366 @@
+"""Импорт каталога из CSV/XLSX: пачки, upsert, отчёт по строкам, команда и загрузка в админке."""
+
+import io
+import zipfile
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.re_objects.models import Building, Floor, Premise
+from apps.re_objects.services import catalog_import
+from apps.re_objects.services.catalog_import import COPY_FIELDS, CatalogImportError, _copy_rows, import_catalog
+
+
+@pytest.fixture
+def building(make_building):
+    Building.objects.filter(name__startswith='БЦ Импорт').delete()
+    return make_building('БЦ Импорт', city='Импортград', floors=(1, 2), address='ул. Импортная, 1')
+
+
+def _csv(*lines: str, delimiter: str = ',') -> bytes:
+    return '\n'.join(line.replace(',', delimiter) for line in lines).encode()
+
+
+def _premises(building) -> dict[str, Premise]:
+    return {p.room_number: p for p in Premise.objects.filter(building=building).select_related('floor')}
+
+
+def _xlsx(rows: list[list[object]]) -> bytes:
+    """Минимальная книга XLSX: строки — через sharedStrings, числа — числовыми ячейками."""
+    strings: list[str] = []
+    sheet_rows = []
+    for r, row in enumerate(rows, start=1):
+        cells = []
+        for c, value in enumerate(row):
+            ref = f'{chr(ord("A") + c)}{r}'
+            if isinstance(value, str):
+                strings.append(value)
+                cells.append(f'<c r="{ref}" t="s"><v>{len(strings) - 1}</v></c>')
+            else:
+                cells.append(f'<c r="{ref}"><v>{value}</v></c>')
+        sheet_rows.append(f'<row r="{r}">{"".join(cells)}</row>')
+    main = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+    rel = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as book:
+        book.writestr(
+            'xl/workbook.xml',
+            f'<workbook xmlns="{main}" xmlns:r="{rel}"><sheets><sheet name="Лист1" sheetId="1" r:id="rId1"/>'
+            '</sheets></workbook>',
+        )
+        book.writestr(
+            'xl/_rels/workbook.xml.rels',
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            f'<Relationship Id="rId1" Type="{rel}/worksheet" Target="worksheets/sheet1.xml"/></Relationships>',
+        )
+        book.writestr(
+            'xl/sharedStrings.xml',
+            f'<sst xmlns="{main}">{"".join(f"<si><t>{escape(s)}</t></si>" for s in strings)}</sst>',
+        )
+        book.writestr(
+            'xl/worksheets/sheet1.xml',
+            f'<worksheet xmlns="{main}"><sheetData>{"".join(sheet_rows)}</sheetData></worksheet>',
+        )
+    return buffer.getvalue()
+
+
+@pytest.mark.django_db
+def test_csv_import_creates_premises_with_derived_fields(building):
+    data = _csv(
+        'building,floor,room_number,area,price_per_month,price_per_sqm,available_for_rent,available_for_sale',
+        f'{building.uuid},1,101,"50,5",100000,,да,нет',
+        'БЦ Импорт,2,201,100.25,,150000,нет,да',
+    )
+
+    report = import_catalog(data, 'catalog.csv')
+
+    assert (report.rows, report.created, report.updated, report.failed) == (2, 2, 0, 0)
+    premises = _premises(building)
+    rent, sale = premises['101'], premises['201']
+    assert rent.area == Decimal('50.50') and rent.price_per_month == 100_000
+    assert rent.floor.number == 1 and rent.city_id == building.city_id
+    assert rent.full_sell_price is None
+    assert sale.floor.number == 2 and not sale.available_for_rent
+    assert sale.full_sell_price == 15_037_500
+
+
+@pytest.mark.django_db
+def test_reimport_updates_by_room_number_and_keeps_missing_columns(building):
+    import_catalog(
+        _csv('building,room_number,area,price_per_month,description', 'БЦ Импорт,101,50,100000,Угловой офис'),
+        'catalog.csv',
+    )
+    original = _premises(building)['101']
+
+    report = import_catalog(
+        _csv('здание;номер;площадь;цена аренды', 'БЦ Импорт;101;60;120 000', delimiter=';'),
+        'catalog.csv',
+    )
+
+    assert (report.created, report.updated) == (0, 1)
+    premise = _premises(building)['101']
+    assert premise.uuid == original.uuid
+    assert (premise.area, premise.price_per_month) == (Decimal('60.00'), 120_000)
+    assert premise.description == 'Угловой офис'
+    assert premise.created_at == original.created_at
+
+
+@pytest.mark.django_db
+def test_uuid_column_updates_existing_premise(building):
+    import_catalog(_csv('building,room_number,area,price_per_month', 'БЦ Импорт,101,50,100000'), 'catalog.csv')
+    premise = _premises(building)['101']
+
+    report = import_catalog(
+        _csv('uuid,building,room_number,available_for_sale,price_per_sqm', f'{premise.uuid},БЦ Импорт,101А,да,200000'),
+        'catalog.csv',
+    )
+
+    assert report.updated == 1
+    premise.refresh_from_db()
+    assert premise.room_number == '101А'
+    assert premise.full_sell_price == 50 * 200_000
+
+
+@pytest.mark.django_db
+def test_row_errors_are_reported_and_valid_rows_imported(building):
+    data = _csv(
+        'building,floor,room_number,area,price_per_month,available_for_sale,premise_type',
+        'БЦ Импорт,1,101,50,100000,,офис',
+        'Нет такого БЦ,1,102,50,100000,,',
+        'БЦ Импорт,9,103,50,100000,,',
+        'БЦ Импорт,1,104,abc,100000,,',
+        'БЦ Импорт,1,105,50,,,',
+        'БЦ Импорт,1,106,50,100000,да,',
+        'БЦ Импорт,1,101,55,100000,,',
+        'БЦ Импорт,1,107,50,100000,,склад',
+        ',1,108,50,100000,,',
+    )
+
+    report = import_catalog(data, 'catalog.csv')
+
+    assert report.created == 1
+    assert set(_premises(building)) == {'101'}
+    assert _premises(building)['101'].premise_type == Premise.PremiseType.OFFICE
+    assert [(e.row, e.column) for e in report.errors] == [
+        (3, 'building'),
+        (4, 'floor'),
+        (5, 'area'),
+        (6, 'price_per_month'),
+        (7, 'price_per_sqm'),
+        (8, 'room_number'),
+        (9, 'premise_type'),
+        (10, 'building'),
+    ]
+    assert report.failed == 8
+    assert 'повтор строки 2' in report.errors[5].message
+
+
+@pytest.mark.django_db
+def test_create_floors_and_dry_run(building):
+    data = _csv('building,floor,room_number,area,price_per_month', 'БЦ Импорт,5,501,40,90000')
+
+    report = import_catalog(data, 'catalog.csv', create_floors=True, dry_run=True)
+
+    assert (report.created, report.floors_created, report.failed) == (1, 1, 0)
+    assert not Floor.objects.filter(building=building, number=5).exists()
+    assert not Premise.objects.filter(building=building).exists()
+
+    report = import_catalog(data, 'catalog.csv', create_floors=True)
+
+    assert _premises(building)['501'].floor.title == 'Этаж 5'
+
+
+@pytest.mark.django_db
+def test_ambiguous_building_name_requires_uuid(building):
+    Building.objects.create(name='БЦ Импорт', address='ул. Другая, 2', city=building.city)
+
+    report = import_catalog(_csv('building,room_number,area,price_per_month', 'БЦ Импорт,1,50,100000'), 'catalog.csv')
+
+    assert report.created == 0
+    assert 'укажите UUID' in report.errors[0].message
+
+
+@pytest.mark.django_db
+def test_small_batches_and_cp1251(building):
+    lines = ['building;номер;площадь;цена аренды'] + [f'БЦ Импорт;{i};{20 + i};{1000 * i}' for i in range(1, 8)]
+    data = '\n'.join(lines).encode('cp1251')
+
+    report = import_catalog(data, 'catalog.csv', batch_size=3)
+
+    assert report.created == 7
+    assert len(_premises(building)) == 7
+
+
+@pytest.mark.django_db
+def test_xlsx_import(building):
+    data = _xlsx(
+        [
+            ['Здание', 'Этаж', 'Номер', 'Площадь', 'Цена аренды', 'Мебель'],
+            [str(building.uuid), 2, '201', 45.5, 70000, 'да'],
+            [str(building.uuid), 1, 102, 30, 50000, 'нет'],
+        ]
+    )
+
+    report = import_catalog(data, 'catalog.xlsx')
+
+    assert (report.created, report.failed) == (2, 0)
+    premises = _premises(building)
+    assert premises['201'].area == Decimal('45.50') and premises['201'].is_furnished
+    assert premises['102'].price_per_month == 50_000 and premises['102'].floor.number == 1
+
+
+def test_file_level_errors():
+    with pytest.raises(CatalogImportError):
+        import_catalog(b'', 'catalog.xls')
+    with pytest.raises(CatalogImportError):
+        import_catalog(b'room_number,area\n1,2', 'catalog.csv')
+    with pytest.raises(CatalogImportError):
+        import_catalog(b'not a zip', 'catalog.xlsx')
+
+
+@pytest.mark.django_db
+def test_command_writes_error_report(building, tmp_path):
+    source = tmp_path / 'catalog.csv'
+    source.write_bytes(_csv('building,room_number,area,price_per_month', 'БЦ Импорт,1,50,100000', 'БЦ Импорт,2,,'))
+    report_path = tmp_path / 'errors.csv'
+    out = io.StringIO()
+
+    call_command('import_catalog', str(source), '--report', str(report_path), stdout=out, stderr=io.StringIO())
+
+    assert 'создано: 1' in out.getvalue()
+    assert report_path.read_text(encoding='utf-8').splitlines()[1].startswith('3,')
+    with pytest.raises(CommandError):
+        call_command('import_catalog', str(tmp_path / 'missing.csv'))
+
+
+@pytest.mark.django_db
+def test_admin_upload(building, django_client, admin_user):
+    client = django_client
+    client.force_login(admin_user)
+    url = reverse('admin:re_objects_premise_import')
+
+    assert client.get(url).status_code == 200
+    upload = SimpleUploadedFile(
+        'catalog.csv', _csv('building,room_number,area,price_per_month', 'БЦ Импорт,1,50,100000,', 'БЦ Импорт,2,0,1')
+    )
+    response = client.post(url, {'file': upload})
+
+    assert response.status_code == 200
+    assert response.context['report'].created == 1
+    assert [e.column for e in response.context['errors_shown']] == ['area']
+    assert set(_premises(building)) == {'1'}
+    assert 'Импорт из CSV/XLSX' in client.get(reverse('admin:re_objects_premise_changelist')).content.decode()
+
+
+def test_copy_rows_escape_text_and_nulls():
+    premise = Premise(
+        room_number='1\t2',
+        title='a\\b',
+        description='строка 1\nстрока 2',
+        area=Decimal('10.50'),
+        building_id=1,
+        city_id=2,
+        has_windows=False,
+    )
+
+    line = _copy_rows([premise]).read()
+
+    values = dict(zip(COPY_FIELDS, line.rstrip('\n').split('\t'), strict=True))
+    assert values['uuid'] == str(premise.uuid)
+    assert values['created_at'] == values['updated_at'] == str(premise.created_at)
+    assert (values['building'], values['city'], values['floor']) == ('1', '2', '\\N')
+    assert (values['room_number'], values['title']) == ('1\\t2', 'a\\\\b')
+    assert values['description'] == 'строка 1\\nстрока 2'
+    assert (values['area'], values['has_windows']) == ('10.50', 'f')
+
+
+class _Psycopg2Cursor:
+    def __init__(self, calls):
+        self.calls = calls
+
+    def copy_expert(self, sql, rows):
+        self.calls.append(('copy_expert', sql, rows.read()))
+
+
+class _Psycopg3Cursor:
+    """cursor.copy(sql) у psycopg 3 — контекстный менеджер с write()."""
+
+    def __init__(self, calls):
+        self.calls = calls
+
+    def copy(self, sql):
+        calls = self.calls
+
+        class _Copy:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+            def write(self, data):
+                calls.append(('copy', sql, data))
+
+        return _Copy()
+
+
+class _Connection:
+    def __init__(self, raw_cursor_class):
+        self.calls = []
+        self.ops = connection.ops
+        self.raw = raw_cursor_class(self.calls)
+
+    def cursor(self):
+        owner = self
+
+        class _Wrapper:
+            cursor = owner.raw
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+            def execute(self, sql, params=None):
+                owner.calls.append(('execute', sql, params))
+
+        return _Wrapper()
+
+
+@pytest.mark.parametrize(('raw_cursor', 'method'), [(_Psycopg2Cursor, 'copy_expert'), (_Psycopg3Cursor, 'copy')])
+def test_copy_upsert_supports_both_drivers(monkeypatch, raw_cursor, method):
+    fake = _Connection(raw_cursor)
+    monkeypatch.setattr(catalog_import, 'connection', fake)
+    premise = Premise(room_number='7', area=Decimal('12.00'), building_id=1, city_id=2)
+
+    catalog_import._copy_upsert([premise])
+
+    kinds = [call[0] for call in fake.calls]
+    assert kinds == ['execute', method, 'execute', 'execute']
+    _, copy_sql, data = fake.calls[1]
+    assert copy_sql.startswith('COPY catalog_import_premises (')
+    assert data.split('\t')[COPY_FIELDS.index('uuid')] == str(premise.uuid)
+    assert 'ON CONFLICT ("uuid") DO UPDATE' in fake.calls[2][1]
+
+
+@pytest.mark.django_db
+@pytest.mark.skipif(connection.vendor != 'postgresql', reason='COPY-путь импорта — только PostgreSQL')
+def test_copy_upsert_on_postgres(building):
+    header = 'building,floor,room_number,area,price_per_month,available_for_rent'
+    with CaptureQueriesContext(connection) as ctx:
+        report = import_catalog(_csv(header, 'БЦ Импорт,1,101,40,50000,да'), 'catalog.csv')
+    assert report.created == 1
+    assert any('catalog_import_premises' in q['sql'] for q in ctx.captured_queries)
+
+    report = import_catalog(_csv(header, 'БЦ Импорт,1,101,40,60000,да'), 'catalog.csv')
+
+    assert (report.created, report.updated) == (0, 1)
+    assert _premises(building)['101'].price_per_month == 60000
@@ -0,0 +1,267 @@
+"""Загрузка медиа по частям: сессия, части в любом порядке, возобновление, finalize и очередь производных."""
+
+import os
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.management import call_command
+from PIL import Image
+
+from apps.accounts.models import CustomUser
+from apps.accounts.services.auth_service import generate_jwt_tokens
+from apps.re_objects.models import (
+    MediaDerivativeJob,
+    MediaUpload,
+    PremiseImage,
+)
+from apps.re_objects.services import chunked_upload
+from apps.re_objects.services.chunked_upload import (
+    ChunkedUploadError,
+    _S3Chunks,
+    finalize_upload,
+    purge_expired_uploads,
+    received_chunks,
+    record_chunk,
+    start_upload,
+    validate_chunk,
+    write_chunk_data,
+)
+from apps.re_objects.services.media_derivatives import build_derivatives_batch
+
+
+def _jpeg(size=(900, 600)) -> bytes:
+    buf = BytesIO()
+    Image.new('RGB', size, color='red').save(buf, format='JPEG', quality=90)
+    return buf.getvalue()
+
+
+@pytest.fixture
+def media_dirs(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path / 'media'
+    settings.MEDIA_UPLOAD_TEMP_DIR = str(tmp_path / 'partial')
+    settings.MEDIA_UPLOAD_CHUNK_SIZE = 4096
+    return tmp_path
+
+
+@pytest.fixture
+def premise(make_building, make_premise):
+    building = make_building('БЦ Загрузка', city='Загрузочный', address='ул. Частей, 1')
+    return make_premise(building, 'U1', area=30, price_per_month=1000)
+
+
+def _send(upload, data: bytes, indexes=None):
+    for index in range(upload.chunk_count) if indexes is None else indexes:
+        chunk = data[index * upload.chunk_size : (index + 1) * upload.chunk_size]
+        length = validate_chunk(upload, index, len(chunk))
+        etag = write_chunk_data(upload, index, BytesIO(chunk), length)
+        record_chunk(upload, index, length, etag)
+
+
+def test_out_of_order_chunks_resume_and_finalize(media_dirs, premise):
+    data = _jpeg()
+    upload = start_upload(
+        target='premise_image',
+        object_uuid=premise.uuid,
+        filename='photo.jpg',
+        size=len(data),
+        fields={'title': 'Фасад'},
+    )
+    assert upload.chunk_count > 2
+
+    # Обрыв после части частей: клиент узнаёт принятые и досылает остальные
+    _send(upload, data, indexes=list(range(upload.chunk_count))[::-2])
+    indexes, received = received_chunks(upload)
+    missing = sorted(set(range(upload.chunk_count)) - set(indexes))
+    with pytest.raises(ChunkedUploadError) as exc:
+        finalize_upload(upload.uuid)
+    assert exc.value.status == 409
+    _send(upload, data, indexes=missing)
+
+    image = finalize_upload(upload.uuid)
+
+    assert isinstance(image, PremiseImage)
+    assert image.title == 'Фасад' and image.order == 1
+    assert image.original.read() == data
+    assert not image.card and not image.detail
+    assert not os.listdir(media_dirs / 'partial')
+    upload.refresh_from_db()
+    assert upload.status == MediaUpload.Status.COMPLETED and upload.media_id == image.pk
+    assert not upload.chunks.exists()
+    # Повтор finalize возвращает ту же запись
+    assert finalize_upload(upload.uuid).pk == image.pk
+    assert MediaDerivativeJob.objects.filter(media_id=image.pk, status=MediaDerivativeJob.Status.PENDING).count() == 1
+
+
+def test_derivative_worker_builds_card_and_detail(media_dirs, premise):
+    data = _jpeg()
+    upload = start_upload(target='premise_image', object_uuid=premise.uuid, filename='a.jpg', size=len(data))
+    _send(upload, data)
+    image = finalize_upload(upload.uuid)
+
+    call_command('build_media_derivatives', stdout=StringIO())
+
+    image.refresh_from_db()
+    assert image.card and image.detail
+    job = MediaDerivativeJob.objects.get(media_id=image.pk)
+    assert job.status == MediaDerivativeJob.Status.DONE
+    assert job.peak_memory > 0
+
+
+def test_oversized_image_fails_without_retries(media_dirs, premise, settings):
+    settings.MEDIA_IMAGE_MAX_PIXELS = 1000
+    data = _jpeg()
+    upload = start_upload(target='premise_image', object_uuid=premise.uuid, filename='big.jpg', size=len(data))
+    _send(upload, data)
+    finalize_upload(upload.uuid)
+
+    assert build_derivatives_batch() == (0, 1)
+    job = MediaDerivativeJob.objects.get()
+    assert job.status == MediaDerivativeJob.Status.FAILED and job.attempts == 1
+    assert 'MEDIA_IMAGE_MAX_PIXELS' in job.last_error
+
+
+def test_broken_image_is_retried_then_failed(media_dirs, premise, settings):
+    settings.MEDIA_DERIVATIVES_MAX_ATTEMPTS = 2
+    settings.MEDIA_DERIVATIVES_RETRY_BASE_SECONDS = 0
+    data = b'not a jpeg' * 100
+    upload = start_upload(target='premise_image', object_uuid=premise.uuid, filename='b.jpg', size=len(data))
+    _send(upload, data)
+    finalize_upload(upload.uuid)
+
+    assert build_derivatives_batch() == (0, 1)
+    assert build_derivatives_batch() == (0, 1)
+    job = MediaDerivativeJob.objects.get()
+    assert job.status == MediaDerivativeJob.Status.FAILED and job.attempts == 2 and job.last_error
+
+
+def test_chunk_validation(media_dirs, premise):
+    upload = start_upload(target='premise_image', object_uuid=premise.uuid, filename='c.jpg', size=5000)
+
+    with pytest.raises(ChunkedUploadError, match='Content-Length 904'):
+        validate_chunk(upload, 1, 4096)
+    with pytest.raises(ChunkedUploadError, match='от 0 до 1'):
+        validate_chunk(upload, 2, 10)
+    with pytest.raises(ChunkedUploadError, match='короче'):
+        write_chunk_data(upload, 0, BytesIO(b'x' * 100), 4096)
+    with pytest.raises(ChunkedUploadError, match='расширение'):
+        start_upload(target='premise_image', object_uuid=premise.uuid, filename='c.exe', size=10)
+    with pytest.raises(ChunkedUploadError, match='не поддерживаются'):
+        start_upload(
+            target='premise_video', object_uuid=premise.uuid, filename='v.mp4', size=10, fields={'is_primary': True}
+        )
+
+
+def test_purge_expired_removes_draft(media_dirs, premise):
+    upload = start_upload(target='premise_image', object_uuid=premise.uuid, filename='d.jpg', size=100)
+    _send(upload, b'x' * 100)
+    MediaUpload.objects.filter(pk=upload.pk).update(expires_at=upload.created_at)
+
+    assert purge_expired_uploads() == 1
+
+    upload.refresh_from_db()
+    assert upload.status == MediaUpload.Status.ABORTED
+    assert not os.listdir(media_dirs / 'partial')
+
+
+class FakeS3Client:
+    def __init__(self):
+        self.parts = {}
+        self.completed = None
+
+    def create_multipart_upload(self, **kwargs):
+        return {'UploadId': 'up-1'}
+
+    def upload_part(self, **kwargs):
+        self.parts[kwargs['PartNumber']] = kwargs['Body']
+        return {'ETag': f'"etag-{kwargs["PartNumber"]}"'}
+
+    def complete_multipart_upload(self, **kwargs):
+        self.completed = kwargs['MultipartUpload']['Parts']
+
+
+class FakeS3Storage:
+    bucket_name = 'media'
+    default_acl = None
+    default_content_type = 'application/octet-stream'
+
+    def __init__(self, client):
+        self.connection = type('Connection', (), {'meta': type('Meta', (), {'client': client})})()
+
+    def _normalize_name(self, name):
+        return name
+
+    def get_object_parameters(self, name):
+        return {}
+
+
+def test_s3_multipart_parts_and_complete(media_dirs, premise, monkeypatch):
+    client = FakeS3Client()
+    monkeypatch.setattr(chunked_upload, '_backend', lambda storage: _S3Chunks(FakeS3Storage(client)))
+    data = b'v' * (chunked_upload.S3_MIN_PART_SIZE + 10)
+    upload = start_upload(target='premise_video', object_uuid=premise.uuid, filename='tour.mp4', size=len(data))
+    assert upload.s3_upload_id == 'up-1'
+    assert upload.chunk_size == chunked_upload.S3_MIN_PART_SIZE and upload.chunk_count == 2
+
+    _send(upload, data, indexes=[1, 0])
+    video = finalize_upload(upload.uuid)
+
+    assert client.completed == [{'PartNumber': 1, 'ETag': '"etag-1"'}, {'PartNumber': 2, 'ETag': '"etag-2"'}]
+    assert b''.join(client.parts[n] for n in sorted(client.parts)) == data
+    assert video.file.name == upload.storage_name
+
+
+def _auth(user) -> dict:
+    return {'Authorization': f'Bearer {generate_jwt_tokens(user)[0]}'}
+
+
+def test_upload_endpoints(django_client, media_dirs, premise):
+    staff = CustomUser.objects.create_superuser(username='uploader', email='uploader@example.com', password='x')
+    data = _jpeg()
+
+    created = django_client.post(
+        '/api/v1/uploads',
+        {'target': 'premise_image', 'object_uuid': str(premise.uuid), 'filename': 'e.jpg', 'size': len(data)},
+        content_type='application/json',
+        headers=_auth(staff),
+    )
+    assert created.status_code == 201, created.content
+    session = created.json()
+    url = f'/api/v1/uploads/{session["uuid"]}'
+    size = session['chunk_size']
+
+    for index in range(session['chunk_count'] - 1, -1, -1):
+        response = django_client.put(
+            f'{url}/chunks/{index}',
+            data[index * size : (index + 1) * size],
+            content_type='application/octet-stream',
+            headers=_auth(staff),
+        )
+        assert response.status_code == 200, response.content
+    status = django_client.get(url, headers=_auth(staff)).json()
+    assert status['received_chunks'] == list(range(session['chunk_count']))
+    assert status['received_bytes'] == len(data)
+
+    finalized = django_client.post(f'{url}/finalize', headers=_auth(staff))
+    assert finalized.status_code == 200, finalized.content
+    assert finalized.json()['derivatives'] == 'pending'
+    assert PremiseImage.objects.get(pk=finalized.json()['media_id']).premise_id == premise.pk
+    assert django_client.delete(url, headers=_auth(staff)).status_code == 204
+
+
+def test_upload_requires_permission_and_hides_foreign_sessions(django_client, media_dirs, premise):
+    user = CustomUser.objects.create_user(username='plain', email='plain@example.com', password='x')
+    payload = {'target': 'premise_image', 'object_uuid': str(premise.uuid), 'filename': 'f.jpg', 'size': 10}
+
+    response = django_client.post('/api/v1/uploads', payload, content_type='application/json', headers=_auth(user))
+    assert response.status_code == 403
+
+    staff = CustomUser.objects.create_superuser(username='owner', email='owner@example.com', password='x')
+    upload = start_upload(target='premise_image', object_uuid=premise.uuid, filename='f.jpg', size=10, user=staff)
+    assert django_client.get(f'/api/v1/uploads/{upload.uuid}', headers=_auth(user)).status_code == 404
+    response = django_client.put(
+        f'/api/v1/uploads/{upload.uuid}/chunks/0',
+        b'x' * 5,
+        content_type='application/octet-stream',
+        headers=_auth(staff),
+    )
+    assert response.status_code == 422
@@ -0,0 +1,126 @@
+"""Dev API: повтор запроса с Idempotency-Key возвращает сохранённый ответ без дубликатов."""
+
+from datetime import timedelta
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.utils import timezone
+
+from apps.re_objects.models import Building, BuildingImage, DevIdempotencyKey, Floor, Premise
+
+# Минимальный GIF 1×1
+GIF = (
+    b'GIF89a\x01\x00\x01\x00\x80\x00\x00\x00\x00\x00\xff\xff\xff!\xf9\x04\x01\x00\x00\x00\x00,'
+    b'\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x02D\x01\x00;'
+)
+
+
+@pytest.fixture
+def building(make_building):
+    return make_building('БЦ Dev', city='Девград')
+
+
+def test_building_retry_with_same_key_returns_stored_response(django_client, building):
+    data = {'name': 'БЦ Повтор', 'address': 'ул. Повторная, 2', 'city_id': building.city_id}
+
+    first = django_client.post('/api/v1/dev/buildings', data, headers={'Idempotency-Key': 'run-1:building:0'})
+    retry = django_client.post('/api/v1/dev/buildings', data, headers={'Idempotency-Key': 'run-1:building:0'})
+
+    assert first.status_code == retry.status_code == 200
+    assert retry.json() == first.json()
+    assert Building.objects.filter(name='БЦ Повтор').count() == 1
+    assert DevIdempotencyKey.objects.get(key='run-1:building:0').response['uuid'] == first.json()['uuid']
+
+
+def test_same_key_on_another_endpoint_is_not_reused(django_client, building, make_building):
+    other = make_building('БЦ Соседний', city='Девград')
+    headers = {'Idempotency-Key': 'run-1:floor:1'}
+
+    first = django_client.post(
+        f'/api/v1/dev/buildings/{building.uuid}/floors', {'number': '5', 'title': 'Этаж 5'}, headers=headers
+    )
+    second = django_client.post(
+        f'/api/v1/dev/buildings/{other.uuid}/floors', {'number': '5', 'title': 'Этаж 5'}, headers=headers
+    )
+
+    assert first.status_code == second.status_code == 200
+    assert second.json()['id'] != first.json()['id']
+    assert Floor.objects.filter(building__in=[building, other], number=5).count() == 2
+    assert DevIdempotencyKey.objects.filter(key='run-1:floor:1').count() == 2
+
+
+def test_too_long_key_is_rejected(django_client, building):
+    url = f'/api/v1/dev/buildings/{building.uuid}/floors'
+
+    response = django_client.post(url, {'number': '6', 'title': 'Этаж 6'}, headers={'Idempotency-Key': 'k' * 201})
+
+    assert response.status_code == 400
+    assert not Floor.objects.filter(building=building, number=6).exists()
+    assert not DevIdempotencyKey.objects.exists()
+
+
+def test_expired_key_is_not_reused_and_is_purged(django_client, building, settings):
+    settings.DEV_IDEMPOTENCY_KEY_TTL_HOURS = 24
+    url = f'/api/v1/dev/buildings/{building.uuid}/floors'
+    first = django_client.post(url, {'number': '7', 'title': 'Этаж 7'}, headers={'Idempotency-Key': 'old'})
+    DevIdempotencyKey.objects.update(created_at=timezone.now() - timedelta(hours=25))
+    Floor.objects.filter(building=building, number=7).delete()
+
+    retry = django_client.post(url, {'number': '7', 'title': 'Этаж 7'}, headers={'Idempotency-Key': 'old'})
+
+    assert retry.status_code == 200
+    assert retry.json()['id'] != first.json()['id']
+    stored = DevIdempotencyKey.objects.get()
+    assert stored.response['id'] == retry.json()['id']
+    assert stored.created_at > timezone.now() - timedelta(hours=1)
+
+
+def test_without_key_every_request_creates(django_client, building):
+    url = f'/api/v1/dev/premises/{building.uuid}'
+
+    for _ in range(2):
+        assert django_client.post(url, {'area': '10', 'price_per_month': '1000', 'number': '7'}).status_code == 200
+
+    assert Premise.objects.filter(building=building, room_number='7').count() == 2
+    assert not DevIdempotencyKey.objects.exists()
+
+
+def test_errors_are_not_stored(django_client, building):
+    url = f'/api/v1/dev/premises/{building.uuid}'
+    data = {'area': '10', 'price_per_month': '1000', 'number': '1', 'floor_number': '2'}
+    headers = {'Idempotency-Key': 'run-1:premise:1'}
+
+    failed = django_client.post(url, data, headers=headers)
+    Floor.objects.create(building=building, number=2, title='Этаж 2')
+    retry = django_client.post(url, data, headers=headers)
+
+    assert failed.status_code == 400
+    assert retry.status_code == 200
+    assert Premise.objects.get(building=building, room_number='1').floor.number == 2
+
+
+def test_floor_retry_is_not_reported_as_duplicate(django_client, building):
+    url = f'/api/v1/dev/buildings/{building.uuid}/floors'
+    headers = {'Idempotency-Key': 'run-1:floor:3'}
+
+    first = django_client.post(url, {'number': '3', 'title': 'Этаж 3'}, headers=headers)
+    retry = django_client.post(url, {'number': '3', 'title': 'Этаж 3'}, headers=headers)
+
+    assert first.status_code == retry.status_code == 200
+    assert retry.json()['id'] == first.json()['id']
+
+
+def test_media_categories_keep_single_primary(django_client, building, tmp_path, settings):
+    settings.MEDIA_ROOT = tmp_path
+    url = f'/api/v1/dev/buildings/{building.uuid}/media'
+
+    for category in ('фасад', 'вход'):
+        upload = SimpleUploadedFile('a.gif', GIF, content_type='image/gif')
+        response = django_client.post(
+            url, {'category': category, 'files': upload}, headers={'Idempotency-Key': category}
+        )
+        assert response.status_code == 200
+
+    images = BuildingImage.objects.filter(building=building)
+    assert list(images.values_list('order', flat=True).order_by('order')) == [1, 2]
+    assert images.filter(is_primary=True).count() == 1
@@ -0,0 +1,78 @@
+"""Команда generate_catalog: объёмы, детерминизм по seed, инварианты броней."""
+
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import Count
+from django.utils import timezone
+
+from apps.bookings.models import Booking
+from apps.payments.models import Payment
+from apps.re_objects.management.commands.generate_catalog import REGION_CODE_PREFIX
+from apps.re_objects.models import Building, Premise, PremiseImage
+
+# Часть тестов проекта оставляет данные в общей БД — считаем только сгенерированное
+GENERATED = {'city__region__code__startswith': REGION_CODE_PREFIX}
+GENERATED_PREMISE = {'premise__city__region__code__startswith': REGION_CODE_PREFIX}
+
+ARGS = dict(
+    premises=60,
+    premises_per_building=20,
+    regions=1,
+    cities_per_region=2,
+    max_floors=5,
+    users=20,
+    bookings=200,
+    active_booking_share=0.2,
+    payments=80,
+    deals=10,
+    referral_links=10,
+    batch_size=25,
+    stdout=StringIO(),
+)
+
+
+def _generate(**overrides):
+    call_command('generate_catalog', **{**ARGS, **overrides})
+
+
+@pytest.mark.django_db
+def test_generate_catalog_creates_requested_volumes():
+    _generate(media=1)
+
+    assert Building.objects.filter(**GENERATED).count() == 3
+    assert Premise.objects.filter(**GENERATED).count() == 60
+    assert Booking.objects.filter(**GENERATED_PREMISE).count() == 200
+    assert Payment.objects.filter(**GENERATED_PREMISE).count() == 80
+    assert PremiseImage.objects.filter(**GENERATED_PREMISE).count() == 60
+    assert set(Payment.objects.filter(**GENERATED_PREMISE).values_list('status', flat=True)) == set(
+        Payment.Status.values
+    )
+    for premise in Premise.objects.filter(available_for_sale=True, **GENERATED):
+        assert premise.full_sell_price == premise._compute_full_sell_price()
+
+
+@pytest.mark.django_db
+def test_generate_catalog_at_most_one_active_booking_per_premise():
+    _generate()
+
+    active = Booking.objects.filter(expires_at__gt=timezone.now(), **GENERATED_PREMISE)
+    assert active.count() == 12
+    assert not active.values('premise_id').annotate(n=Count('id')).filter(n__gt=1).exists()
+
+
+@pytest.mark.django_db
+def test_generate_catalog_is_deterministic_and_clear_replaces_data():
+    _generate(seed=7)
+    first = list(Premise.objects.filter(**GENERATED).order_by('uuid').values_list('uuid', 'area', 'price_per_month'))
+
+    with pytest.raises(CommandError):
+        _generate(seed=7)
+
+    _generate(seed=7, clear=True)
+    assert (
+        list(Premise.objects.filter(**GENERATED).order_by('uuid').values_list('uuid', 'area', 'price_per_month'))
+        == first
+    )
@@ -0,0 +1,158 @@
+"""Геокодирование зданий: кэш, параллельность, повторы — против локальной заглушки API."""
+
+import time
+from decimal import Decimal
+from io import StringIO
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import override_settings
+
+from apps.re_objects.models import Building, GeocodeCacheEntry
+from apps.re_objects.services.geocoding import (
+    TokenBucket,
+    build_geocoder,
+    geocode_buildings,
+    geocode_query,
+    normalize_geocode_query,
+)
+from loadtest.geocoder_stub import GeocoderStub, stub_coordinates
+
+
+@pytest.fixture
+def stub():
+    server = GeocoderStub().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def make_moscow_building(make_building):
+    """Здания в Москве без этажей: для геокодера важны только город и адрес."""
+    return lambda address: make_building(f'БЦ {address}', city='Москва', floors=(), address=address)
+
+
+def _coords(query: str) -> tuple[Decimal, Decimal]:
+    lat, lon = stub_coordinates(query)
+    return Decimal(str(lat)).quantize(Decimal('0.000001')), Decimal(str(lon)).quantize(Decimal('0.000001'))
+
+
+def _run(buildings, stub, **options):
+    use_cache = options.pop('use_cache', True)
+
+    async def run():
+        async with build_geocoder(api_key='stub', url=stub.url, retry_backoff=0.01, **options) as geocoder:
+            return await geocode_buildings(buildings, geocoder, use_cache=use_cache)
+
+    return async_to_sync(run)()
+
+
+def _load(buildings) -> list[Building]:
+    return list(Building.objects.select_related('city').filter(pk__in=[b.pk for b in buildings]).order_by('pk'))
+
+
+def test_normalize_geocode_query():
+    assert normalize_geocode_query('  Москва ,ул.  Тверская,   1 ') == 'москва, ул. тверская, 1'
+    assert normalize_geocode_query(geocode_query('Москва', ' Ул. Тверская, 1')) == 'москва, ул. тверская, 1'
+
+
+@pytest.mark.django_db
+def test_identical_addresses_are_geocoded_once_and_cached(stub, make_moscow_building):
+    buildings = _load(
+        [
+            make_moscow_building('ул. Тверская, 1'),
+            make_moscow_building('УЛ.  Тверская ,1'),
+            make_moscow_building('nowhere street'),
+            make_moscow_building('   '),
+        ]
+    )
+
+    report = _run(buildings, stub)
+
+    assert (report.updated, report.not_found, report.skipped, report.failed) == (2, 1, 1, 0)
+    assert len(stub.state.queries) == 2
+    first, second, missing, empty = _load(buildings)
+    assert (first.latitude, first.longitude) == _coords('Москва, ул. Тверская, 1')
+    assert (second.latitude, second.longitude) == (first.latitude, first.longitude)
+    assert missing.latitude is None and empty.latitude is None
+    assert GeocodeCacheEntry.objects.get(query_key='москва, nowhere street').found is False
+
+    report = _run(_load(buildings), stub)
+
+    assert len(stub.state.queries) == 2
+    assert (report.cache_hits, report.requests) == (3, 0)
+
+    _run(_load(buildings), stub, use_cache=False)
+    assert len(stub.state.queries) == 4
+
+
+@pytest.mark.django_db
+def test_retries_transient_errors(stub, make_moscow_building):
+    buildings = _load([make_moscow_building('ул. Повторная, 5')])
+    stub.state.fail_next = 2
+
+    report = _run(buildings, stub, retries=3)
+
+    assert report.updated == 1
+    assert len(stub.state.queries) == 3
+
+
+@pytest.mark.django_db
+def test_gives_up_after_retries_without_caching(stub, make_moscow_building):
+    buildings = _load([make_moscow_building('ул. Недоступная, 7')])
+    stub.state.fail_next = 10
+
+    report = _run(buildings, stub, retries=1)
+
+    assert (report.updated, report.failed) == (0, 1)
+    assert 'HTTP 503' in next(iter(report.errors.values()))
+    assert not GeocodeCacheEntry.objects.filter(query_key__contains='недоступная').exists()
+
+
+@pytest.mark.django_db
+def test_concurrency_is_bounded(make_moscow_building):
+    server = GeocoderStub(latency_ms=50).start()
+    try:
+        buildings = _load([make_moscow_building(f'ул. Параллельная, {i}') for i in range(12)])
+        started = time.perf_counter()
+        report = _run(buildings, server, concurrency=4, rate_per_second=0)
+        elapsed = time.perf_counter() - started
+    finally:
+        server.stop()
+
+    assert report.updated == 12
+    assert 1 < server.state.max_in_flight <= 4
+    assert elapsed < 12 * 0.05
+
+
+def test_token_bucket_limits_rate():
+    bucket = TokenBucket(rate=50, burst=1)
+
+    async def acquire_many():
+        for _ in range(6):
+            await bucket.acquire()
+
+    started = time.perf_counter()
+    async_to_sync(acquire_many)()
+    assert time.perf_counter() - started >= 5 / 50 * 0.9
+
+
+@pytest.mark.django_db
+def test_command_updates_buildings_via_stub(stub, make_moscow_building):
+    building = make_moscow_building('ул. Командная, 3')
+
+    with override_settings(YANDEX_GEOCODER_API_KEY='stub', YANDEX_GEOCODER_URL=stub.url):
+        out = StringIO()
+        call_command('geocode_buildings', '--rate', '0', stdout=out, stderr=StringIO())
+
+    building.refresh_from_db()
+    assert (building.latitude, building.longitude) == _coords('Москва, ул. Командная, 3')
+    assert 'Готово.' in out.getvalue()
+
+
+@override_settings(YANDEX_GEOCODER_API_KEY='')
+def test_command_requires_api_key():
+    with pytest.raises(CommandError):
+        call_command('geocode_buildings', stdout=StringIO())
@@ -1,4 +1,6 @@
-"""Производные медиа: размеры WebP и поля API url / full_url."""
+"""Производные медиа: размеры WebP, пределы памяти на патологических изображениях, поля API url / full_url."""
+import struct
+import zlib
 from io import BytesIO
 
 import pytest
@@ -6,7 +8,13 @@ from django.core.files.uploadedfile import SimpleUploadedFile
 from PIL import Image
 
 from apps.re_objects.models import Building, Floor, Premise, PremiseImage, PremiseVideo
-from apps.re_objects.services.media_processing import CARD_SIZE, process_raster_bytes
+from apps.re_objects.services.media_processing import (
+    CARD_SIZE,
+    ImageStats,
+    ImageTooLargeError,
+    process_raster_bytes,
+    process_raster_file,
+)
 from apps.re_objects.services.premise_service import (
     _build_premise_media,
     _photo_api_urls,
@@ -25,6 +33,92 @@ def test_process_raster_bytes_card_and_detail_dimensions():
     assert detail_im.width <= 1920 and detail_im.height <= 1080
 
 
+def _encode(image: Image.Image, fmt: str, **params) -> bytes:
+    buf = BytesIO()
+    image.save(buf, format=fmt, **params)
+    return buf.getvalue()
+
+
+def _png_header_only(width: int, height: int) -> bytes:
+    """PNG в несколько десятков байт, объявляющий width×height (1 бит/пиксель) — «декомпрессионная бомба»."""
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+    ihdr = struct.pack('>IIBBBBB', width, height, 1, 0, 0, 0, 0)
+    return b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', ihdr) + chunk(b'IDAT', zlib.compress(b'\0')) + chunk(b'IEND', b'')
+
+
+@pytest.mark.parametrize('size', [(30000, 30000), (9000, 9000)])
+def test_oversized_png_is_rejected_before_decoding(size):
+    # 900 Мп Pillow отвергает сам (DecompressionBombError), 81 Мп — предел MEDIA_IMAGE_MAX_PIXELS
+    with pytest.raises(ImageTooLargeError):
+        process_raster_bytes(_png_header_only(*size))
+
+
+def test_max_pixels_setting(settings):
+    settings.MEDIA_IMAGE_MAX_PIXELS = 100 * 100
+    data = _encode(Image.new('RGB', (101, 100)), 'PNG')
+
+    with pytest.raises(ImageTooLargeError, match='101×100'):
+        process_raster_bytes(data)
+
+
+def test_large_jpeg_is_decoded_at_reduced_scale():
+    stats = ImageStats()
+    process_raster_file(BytesIO(_encode(Image.new('RGB', (6000, 4000), 'blue'), 'JPEG')), stats)
+
+    assert stats.source_size == (6000, 4000)
+    # 1/2 масштаба: 3000×2000 ещё покрывает detail 1920×1080
+    assert stats.decoded_size == (3000, 2000)
+    assert stats.peak_bytes < 6000 * 4000 * 4 / 2
+
+
+def test_palette_transparency_becomes_white_without_rgba_copy():
+    image = Image.new('P', (4000, 3000), 0)
+    image.putpalette([0, 0, 0] + [255, 0, 0] * 255)
+    image.paste(1, (2000, 0, 4000, 3000))
+    stats = ImageStats()
+
+    card_cf, _ = process_raster_file(BytesIO(_encode(image, 'PNG', transparency=0)), stats)
+
+    card = Image.open(card_cf)
+    assert card.getpixel((10, 150))[0] > 240 and card.getpixel((10, 150))[1] > 240
+    assert card.getpixel((550, 150))[:2] == pytest.approx((254, 0), abs=3)
+    # P (1 байт) + RGB (4 байта) — без промежуточного RGBA
+    assert stats.peak_bytes <= 4000 * 3000 * 5
+
+
+@pytest.mark.parametrize('mode', ['RGBA', 'LA'])
+def test_alpha_is_flattened_on_white(mode):
+    image = Image.new(mode, (1000, 500), (0, 0) if mode == 'LA' else (0, 0, 0, 0))
+    card_cf, detail_cf = process_raster_bytes(_encode(image, 'PNG'))
+
+    for cf in (card_cf, detail_cf):
+        im = Image.open(cf)
+        assert im.mode == 'RGB'
+        assert min(im.getpixel((5, 5))) > 240
+
+
+def test_grayscale_is_resized_without_rgb_copy():
+    stats = ImageStats()
+    process_raster_file(BytesIO(_encode(Image.new('L', (4000, 3000), 128), 'PNG')), stats)
+
+    assert stats.peak_bytes < 4000 * 3000 * 2
+
+
+def test_extreme_panorama_and_unseekable_stream():
+    class Unseekable(BytesIO):
+        def seekable(self):
+            return False
+
+    data = _encode(Image.new('RGB', (8000, 60), 'green'), 'PNG')
+    card_cf, detail_cf = process_raster_file(Unseekable(data))
+
+    assert Image.open(card_cf).size == CARD_SIZE
+    assert Image.open(detail_cf).size == (1920, 14)
+
+
 @pytest.mark.django_db
 def test_premise_image_save_writes_card_and_detail(city):
     buf = BytesIO()
@@ -0,0 +1,221 @@
+"""Хранение медиа по содержимому: общий оригинал и производные, счётчик ссылок, дедупликация существующих."""
+
+import threading
+import time
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from PIL import Image
+
+from apps.re_objects.models import MediaBlob, PremiseImage
+from apps.re_objects.services import media_processing, media_store
+
+
+def _jpeg(color='red', size=(900, 600)) -> bytes:
+    buf = BytesIO()
+    Image.new('RGB', size, color=color).save(buf, format='JPEG', quality=90)
+    return buf.getvalue()
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+@pytest.fixture
+def premises(make_building, make_premise):
+    building = make_building('БЦ Содержимое', city='Хешевск', address='ул. Хешей, 1')
+    return [make_premise(building, f'S{n}', area=30, price_per_month=1000) for n in (1, 2)]
+
+
+@pytest.fixture
+def processing_calls(monkeypatch):
+    calls = []
+    original = media_processing.process_raster_file
+
+    def counting(fp, stats=None):
+        calls.append(fp)
+        return original(fp, stats)
+
+    monkeypatch.setattr(media_processing, 'process_raster_file', counting)
+    return calls
+
+
+def _upload(premise, data: bytes, name='photo.jpg') -> PremiseImage:
+    return PremiseImage.objects.create(premise=premise, original=ContentFile(data, name=name))
+
+
+def test_same_upload_is_stored_and_processed_once(media_root, premises, processing_calls):
+    data = _jpeg()
+
+    first = _upload(premises[0], data)
+    second = _upload(premises[1], data, name='copy.jpg')
+
+    assert len(processing_calls) == 1
+    assert first.blob_id == second.blob_id
+    blob = MediaBlob.objects.get()
+    assert blob.ref_count == 2 and blob.size == len(data)
+    assert blob.original.startswith(f'cas/{blob.sha256[:2]}/{blob.sha256}')
+    assert blob.build_seconds is not None
+    assert (first.original.name, first.card.name, first.detail.name) == (
+        second.original.name,
+        second.card.name,
+        second.detail.name,
+    )
+    assert second.original.read() == data
+    assert len(list(media_root.rglob('*.*'))) == 3
+
+
+def test_files_removed_with_last_reference(media_root, premises, django_capture_on_commit_callbacks):
+    data = _jpeg()
+    first = _upload(premises[0], data)
+    _upload(premises[1], data)
+    names = [first.original.name, first.card.name, first.detail.name]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        first.delete()
+    assert MediaBlob.objects.get().ref_count == 1
+    assert all(default_storage.exists(name) for name in names)
+
+    # Удаление помещения — каскадом
+    with django_capture_on_commit_callbacks(execute=True):
+        premises[1].delete()
+    assert not MediaBlob.objects.exists()
+    assert not any(default_storage.exists(name) for name in names)
+
+
+def test_replacing_original_releases_previous_blob(media_root, premises):
+    image = _upload(premises[0], _jpeg('red'))
+    old_blob = image.blob_id
+
+    image.original = ContentFile(_jpeg('blue'), name='new.jpg')
+    image.save()
+
+    assert image.blob_id != old_blob
+    assert not MediaBlob.objects.filter(pk=old_blob).exists()
+    assert MediaBlob.objects.get().ref_count == 1
+    assert image.card.name.startswith(f'cas/{image.blob.sha256[:2]}/')
+
+
+def test_changed_processing_params_rebuild(
+    media_root, premises, processing_calls, monkeypatch, django_capture_on_commit_callbacks
+):
+    data = _jpeg()
+    _upload(premises[0], data)
+    monkeypatch.setattr(media_processing, 'DERIVATIVES_VERSION', media_processing.DERIVATIVES_VERSION + 1)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        second = _upload(premises[1], data)
+
+    assert len(processing_calls) == 2
+    blob = MediaBlob.objects.get()
+    assert blob.derivatives_key == media_processing.derivatives_key('image')
+    # Обе записи переведены на новые производные, старые удалены
+    assert set(PremiseImage.objects.filter(blob=blob).values_list('card', flat=True)) == {blob.card}
+    assert second.card.name == blob.card
+    assert len(list(media_root.rglob('*.webp'))) == 2
+
+
+def _legacy(premise, data: bytes, name: str) -> PremiseImage:
+    """Запись в старом виде: собственные файлы, без blob (bulk_create — без построения производных в save)."""
+    card, detail = media_processing.process_raster_bytes(data)
+    paths = {
+        'original': default_storage.save(f'legacy/{name}.jpg', ContentFile(data)),
+        'card': default_storage.save(f'legacy/{name}-card.webp', card),
+        'detail': default_storage.save(f'legacy/{name}-detail.webp', detail),
+    }
+    return PremiseImage.objects.bulk_create([PremiseImage(premise=premise, **paths)])[0]
+
+
+def test_dedupe_media_command(media_root, premises, processing_calls, django_capture_on_commit_callbacks):
+    data = _jpeg()
+    first = _legacy(premises[0], data, 'a')
+    second = _legacy(premises[1], data, 'b')
+    unique = _legacy(premises[1], _jpeg('green'), 'c')
+    processing_calls.clear()
+
+    out = StringIO()
+    call_command('dedupe_media', '--dry-run', stdout=out)
+    assert 'копий оригиналов: 1' in out.getvalue()
+    assert not MediaBlob.objects.exists()
+
+    out = StringIO()
+    with django_capture_on_commit_callbacks(execute=True):
+        call_command('dedupe_media', stdout=out)
+
+    assert 'копий оригиналов: 1' in out.getvalue() and 'копий производных: 2' in out.getvalue()
+    assert 'Построений производных не понадобится (фото): 1' in out.getvalue()
+    assert not processing_calls
+    first.refresh_from_db()
+    second.refresh_from_db()
+    unique.refresh_from_db()
+    assert first.blob_id == second.blob_id != unique.blob_id
+    assert first.original.name == second.original.name == 'legacy/a.jpg'
+    assert first.card.name == second.card.name == 'legacy/a-card.webp'
+    assert MediaBlob.objects.get(pk=first.blob_id).ref_count == 2
+    assert not default_storage.exists('legacy/b.jpg') and not default_storage.exists('legacy/b-detail.webp')
+
+    # Новая загрузка того же содержимого использует готовые производные
+    third = _upload(premises[0], data)
+    assert not processing_calls
+    assert third.detail.name == 'legacy/a-detail.webp'
+    assert MediaBlob.objects.get(pk=first.blob_id).ref_count == 3
+
+
+def _acquire_retrying(data: bytes, name: str):
+    # SQLite (тестовая БД) отвечает «table is locked» вместо ожидания — повторяем, как в гонке броней
+    try:
+        for _ in range(400):
+            try:
+                return media_store.acquire_blob(ContentFile(data, name=name), name)
+            except OperationalError:
+                time.sleep(0.005)
+        raise AssertionError('Не удалось дождаться блокировки БД')
+    finally:
+        connection.close()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_parallel_uploads_of_same_content_keep_winner_file(media_root):
+    data = _jpeg('purple')
+    barrier = threading.Barrier(2)
+    results = [None, None]
+
+    def upload(i):
+        barrier.wait()
+        results[i] = _acquire_retrying(data, f'same-{i}.jpg')
+
+    threads = [threading.Thread(target=upload, args=(i,)) for i in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    blob = MediaBlob.objects.get()
+    assert results[0].pk == results[1].pk == blob.pk
+    assert blob.ref_count == 2
+    with default_storage.open(blob.original, 'rb') as stored:
+        assert stored.read() == data
+    assert len(list((media_root / 'cas').rglob('*.*'))) == 1
+
+
+def test_losing_upload_does_not_touch_winner_file(db, media_root, monkeypatch):
+    data = _jpeg('orange')
+    winner = media_store.acquire_blob(ContentFile(data, name='w.jpg'), 'w.jpg')
+    # Проигравшая загрузка не видела строку победителя (она была не закоммичена) и упёрлась в уникальный sha256
+    monkeypatch.setattr(media_store, '_locked_blob', lambda digest: None)
+    writes = []
+    monkeypatch.setattr(default_storage, 'delete', lambda name: writes.append(('delete', name)))
+    monkeypatch.setattr(media_store, 'save_files', lambda *args, **kwargs: writes.append(('save', args)))
+
+    loser = media_store.acquire_blob(ContentFile(data, name='l.jpg'), 'l.jpg')
+
+    assert loser.pk == winner.pk and loser.ref_count == 2
+    assert writes == []
+    with default_storage.open(winner.original, 'rb') as stored:
+        assert stored.read() == data
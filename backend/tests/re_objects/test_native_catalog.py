@@ -0,0 +1,308 @@
+"""
+Нативный async-путь каталога (NATIVE_ASYNC_DB, services.native_catalog) отвечает так же, как ORM.
+
+В тестовой БД (SQLite) соединение из пула подменяется обёрткой, выполняющей тот же скомпилированный SQL
+через соединение Django: проверяется сборка ответа из строк values(). С PostgreSQL и psycopg[pool] >= 3
+test_real_pool_matches_orm дополнительно сравнивает ответы через настоящий AsyncConnectionPool.
+"""
+
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+from asgiref.sync import sync_to_async
+from django.db import connections
+from django.utils import timezone
+
+from apps.bookings.models import Booking
+from apps.payments.models import Payment
+from apps.re_objects.models import (
+    Building,
+    BuildingImage,
+    BuildingVideo,
+    Floor,
+    Premise,
+    PremiseImage,
+    PremiseVideo,
+)
+from apps.re_objects.services import native_catalog, premise_service
+from core import async_db
+
+
+class SQLiteNativeConnection:
+    """Вместо соединения psycopg: SQL и параметры компилятора выполняются курсором Django."""
+
+    def __init__(self):
+        self.queries = []
+
+    async def fetchall(self, sql, params):
+        self.queries.append(sql)
+        return await sync_to_async(self._fetchall)(sql, params)
+
+    @staticmethod
+    def _fetchall(sql, params):
+        with connections['default'].cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+
+
+@pytest.fixture
+def client(api_client):
+    return api_client
+
+
+@pytest.fixture
+def native(settings, monkeypatch):
+    """Включает нативный путь; возвращает функцию-переключатель (False — обратно на ORM)."""
+    connection = SQLiteNativeConnection()
+
+    @asynccontextmanager
+    async def native_connection(alias):
+        assert alias == 'default'
+        yield connection
+
+    monkeypatch.setattr(async_db, '_native_supported', lambda alias: True)
+    monkeypatch.setattr(native_catalog, 'native_connection', native_connection)
+
+    def switch(enabled):
+        settings.NATIVE_ASYNC_DB = enabled
+        connection.queries.clear()
+        return connection
+
+    return switch
+
+
+def _create_catalog(city, user):
+    building = Building.objects.create(
+        name='БЦ Нативный',
+        address='ул. Пуловая, 3',
+        city=city,
+        description='Здание для сравнения путей',
+        latitude=Decimal('55.790000'),
+        longitude=Decimal('49.120000'),
+        year_built=2015,
+    )
+    Building.objects.create(name='БЦ Без этажей', address='ул. Пустая, 1', city=city)
+    # bulk_create — без save(): производные из оригиналов не строятся, файлов нет
+    BuildingImage.objects.bulk_create(
+        [
+            BuildingImage(
+                building=building, original='buildings/n/orig.jpg', order=2, category=' Фасад ', title='Вход'
+            ),
+            BuildingImage(
+                building=building,
+                original='buildings/n/main.jpg',
+                card='buildings/n/main-card.webp',
+                detail='buildings/n/main-detail.webp',
+                order=5,
+                is_primary=True,
+                category='Фасад',
+            ),
+        ]
+    )
+    BuildingVideo.objects.bulk_create(
+        [BuildingVideo(building=building, file='buildings/n/tour.mp4', order=1, category='Холл')]
+    )
+
+    first = Floor.objects.create(building=building, number=1, title='Этаж 1')
+    second = Floor.objects.create(building=building, number=2, title='Этаж 2')
+    premises = [
+        Premise.objects.create(
+            building=building,
+            city=city,
+            floor=first,
+            area=Decimal('42.50'),
+            price_per_month=85000,
+            available_for_rent=True,
+            room_number='101',
+            title='Офис 101',
+        ),
+        Premise.objects.create(
+            building=building,
+            city=city,
+            floor=first,
+            area=Decimal('120.00'),
+            price_per_month=200000,
+            price_per_sqm=150000,
+            available_for_rent=True,
+            available_for_sale=True,
+            room_number='102',
+        ),
+        Premise.objects.create(
+            building=building,
+            city=city,
+            floor=first,
+            area=Decimal('60.00'),
+            price_per_month=90000,
+            available_for_rent=False,
+            show_rented_button=True,
+            room_number='103',
+        ),
+        Premise.objects.create(
+            building=building,
+            city=city,
+            floor=second,
+            area=Decimal('75.00'),
+            price_per_sqm=120000,
+            available_for_rent=False,
+            available_for_sale=True,
+            room_number='201',
+        ),
+    ]
+    PremiseImage.objects.bulk_create(
+        [
+            PremiseImage(premise=premises[0], original='premises/n/a.jpg', order=1),
+            PremiseImage(
+                premise=premises[0],
+                original='premises/n/b.jpg',
+                card='premises/n/b-card.webp',
+                detail='premises/n/b-detail.webp',
+                order=3,
+                is_primary=True,
+            ),
+        ]
+    )
+    PremiseVideo.objects.bulk_create(
+        [PremiseVideo(premise=premises[1], file='premises/n/v.mp4', card='premises/n/v-card.webp', order=0)]
+    )
+
+    Booking.objects.create(
+        user_id=user.id,
+        premise=premises[0],
+        deal_type=Booking.DealType.RENT,
+        expires_at=timezone.now() + timedelta(hours=2),
+    )
+    Payment.objects.create(
+        premise=premises[1],
+        provider_payment_id=f'pending-native-{uuid4()}',
+        idempotence_key=uuid4(),
+        status=Payment.Status.PENDING,
+        paid=False,
+        amount_value=Decimal('10000.00'),
+        amount_currency='RUB',
+        description='Pending payment',
+    )
+    return building, first, second
+
+
+BUILDING_NAMES = ('БЦ Нативный', 'БЦ Без этажей')
+
+
+def _delete_catalog():
+    Payment.objects.filter(premise__building__name__in=BUILDING_NAMES).delete()
+    Building.objects.filter(name__in=BUILDING_NAMES).delete()
+
+
+@pytest.fixture
+async def catalog(city, test_user):
+    building, first, second = await sync_to_async(_create_catalog)(city, test_user)
+    yield building, first, second
+    # Данные async-тестов не откатываются — не оставляем здания в выдаче каталога для других тестов
+    await sync_to_async(_delete_catalog)()
+
+
+async def _both(client, native, url):
+    """Ответы ORM и нативного пути на один запрос; нативный путь должен реально выполнить SQL."""
+    native(False)
+    orm = await client.get(url)
+    connection = native(True)
+    fast = await client.get(url)
+    assert orm.status_code == fast.status_code == 200
+    assert connection.queries, url
+    return orm.json(), fast.json()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'query',
+    [
+        '',
+        '?sale_type=rent',
+        '?sale_type=sale',
+        '?page=2&page_size=2',
+        '?available=true&order_by=price_asc',
+        '?min_area=50&sale_type=rent&order_by=area_desc',
+        '?page=9',
+    ],
+)
+async def test_premise_list_matches_orm(client, native, catalog, query):
+    orm, fast = await _both(client, native, f'/premises{query}')
+    assert fast == orm
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('query', ['', '?sale_type=rent', '?sale_type=sale', '?page=1&page_size=1'])
+async def test_buildings_list_matches_orm(client, native, catalog, query):
+    orm, fast = await _both(client, native, f'/buildings/{query}')
+    assert fast == orm
+    for item in fast['items']:
+        if item['title'] == 'БЦ Нативный':
+            assert [media['type'] for media in item['media']] == ['photo', 'video', 'photo']
+
+
+@pytest.mark.django_db
+async def test_building_detail_matches_orm(client, native, catalog):
+    building, _, _ = catalog
+    orm, fast = await _both(client, native, f'/buildings/{building.uuid}')
+    assert fast == orm
+    assert [floor['has_sale'] for floor in fast['floors']] == [True, True]
+    assert fast['media_categories'] == ['Фасад', 'Холл']
+
+
+@pytest.mark.django_db
+async def test_missing_building_is_404_on_native_path(client, native, catalog):
+    native(True)
+    response = await client.get(f'/buildings/{uuid4()}')
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('sale_type', ['rent', 'sale'])
+async def test_floor_matches_orm(client, native, catalog, sale_type):
+    building, first, second = catalog
+    for floor in (first, second):
+        orm, fast = await _both(client, native, f'/floors/{building.uuid}/{floor.id}?sale_type={sale_type}')
+        assert fast == orm
+    orm, fast = await _both(client, native, f'/floors/{building.uuid}/999999?sale_type={sale_type}')
+    assert fast == orm
+
+
+@pytest.mark.django_db
+async def test_orm_path_when_native_unsupported(client, settings, catalog, monkeypatch):
+    settings.NATIVE_ASYNC_DB = True
+    monkeypatch.setattr(async_db, '_warned_unavailable', False)
+    # SQLite и нет psycopg 3 — запрос идёт через ORM и не падает
+    assert await premise_service.native_read_alias(Premise) is None
+    response = await client.get('/premises')
+    assert response.status_code == 200
+    assert response.json()['total'] >= 4
+
+
+@pytest.mark.django_db
+@pytest.mark.skipif(
+    connections['default'].vendor != 'postgresql' or async_db.AsyncConnectionPool is None,
+    reason='нужны PostgreSQL и psycopg[pool] >= 3',
+)
+async def test_real_pool_matches_orm(client, settings, catalog):
+    building, first, _ = catalog
+    urls = [
+        '/premises?sale_type=rent',
+        '/buildings/',
+        f'/buildings/{building.uuid}',
+        f'/floors/{building.uuid}/{first.id}',
+    ]
+    try:
+        for url in urls:
+            settings.NATIVE_ASYNC_DB = False
+            orm = await client.get(url)
+            settings.NATIVE_ASYNC_DB = True
+            assert await premise_service.native_read_alias(Premise) == 'default'
+            fast = await client.get(url)
+            assert fast.status_code == orm.status_code == 200
+            assert fast.json() == orm.json(), url
+    finally:
+        _, pool = async_db._pools.pop('default', (None, None))
+        if pool is not None:
+            await pool.close()
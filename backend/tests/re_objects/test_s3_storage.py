@@ -0,0 +1,119 @@
+"""MediaS3Storage на локальной S3-заглушке: параллельные части multipart, save_many и пакетное удаление."""
+
+import os
+from io import BytesIO
+
+import pytest
+from django.core.files.base import ContentFile
+from PIL import Image
+
+from apps.re_objects.models import MediaBlob, PremiseImage
+from apps.re_objects.storage import MediaS3Storage, delete_files, save_files
+from loadtest.s3_stub import S3Stub
+
+MB = 1024 * 1024
+BUCKET = 'media'
+
+
+@pytest.fixture
+def stub():
+    stub = S3Stub(latency_ms=30).start()
+    yield stub
+    stub.stop()
+
+
+def _storage(stub, **kwargs) -> MediaS3Storage:
+    options = {
+        'endpoint_url': stub.url,
+        'bucket_name': BUCKET,
+        'access_key': 'stub',
+        'secret_key': 'stub',
+        'region_name': 'us-east-1',
+        'multipart_threshold': 5 * MB,
+        'multipart_chunksize': 5 * MB,
+        'max_concurrency': 4,
+        **kwargs,
+    }
+    return MediaS3Storage(**options)
+
+
+def test_large_file_uploads_parts_in_parallel(stub):
+    storage = _storage(stub)
+    data = os.urandom(16 * MB)
+
+    name = storage.save('videos/tour.mp4', ContentFile(data))
+
+    ops = stub.state.operations
+    assert ops['CreateMultipartUpload'] == 1 and ops['UploadPart'] == 4 and ops['CompleteMultipartUpload'] == 1
+    assert ops['PutObject'] == 0
+    assert stub.state.max_in_flight > 1
+    assert stub.get(BUCKET, name) == data
+
+
+def test_small_file_is_single_put(stub):
+    storage = _storage(stub)
+
+    storage.save('cards/card.webp', ContentFile(b'x' * 1000))
+
+    assert stub.state.operations['PutObject'] == 1
+    assert stub.state.operations['CreateMultipartUpload'] == 0
+
+
+def test_save_many_writes_concurrently(stub):
+    storage = _storage(stub)
+
+    saved = save_files(storage, {'a/card.webp': ContentFile(b'card'), 'a/detail.webp': ContentFile(b'detail')})
+
+    assert saved == {'a/card.webp': 'a/card.webp', 'a/detail.webp': 'a/detail.webp'}
+    assert stub.state.max_in_flight == 2
+    assert stub.get(BUCKET, 'a/detail.webp') == b'detail'
+
+
+def test_delete_many_batches_keys(stub):
+    storage = _storage(stub, delete_batch_size=2)
+    names = [storage.save(f'old/{n}.webp', ContentFile(b'x')) for n in range(5)]
+    stub.state.reset_counters()
+
+    delete_files(storage, [*names, 'old/missing.webp', ''])
+
+    assert stub.state.operations == {'DeleteObjects': 3}
+    assert not stub.state.objects
+
+
+@pytest.fixture
+def s3_media(settings, stub):
+    settings.AWS_S3_ENDPOINT_URL = stub.url
+    settings.AWS_STORAGE_BUCKET_NAME = BUCKET
+    settings.AWS_ACCESS_KEY_ID = 'stub'
+    settings.AWS_SECRET_ACCESS_KEY = 'stub'
+    settings.AWS_S3_REGION_NAME = 'us-east-1'
+    settings.STORAGES = {
+        **settings.STORAGES,
+        'default': {'BACKEND': 'apps.re_objects.storage.MediaS3Storage'},
+    }
+    return stub
+
+
+def test_image_derivatives_written_together_and_deleted_in_one_request(
+    s3_media, make_building, make_premise, django_capture_on_commit_callbacks
+):
+    building = make_building('БЦ Объектный', city='Бакетск', address='ул. Ключей, 1')
+    premise = make_premise(building, 'S3', area=30, price_per_month=1000)
+    buf = BytesIO()
+    Image.new('RGB', (900, 600), color='navy').save(buf, format='JPEG')
+
+    image = PremiseImage.objects.create(premise=premise, original=ContentFile(buf.getvalue(), name='p.jpg'))
+
+    assert s3_media.get(BUCKET, image.original.name) == buf.getvalue()
+    assert s3_media.get(BUCKET, image.detail.name)
+    # card и detail уходят одновременно
+    assert s3_media.state.max_in_flight >= 2
+    s3_media.state.reset_counters()
+
+    blob_id = image.blob_id
+    with django_capture_on_commit_callbacks(execute=True):
+        image.delete()
+
+    assert not MediaBlob.objects.filter(pk=blob_id).exists()
+    assert s3_media.state.operations['DeleteObjects'] == 1 and s3_media.state.operations['DeleteObject'] == 0
+    assert not s3_media.state.objects
@@ -0,0 +1,38 @@
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+
+from apps.accounts.services.auth_service import generate_jwt_tokens
+from apps.referrals.models import ReferralLink
+
+
+@pytest.fixture
+def agent(db):
+    return get_user_model().objects.create_user(username='ref-agent', email='ref-agent@example.com', password='secret')
+
+
+@pytest.fixture
+def auth_header(agent):
+    access_token, _ = generate_jwt_tokens(agent)
+    return f'Bearer {access_token}'
+
+
+@pytest.fixture
+def premise(make_building, make_premise):
+    building = make_building('Реферальный БЦ', city='Реферальск', floors=(), address='ул. Ссылка, 1')
+    return make_premise(
+        building,
+        '42',
+        floor=None,
+        area=Decimal('33.00'),
+        price_per_sqm=150000,
+        available_for_rent=False,
+        available_for_sale=True,
+        title='Офис для рефералки',
+    )
+
+
+@pytest.fixture
+def link(agent, premise):
+    return ReferralLink.objects.create(referrer=agent, premise=premise, contact_phone='+7900')
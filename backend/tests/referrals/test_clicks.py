@@ -0,0 +1,58 @@
+"""Переходы по реферальным ссылкам: буфер в памяти и запись пачкой."""
+
+import uuid
+
+import pytest
+from django.utils import timezone
+
+from apps.referrals.clicks import click_buffer
+from apps.referrals.models import ReferralClick
+
+
+@pytest.fixture(autouse=True)
+def empty_buffer(db):
+    click_buffer.flush()
+
+
+@pytest.fixture
+def click(django_client):
+    def post(code) -> int:
+        return django_client.post(
+            '/api/v1/referrals/clicks', data={'code': str(code)}, content_type='application/json'
+        ).status_code
+
+    return post
+
+
+def test_clicks_are_buffered_until_flush(click, link):
+    assert click(link.code) == 202
+    assert click(uuid.uuid4()) == 202
+
+    assert not ReferralClick.objects.filter(link=link).exists()
+    assert click_buffer.flush() == 1
+    assert list(ReferralClick.objects.filter(link=link).values_list('link_id', flat=True)) == [link.id]
+
+
+def test_full_buffer_is_flushed_by_request_in_one_bulk_insert(click, link, settings, django_assert_num_queries):
+    settings.REFERRAL_CLICKS_FLUSH_SIZE = 3
+    click(link.code)
+    click(link.code)
+    assert not ReferralClick.objects.filter(link=link).exists()
+
+    with django_assert_num_queries(2):  # коды -> id ссылок и один bulk INSERT
+        click(link.code)
+
+    assert ReferralClick.objects.filter(link=link).count() == 3
+    assert len(click_buffer) == 0
+
+
+def test_buffer_is_bounded(link, settings):
+    settings.REFERRAL_CLICKS_BUFFER_MAX = 2
+    settings.REFERRAL_CLICKS_FLUSH_SIZE = 100
+    dropped = click_buffer.dropped
+    for _ in range(3):
+        click_buffer.add(link.code, timezone.now())
+
+    assert len(click_buffer) == 2
+    assert click_buffer.dropped == dropped + 1
+    assert click_buffer.flush() == 2
@@ -0,0 +1,77 @@
+"""Реферальные ссылки: повторный запрос отдаёт активную ссылку, параллельные запросы не создают дублей."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from django.db import IntegrityError, OperationalError, connection, transaction
+
+from apps.referrals.models import ReferralLink
+from apps.referrals.services import create_referral_link
+
+WORKERS = 16
+
+
+@pytest.fixture
+def create_link(django_client, auth_header, premise):
+    def create(phone: str) -> dict:
+        response = django_client.post(
+            '/api/v1/referrals/links',
+            data={'premise_uuid': str(premise.uuid), 'phone': phone},
+            content_type='application/json',
+            HTTP_AUTHORIZATION=auth_header,
+        )
+        assert response.status_code == 201
+        return response.json()
+
+    return create
+
+
+def test_create_referral_link_reuses_active_link(create_link, premise):
+    first = create_link('+7 900 000-00-00')
+    again = create_link(' +7 900 000-00-00 ')
+    other_phone = create_link('+7 900 111-11-11')
+
+    assert again['code'] == first['code']
+    assert other_phone['code'] != first['code']
+    assert ReferralLink.objects.filter(premise=premise).count() == 2
+
+    ReferralLink.objects.filter(code=first['code']).update(is_active=False)
+    assert create_link('+7 900 000-00-00')['code'] != first['code']
+
+
+def test_database_rejects_second_active_link(agent, premise, link):
+    with pytest.raises(IntegrityError), transaction.atomic():
+        ReferralLink.objects.create(referrer=agent, premise=premise, contact_phone=link.contact_phone)
+
+    ReferralLink.objects.create(referrer=agent, premise=premise, contact_phone=link.contact_phone, is_active=False)
+
+
+def _retrying(call):
+    # SQLite (тестовая БД) отвечает «table is locked» вместо ожидания блокировки — повторяем
+    try:
+        for _ in range(400):
+            try:
+                return call()
+            except OperationalError:
+                time.sleep(0.005)
+        raise AssertionError('Не удалось дождаться блокировки БД')
+    finally:
+        connection.close()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_parallel_requests_share_one_link(agent, premise):
+    barrier = threading.Barrier(WORKERS)
+
+    def attempt(_):
+        barrier.wait()
+        return _retrying(lambda: create_referral_link(agent, premise.uuid, '+7 900 000-00-00'))
+
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        results = list(pool.map(attempt, range(WORKERS)))
+
+    assert all(err is None for _, err in results)
+    assert len({out.code for out, _ in results}) == 1
+    assert ReferralLink.objects.filter(premise=premise, is_active=True).count() == 1
@@ -0,0 +1,138 @@
+"""Свертка переходов, броней и оплат по ссылкам в дневную статистику и ручка статистики агента."""
+
+import uuid
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.utils import timezone
+
+from apps.bookings.models import Booking
+from apps.payments.models import Payment
+from apps.referrals.models import ReferralClick, ReferralDailyStats, ReferralLink
+from apps.referrals.rollup import purge_old_clicks, rollup_referral_stats
+
+
+def _at(day: date, hour: int = 12) -> datetime:
+    return timezone.make_aware(datetime(day.year, day.month, day.day, hour))
+
+
+def _payment(link, provider_payment_id: str, **fields) -> Payment:
+    return Payment.objects.create(
+        premise=link.premise,
+        referral_link=link,
+        provider_payment_id=provider_payment_id,
+        idempotence_key=uuid.uuid4(),
+        amount_value=Decimal('100.00'),
+        amount_currency='RUB',
+        **fields,
+    )
+
+
+def _stats(link) -> dict:
+    return {row.day: (row.clicks, row.bookings, row.payments) for row in ReferralDailyStats.objects.filter(link=link)}
+
+
+@pytest.fixture
+def today():
+    return timezone.localdate()
+
+
+@pytest.fixture
+def seeded(agent, link, today):
+    ReferralClick.objects.bulk_create(
+        [ReferralClick(link=link, clicked_at=_at(today - timedelta(days=1))) for _ in range(3)]
+        + [ReferralClick(link=link, clicked_at=_at(today))]
+    )
+    payment = _payment(link, 'rollup-payment', status=Payment.Status.SUCCEEDED, paid=True)
+    _payment(link, 'rollup-canceled', status=Payment.Status.CANCELED)
+    Booking.objects.create(
+        user=agent,
+        premise=link.premise,
+        deal_type=Booking.DealType.SALE,
+        expires_at=timezone.now() + timedelta(days=3),
+        source_payment=payment,
+    )
+
+
+def test_rollup_counts_per_link_and_day(link, seeded, today):
+    rollup_referral_stats(days=2)
+    assert _stats(link) == {today - timedelta(days=1): (3, 0, 0), today: (1, 1, 1)}
+
+    rollup_referral_stats(days=2)
+    assert ReferralDailyStats.objects.filter(link=link).count() == 2
+
+
+def test_rollup_keeps_days_outside_window(link, today):
+    old_day = today - timedelta(days=10)
+    ReferralDailyStats.objects.create(link=link, day=old_day, clicks=7)
+    ReferralDailyStats.objects.create(link=link, day=today, clicks=99)
+
+    call_command('rollup_referral_stats', '--days', '1', stdout=StringIO())
+
+    assert _stats(link) == {old_day: (7, 0, 0)}
+
+
+def test_wide_rollup_keeps_clicks_of_purged_days(link, settings, today):
+    settings.REFERRAL_CLICKS_KEEP_DAYS = 30
+    purged_day = today - timedelta(days=40)
+    recent_day = today - timedelta(days=10)
+    ReferralDailyStats.objects.create(link=link, day=purged_day, clicks=7)
+    ReferralClick.objects.create(link=link, clicked_at=_at(recent_day))
+
+    rollup_referral_stats(days=60)
+
+    assert _stats(link) == {purged_day: (7, 0, 0), recent_day: (1, 0, 0)}
+
+
+def test_late_success_counts_on_creation_day(link, today):
+    created_day = today - timedelta(days=5)
+    ReferralDailyStats.objects.create(link=link, day=created_day, clicks=4)
+    payment = _payment(link, 'rollup-late')
+    Payment.objects.filter(pk=payment.pk).update(created_at=_at(created_day))
+    rollup_referral_stats()
+    assert _stats(link) == {created_day: (4, 0, 0)}
+
+    # Оплата прошла уже после окна свертки
+    Payment.objects.filter(pk=payment.pk).update(status=Payment.Status.SUCCEEDED, updated_at=timezone.now())
+    rollup_referral_stats()
+    rollup_referral_stats()
+
+    assert _stats(link) == {created_day: (4, 0, 1)}
+
+
+def test_purge_old_clicks(link, settings):
+    settings.REFERRAL_CLICKS_KEEP_DAYS = 30
+    ReferralClick.objects.create(link=link, clicked_at=timezone.now() - timedelta(days=31))
+    ReferralClick.objects.create(link=link, clicked_at=timezone.now())
+
+    assert purge_old_clicks() == 1
+    assert ReferralClick.objects.filter(link=link).count() == 1
+
+
+def test_stats_endpoint_reads_rollups(django_client, auth_header, agent, premise, link, today):
+    yesterday = today - timedelta(days=1)
+    other = ReferralLink.objects.create(referrer=agent, premise=premise, contact_phone='+7901')
+    foreign_user = get_user_model().objects.create_user(username='other', email='o@example.com', password='x')
+    foreign = ReferralLink.objects.create(referrer=foreign_user, premise=premise, contact_phone='+7902')
+    ReferralDailyStats.objects.create(link=link, day=yesterday, clicks=3)
+    ReferralDailyStats.objects.create(link=link, day=today, clicks=1, bookings=1, payments=1)
+    ReferralDailyStats.objects.create(link=other, day=today, clicks=5)
+    ReferralDailyStats.objects.create(link=foreign, day=today, clicks=100)
+    ReferralDailyStats.objects.create(link=link, day=today - timedelta(days=30), clicks=50)
+
+    response = django_client.get('/api/v1/referrals/stats', {'days': 7}, HTTP_AUTHORIZATION=auth_header)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body['clicks'], body['bookings'], body['payments']) == (9, 1, 1)
+    assert [(d['day'], d['clicks']) for d in body['days']] == [(yesterday.isoformat(), 3), (today.isoformat(), 6)]
+    assert [item['code'] for item in body['links']] == [str(other.code), str(link.code)]
+    assert body['links'][1]['premise_uuid'] == str(premise.uuid)
+
+
+def test_stats_endpoint_requires_auth(django_client):
+    assert django_client.get('/api/v1/referrals/stats').status_code == 401
@@ -5,7 +5,8 @@ import pytest
 from asgiref.sync import sync_to_async
 from django.core.files.uploadedfile import SimpleUploadedFile
 
-from apps.site_settings.models import AgentSettings, ContactsSettings, MainSettings
+from apps.site_settings.cache import get_site_settings, site_settings_cache
+from apps.site_settings.models import AgentSettings, ContactsSettings, MainSettings, SiteSettingsVersion
 
 
 def _create_main_settings():
@@ -190,3 +191,68 @@ class TestAgents:
         assert response.status_code == 200
         data = response.json()
         assert data["table_link"] is None
+
+
+@pytest.mark.django_db
+class TestAllSettings:
+    """Тесты для GET /site-settings/all."""
+
+    async def test_all_returns_every_section(self, api_client, main_settings, contacts_settings, agent_settings):
+        response = await api_client.get("/site-settings/all")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["main"]["phone"] == "+79990001122"
+        assert data["contacts"]["coordinates"] == {"lat": 55.7558, "lng": 37.6173}
+        assert data["investors"] == {"document_1": None, "document_2": None, "document_3": None}
+        assert data["agents"]["table_link"] == "https://docs.google.com/spreadsheets/d/test"
+
+    async def test_all_etag_revalidation(self, api_client, main_settings):
+        first = await api_client.get("/site-settings/all")
+        etag = first.headers["ETag"]
+
+        cached = await api_client.get("/site-settings/all", headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+        assert cached.content == b""
+
+        main_settings.phone = "+79990009999"
+        await sync_to_async(main_settings.save)()
+
+        changed = await api_client.get("/site-settings/all", headers={"If-None-Match": etag})
+        assert changed.status_code == 200
+        assert changed.headers["ETag"] != etag
+        assert changed.json()["main"]["phone"] == "+79990009999"
+
+
+@pytest.mark.django_db
+class TestSiteSettingsCache:
+    """Кэш singleton-настроек: без вставок в БД, сброс по версии."""
+
+    def setup_method(self):
+        site_settings_cache.clear()
+
+    def test_missing_settings_are_not_created(self):
+        ContactsSettings.objects.all().delete()
+
+        settings = get_site_settings(ContactsSettings)
+
+        assert settings.pk is None
+        assert not ContactsSettings.objects.exists()
+
+    def test_cached_read_checks_only_version(self, django_assert_num_queries):
+        _create_main_settings()
+        get_site_settings(MainSettings)
+
+        with django_assert_num_queries(1):
+            assert get_site_settings(MainSettings).phone == "+79990001122"
+
+    def test_version_bump_from_other_worker_invalidates(self):
+        _create_main_settings()
+        assert get_site_settings(MainSettings).email == "site@example.com"
+
+        # Другой воркер сохранил настройки: в БД новые данные и новый токен, локальный кэш не сброшен
+        MainSettings.objects.filter(pk=1).update(email="new@example.com")
+        assert get_site_settings(MainSettings).email == "site@example.com"
+        SiteSettingsVersion.objects.filter(pk=1).update(token="other-worker")
+
+        assert get_site_settings(MainSettings).email == "new@example.com"
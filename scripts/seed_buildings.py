@@ -6,6 +6,9 @@
     python scripts/seed_buildings.py [--base-url URL] [--email EMAIL] [--password PASSWORD]
     python scripts/seed_buildings.py --base-url http://176.98.176.204 --email admin@example.com --password admin
 
+Загрузка идёт параллельно (--workers), с повторами и манифестом: после сбоя тот же запуск
+продолжает с места остановки, --fresh — начать заново (см. scripts/upload_client.py).
+
 Требования: pip install requests
 """
 import argparse
@@ -13,11 +16,7 @@ import random
 import sys
 from pathlib import Path
 
-try:
-    import requests
-except ImportError:
-    print("Ошибка: установите requests: pip install requests")
-    sys.exit(1)
+from upload_client import UploadClient, UploadTask, add_upload_arguments, log, login
 
 # Путь к examples относительно корня проекта
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
@@ -67,119 +66,53 @@ BUILDING_DESCRIPTIONS = [
 ]
 
 
-def log(msg: str) -> None:
-    print(msg, flush=True)
-
-
-def login(base_url: str, email: str, password: str) -> str | None:
-    """Авторизация, возвращает access_token или None."""
-    url = f"{base_url.rstrip('/')}/api/v1/auth/login"
-    try:
-        r = requests.post(url, json={"email": email, "password": password}, timeout=30)
-        if r.status_code != 200:
-            log(f"  Ошибка логина: {r.status_code} {r.text[:200]}")
-            return None
-        data = r.json()
-        return data.get("access_token")
-    except Exception as e:
-        log(f"  Ошибка при логине: {e}")
-        return None
-
-
-def create_building(
-    base_url: str,
-    token: str | None,
+def building_task(
+    index: int,
     name: str,
     address: str,
     description: str,
     examples_dir: Path,
     include_video: bool = True,
-) -> dict | None:
-    """Создаёт здание с этажом и медиа. Возвращает ответ или None."""
-    url = f"{base_url.rstrip('/')}/api/v1/dev/buildings"
-
-    # Собираем файлы в случайном порядке
-    file_handles = []
-    all_files = []
-    for fname in BUILDING_IMAGES:
-        p = examples_dir / fname
-        if p.exists():
-            fh = p.open("rb")
-            file_handles.append(fh)
-            ct = "image/png" if fname.endswith(".png") else "image/jpeg"
-            all_files.append(("files", (fname, fh, ct)))
-    if include_video:
-        video_path = examples_dir / BUILDING_VIDEO
-        if video_path.exists():
-            fh = video_path.open("rb")
-            file_handles.append(fh)
-            all_files.append(("files", (BUILDING_VIDEO, fh, "video/mp4")))
-    random.shuffle(all_files)
-
-    data = {"name": name, "address": address, "description": description}
-    headers = {"Authorization": f"Bearer {token}"} if token else {}
-
-    try:
-        r = requests.post(url, data=data, files=all_files, headers=headers, timeout=120)
-        if r.status_code not in (200, 201):
-            log(f"  Ошибка создания здания: {r.status_code}")
-            log(f"  Ответ: {r.text[:500]}")
-            return None
-        return r.json()
-    except Exception as e:
-        log(f"  Ошибка при создании здания: {e}")
-        return None
-    finally:
-        for fh in file_handles:
-            fh.close()
+) -> UploadTask:
+    """Здание с этажом и медиа (фото + видео в случайном порядке)."""
+    files = [examples_dir / fname for fname in BUILDING_IMAGES if (examples_dir / fname).exists()]
+    if include_video and (examples_dir / BUILDING_VIDEO).exists():
+        files.append(examples_dir / BUILDING_VIDEO)
+    random.shuffle(files)
+    return UploadTask(
+        key=f"building:{index}",
+        path="/api/v1/dev/buildings",
+        data={"name": name, "address": address, "description": description},
+        files=files,
+        label=f"здание {name}",
+        timeout=300,
+    )
 
 
-def create_premise(
-    base_url: str,
-    token: str | None,
+def premise_task(
     building_uuid: str,
+    index: int,
     area: float,
     price_per_month: float,
     number: str,
     description: str,
     examples_dir: Path,
-) -> dict | None:
-    """Создаёт помещение в здании с фото. Возвращает ответ или None."""
-    url = f"{base_url.rstrip('/')}/api/v1/dev/premises/{building_uuid}"
-
-    # Фото в случайном порядке
-    file_handles = []
-    files = []
-    for fname in PREMISE_IMAGES:
-        p = examples_dir / fname
-        if p.exists():
-            fh = p.open("rb")
-            file_handles.append(fh)
-            ct = "image/png" if fname.endswith(".png") else "image/jpeg"
-            files.append(("files", (fname, fh, ct)))
+) -> UploadTask:
+    """Помещение в здании с фото в случайном порядке."""
+    files = [examples_dir / fname for fname in PREMISE_IMAGES if (examples_dir / fname).exists()]
     random.shuffle(files)
-
-    data = {
-        "area": str(area),
-        "price_per_month": str(int(price_per_month)),
-        "number": number,
-        "description": description,
-    }
-    headers = {"Authorization": f"Bearer {token}"} if token else {}
-
-    try:
-        r = requests.post(url, data=data, files=files, headers=headers, timeout=60)
-        if r.status_code not in (200, 201):
-            log(f"  Ошибка создания помещения: {r.status_code}")
-            log(f"  Ответ: {r.text[:500]}")
-            return None
-        return r.json()
-    except Exception as e:
-        log(f"  Ошибка при создании помещения: {e}")
-        return None
-    finally:
-        for fh in file_handles:
-            fh.close()
+    return UploadTask(
+        key=f"premise:{building_uuid}:{index}",
+        path=f"/api/v1/dev/premises/{building_uuid}",
+        data={
+            "area": str(area),
+            "price_per_month": str(int(price_per_month)),
+            "number": number,
+            "description": description,
+        },
+        files=files,
+        label=f"помещение {number}",
+    )
 
 
 def main() -> int:
@@ -191,6 +124,7 @@ def main() -> int:
     parser.add_argument("--premises-per-building", type=int, default=10, help="Помещений в каждом здании")
     parser.add_argument("--no-auth", action="store_true", help="Не использовать авторизацию (если dev-ручки публичные)")
     parser.add_argument("--no-video", action="store_true", help="Не загружать видео (экономия трафика, видео ~18MB)")
+    add_upload_arguments(parser, "seed_buildings")
     args = parser.parse_args()
 
     base_url = args.base_url.rstrip("/")
@@ -202,7 +136,7 @@ def main() -> int:
 
     log("=== Загрузка тестовых данных ===")
     log(f"Сервер: {base_url}")
-    log(f"Зданий: {args.buildings}, помещений в каждом: {args.premises_per_building}")
+    log(f"Зданий: {args.buildings}, помещений в каждом: {args.premises_per_building}, потоков: {args.workers}")
     log("")
 
     token = None
@@ -216,13 +150,13 @@ def main() -> int:
     else:
         log("Авторизация отключена (--no-auth).")
 
+    client = UploadClient.from_args(base_url, token, args)
+
     # Используем копию списка имён и перемешиваем
     building_names = BUILDING_NAMES.copy()
     random.shuffle(building_names)
 
-    total_ok_buildings = 0
-    total_ok_premises = 0
-
+    building_tasks = []
     for i in range(args.buildings):
         name = building_names[i % len(building_names)]
         if args.buildings > len(building_names):
@@ -231,45 +165,38 @@ def main() -> int:
         num = random.randint(1, 150)
         address = f"{street}, {num}, Казань, Татарстан"
         description = random.choice(BUILDING_DESCRIPTIONS)
-
-        log(f"[{i + 1}/{args.buildings}] Создание здания: {name}")
-
-        resp = create_building(
-            base_url, token, name, address, description, examples_dir,
-            include_video=not args.no_video,
+        building_tasks.append(
+            building_task(i, name, address, description, examples_dir, include_video=not args.no_video)
         )
-        if not resp:
-            log(f"  Пропуск здания {name}")
-            continue
-
-        building_uuid = resp.get("uuid")
-        if not building_uuid:
-            log(f"  Нет uuid в ответе: {resp}")
-            continue
 
-        total_ok_buildings += 1
-        log(f"  Здание создано: uuid={building_uuid}")
+    log("Создание зданий...")
+    buildings = client.run(building_tasks)
+    building_uuids = [resp["uuid"] for resp in buildings.values() if resp and resp.get("uuid")]
+    log("")
 
+    premise_tasks = []
+    for building_uuid in building_uuids:
         for j in range(args.premises_per_building):
             area = round(random.uniform(20, 200), 1)
             price = random.randint(30000, 150000)
             num = random.randint(1, 999)
             number = random.choice(PREMISE_NUMBER_TEMPLATES).format(n=num)
             desc = f"Офисное помещение {area} м², аренда от {price} ₽/мес."
-
-            resp_p = create_premise(
-                base_url, token, building_uuid,
-                area=area, price_per_month=price,
-                number=number, description=desc,
-                examples_dir=examples_dir,
+            premise_tasks.append(
+                premise_task(
+                    building_uuid, j,
+                    area=area, price_per_month=price,
+                    number=number, description=desc,
+                    examples_dir=examples_dir,
+                )
             )
-            if resp_p:
-                total_ok_premises += 1
-                if (j + 1) % 5 == 0 or j == args.premises_per_building - 1:
-                    log(f"  Помещений: {j + 1}/{args.premises_per_building}")
 
-        log("")
+    log("Создание помещений...")
+    premises = client.run(premise_tasks)
+    log("")
 
+    total_ok_buildings = len(building_uuids)
+    total_ok_premises = sum(1 for resp in premises.values() if resp)
     log("=== Готово ===")
     log(f"Создано зданий: {total_ok_buildings}/{args.buildings}")
     log(f"Создано помещений: {total_ok_premises}/{args.buildings * args.premises_per_building}")
@@ -0,0 +1,338 @@
+"""
+Общий клиент загрузки для скриптов наполнения (seed_buildings.py, seed_full_building.py,
+upload_zilant_visualization_premises.py).
+
+- одна requests.Session с пулом соединений на все потоки;
+- ограниченный параллелизм: не больше --workers запросов одновременно;
+- повторы при сетевых ошибках и 429/5xx с экспоненциальной задержкой и учётом Retry-After;
+  каждый запрос несёт Idempotency-Key, поэтому повтор уже выполненного сервером запроса
+  возвращает сохранённый ответ, а не создаёт дубликат;
+- манифест (JSONL) завершённых задач: повторный запуск пропускает их и берёт сохранённые ответы
+  (например, uuid созданного здания);
+- файлы читаются с диска один раз (LRU-кэш в памяти, ограниченный по байтам);
+- прогресс: задачи, мегабайты и скорость.
+
+Скрипты лежат в одной папке, поэтому импорт — просто `from upload_client import ...`.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import mimetypes
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+except ImportError:
+    print("Ошибка: установите requests: pip install requests", file=sys.stderr)
+    sys.exit(1)
+
+DEFAULT_WORKERS = 4
+DEFAULT_RETRIES = 5
+MANIFEST_DIR = Path(".upload-manifests")
+
+# Статусы, после которых запрос имеет смысл повторить
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_BACKOFF = 30.0
+
+# Сколько байт файлов держать в памяти: примеры и визуализации переиспользуются между запросами и повторами
+FILE_CACHE_BYTES = 128 * 1024 * 1024
+
+_log_lock = threading.Lock()
+
+
+def log(msg: str) -> None:
+    with _log_lock:
+        print(msg, flush=True)
+
+
+def login(base_url: str, email: str, password: str) -> str | None:
+    """Авторизация, возвращает access_token или None."""
+    url = f"{base_url.rstrip('/')}/api/v1/auth/login"
+    try:
+        r = requests.post(url, json={"email": email, "password": password}, timeout=30)
+        if r.status_code != 200:
+            log(f"Ошибка логина: {r.status_code} {r.text[:300]}")
+            return None
+        return r.json().get("access_token")
+    except (OSError, ValueError) as e:
+        log(f"Ошибка при логине: {e}")
+        return None
+
+
+def add_upload_arguments(parser: argparse.ArgumentParser, manifest_name: str) -> None:
+    """Общие параметры загрузки: параллелизм, повторы, манифест."""
+    parser.add_argument(
+        "--workers", type=int, default=DEFAULT_WORKERS, help="Одновременных запросов (по умолчанию 4)"
+    )
+    parser.add_argument(
+        "--retries", type=int, default=DEFAULT_RETRIES, help="Повторов при сетевых ошибках и 429/5xx"
+    )
+    parser.add_argument(
+        "--manifest",
+        type=Path,
+        default=MANIFEST_DIR / f"{manifest_name}.jsonl",
+        help="Манифест завершённых загрузок: повторный запуск пропускает их",
+    )
+    parser.add_argument(
+        "--fresh", action="store_true", help="Начать заново: забыть манифест и загрузить всё ещё раз"
+    )
+
+
+def _mime(path: Path) -> str:
+    return mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+
+
+def _retry_after(response: requests.Response) -> float | None:
+    try:
+        return min(MAX_BACKOFF, max(0.0, float(response.headers["Retry-After"])))
+    except (KeyError, ValueError):
+        return None
+
+
+class FileCache:
+    """LRU-кэш содержимого файлов, ограниченный суммарным размером."""
+
+    def __init__(self, max_bytes: int = FILE_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._items: OrderedDict[Path, bytes] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def read(self, path: Path) -> bytes:
+        with self._lock:
+            data = self._items.get(path)
+            if data is not None:
+                self._items.move_to_end(path)
+                return data
+        data = path.read_bytes()
+        if len(data) > self.max_bytes:
+            return data
+        with self._lock:
+            if path not in self._items:
+                self._items[path] = data
+                self._size += len(data)
+                while self._size > self.max_bytes:
+                    _, evicted = self._items.popitem(last=False)
+                    self._size -= len(evicted)
+        return data
+
+
+class Manifest:
+    """
+    Журнал завершённых задач в JSONL.
+
+    Первая строка — {"run_id": ...}: из него строятся Idempotency-Key, и он переживает перезапуск,
+    чтобы повтор запроса, выполненного сервером до сбоя, не создал дубликат. Далее по строке
+    на задачу: {"base_url", "key", "response"}. Строка дописывается и сбрасывается на диск сразу.
+    """
+
+    def __init__(self, path: Path | None, base_url: str, fresh: bool = False):
+        self.path = path
+        self.base_url = base_url
+        self.run_id = uuid.uuid4().hex
+        self.done: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        if path is None:
+            return
+        if fresh or not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps({"run_id": self.run_id}) + "\n", encoding="utf-8")
+            return
+        raw = path.read_bytes()
+        for line in raw.decode("utf-8", errors="replace").splitlines():
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # строка, оборванная при аварийном завершении
+            if "run_id" in entry:
+                self.run_id = entry["run_id"]
+            elif entry.get("base_url") == base_url:
+                self.done[entry["key"]] = entry["response"]
+        if raw and not raw.endswith(b"\n"):
+            with path.open("a", encoding="utf-8") as f:
+                f.write("\n")
+
+    def record(self, key: str, response: dict) -> None:
+        with self._lock:
+            self.done[key] = response
+            if self.path is None:
+                return
+            line = json.dumps({"base_url": self.base_url, "key": key, "response": response}, ensure_ascii=False)
+            with self.path.open("a", encoding="utf-8") as f:
+                f.write(line + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+
+@dataclass
+class UploadTask:
+    """Один POST multipart/form-data. key стабилен между запусками: по нему манифест и Idempotency-Key."""
+
+    key: str
+    path: str
+    data: dict = field(default_factory=dict)
+    files: list[Path] = field(default_factory=list)
+    label: str = ""
+    file_field: str = "files"
+    timeout: float = 120
+
+    @property
+    def size(self) -> int:
+        return sum(p.stat().st_size for p in self.files if p.exists())
+
+
+class Progress:
+    """Строка прогресса после каждой задачи: готово/всего, мегабайты, средняя скорость."""
+
+    def __init__(self, total: int, total_bytes: int):
+        self.total = total
+        self.total_bytes = total_bytes
+        self.done = 0
+        self.failed = 0
+        self.sent_bytes = 0
+        self.started = time.monotonic()
+
+    def update(self, task: UploadTask, size: int, ok: bool) -> None:
+        self.done += 1
+        if ok:
+            self.sent_bytes += size
+        else:
+            self.failed += 1
+        mb = self.sent_bytes / 1_048_576
+        speed = mb / max(time.monotonic() - self.started, 1e-6)
+        status = "OK" if ok else "ошибка"
+        log(
+            f"[{self.done}/{self.total}] {mb:.1f}/{self.total_bytes / 1_048_576:.1f} МБ, {speed:.1f} МБ/с — "
+            f"{task.label or task.key}: {status}"
+        )
+
+    def finish(self) -> None:
+        elapsed = time.monotonic() - self.started
+        log(
+            f"Загружено {self.done - self.failed}/{self.total} за {elapsed:.1f} с "
+            f"({self.sent_bytes / 1_048_576:.1f} МБ), ошибок: {self.failed}"
+        )
+
+
+class UploadClient:
+    """Параллельная загрузка в dev API с повторами и манифестом завершённых задач."""
+
+    def __init__(
+        self,
+        base_url: str,
+        token: str | None = None,
+        *,
+        workers: int = DEFAULT_WORKERS,
+        retries: int = DEFAULT_RETRIES,
+        manifest: Path | None = None,
+        fresh: bool = False,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.workers = max(1, workers)
+        self.retries = max(0, retries)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        if token:
+            self.session.headers["Authorization"] = f"Bearer {token}"
+        self.files = FileCache()
+        self.manifest = Manifest(manifest, self.base_url, fresh=fresh)
+
+    @classmethod
+    def from_args(cls, base_url: str, token: str | None, args: argparse.Namespace) -> UploadClient:
+        client = cls(
+            base_url, token, workers=args.workers, retries=args.retries, manifest=args.manifest, fresh=args.fresh
+        )
+        if client.manifest.done:
+            log(f"Манифест {args.manifest}: завершено ранее {len(client.manifest.done)} (--fresh — начать заново)")
+        return client
+
+    def post(self, task: UploadTask) -> dict | None:
+        """Выполняет запрос с повторами. None — запрос не удался (причина уже в логе)."""
+        label = task.label or task.key
+        # Ключ задачи может содержать кириллицу (категории медиа), а заголовки — только latin-1
+        headers = {"Idempotency-Key": f"{self.manifest.run_id}:{hashlib.sha256(task.key.encode()).hexdigest()}"}
+        error = ""
+        for attempt in range(self.retries + 1):
+            try:
+                files = [(task.file_field, (p.name, self.files.read(p), _mime(p))) for p in task.files]
+            except OSError as e:
+                log(f"  {label}: не удалось прочитать файл: {e}")
+                return None
+            delay = None
+            try:
+                r = self.session.post(
+                    self.base_url + task.path,
+                    data=task.data,
+                    files=files or None,
+                    headers=headers,
+                    timeout=task.timeout,
+                )
+            except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError) as e:
+                error = f"{type(e).__name__}: {e}"
+            else:
+                if r.status_code in (200, 201):
+                    try:
+                        return r.json()
+                    except ValueError:
+                        error = f"{r.status_code}, ответ не JSON: {r.text[:200]}"
+                        break
+                error = f"{r.status_code} {' '.join(r.text[:500].split())}"
+                if r.status_code not in RETRY_STATUSES:
+                    break
+                delay = _retry_after(r)
+            if attempt < self.retries:
+                if delay is None:
+                    delay = min(MAX_BACKOFF, 2**attempt) * random.uniform(0.5, 1.0)
+                log(f"  {label}: {error}; повтор через {delay:.1f} с")
+                time.sleep(delay)
+        log(f"  {label}: {error}")
+        return None
+
+    def run(self, tasks: Iterable[UploadTask]) -> dict[str, dict | None]:
+        """
+        Выполняет задачи параллельно и возвращает ответы по ключам (None — ошибка).
+        Задачи из манифеста не отправляются: их ответ берётся из манифеста.
+        """
+        results: dict[str, dict | None] = {}
+        pending: list[tuple[UploadTask, int]] = []
+        for task in tasks:
+            if task.key in self.manifest.done:
+                results[task.key] = self.manifest.done[task.key]
+            else:
+                pending.append((task, task.size))
+        if results:
+            log(f"Пропущено (уже загружено): {len(results)}")
+        if not pending:
+            return results
+
+        progress = Progress(len(pending), sum(size for _, size in pending))
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {pool.submit(self.post, task): (task, size) for task, size in pending}
+            for future in as_completed(futures):
+                task, size = futures[future]
+                try:
+                    response = future.result()
+                except Exception as e:  # ошибка одной задачи не должна останавливать остальные
+                    log(f"  {task.label or task.key}: {type(e).__name__}: {e}")
+                    response = None
+                if response is not None:
+                    self.manifest.record(task.key, response)
+                results[task.key] = response
+                progress.update(task, size, response is not None)
+        progress.finish()
+        return results
@@ -4,6 +4,8 @@
 
 В корне (--path) ожидаются подпапки «2 офис»…«8 офис» с изображениями → номера помещений 102…108.
 Порядок файлов в подпапке — по имени. Площадь всегда 1 м²; available_for_rent=true, available_for_sale=false.
+Помещения загружаются параллельно (--workers), с повторами и манифестом: перезапуск после сбоя
+пропускает уже созданные помещения (см. scripts/upload_client.py).
 
 Зависимость requests — окружение backend:
   cd backend && uv run python ../scripts/upload_zilant_visualization_premises.py --help
@@ -19,15 +21,10 @@
 from __future__ import annotations
 
 import argparse
-import sys
 from pathlib import Path
 from uuid import UUID
 
-try:
-    import requests
-except ImportError:
-    print("Ошибка: установите requests (или uv sync в backend).", file=sys.stderr)
-    sys.exit(1)
+from upload_client import UploadClient, UploadTask, add_upload_arguments, log, login
 
 IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".webp", ".gif"}
 
@@ -38,36 +35,6 @@ FOLDER_TO_PREMISE = [(f"{n} офис", str(100 + n)) for n in range(2, 9)]
 PREMISE_AREA = "1"
 
 
-def log(msg: str) -> None:
-    print(msg, flush=True)
-
-
-def _mime(path: Path) -> str:
-    s = path.suffix.lower()
-    if s in (".jpg", ".jpeg"):
-        return "image/jpeg"
-    if s == ".png":
-        return "image/png"
-    if s == ".webp":
-        return "image/webp"
-    if s == ".gif":
-        return "image/gif"
-    return "application/octet-stream"
-
-
-def login(base_url: str, email: str, password: str) -> str | None:
-    url = f"{base_url.rstrip('/')}/api/v1/auth/login"
-    try:
-        r = requests.post(url, json={"email": email, "password": password}, timeout=30)
-        if r.status_code != 200:
-            log(f"Ошибка логина: {r.status_code} {r.text[:300]}")
-            return None
-        return r.json().get("access_token")
-    except OSError as e:
-        log(f"Ошибка сети при логине: {e}")
-        return None
-
-
 def collect_images(folder: Path) -> list[Path]:
     if not folder.is_dir():
         return []
@@ -76,45 +43,27 @@ def collect_images(folder: Path) -> list[Path]:
     return out
 
 
-def create_premise(
-    base_url: str,
-    token: str | None,
+def premise_task(
     building_uuid: str,
     number: str,
     image_paths: list[Path],
     floor_number: int,
-) -> dict | None:
-    url = f"{base_url.rstrip('/')}/api/v1/dev/premises/{building_uuid}"
-    headers = {"Authorization": f"Bearer {token}"} if token else {}
-
-    data = {
-        "area": PREMISE_AREA,
-        "number": number,
-        "description": "",
-        "floor_number": str(floor_number),
-        "available_for_rent": "true",
-        "available_for_sale": "false",
-    }
-
-    file_handles: list = []
-    files: list[tuple[str, tuple]] = []
-    try:
-        for p in image_paths:
-            fh = p.open("rb")
-            file_handles.append(fh)
-            files.append(("files", (p.name, fh, _mime(p))))
-
-        r = requests.post(url, data=data, files=files, headers=headers, timeout=120)
-        if r.status_code not in (200, 201):
-            log(f"  Ошибка API: {r.status_code} {r.text[:800]}")
-            return None
-        return r.json()
-    except OSError as e:
-        log(f"  Ошибка файлов/сети: {e}")
-        return None
-    finally:
-        for fh in file_handles:
-            fh.close()
+) -> UploadTask:
+    return UploadTask(
+        key=f"premise:{building_uuid}:{number}",
+        path=f"/api/v1/dev/premises/{building_uuid}",
+        data={
+            "area": PREMISE_AREA,
+            "number": number,
+            "description": "",
+            "floor_number": str(floor_number),
+            "available_for_rent": "true",
+            "available_for_sale": "false",
+        },
+        files=image_paths,
+        label=f"№{number} ({len(image_paths)} файлов)",
+        timeout=300,
+    )
 
 
 def _resolve_token(base_url: str, args: argparse.Namespace) -> str | None:
@@ -147,6 +96,7 @@ def main() -> int:
     parser.add_argument("--password", help="Пароль")
     parser.add_argument("--token", help="Bearer-токен (без префикса Bearer)")
     parser.add_argument("--no-auth", action="store_true", help="Не передавать заголовок Authorization")
+    add_upload_arguments(parser, "zilant_visualization_premises")
     args = parser.parse_args()
 
     try:
@@ -177,31 +127,27 @@ def main() -> int:
     if not args.no_auth and not token:
         return 1
 
-    ok = 0
-    failed = 0
+    tasks = []
     for folder_name, premise_number in FOLDER_TO_PREMISE:
         sub = visual_root / folder_name
         images = collect_images(sub)
         if not images:
             log(f"Пропуск папки «{folder_name}» → №{premise_number}: нет изображений в {sub}")
             continue
-        log(f"Помещение №{premise_number}, файлов: {len(images)} …")
-        result = create_premise(
-            base_url,
-            token,
-            building_uuid,
-            premise_number,
-            images,
-            floor_number=args.floor_number,
-        )
+        tasks.append(premise_task(building_uuid, premise_number, images, floor_number=args.floor_number))
+
+    client = UploadClient.from_args(base_url, token, args)
+    results = client.run(tasks)
+    failed = 0
+    for task in tasks:
+        result = results.get(task.key)
         if result:
-            ok += 1
             log(f"  OK: {result}")
         else:
             failed += 1
-            log(f"  Не создано: №{premise_number}")
+            log(f"  Не создано: {task.label}")
 
-    log(f"Готово: успешно создано {ok}, ошибок {failed}.")
+    log(f"Готово: успешно создано {len(tasks) - failed}, ошибок {failed}.")
     return 0 if failed == 0 else 1
 
 